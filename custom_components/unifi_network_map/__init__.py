@@ -4,7 +4,7 @@ import asyncio
 import inspect
 import json
 import logging
-from collections.abc import Awaitable, Callable, Mapping
+from collections.abc import Awaitable, Callable, Coroutine, Mapping
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Protocol, cast
 
@@ -12,22 +12,31 @@ import voluptuous as vol
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.config_entries import ConfigEntryState
 from homeassistant.const import EVENT_HOMEASSISTANT_START
+from homeassistant.core import SupportsResponse
 from homeassistant.exceptions import HomeAssistantError
 
 from .const import (
     ATTR_ENTRY_ID,
+    ATTR_TOP,
+    CONF_CACHE_MEMORY_MIB,
+    CONF_EXECUTOR_WORKERS,
     CONF_PAYLOAD_CACHE_TTL,
+    DEFAULT_CACHE_MEMORY_MIB,
+    DEFAULT_EXECUTOR_WORKERS,
     DEFAULT_PAYLOAD_CACHE_TTL_SECONDS,
+    DEFAULT_PROFILE_TOP_N,
     DOMAIN,
     LOGGER,
     PLATFORMS,
+    SERVICE_PROFILE_REFRESH,
+    SERVICE_RECORD_BUNDLE,
     SERVICE_REFRESH,
 )
 from .coordinator import UniFiNetworkMapCoordinator
 
 if TYPE_CHECKING:
     from homeassistant.config_entries import ConfigEntry
-    from homeassistant.core import HomeAssistant, ServiceCall
+    from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse
 
     from .data import UniFiNetworkMapConfigEntry
 
@@ -63,6 +72,8 @@ async def async_setup_entry(
     _suppress_unifi_api_info_logs(hass)
     _register_websocket_api(hass)
     _configure_payload_cache_ttl(hass, entry)
+    _configure_cache_memory(hass, entry)
+    _configure_job_executor(hass, entry)
     coordinator = UniFiNetworkMapCoordinator(hass, entry)
     await _initialize_coordinator(coordinator)
     entry.runtime_data = coordinator
@@ -79,9 +90,13 @@ async def _async_options_updated(
 ) -> None:
     """Handle options update -- rebuild coordinator and refresh."""
     from .payload_cache import invalidate_payload_cache
+    from .svg_cache import invalidate_themed_svg_cache
 
     _configure_payload_cache_ttl(hass, entry)
+    _configure_cache_memory(hass, entry)
+    _configure_job_executor(hass, entry)
     invalidate_payload_cache(hass, entry.entry_id)
+    invalidate_themed_svg_cache(hass, entry.entry_id)
     coordinator = entry.runtime_data
     coordinator.update_settings()
     await coordinator.async_request_refresh()
@@ -93,16 +108,23 @@ async def async_unload_entry(
     entry: UniFiNetworkMapConfigEntry,
 ) -> bool:
     from . import entity_cache
+    from .job_executor import async_shutdown_job_executor
     from .payload_cache import invalidate_payload_cache
+    from .stage_timings import discard_stage_timings
+    from .svg_cache import invalidate_themed_svg_cache
 
     unload_ok = await hass.config_entries.async_unload_platforms(
         entry, PLATFORMS
     )
     if unload_ok:
+        await entry.runtime_data.async_shutdown()
         entity_cache.invalidate_entity_cache(hass)
         invalidate_payload_cache(hass, entry.entry_id)
+        discard_stage_timings(hass, entry.entry_id)
+        invalidate_themed_svg_cache(hass, entry.entry_id)
         if not _other_loaded_entries(hass, entry):
             entity_cache.cleanup_entity_cache(hass)
+            await async_shutdown_job_executor(hass)
     return unload_ok
 
 
@@ -156,6 +178,24 @@ def _configure_payload_cache_ttl(
     set_payload_cache_ttl(hass, float(ttl))
 
 
+def _configure_cache_memory(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Set the shared cache memory budget from entry options."""
+    from .cache_budget import set_cache_memory_limit
+
+    limit = entry.options.get(CONF_CACHE_MEMORY_MIB, DEFAULT_CACHE_MEMORY_MIB)
+    set_cache_memory_limit(hass, int(limit))
+
+
+def _configure_job_executor(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Size the shared job executor from entry options."""
+    from .job_executor import set_job_executor_workers
+
+    workers = entry.options.get(
+        CONF_EXECUTOR_WORKERS, DEFAULT_EXECUTOR_WORKERS
+    )
+    set_job_executor_workers(hass, int(workers))
+
+
 def _register_refresh_service(hass: HomeAssistant) -> None:
     if _refresh_service_registered(hass):
         return
@@ -176,6 +216,8 @@ def _register_runtime_services(
     register_views(hass)
     _register_frontend_assets(hass)
     _register_refresh_service(hass)
+    _register_profile_service(hass)
+    _register_record_bundle_service(hass)
 
 
 def _register_websocket_api(hass: HomeAssistant) -> None:
@@ -238,6 +280,84 @@ def _register_refresh_handler(
     )
 
 
+def _register_profile_service(hass: HomeAssistant) -> None:
+    data = hass.data.setdefault(DOMAIN, {})
+    if _flag_is_set(data, "profile_service_registered"):
+        return
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        _build_profile_handler(hass),
+        schema=vol.Schema(
+            {
+                vol.Optional(ATTR_ENTRY_ID): str,
+                vol.Optional(ATTR_TOP, default=DEFAULT_PROFILE_TOP_N): vol.All(
+                    vol.Coerce(int), vol.Range(min=1, max=200)
+                ),
+            }
+        ),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    _set_flag(data, "profile_service_registered")
+
+
+def _build_profile_handler(
+    hass: HomeAssistant,
+) -> Callable[[ServiceCall], Coroutine[Any, Any, ServiceResponse]]:
+    async def _handle_profile(call: ServiceCall) -> ServiceResponse:
+        from .profiler import async_profile_refresh
+
+        entry_id = call.data.get(ATTR_ENTRY_ID)
+        entries = _select_entries(hass, entry_id)
+        if not entries:
+            raise HomeAssistantError(
+                "No matching UniFi Network Map entry found"
+            )
+        profiles = {}
+        for entry in entries:
+            profiles[entry.entry_id] = await async_profile_refresh(
+                hass, entry.entry_id, entry.runtime_data, call.data[ATTR_TOP]
+            )
+        return {"profiles": profiles}
+
+    return _handle_profile
+
+
+def _register_record_bundle_service(hass: HomeAssistant) -> None:
+    data = hass.data.setdefault(DOMAIN, {})
+    if _flag_is_set(data, "record_bundle_service_registered"):
+        return
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_RECORD_BUNDLE,
+        _build_record_bundle_handler(hass),
+        schema=vol.Schema({vol.Optional(ATTR_ENTRY_ID): str}),
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    _set_flag(data, "record_bundle_service_registered")
+
+
+def _build_record_bundle_handler(
+    hass: HomeAssistant,
+) -> Callable[[ServiceCall], Coroutine[Any, Any, ServiceResponse]]:
+    async def _handle_record_bundle(call: ServiceCall) -> ServiceResponse:
+        from .bundle import async_record_bundle
+
+        entries = _select_entries(hass, call.data.get(ATTR_ENTRY_ID))
+        if not entries:
+            raise HomeAssistantError(
+                "No matching UniFi Network Map entry found"
+            )
+        bundles = {}
+        for entry in entries:
+            bundles[entry.entry_id] = await async_record_bundle(
+                hass, entry.entry_id, entry.runtime_data
+            )
+        return {"bundles": bundles}
+
+    return _handle_record_bundle
+
+
 def _register_frontend_assets(hass: HomeAssistant) -> None:
     data = hass.data.setdefault(DOMAIN, {})
     if _flag_is_set(data, "frontend_registered"):
@@ -549,9 +669,15 @@ async def _maybe_await_items(
 def _select_coordinators(
     hass: HomeAssistant, entry_id: str | None
 ) -> list[UniFiNetworkMapCoordinator]:
+    return [entry.runtime_data for entry in _select_entries(hass, entry_id)]
+
+
+def _select_entries(
+    hass: HomeAssistant, entry_id: str | None
+) -> list[UniFiNetworkMapConfigEntry]:
     entries = hass.config_entries.async_entries(DOMAIN)
     return [
-        entry.runtime_data
+        entry
         for entry in entries
         if hasattr(entry, "runtime_data")
         and isinstance(entry.runtime_data, UniFiNetworkMapCoordinator)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import logging
 import os
 import re
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from time import monotonic
 from typing import TYPE_CHECKING
 
@@ -19,17 +19,33 @@ from .errors import (
     RequestRejected,
     UniFiNetworkMapError,
 )
-from .renderer import RenderSettings, UniFiNetworkMapRenderer
+from .renderer import (
+    ControllerRecords,
+    RenderSettings,
+    UniFiNetworkMapRenderer,
+    fetch_controller_records,
+    load_networks,
+    with_networks,
+)
+from .stage_timings import StageTimings
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Mapping
+    from concurrent.futures import Future
+    from typing import Any
+
     from .data import UniFiNetworkMapData
+    from .device_details import DeviceDetailCache
+    from .render_worker import RenderWorker
+    from .renderer import ClientData, RenderInputs, RenderJob
+
+    type Networks = list[Mapping[str, Any]]
 
 SSL_WARNING_MESSAGE = (
     "SSL certificate verification is disabled."
     " This is not recommended for production use."
 )
 DEFAULT_REQUEST_TIMEOUT_SECONDS = 30.0
-
 _ssl_warning_filter_added = False
 _ssl_warning_filter: logging.Filter | None = None
 
@@ -45,10 +61,34 @@ class UniFiNetworkMapClient:
     request_timeout_seconds: float | None = None
     api_key: str | None = None
     cache_ttl_seconds: float = DEFAULT_RENDER_CACHE_SECONDS
+    timings: StageTimings = field(default_factory=StageTimings)
+    render_worker: RenderWorker | None = None
+    device_details: DeviceDetailCache | None = None
     _cache_data: UniFiNetworkMapData | None = field(default=None, init=False)
     _cache_time: float | None = field(default=None, init=False)
-
-    def fetch_map(self) -> UniFiNetworkMapData:
+    # The last map published before its networks arrived, with the
+    # clients needed to complete it.
+    _partial: tuple[UniFiNetworkMapData, list[ClientData]] | None = field(
+        default=None, init=False
+    )
+    # Networks of the last completed map; a map rendered before its own
+    # networks arrive uses them, so it keeps the VLAN sections it had.
+    _networks: Networks | None = field(default=None, init=False)
+
+    def fetch_map(
+        self,
+        job: RenderJob | None = None,
+        start_networks: Callable[[], Future[Networks]] | None = None,
+    ) -> UniFiNetworkMapData:
+        """Fetch and render the map (or return the cached one).
+
+        With ``start_networks`` (which starts ``fetch_networks`` in the
+        background; only called when the map is rendered) the map is
+        rendered as soon as devices and clients are in. If the networks
+        are not there yet it comes back with ``pending`` set, using the
+        previous map's networks if there was one, and
+        ``complete_networks`` fills the fresh ones in.
+        """
         _ensure_unifi_ssl_warning_filter(self.verify_ssl)
         _ensure_unifi_request_timeout(self.request_timeout_seconds)
         cached = self._get_cached_map()
@@ -62,7 +102,75 @@ class UniFiNetworkMapClient:
             self.request_timeout_seconds,
             "api_key" if self.api_key else "password",
         )
-        config = _build_config(
+        with self.timings.measure("fetch_map"):
+            if start_networks is None:
+                data = _render_map_payload(
+                    self._config(),
+                    self.settings,
+                    self.timings,
+                    self.render_worker,
+                    job,
+                    self.device_details,
+                )
+            else:
+                data, inputs = _render_map_partial(
+                    self._config(),
+                    self.settings,
+                    self.timings,
+                    self.render_worker,
+                    job,
+                    start_networks(),
+                    self.device_details,
+                    self._networks,
+                )
+                if data.pending:
+                    self._partial = (data, inputs.clients)
+                else:
+                    self._partial = None
+                    self._networks = inputs.networks
+        self._store_cache(data)
+        LOGGER.debug("api fetch_map completed site=%s", self.site)
+        return data
+
+    def fetch_networks(self) -> Networks:
+        """Fetch the site's networks; failures give an empty list."""
+        _ensure_unifi_ssl_warning_filter(self.verify_ssl)
+        _ensure_unifi_request_timeout(self.request_timeout_seconds)
+        with self.timings.measure("fetch_networks"):
+            return load_networks(self._config(), self.settings)
+
+    def complete_networks(
+        self, data: UniFiNetworkMapData, networks: Networks
+    ) -> UniFiNetworkMapData:
+        """Fill late networks into ``data``, the last partial map.
+
+        Returns ``data`` unchanged if a newer map replaced it.
+        """
+        partial = self._partial
+        if partial is None or partial[0] is not data:
+            return data
+        self._partial = None
+        self._networks = networks
+        completed = with_networks(data, partial[1], networks, self.settings)
+        if self._cache_data is data:
+            self._cache_data = completed
+        LOGGER.debug(
+            "api complete_networks site=%s networks=%d",
+            self.site,
+            len(networks),
+        )
+        return completed
+
+    def fetch_records(self) -> ControllerRecords:
+        """Fetch the raw controller responses, bypassing every cache."""
+        _ensure_unifi_ssl_warning_filter(self.verify_ssl)
+        _ensure_unifi_request_timeout(self.request_timeout_seconds)
+        settings = replace(self.settings, use_cache=False)
+        with self.timings.measure("fetch_records"):
+            return _fetch_records(self._config(), settings)
+
+    def _config(self) -> Config:
+        return _build_config(
             base_url=self.base_url,
             username=self.username,
             password=self.password,
@@ -70,10 +178,6 @@ class UniFiNetworkMapClient:
             verify_ssl=self.verify_ssl,
             api_key=self.api_key,
         )
-        data = _render_map_payload(config, self.settings)
-        self._store_cache(data)
-        LOGGER.debug("api fetch_map completed site=%s", self.site)
-        return data
 
     def _get_cached_map(self) -> UniFiNetworkMapData | None:
         if not self.settings.use_cache:
@@ -88,6 +192,9 @@ class UniFiNetworkMapClient:
         """Drop the cached map so the next fetch contacts the controller."""
         self._cache_data = None
         self._cache_time = None
+        self._partial = None
+        if self.device_details is not None:
+            self.device_details.invalidate()
 
     def _store_cache(self, data: UniFiNetworkMapData) -> None:
         if not self.settings.use_cache:
@@ -192,19 +299,112 @@ def _assert_unifi_connectivity(config: Config, site: str) -> None:
 
 
 def _render_map_payload(
-    config: Config, settings: RenderSettings
+    config: Config,
+    settings: RenderSettings,
+    timings: StageTimings | None = None,
+    render_worker: RenderWorker | None = None,
+    job: RenderJob | None = None,
+    device_details: DeviceDetailCache | None = None,
 ) -> UniFiNetworkMapData:
+    renderer = UniFiNetworkMapRenderer()
+    if render_worker is None:
+        return _call_controller(
+            config,
+            "render_map",
+            lambda: renderer.render(
+                config,
+                settings,
+                timings,
+                job=job,
+                device_details=device_details,
+            ),
+        )
+    timings = timings or StageTimings()
+    inputs = _call_controller(
+        config,
+        "render_map",
+        lambda: renderer.load_inputs(
+            config, settings, timings, job, device_details=device_details
+        ),
+    )
+    return render_worker.render(inputs, settings, timings, job)
+
+
+def _render_map_partial(
+    config: Config,
+    settings: RenderSettings,
+    timings: StageTimings,
+    render_worker: RenderWorker | None,
+    job: RenderJob | None,
+    networks: Future[Networks],
+    device_details: DeviceDetailCache | None = None,
+    known_networks: Networks | None = None,
+) -> tuple[UniFiNetworkMapData, RenderInputs]:
+    """Render with whatever networks have arrived once clients are in.
+
+    Networks still loading are stood in for by ``known_networks``; the
+    map is marked ``pending`` either way.
+    """
+    renderer = UniFiNetworkMapRenderer()
+    inputs = _call_controller(
+        config,
+        "render_map",
+        lambda: renderer.load_inputs(
+            config,
+            settings,
+            timings,
+            job,
+            include_networks=False,
+            device_details=device_details,
+        ),
+    )
+    arrived = _arrived(networks)
+    inputs = replace(
+        inputs, networks=known_networks if arrived is None else arrived
+    )
+    if render_worker is None:
+        data = renderer.render_inputs(config, inputs, settings, timings, job)
+    else:
+        data = render_worker.render(inputs, settings, timings, job)
+    if arrived is None and not data.pending:
+        data = replace(data, pending=("networks",))
+    return data, inputs
+
+
+def _arrived(networks: Future[Networks]) -> Networks | None:
+    if not networks.done() or networks.cancelled():
+        return None
+    if networks.exception() is not None:
+        return []
+    return networks.result()
+
+
+def _fetch_records(
+    config: Config, settings: RenderSettings
+) -> ControllerRecords:
+    return _call_controller(
+        config,
+        "fetch_records",
+        lambda: fetch_controller_records(config, settings),
+    )
+
+
+def _call_controller[T](
+    config: Config, operation: str, call: Callable[[], T]
+) -> T:
+    """Run a controller call, mapping library errors to ours."""
     try:
-        return UniFiNetworkMapRenderer().render(config, settings)
+        return call()
     except UnifiAuthError as exc:
         LOGGER.debug(
-            "api render_map failed reason=auth_error site=%s", config.site
+            "api %s failed reason=auth_error site=%s", operation, config.site
         )
         raise _map_auth_error(exc) from exc
     except UnifiApiError as exc:
         mapped = _map_api_error(exc)
         LOGGER.debug(
-            "api render_map failed reason=%s site=%s error=%s",
+            "api %s failed reason=%s site=%s error=%s",
+            operation,
             "request_rejected"
             if isinstance(mapped, RequestRejected)
             else "connection_error",
@@ -219,7 +419,8 @@ def _render_map_payload(
         TimeoutError,
     ) as exc:
         LOGGER.debug(
-            "api render_map failed reason=connection_error site=%s error=%s",
+            "api %s failed reason=connection_error site=%s error=%s",
+            operation,
             config.site,
             type(exc).__name__,
         )
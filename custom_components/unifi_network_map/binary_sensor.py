@@ -11,10 +11,9 @@ from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import CONF_TRACKED_CLIENTS, DOMAIN
-from .data import UniFiNetworkMapData
+from .entity import UniFiNetworkMapEntity
 
 PARALLEL_UPDATES = 1
 
@@ -52,35 +51,49 @@ class _EntityTracker:
             return
 
         new_entities: EntityList = []
-        self._collect_device_entities(new_entities)
+        self._collect_device_entities(
+            self._coordinator.data.payload, new_entities
+        )
         self._collect_client_entities(new_entities)
 
         if new_entities:
             self._async_add_entities(new_entities)
 
-    def _collect_device_entities(self, entities: EntityList) -> None:
-        """Collect new device entities."""
-        for entity in _create_device_presence_entities(
-            self._coordinator, self._entry
-        ):
-            if (
-                entity.unique_id
-                and entity.unique_id not in self._added_devices
-            ):
-                self._added_devices.add(entity.unique_id)
-                entities.append(entity)
+    def _collect_device_entities(
+        self, payload: dict[str, Any], entities: EntityList
+    ) -> None:
+        """Collect entities for devices not added yet.
+
+        Keys are diffed before construction so an update with no new
+        devices allocates no entities.
+        """
+        entry_id = self._entry.entry_id
+        for mac, device_type in _tracked_device_types(payload).items():
+            unique_id = _device_unique_id(entry_id, mac)
+            if unique_id in self._added_devices:
+                continue
+            self._added_devices.add(unique_id)
+            entities.append(
+                _create_device_presence_entity(
+                    self._coordinator, self._entry, payload, mac, device_type
+                )
+            )
 
     def _collect_client_entities(self, entities: EntityList) -> None:
-        """Collect new client entities."""
-        for entity in _create_client_presence_entities(
-            self._coordinator, self._entry
-        ):
-            if (
-                entity.unique_id
-                and entity.unique_id not in self._added_clients
-            ):
-                self._added_clients.add(entity.unique_id)
-                entities.append(entity)
+        """Collect entities for tracked clients not added yet."""
+        entry_id = self._entry.entry_id
+        for mac in _parse_tracked_clients(self._entry):
+            unique_id = _client_unique_id(entry_id, mac)
+            if unique_id in self._added_clients:
+                continue
+            self._added_clients.add(unique_id)
+            entities.append(
+                UniFiClientPresenceSensor(
+                    coordinator=self._coordinator,
+                    entry=self._entry,
+                    client_mac=mac,
+                )
+            )
 
     def register_listener(self) -> None:
         """Register coordinator update listener."""
@@ -156,46 +169,55 @@ def _migrate_device_unique_ids(
         registry.async_update_entity(old_entity_id, new_unique_id=new_uid)
 
 
-def _create_device_presence_entities(
+def _tracked_device_types(payload: dict[str, Any]) -> dict[str, str]:
+    """Map the MAC of every device that gets a presence sensor to its type."""
+    node_types = payload.get("node_types", {})
+    return {
+        mac: device_type
+        for mac, device_type in node_types.items()
+        if device_type in DEVICE_TYPES_TO_TRACK
+    }
+
+
+def _create_device_presence_entity(
     coordinator: UniFiNetworkMapCoordinator,
     entry: ConfigEntry,
-) -> list[UniFiDevicePresenceSensor]:
-    """Create binary sensors for network devices."""
-    if not coordinator.data or not coordinator.data.payload:
-        return []
+    payload: dict[str, Any],
+    mac: str,
+    device_type: str,
+) -> UniFiDevicePresenceSensor:
+    """Create the presence sensor for one network device."""
+    return UniFiDevicePresenceSensor(
+        coordinator=coordinator,
+        entry=entry,
+        device_mac=mac,
+        device_name=payload.get("node_names", {}).get(mac, mac),
+        device_type=device_type,
+        device_details=payload.get("device_details", {}).get(mac, {}),
+    )
 
-    payload = coordinator.data.payload
-    node_types = payload.get("node_types", {})
-    node_names = payload.get("node_names", {})
-    device_details = payload.get("device_details", {})
 
-    entities: list[UniFiDevicePresenceSensor] = []
-    for mac, device_type in node_types.items():
-        if device_type not in DEVICE_TYPES_TO_TRACK:
-            continue
-        details = device_details.get(mac, {})
-        display_name = node_names.get(mac, mac)
-        entities.append(
-            UniFiDevicePresenceSensor(
-                coordinator=coordinator,
-                entry=entry,
-                device_mac=mac,
-                device_name=display_name,
-                device_type=device_type,
-                device_details=details,
-            )
-        )
-    return entities
+def _device_unique_id(entry_id: str, mac: str) -> str:
+    return f"{entry_id}_device_{mac.lower().replace(':', '')}"
+
+
+def _client_unique_id(entry_id: str, mac: str) -> str:
+    return f"{entry_id}_client_{mac.replace(':', '')}"
 
 
 class UniFiDevicePresenceSensor(  # type: ignore[reportUntypedBaseClass]
-    CoordinatorEntity[UniFiNetworkMapData], BinarySensorEntity
+    UniFiNetworkMapEntity, BinarySensorEntity
 ):
     """Binary sensor for UniFi network device presence."""
 
     _attr_device_class = BinarySensorDeviceClass.CONNECTIVITY
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_has_entity_name = True
+    # Static descriptors and the fast-changing AP client count would add a
+    # recorder attribute row per change without helping history queries.
+    _unrecorded_attributes = frozenset(
+        {"uplink_device", "model", "model_name", "clients_connected"}
+    )
 
     def __init__(
         self,
@@ -214,8 +236,7 @@ class UniFiDevicePresenceSensor(  # type: ignore[reportUntypedBaseClass]
         self._device_type = device_type
         self._initial_details = device_details
 
-        mac_suffix = device_mac.lower().replace(":", "")
-        self._attr_unique_id = f"{entry.entry_id}_device_{mac_suffix}"
+        self._attr_unique_id = _device_unique_id(entry.entry_id, device_mac)
         self._attr_name = device_name
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
@@ -253,6 +274,12 @@ class UniFiDevicePresenceSensor(  # type: ignore[reportUntypedBaseClass]
 
         return attrs
 
+    def _state_sources(self) -> tuple[Any, ...]:
+        clients = None
+        if self._device_type == "ap":
+            clients = self._get_ap_client_counts().get(self._device_mac, 0)
+        return (self.is_on, self._get_current_details(), clients)
+
     def _get_current_details(self) -> dict[str, Any]:
         """Get device details from current coordinator data."""
         if not self.coordinator.data or not self.coordinator.data.payload:
@@ -278,27 +305,6 @@ def _normalize_name(name: str) -> str:
     return normalized
 
 
-def _create_client_presence_entities(
-    coordinator: UniFiNetworkMapCoordinator,
-    entry: ConfigEntry,
-) -> list[UniFiClientPresenceSensor]:
-    """Create binary sensors for tracked clients."""
-    tracked_macs = _parse_tracked_clients(entry)
-    if not tracked_macs:
-        return []
-
-    entities: list[UniFiClientPresenceSensor] = []
-    for mac in tracked_macs:
-        entities.append(
-            UniFiClientPresenceSensor(
-                coordinator=coordinator,
-                entry=entry,
-                client_mac=mac,
-            )
-        )
-    return entities
-
-
 def _parse_tracked_clients(entry: ConfigEntry) -> list[str]:
     """Parse tracked client MAC addresses from entry options."""
     raw_value = entry.options.get(CONF_TRACKED_CLIENTS, "")
@@ -328,7 +334,7 @@ def _parse_mac(mac: str) -> str | None:
 
 
 class UniFiClientPresenceSensor(  # type: ignore[reportUntypedBaseClass]
-    CoordinatorEntity[UniFiNetworkMapData], BinarySensorEntity
+    UniFiNetworkMapEntity, BinarySensorEntity
 ):
     """Binary sensor for UniFi client presence."""
 
@@ -346,8 +352,7 @@ class UniFiClientPresenceSensor(  # type: ignore[reportUntypedBaseClass]
         self._entry = entry
         self._client_mac = client_mac
 
-        mac_normalized = client_mac.replace(":", "")
-        self._attr_unique_id = f"{entry.entry_id}_client_{mac_normalized}"
+        self._attr_unique_id = _client_unique_id(entry.entry_id, client_mac)
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, entry.entry_id)},
         )
@@ -395,6 +400,15 @@ class UniFiClientPresenceSensor(  # type: ignore[reportUntypedBaseClass]
 
         return attrs
 
+    def _state_sources(self) -> tuple[Any, ...]:
+        # The name and is_on derive from the details as well.
+        details = self._get_client_details()
+        connected_to = details.get("connected_to_mac") if details else None
+        return (
+            details,
+            self._resolve_device_name(connected_to) if connected_to else None,
+        )
+
     def _get_client_details(self) -> dict[str, Any] | None:
         """Get client details from current coordinator data."""
         if not self.coordinator.data or not self.coordinator.data.payload:
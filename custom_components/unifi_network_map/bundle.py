@@ -0,0 +1,284 @@
+"""Redacted recordings of controller responses (``record_bundle`` service).
+
+A bundle holds the raw device, client and network records of one fetch
+plus the entry's render settings, so a slow or broken map can be
+reproduced without the controller. The service writes
+``<config>/unifi_network_map/bundle-<entry_id>-<timestamp>.json.gz``;
+``scripts/replay_bundle.py`` replays it through the renderer and payload
+encoders with per-stage timings, ``BENCHMARK_BUNDLE`` runs it through
+the benchmark suite (including enrichment), and the e2e mock controller
+serves it when ``UNIFI_BUNDLE`` is set.
+
+Everything is redacted before it is written:
+
+- MAC and IP addresses become stable pseudonyms, so uplinks, LLDP
+  entries and client attachments still line up. Public addresses stay
+  public and private ones private.
+- Names, hostnames, SSIDs, network names, serials and notes become
+  numbered labels; the same text always gets the same label.
+- Secrets (the controller's ``x_`` fields) and location data are dropped.
+"""
+
+from __future__ import annotations
+
+import gzip
+import ipaddress
+import json
+import re
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from unifi_topology import Config
+
+from .const import DOMAIN, LOGGER
+from .renderer import ControllerRecords, RenderSettings
+from .stage_timings import StageTimings
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import UniFiNetworkMapCoordinator
+
+BUNDLE_FORMAT = 1
+
+_MAC = re.compile(r"^(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}$")
+_TEXT_KEYS = frozenset(
+    {
+        "desc",
+        "device_name",
+        "display_name",
+        "essid",
+        "hostname",
+        "isp_name",
+        "isp_organization",
+        "last_uplink_name",
+        "name",
+        "network",
+        "note",
+        "port_desc",
+        "serial",
+        "ssid",
+        "uplink_device_name",
+    }
+)
+_DROPPED_KEYS = frozenset({"anon_id", "geo_info", "ssh_session_table"})
+
+
+@dataclass(frozen=True)
+class ControllerBundle:
+    """Redacted controller records plus how they were rendered."""
+
+    records: ControllerRecords
+    metadata: dict[str, Any]
+
+    def settings(self) -> RenderSettings:
+        """Render settings of the recorded entry (defaults if absent)."""
+        stored = self.metadata.get("settings") or {}
+        known = {item.name for item in fields(RenderSettings)}
+        values = {key: stored[key] for key in known if key in stored}
+        values.setdefault("include_ports", True)
+        values.setdefault("include_clients", True)
+        values.setdefault("client_scope", "wired")
+        values.setdefault("only_unifi", False)
+        values.setdefault("svg_isometric", False)
+        values.setdefault("svg_width", None)
+        values.setdefault("svg_height", None)
+        values["use_cache"] = False
+        return RenderSettings(**values)
+
+    def config(self) -> Config:
+        """A placeholder config; replays never contact a controller."""
+        return Config(
+            url="https://replay.invalid",
+            site=str(self.metadata.get("site", "default")),
+            api_key="replay",
+        )
+
+
+class _Redactor:
+    """Replaces identifying values with stable pseudonyms."""
+
+    def __init__(self) -> None:
+        self._macs: dict[str, str] = {}
+        self._ips: dict[str, str] = {}
+        self._texts: dict[str, str] = {}
+
+    def value(self, key: str, value: Any) -> Any:
+        if isinstance(value, dict):
+            return self.record(value)
+        if isinstance(value, list):
+            return [self.value(key, item) for item in value]
+        if not isinstance(value, str) or not value:
+            return value
+        if _MAC.match(value):
+            return self._mac(value)
+        if (address := _parse_address(value)) is not None:
+            return self._ip(value, address)
+        if key in _TEXT_KEYS:
+            return self._text(key, value)
+        return value
+
+    def record(self, record: dict[str, Any]) -> dict[str, Any]:
+        return {
+            key: self.value(key, value)
+            for key, value in record.items()
+            if not key.startswith("x_") and key not in _DROPPED_KEYS
+        }
+
+    def _mac(self, value: str) -> str:
+        key = value.lower().replace("-", ":")
+        mapped = self._macs.get(key)
+        if mapped is None:
+            number = len(self._macs) + 1
+            # Locally administered, so it never collides with a real OUI.
+            mapped = "02:" + ":".join(
+                f"{(number >> shift) & 0xFF:02x}"
+                for shift in range(32, -8, -8)
+            )
+            self._macs[key] = mapped
+        return mapped
+
+    def _ip(
+        self,
+        value: str,
+        address: ipaddress.IPv4Interface | ipaddress.IPv6Interface,
+    ) -> str:
+        host = str(address.ip)
+        mapped = self._ips.get(host)
+        if mapped is None:
+            mapped = _pseudonym_address(address.ip, len(self._ips) + 1)
+            self._ips[host] = mapped
+        if "/" in value:
+            return f"{mapped}/{address.network.prefixlen}"
+        return mapped
+
+    def _text(self, key: str, value: str) -> str:
+        mapped = self._texts.get(value)
+        if mapped is None:
+            mapped = f"{key.replace('_', '-')}-{len(self._texts) + 1}"
+            self._texts[value] = mapped
+        return mapped
+
+
+def redact_records(records: ControllerRecords) -> ControllerRecords:
+    """Return a redacted copy of ``records``.
+
+    Devices are redacted first so their names get the lowest labels and
+    the pseudonyms stay consistent across devices, clients and networks.
+    """
+    redactor = _Redactor()
+    return ControllerRecords(
+        devices=[redactor.record(_as_dict(item)) for item in records.devices],
+        clients=[redactor.record(_as_dict(item)) for item in records.clients],
+        networks=[redactor.record(dict(item)) for item in records.networks],
+    )
+
+
+def write_bundle(
+    path: Path, records: ControllerRecords, metadata: dict[str, Any]
+) -> None:
+    document = {
+        "format": BUNDLE_FORMAT,
+        **metadata,
+        "devices": records.devices,
+        "clients": records.clients,
+        "networks": records.networks,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as handle:
+        json.dump(document, handle, default=str)
+
+
+def load_bundle(path: Path) -> ControllerBundle:
+    """Read a bundle written by ``write_bundle`` (gzipped or plain JSON)."""
+    raw = path.read_bytes()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    document = json.loads(raw)
+    if document.get("format") != BUNDLE_FORMAT:
+        raise ValueError(
+            f"Unsupported bundle format: {document.get('format')!r}"
+        )
+    records = ControllerRecords(
+        devices=document.pop("devices", []),
+        clients=document.pop("clients", []),
+        networks=document.pop("networks", []),
+    )
+    return ControllerBundle(records=records, metadata=document)
+
+
+async def async_record_bundle(
+    hass: HomeAssistant,
+    entry_id: str,
+    coordinator: UniFiNetworkMapCoordinator,
+) -> dict[str, Any]:
+    """Record, redact and store one fetch of the entry's controller."""
+    client = coordinator.build_uncached_client(StageTimings())
+    recorded_at = dt_util.utcnow()
+    try:
+        records = await hass.async_add_executor_job(client.fetch_records)
+    except Exception as err:
+        raise HomeAssistantError(
+            f"Failed to record controller responses: {err}"
+        ) from err
+    stem = f"bundle-{entry_id}-{recorded_at.strftime('%Y%m%dT%H%M%SZ')}"
+    path = Path(hass.config.path(DOMAIN)) / f"{stem}.json.gz"
+    metadata = {
+        "recorded_at": recorded_at.isoformat(),
+        "site": "default",
+        "settings": asdict(coordinator.settings),
+    }
+    counts = await hass.async_add_executor_job(
+        _redact_and_write, path, records, metadata
+    )
+    LOGGER.debug(
+        "bundle recorded entry_id=%s devices=%d clients=%d networks=%d",
+        entry_id,
+        counts["devices"],
+        counts["clients"],
+        counts["networks"],
+    )
+    return {"path": str(path), **counts}
+
+
+def _redact_and_write(
+    path: Path, records: ControllerRecords, metadata: dict[str, Any]
+) -> dict[str, int]:
+    redacted = redact_records(records)
+    write_bundle(path, redacted, metadata)
+    return {
+        "devices": len(redacted.devices),
+        "clients": len(redacted.clients),
+        "networks": len(redacted.networks),
+    }
+
+
+def _as_dict(item: object) -> dict[str, Any]:
+    if isinstance(item, dict):
+        return item
+    return dict(getattr(item, "__dict__", {}))
+
+
+def _parse_address(
+    value: str,
+) -> ipaddress.IPv4Interface | ipaddress.IPv6Interface | None:
+    if len(value) > 49 or not ("." in value or ":" in value):
+        return None
+    try:
+        return ipaddress.ip_interface(value)
+    except ValueError:
+        return None
+
+
+def _pseudonym_address(
+    address: ipaddress.IPv4Address | ipaddress.IPv6Address, number: int
+) -> str:
+    if address.version == 6:
+        prefix = "2a00::" if address.is_global else "fd00::"
+        return str(ipaddress.IPv6Address(prefix) + number)
+    # 11.0.0.0/8 is globally routable, 10.0.0.0/8 is private.
+    base = "11.0.0.0" if address.is_global else "10.0.0.0"
+    return str(ipaddress.IPv4Address(base) + number)
@@ -0,0 +1,193 @@
+"""Shared memory budget for the integration's caches.
+
+The payload cache (enriched payloads, their compact and projected
+variants and serialized bodies) and the themed SVG cache each keep
+artifacts per config entry. Every artifact they store is registered
+here with an estimate of its size. When the total exceeds the
+``cache_memory_mib`` option, the least recently used artifacts of any
+entry and either cache are evicted until it fits; the artifact just
+stored (and the payload it derives from) is never evicted, so a request
+always gets its answer even when one artifact alone exceeds the budget.
+
+Sizes are estimates: containers are measured on a sample of their
+items, and strings shared between artifacts (or with the coordinator's
+map data) count once per artifact.
+"""
+
+from __future__ import annotations
+
+import sys
+from collections import Counter, OrderedDict
+from typing import TYPE_CHECKING, Any
+
+from .const import DEFAULT_CACHE_MEMORY_MIB, DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.core import HomeAssistant
+
+_BUDGET_KEY = "cache_budget"
+# Items measured per container; the rest are assumed to be alike.
+_SAMPLE_SIZE = 32
+
+type ArtifactKey = tuple[str, str, str]
+"""Cache name, config entry ID and the artifact's key within the entry."""
+
+
+class CacheBudget:
+    """Size accounting and LRU eviction across the integration's caches."""
+
+    def __init__(self, limit_bytes: int) -> None:
+        self.limit_bytes = limit_bytes
+        self.used_bytes = 0
+        self.evictions: Counter[str] = Counter()
+        self._sizes: OrderedDict[ArtifactKey, int] = OrderedDict()
+        self._evictors: dict[str, Callable[[str, str], None]] = {}
+
+    def register(self, cache: str, evict: Callable[[str, str], None]) -> None:
+        """Set how to drop one of ``cache``'s artifacts on eviction."""
+        self._evictors[cache] = evict
+
+    def track(
+        self,
+        key: ArtifactKey,
+        size_bytes: int,
+        keep: tuple[ArtifactKey, ...] = (),
+    ) -> None:
+        """Account a stored artifact, then evict down to the budget.
+
+        ``key`` and the artifacts in ``keep`` are not evicted.
+        """
+        self._remove(key)
+        self._sizes[key] = size_bytes
+        self.used_bytes += size_bytes
+        self._evict_over_budget({key, *keep})
+
+    def touch(self, key: ArtifactKey) -> None:
+        """Mark an artifact as used by a cache hit."""
+        if key in self._sizes:
+            self._sizes.move_to_end(key)
+
+    def discard(self, key: ArtifactKey) -> None:
+        """Forget an artifact its cache dropped."""
+        self._remove(key)
+
+    def discard_entry(self, cache: str, entry_id: str) -> None:
+        """Forget every artifact ``cache`` holds for ``entry_id``."""
+        for key in [
+            key for key in self._sizes if key[:2] == (cache, entry_id)
+        ]:
+            self._remove(key)
+
+    def resize(self, limit_bytes: int) -> None:
+        """Apply a new budget, evicting at once if it shrank."""
+        self.limit_bytes = limit_bytes
+        self._evict_over_budget(set())
+
+    def stats(self, entry_id: str | None = None) -> dict[str, Any]:
+        by_cache: Counter[str] = Counter()
+        entry_bytes = 0
+        for (cache, owner, _artifact), size in self._sizes.items():
+            by_cache[cache] += size
+            if owner == entry_id:
+                entry_bytes += size
+        return {
+            "limit_bytes": self.limit_bytes,
+            "used_bytes": self.used_bytes,
+            "artifacts": len(self._sizes),
+            "by_cache": dict(by_cache),
+            "entry_bytes": entry_bytes,
+            "evictions": dict(self.evictions),
+        }
+
+    def entry_bytes(self, cache: str, entry_id: str) -> int:
+        return sum(
+            size
+            for key, size in self._sizes.items()
+            if key[:2] == (cache, entry_id)
+        )
+
+    def _remove(self, key: ArtifactKey) -> None:
+        size = self._sizes.pop(key, None)
+        if size is not None:
+            self.used_bytes -= size
+
+    def _evict_over_budget(self, keep: set[ArtifactKey]) -> None:
+        while self.used_bytes > self.limit_bytes:
+            victim = next(
+                (key for key in self._sizes if key not in keep), None
+            )
+            if victim is None:
+                return
+            cache, entry_id, artifact = victim
+            size = self._sizes[victim]
+            self._remove(victim)
+            self.evictions[cache] += 1
+            evict = self._evictors.get(cache)
+            if evict is not None:
+                evict(entry_id, artifact)
+            LOGGER.debug(
+                "cache_budget evicted cache=%s entry_id=%s artifact=%s"
+                " bytes=%d used=%d limit=%d",
+                cache,
+                entry_id,
+                artifact,
+                size,
+                self.used_bytes,
+                self.limit_bytes,
+            )
+
+
+def estimate_size(value: object) -> int:
+    """Estimate the memory held by ``value`` and what it contains."""
+    return _estimate(value, set())
+
+
+def _estimate(value: object, seen: set[int]) -> int:
+    # Objects met twice (interned MACs and names) are counted once.
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        items: list[Any] = []
+        for key, item in value.items():
+            items.extend((key, item))
+            if len(items) >= 2 * _SAMPLE_SIZE:
+                break
+        return size + _scaled(items, 2 * len(value), seen)
+    if isinstance(value, (list, tuple)):
+        return size + _scaled(value[:_SAMPLE_SIZE], len(value), seen)
+    return size
+
+
+def _scaled(
+    sample: list[Any] | tuple[Any, ...], total: int, seen: set[int]
+) -> int:
+    if not sample:
+        return 0
+    measured = sum(_estimate(item, seen) for item in sample)
+    return measured * total // len(sample)
+
+
+def get_cache_budget(hass: HomeAssistant) -> CacheBudget:
+    """Get or create the cache budget for this hass instance."""
+    data = hass.data.setdefault(DOMAIN, {})
+    budget = data.get(_BUDGET_KEY)
+    if budget is None:
+        budget = CacheBudget(DEFAULT_CACHE_MEMORY_MIB * 1024 * 1024)
+        data[_BUDGET_KEY] = budget
+    return budget
+
+
+def set_cache_memory_limit(hass: HomeAssistant, limit_mib: int) -> None:
+    """Set the budget shared by every entry's cached artifacts."""
+    get_cache_budget(hass).resize(limit_mib * 1024 * 1024)
+    LOGGER.debug("cache_budget limit_configured limit_mib=%d", limit_mib)
+
+
+def cache_budget_stats(
+    hass: HomeAssistant, entry_id: str | None = None
+) -> dict[str, Any]:
+    return get_cache_budget(hass).stats(entry_id)
@@ -15,15 +15,23 @@ from yarl import URL
 from .api import validate_unifi_credentials
 from .const import (
     CONF_API_KEY,
+    CONF_CACHE_MEMORY_MIB,
     CONF_CLIENT_SCOPE,
+    CONF_DEVICE_DETAIL_MAX_AGE,
+    CONF_EXECUTOR_WORKERS,
     CONF_ICON_SET,
     CONF_INCLUDE_CLIENTS,
     CONF_INCLUDE_PORTS,
     CONF_ISO_LIGHTING,
     CONF_ISO_ROUTE_AROUND_NODES,
     CONF_ISO_SHOW_GRID,
+    CONF_LIGHTWEIGHT_STATS,
     CONF_ONLY_UNIFI,
     CONF_PAYLOAD_CACHE_TTL,
+    CONF_RELATED_ENTITIES_EAGER_MAX_NODES,
+    CONF_RENDER_IN_WORKER,
+    CONF_RENDER_TIMEOUT_SECONDS,
+    CONF_RENDER_WORKER_MEMORY_MIB,
     CONF_REQUEST_TIMEOUT_SECONDS,
     CONF_SCAN_INTERVAL,
     CONF_SHOW_VPN,
@@ -41,15 +49,23 @@ from .const import (
     CONF_WAN2_SPEED,
     CONF_WAN_LABEL,
     CONF_WAN_SPEED,
+    DEFAULT_CACHE_MEMORY_MIB,
     DEFAULT_CLIENT_SCOPE,
+    DEFAULT_DEVICE_DETAIL_MAX_AGE_MINUTES,
+    DEFAULT_EXECUTOR_WORKERS,
     DEFAULT_ICON_SET,
     DEFAULT_INCLUDE_CLIENTS,
     DEFAULT_INCLUDE_PORTS,
     DEFAULT_ISO_LIGHTING,
     DEFAULT_ISO_ROUTE_AROUND_NODES,
     DEFAULT_ISO_SHOW_GRID,
+    DEFAULT_LIGHTWEIGHT_STATS,
     DEFAULT_ONLY_UNIFI,
     DEFAULT_PAYLOAD_CACHE_TTL_SECONDS,
+    DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES,
+    DEFAULT_RENDER_IN_WORKER,
+    DEFAULT_RENDER_TIMEOUT_SECONDS,
+    DEFAULT_RENDER_WORKER_MEMORY_MIB,
     DEFAULT_REQUEST_TIMEOUT_SECONDS,
     DEFAULT_SCAN_INTERVAL_MINUTES,
     DEFAULT_SHOW_VPN,
@@ -68,9 +84,21 @@ from .const import (
     DOMAIN,
     ICON_SETS,
     LOGGER,
+    MAX_CACHE_MEMORY_MIB,
+    MAX_DEVICE_DETAIL_MAX_AGE_MINUTES,
+    MAX_EXECUTOR_WORKERS,
     MAX_PAYLOAD_CACHE_TTL_SECONDS,
+    MAX_RELATED_ENTITIES_EAGER_MAX_NODES,
+    MAX_RENDER_TIMEOUT_SECONDS,
+    MAX_RENDER_WORKER_MEMORY_MIB,
     MAX_SCAN_INTERVAL_MINUTES,
+    MIN_CACHE_MEMORY_MIB,
+    MIN_DEVICE_DETAIL_MAX_AGE_MINUTES,
+    MIN_EXECUTOR_WORKERS,
     MIN_PAYLOAD_CACHE_TTL_SECONDS,
+    MIN_RELATED_ENTITIES_EAGER_MAX_NODES,
+    MIN_RENDER_TIMEOUT_SECONDS,
+    MIN_RENDER_WORKER_MEMORY_MIB,
     MIN_SCAN_INTERVAL_MINUTES,
     SVG_THEMES,
 )
@@ -333,11 +361,26 @@ def _options_schema_fields(
         opt(
             CONF_PAYLOAD_CACHE_TTL, DEFAULT_PAYLOAD_CACHE_TTL_SECONDS
         ): _payload_cache_ttl_selector(),
+        opt(CONF_CACHE_MEMORY_MIB, DEFAULT_CACHE_MEMORY_MIB): _number_selector(
+            MIN_CACHE_MEMORY_MIB, MAX_CACHE_MEMORY_MIB, 16, "MiB"
+        ),
+        opt(
+            CONF_RELATED_ENTITIES_EAGER_MAX_NODES,
+            DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES,
+        ): _number_selector(
+            MIN_RELATED_ENTITIES_EAGER_MAX_NODES,
+            MAX_RELATED_ENTITIES_EAGER_MAX_NODES,
+            50,
+            "nodes",
+        ),
         opt(CONF_INCLUDE_PORTS, DEFAULT_INCLUDE_PORTS): _boolean_selector(),
         opt(
             CONF_INCLUDE_CLIENTS, DEFAULT_INCLUDE_CLIENTS
         ): _boolean_selector(),
         opt(CONF_CLIENT_SCOPE, DEFAULT_CLIENT_SCOPE): _client_scope_selector(),
+        opt(
+            CONF_LIGHTWEIGHT_STATS, DEFAULT_LIGHTWEIGHT_STATS
+        ): _boolean_selector(),
         opt(CONF_ONLY_UNIFI, DEFAULT_ONLY_UNIFI): _boolean_selector(),
         opt(CONF_SVG_ISOMETRIC, DEFAULT_SVG_ISOMETRIC): _boolean_selector(),
         opt(CONF_SVG_THEME, DEFAULT_SVG_THEME): _svg_theme_selector(),
@@ -348,6 +391,36 @@ def _options_schema_fields(
         ): _boolean_selector(),
         opt(CONF_ISO_SHOW_GRID, DEFAULT_ISO_SHOW_GRID): _boolean_selector(),
         opt(CONF_USE_CACHE, DEFAULT_USE_CACHE): _boolean_selector(),
+        opt(
+            CONF_DEVICE_DETAIL_MAX_AGE, DEFAULT_DEVICE_DETAIL_MAX_AGE_MINUTES
+        ): _number_selector(
+            MIN_DEVICE_DETAIL_MAX_AGE_MINUTES,
+            MAX_DEVICE_DETAIL_MAX_AGE_MINUTES,
+            1,
+            "minutes",
+        ),
+        opt(
+            CONF_RENDER_IN_WORKER, DEFAULT_RENDER_IN_WORKER
+        ): _boolean_selector(),
+        opt(
+            CONF_RENDER_TIMEOUT_SECONDS, DEFAULT_RENDER_TIMEOUT_SECONDS
+        ): _number_selector(
+            MIN_RENDER_TIMEOUT_SECONDS,
+            MAX_RENDER_TIMEOUT_SECONDS,
+            5,
+            "seconds",
+        ),
+        opt(
+            CONF_RENDER_WORKER_MEMORY_MIB, DEFAULT_RENDER_WORKER_MEMORY_MIB
+        ): _number_selector(
+            MIN_RENDER_WORKER_MEMORY_MIB,
+            MAX_RENDER_WORKER_MEMORY_MIB,
+            64,
+            "MiB",
+        ),
+        opt(CONF_EXECUTOR_WORKERS, DEFAULT_EXECUTOR_WORKERS): _number_selector(
+            MIN_EXECUTOR_WORKERS, MAX_EXECUTOR_WORKERS, 1
+        ),
         opt(
             CONF_TRACKED_CLIENTS, DEFAULT_TRACKED_CLIENTS
         ): _tracked_clients_selector(),
@@ -403,6 +476,20 @@ def _payload_cache_ttl_selector() -> selector.NumberSelector:
     )
 
 
+def _number_selector(
+    minimum: int, maximum: int, step: int, unit: str | None = None
+) -> selector.NumberSelector:
+    config = selector.NumberSelectorConfig(
+        min=minimum,
+        max=maximum,
+        step=step,
+        mode=selector.NumberSelectorMode.BOX,
+    )
+    if unit is not None:
+        config["unit_of_measurement"] = unit
+    return selector.NumberSelector(config)
+
+
 def _client_scope_selector() -> selector.SelectSelector:
     return selector.SelectSelector(
         selector.SelectSelectorConfig(
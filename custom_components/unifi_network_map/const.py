@@ -5,9 +5,14 @@ import logging
 DOMAIN = "unifi_network_map"
 PLATFORMS = ["sensor", "binary_sensor"]
 PAYLOAD_SCHEMA_VERSION = "2.0"
+COMPACT_PAYLOAD_SCHEMA_VERSION = "3.0"
 
 SERVICE_REFRESH = "refresh"
+SERVICE_PROFILE_REFRESH = "profile_refresh"
+SERVICE_RECORD_BUNDLE = "record_bundle"
 ATTR_ENTRY_ID = "entry_id"
+ATTR_TOP = "top"
+DEFAULT_PROFILE_TOP_N = 25
 DEFAULT_SCAN_INTERVAL_SECONDS = 600
 DEFAULT_RENDER_CACHE_SECONDS = DEFAULT_SCAN_INTERVAL_SECONDS
 DEFAULT_SITE = "default"
@@ -16,12 +21,58 @@ DEFAULT_INCLUDE_PORTS = True
 DEFAULT_INCLUDE_CLIENTS = True
 DEFAULT_CLIENT_SCOPE = "wired"
 DEFAULT_ONLY_UNIFI = False
+DEFAULT_LIGHTWEIGHT_STATS = False
 DEFAULT_SVG_ISOMETRIC = True
 DEFAULT_USE_CACHE = True
 DEFAULT_REQUEST_TIMEOUT_SECONDS = 30
+# How long a published partial map waits for its networks before keeping
+# the VLAN data it was rendered with; capped by the request timeout.
+LATE_NETWORKS_TIMEOUT_SECONDS = 10
 DEFAULT_PAYLOAD_CACHE_TTL_SECONDS = 30
 MIN_PAYLOAD_CACHE_TTL_SECONDS = 0
 MAX_PAYLOAD_CACHE_TTL_SECONDS = 300
+DEFAULT_CACHE_MEMORY_MIB = 128
+MIN_CACHE_MEMORY_MIB = 16
+MAX_CACHE_MEMORY_MIB = 4096
+DEFAULT_RENDER_IN_WORKER = False
+DEFAULT_RENDER_TIMEOUT_SECONDS = 120
+MIN_RENDER_TIMEOUT_SECONDS = 10
+MAX_RENDER_TIMEOUT_SECONDS = 600
+DEFAULT_RENDER_WORKER_MEMORY_MIB = 1024
+MIN_RENDER_WORKER_MEMORY_MIB = 256
+MAX_RENDER_WORKER_MEMORY_MIB = 8192
+DEFAULT_EXECUTOR_WORKERS = 2
+MIN_EXECUTOR_WORKERS = 1
+MAX_EXECUTOR_WORKERS = 8
+DEFAULT_DEVICE_DETAIL_MAX_AGE_MINUTES = 0
+MIN_DEVICE_DETAIL_MAX_AGE_MINUTES = 0
+MAX_DEVICE_DETAIL_MAX_AGE_MINUTES = 60
+# Up to this many nodes, related entities are resolved for the whole site
+# on every payload rebuild; above it, per node on demand. On the synthetic
+# benchmark sites eager resolution costs about 6 us, 0.4 KiB of peak
+# memory and 180 payload bytes per node, growing linearly (compare
+# enrich_payload_eager and enrich_payload_lazy), so the default keeps it
+# to roughly a millisecond and 35 KB per rebuild.
+DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES = 200
+MIN_RELATED_ENTITIES_EAGER_MAX_NODES = 0
+MAX_RELATED_ENTITIES_EAGER_MAX_NODES = 5000
+# Samples kept per pipeline stage for the timing percentiles.
+STAGE_TIMING_WINDOW = 50
+# Upper bounds (seconds) of the cumulative stage latency histogram buckets.
+STAGE_HISTOGRAM_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
 
 CONF_SITE = "site"
 CONF_API_KEY = "api_key"
@@ -62,7 +113,15 @@ ICON_SETS = ("modern", "isometric", "unifi")
 CONF_SCAN_INTERVAL = "scan_interval"
 CONF_REQUEST_TIMEOUT_SECONDS = "request_timeout_seconds"
 CONF_PAYLOAD_CACHE_TTL = "payload_cache_ttl"
+CONF_CACHE_MEMORY_MIB = "cache_memory_mib"
+CONF_RELATED_ENTITIES_EAGER_MAX_NODES = "related_entities_eager_max_nodes"
+CONF_RENDER_IN_WORKER = "render_in_worker"
+CONF_RENDER_TIMEOUT_SECONDS = "render_timeout_seconds"
+CONF_RENDER_WORKER_MEMORY_MIB = "render_worker_memory_mib"
+CONF_EXECUTOR_WORKERS = "executor_workers"
+CONF_DEVICE_DETAIL_MAX_AGE = "device_detail_max_age"
 CONF_TRACKED_CLIENTS = "tracked_clients"
+CONF_LIGHTWEIGHT_STATS = "lightweight_stats"
 DEFAULT_TRACKED_CLIENTS = ""
 
 CONF_WAN_LABEL = "wan_label"
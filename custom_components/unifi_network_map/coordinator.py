@@ -1,25 +1,36 @@
 from __future__ import annotations
 
-from datetime import timedelta
-from typing import TYPE_CHECKING, Any, Protocol
+import asyncio
+import hashlib
+from collections import Counter
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, NamedTuple, Protocol
 
 from homeassistant.const import CONF_PASSWORD, CONF_URL, CONF_USERNAME
+from homeassistant.helpers.json import json_bytes
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
+from homeassistant.util import dt as dt_util
 
 from .api import UniFiNetworkMapClient
 from .const import (
     CONF_API_KEY,
     CONF_CLIENT_SCOPE,
+    CONF_DEVICE_DETAIL_MAX_AGE,
     CONF_ICON_SET,
     CONF_INCLUDE_CLIENTS,
     CONF_INCLUDE_PORTS,
     CONF_ISO_LIGHTING,
     CONF_ISO_ROUTE_AROUND_NODES,
     CONF_ISO_SHOW_GRID,
+    CONF_LIGHTWEIGHT_STATS,
     CONF_ONLY_UNIFI,
+    CONF_RENDER_IN_WORKER,
+    CONF_RENDER_TIMEOUT_SECONDS,
+    CONF_RENDER_WORKER_MEMORY_MIB,
     CONF_REQUEST_TIMEOUT_SECONDS,
     CONF_SCAN_INTERVAL,
     CONF_SHOW_VPN,
@@ -29,6 +40,7 @@ from .const import (
     CONF_SVG_ISOMETRIC,
     CONF_SVG_THEME,
     CONF_SVG_WIDTH,
+    CONF_TRACKED_CLIENTS,
     CONF_USE_CACHE,
     CONF_VERIFY_SSL,
     CONF_WAN2_DISABLED,
@@ -37,19 +49,25 @@ from .const import (
     CONF_WAN_LABEL,
     CONF_WAN_SPEED,
     DEFAULT_CLIENT_SCOPE,
+    DEFAULT_DEVICE_DETAIL_MAX_AGE_MINUTES,
     DEFAULT_ICON_SET,
     DEFAULT_INCLUDE_CLIENTS,
     DEFAULT_INCLUDE_PORTS,
     DEFAULT_ISO_LIGHTING,
     DEFAULT_ISO_ROUTE_AROUND_NODES,
     DEFAULT_ISO_SHOW_GRID,
+    DEFAULT_LIGHTWEIGHT_STATS,
     DEFAULT_ONLY_UNIFI,
+    DEFAULT_RENDER_IN_WORKER,
+    DEFAULT_RENDER_TIMEOUT_SECONDS,
+    DEFAULT_RENDER_WORKER_MEMORY_MIB,
     DEFAULT_REQUEST_TIMEOUT_SECONDS,
     DEFAULT_SCAN_INTERVAL_MINUTES,
     DEFAULT_SHOW_VPN,
     DEFAULT_SHOW_WAN,
     DEFAULT_SVG_ISOMETRIC,
     DEFAULT_SVG_THEME,
+    DEFAULT_TRACKED_CLIENTS,
     DEFAULT_USE_CACHE,
     DEFAULT_VERIFY_SSL,
     DEFAULT_WAN2_DISABLED,
@@ -58,24 +76,33 @@ from .const import (
     DEFAULT_WAN_LABEL,
     DEFAULT_WAN_SPEED,
     DOMAIN,
+    LATE_NETWORKS_TIMEOUT_SECONDS,
     LOGGER,
 )
 from .data import UniFiNetworkMapData
+from .device_details import DeviceDetailCache
 from .errors import (
     CannotConnect,
     InvalidAuth,
+    RenderSuperseded,
     RequestRejected,
     UniFiNetworkMapError,
 )
-from .renderer import RenderSettings
+from .job_executor import async_run_job, get_job_executor
+from .render_worker import RenderWorker
+from .renderer import RenderJob, RenderSettings
+from .stage_timings import StageTimings, get_stage_timings
 from .utils import monotonic_seconds
 
 if TYPE_CHECKING:
-    from collections.abc import Mapping
+    from collections.abc import Callable, Mapping
+    from concurrent.futures import Future
 
     from homeassistant.config_entries import ConfigEntry
     from homeassistant.core import HomeAssistant
 
+    from .job_executor import JobExecutor
+
 AUTH_BACKOFF_BASE_SECONDS = 30
 AUTH_BACKOFF_MAX_SECONDS = 600
 
@@ -83,12 +110,27 @@ AUTH_BACKOFF_MAX_SECONDS = 600
 class MapClient(Protocol):
     settings: RenderSettings
 
-    def fetch_map(self) -> UniFiNetworkMapData: ...
+    def fetch_map(
+        self,
+        job: RenderJob | None = None,
+        start_networks: Callable[[], Future[list[Mapping[str, Any]]]]
+        | None = None,
+    ) -> UniFiNetworkMapData: ...
+
+    def fetch_networks(self) -> list[Mapping[str, Any]]: ...
+
+    def complete_networks(
+        self, data: UniFiNetworkMapData, networks: list[Mapping[str, Any]]
+    ) -> UniFiNetworkMapData: ...
 
     def invalidate_cache(self) -> None: ...
 
 
 class UniFiNetworkMapCoordinator(DataUpdateCoordinator[UniFiNetworkMapData]):  # type: ignore[reportUntypedBaseClass]
+    backoff_activations: int = 0
+    websocket_subscribers: int = 0
+    superseded_refreshes: int = 0
+
     def __init__(
         self,
         hass: HomeAssistant,
@@ -101,15 +143,49 @@ class UniFiNetworkMapCoordinator(DataUpdateCoordinator[UniFiNetworkMapData]):  #
             LOGGER,
             name=DOMAIN,
             update_interval=scan_interval,
+            # Listeners are only notified when the returned data object
+            # differs; unchanged refreshes hand back the previous object.
+            always_update=False,
         )
         self._entry = entry
-        self._client = client or _build_client(hass, entry)
+        self.timings = get_stage_timings(hass, entry.entry_id)
+        self.render_worker: RenderWorker | None = (
+            None if client else _build_render_worker(entry)
+        )
+        self.device_details: DeviceDetailCache | None = (
+            None if client else _build_device_details(entry)
+        )
+        self._client = client or _build_client(
+            hass,
+            entry,
+            self.timings,
+            render_worker=self.render_worker,
+            device_details=self.device_details,
+        )
+        self._data_digest: DataDigest | None = None
+        # The data object ``_data_digest`` was computed for.
+        self._digested: UniFiNetworkMapData | None = None
+        self._generation = 0
+        self._job: RenderJob | None = None
+        self._late_task: asyncio.Task[None] | None = None
+        self.fetch_errors: Counter[str] = Counter()
+        self.last_refresh_time: datetime | None = None
+        self.last_change_time: datetime | None = None
         self._auth_backoff_until: float | None = None
         self._auth_backoff_seconds = AUTH_BACKOFF_BASE_SECONDS
 
     def update_settings(self) -> None:
         """Rebuild client with current entry options."""
-        self._client = _build_client(self.hass, self._entry)
+        self.supersede_refresh()
+        self._update_render_worker()
+        self.device_details = _build_device_details(self._entry)
+        self._client = _build_client(
+            self.hass,
+            self._entry,
+            self.timings,
+            render_worker=self.render_worker,
+            device_details=self.device_details,
+        )
         self.update_interval = _get_scan_interval(self._entry)
         LOGGER.debug(
             "coordinator settings_updated entry_id=%s interval=%s",
@@ -117,14 +193,61 @@ class UniFiNetworkMapCoordinator(DataUpdateCoordinator[UniFiNetworkMapData]):  #
             self.update_interval,
         )
 
+    def _update_render_worker(self) -> None:
+        """Start, stop or re-limit the render worker for new options."""
+        current = self.render_worker
+        configured = _build_render_worker(self._entry)
+        if current is not None and configured is not None:
+            current.configure(
+                configured.timeout_seconds, configured.memory_limit_mib
+            )
+            return
+        if current is not None:
+            self.hass.async_add_executor_job(current.stop)
+        self.render_worker = configured
+
+    async def async_shutdown(self) -> None:
+        await super().async_shutdown()
+        if self._late_task is not None:
+            self._late_task.cancel()
+        if self.render_worker is not None:
+            await self.hass.async_add_executor_job(self.render_worker.stop)
+
     @property
     def settings(self) -> RenderSettings:
         return self._client.settings
 
+    def build_uncached_client(
+        self, timings: StageTimings
+    ) -> UniFiNetworkMapClient:
+        """Return a client for this entry with every fetch cache disabled."""
+        settings = replace(_build_settings(self._entry), use_cache=False)
+        return _build_client(self.hass, self._entry, timings, settings)
+
     @property
     def auth_backoff_until(self) -> float | None:
         return self._auth_backoff_until
 
+    @property
+    def data_digest(self) -> DataDigest | None:
+        """Digest and encoded sizes of the published data.
+
+        Computed once per data generation, when it is fetched; data set
+        any other way is measured on first use.
+        """
+        data = self._published()
+        if data is None:
+            return None
+        if self._digested is not data or self._data_digest is None:
+            self._data_digest = measure_data(data)
+            self._digested = data
+        return self._data_digest
+
+    def _published(self) -> UniFiNetworkMapData | None:
+        # Typed as always set by the base class, but None until the first
+        # successful refresh.
+        return self.data
+
     @property
     def auth_backoff_seconds(self) -> int:
         return self._auth_backoff_seconds
@@ -142,24 +265,54 @@ class UniFiNetworkMapCoordinator(DataUpdateCoordinator[UniFiNetworkMapData]):  #
             raise UpdateFailed(
                 f"Auth backoff active, retrying in {int(backoff_remaining)}s"
             )
+        job = self._start_job()
         LOGGER.debug(
-            "coordinator fetch_started entry_id=%s", self._entry.entry_id
+            "coordinator fetch_started entry_id=%s generation=%d",
+            self._entry.entry_id,
+            job.generation,
+        )
+        # Networks only feed the VLAN sections; the client starts their
+        # fetch alongside the render, so a slow networks endpoint does
+        # not hold back the map, and not at all when its cache answers.
+        networks = _NetworksFetch(
+            get_job_executor(self.hass), self._client.fetch_networks
         )
         try:
-            data = await self.hass.async_add_executor_job(
-                self._client.fetch_map
-            )
+            with self.timings.measure("refresh"):
+                data, digest = await async_run_job(
+                    self.hass,
+                    "refresh",
+                    self._fetch_map_with_digest,
+                    job,
+                    networks.start,
+                )
             self._reset_auth_backoff()
             LOGGER.debug(
-                "coordinator fetch_completed entry_id=%s", self._entry.entry_id
+                "coordinator fetch_completed entry_id=%s pending=%s",
+                self._entry.entry_id,
+                ",".join(data.pending) or "none",
             )
-            return data
+            if job.superseded:
+                # A newer refresh owns the published data now.
+                networks.cancel()
+                return self._superseded(job)
+            published = self._apply_fetched_data(data, digest)
+            if data.pending and networks.future is not None:
+                self._start_late_networks(data, published, networks.future)
+            else:
+                networks.cancel()
+            return published
+        except RenderSuperseded:
+            networks.cancel()
+            return self._superseded(job)
         except UniFiNetworkMapError as err:
+            networks.cancel()
             LOGGER.debug(
                 "coordinator fetch_failed entry_id=%s error=%s",
                 self._entry.entry_id,
                 type(err).__name__,
             )
+            self.fetch_errors[type(err).__name__] += 1
             if _should_backoff(err):
                 self._advance_auth_backoff()
             if isinstance(err, InvalidAuth):
@@ -169,11 +322,162 @@ class UniFiNetworkMapCoordinator(DataUpdateCoordinator[UniFiNetworkMapData]):  #
                 )
             raise UpdateFailed(str(err)) from err
 
+    def _start_job(self) -> RenderJob:
+        self._generation += 1
+        timeout = self._entry.options.get(
+            CONF_RENDER_TIMEOUT_SECONDS, DEFAULT_RENDER_TIMEOUT_SECONDS
+        )
+        self._job = RenderJob(self._generation, float(timeout))
+        return self._job
+
+    def _superseded(self, job: RenderJob) -> UniFiNetworkMapData:
+        """Finish a superseded refresh without touching the published data.
+
+        Returning the current data object leaves listeners and the
+        update status alone; the newer refresh publishes its own result.
+        """
+        self.superseded_refreshes += 1
+        LOGGER.debug(
+            "coordinator fetch_superseded entry_id=%s generation=%d",
+            self._entry.entry_id,
+            job.generation,
+        )
+        current = self._published()
+        if current is None:
+            raise UpdateFailed("Refresh superseded before the first map")
+        return current
+
+    def _fetch_map_with_digest(
+        self,
+        job: RenderJob,
+        start_networks: Callable[[], Future[list[Mapping[str, Any]]]]
+        | None = None,
+    ) -> tuple[UniFiNetworkMapData, DataDigest]:
+        data = self._client.fetch_map(job, start_networks)
+        if data is self._digested and self._data_digest is not None:
+            # The client's render cache handed back the current snapshot.
+            return data, self._data_digest
+        return data, measure_data(data)
+
+    def _start_late_networks(
+        self,
+        partial: UniFiNetworkMapData,
+        published: UniFiNetworkMapData,
+        networks: Future[list[Mapping[str, Any]]],
+    ) -> None:
+        if self._late_task is not None:
+            self._late_task.cancel()
+        self._late_task = self._entry.async_create_background_task(
+            self.hass,
+            self._async_complete_networks(partial, published, networks),
+            f"{DOMAIN}_late_networks_{self._entry.entry_id}",
+        )
+
+    async def _async_complete_networks(
+        self,
+        partial: UniFiNetworkMapData,
+        published: UniFiNetworkMapData,
+        networks: Future[list[Mapping[str, Any]]],
+    ) -> None:
+        """Complete ``partial`` with its networks once they arrive.
+
+        ``published`` is what the refresh left as the coordinator's data:
+        ``partial`` itself, or the previous data object when ``partial``
+        (rendered with the previous networks) had the same content. The
+        completed map replaces it only if its content differs.
+
+        The networks get ``LATE_NETWORKS_TIMEOUT_SECONDS`` (or the
+        request timeout, if shorter) from the moment the partial map was
+        published; past it, the map keeps the VLAN data it was rendered
+        with, as when the networks fetch fails, and the fetch is cancelled
+        if it has not started.
+        """
+        timeout = min(
+            float(
+                self._entry.options.get(
+                    CONF_REQUEST_TIMEOUT_SECONDS,
+                    DEFAULT_REQUEST_TIMEOUT_SECONDS,
+                )
+            ),
+            LATE_NETWORKS_TIMEOUT_SECONDS,
+        )
+        try:
+            async with asyncio.timeout(timeout):
+                loaded = await asyncio.wrap_future(networks)
+        except TimeoutError:
+            LOGGER.debug(
+                "coordinator late_networks_timeout entry_id=%s timeout=%gs",
+                self._entry.entry_id,
+                timeout,
+            )
+            return
+        if self.data is not published:
+            return
+        completed, digest = await async_run_job(
+            self.hass, "refresh", self._complete_with_digest, partial, loaded
+        )
+        if self.data is not published:
+            # A newer refresh was published meanwhile.
+            return
+        LOGGER.debug(
+            "coordinator late_networks_applied entry_id=%s networks=%d",
+            self._entry.entry_id,
+            len(loaded),
+        )
+        published = self._apply_fetched_data(completed, digest)
+        if published is completed:
+            self.async_set_updated_data(completed)
+
+    def _complete_with_digest(
+        self,
+        partial: UniFiNetworkMapData,
+        networks: list[Mapping[str, Any]],
+    ) -> tuple[UniFiNetworkMapData, DataDigest]:
+        completed = self._client.complete_networks(partial, networks)
+        return completed, measure_data(completed)
+
+    def _apply_fetched_data(
+        self, data: UniFiNetworkMapData, digest: DataDigest
+    ) -> UniFiNetworkMapData:
+        """Keep the current data object when the content is unchanged.
+
+        Returning the same object makes the base coordinator skip listener
+        notification, so entities, discovery callbacks and WebSocket
+        subscribers are not woken for identical refreshes.
+        """
+        now = dt_util.utcnow()
+        self.last_refresh_time = now
+        current = self._published()
+        previous = self._data_digest
+        if (
+            current is not None
+            and previous is not None
+            and digest.value == previous.value
+        ):
+            LOGGER.debug(
+                "coordinator data_unchanged entry_id=%s", self._entry.entry_id
+            )
+            return current
+        self._data_digest = digest
+        self._digested = data
+        self.last_change_time = now
+        return data
+
     async def async_force_refresh(self) -> None:
         """Refresh bypassing the render cache (manual refresh service)."""
+        self.supersede_refresh()
         self._client.invalidate_cache()
         await self.async_request_refresh()
 
+    def supersede_refresh(self) -> None:
+        """Stop the running refresh, if any, at its next stage boundary.
+
+        Refreshes run one at a time, so a requested refresh would
+        otherwise wait for a render whose result it replaces.
+        """
+        if self._job is not None:
+            self._job.supersede()
+
     def _auth_backoff_remaining(self) -> float | None:
         if self._auth_backoff_until is None:
             return None
@@ -186,6 +490,7 @@ class UniFiNetworkMapCoordinator(DataUpdateCoordinator[UniFiNetworkMapData]):  #
         now = monotonic_seconds()
         delay = min(self._auth_backoff_seconds, AUTH_BACKOFF_MAX_SECONDS)
         self._auth_backoff_until = now + delay
+        self.backoff_activations += 1
         next_delay = min(
             self._auth_backoff_seconds * 2, AUTH_BACKOFF_MAX_SECONDS
         )
@@ -208,6 +513,56 @@ class UniFiNetworkMapCoordinator(DataUpdateCoordinator[UniFiNetworkMapData]):  #
         self._auth_backoff_seconds = AUTH_BACKOFF_BASE_SECONDS
 
 
+class _NetworksFetch:
+    """The networks fetch of one refresh, started on first request.
+
+    ``start`` runs on the refresh's worker thread; ``future`` is read
+    back on the event loop once the render returned.
+    """
+
+    def __init__(
+        self,
+        executor: JobExecutor,
+        fetch: Callable[[], list[Mapping[str, Any]]],
+    ) -> None:
+        self._executor = executor
+        self._fetch = fetch
+        self.future: Future[list[Mapping[str, Any]]] | None = None
+
+    def start(self) -> Future[list[Mapping[str, Any]]]:
+        if self.future is None:
+            self.future = self._executor.submit("refresh", self._fetch)
+        return self.future
+
+    def cancel(self) -> None:
+        if self.future is not None:
+            self.future.cancel()
+
+
+class DataDigest(NamedTuple):
+    """Content digest of one data generation and its encoded sizes."""
+
+    value: str
+    payload_bytes: int
+    svg_bytes: int
+
+
+def measure_data(data: UniFiNetworkMapData) -> DataDigest:
+    """Digest the SVG, payload and WAN/VPN state, keeping their sizes."""
+    svg = data.svg.encode("utf-8")
+    payload = json_bytes(data.payload)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(svg)
+    digest.update(payload)
+    digest.update(repr((data.wan_info, data.vpn_tunnels)).encode("utf-8"))
+    return DataDigest(digest.hexdigest(), len(payload), len(svg))
+
+
+def compute_data_digest(data: UniFiNetworkMapData) -> str:
+    """Return a content digest of the SVG, payload and WAN/VPN state."""
+    return measure_data(data).value
+
+
 def _should_backoff(err: UniFiNetworkMapError) -> bool:
     if isinstance(err, (InvalidAuth, RequestRejected)):
         return True
@@ -217,7 +572,12 @@ def _should_backoff(err: UniFiNetworkMapError) -> bool:
 
 
 def _build_client(
-    hass: HomeAssistant, entry: ConfigEntry
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    timings: StageTimings,
+    settings: RenderSettings | None = None,
+    render_worker: RenderWorker | None = None,
+    device_details: DeviceDetailCache | None = None,
 ) -> UniFiNetworkMapClient:
     data = entry.data
     _validate_required_keys(data)
@@ -228,11 +588,37 @@ def _build_client(
         api_key=data.get(CONF_API_KEY),
         site=data[CONF_SITE],
         verify_ssl=data.get(CONF_VERIFY_SSL, DEFAULT_VERIFY_SSL),
-        settings=_build_settings(entry),
+        settings=settings or _build_settings(entry),
         request_timeout_seconds=entry.options.get(
             CONF_REQUEST_TIMEOUT_SECONDS, DEFAULT_REQUEST_TIMEOUT_SECONDS
         ),
         cache_ttl_seconds=_get_scan_interval(entry).total_seconds(),
+        timings=timings,
+        render_worker=render_worker,
+        device_details=device_details,
+    )
+
+
+def _build_device_details(entry: ConfigEntry) -> DeviceDetailCache | None:
+    minutes = entry.options.get(
+        CONF_DEVICE_DETAIL_MAX_AGE, DEFAULT_DEVICE_DETAIL_MAX_AGE_MINUTES
+    )
+    if not minutes:
+        return None
+    return DeviceDetailCache(max_age_seconds=float(minutes) * 60)
+
+
+def _build_render_worker(entry: ConfigEntry) -> RenderWorker | None:
+    options = entry.options
+    if not options.get(CONF_RENDER_IN_WORKER, DEFAULT_RENDER_IN_WORKER):
+        return None
+    return RenderWorker(
+        timeout_seconds=options.get(
+            CONF_RENDER_TIMEOUT_SECONDS, DEFAULT_RENDER_TIMEOUT_SECONDS
+        ),
+        memory_limit_mib=options.get(
+            CONF_RENDER_WORKER_MEMORY_MIB, DEFAULT_RENDER_WORKER_MEMORY_MIB
+        ),
     )
 
 
@@ -283,9 +669,18 @@ def _build_settings(entry: ConfigEntry) -> RenderSettings:
             CONF_ISO_ROUTE_AROUND_NODES, DEFAULT_ISO_ROUTE_AROUND_NODES
         ),
         iso_show_grid=options.get(CONF_ISO_SHOW_GRID, DEFAULT_ISO_SHOW_GRID),
+        lightweight_stats=_use_lightweight_stats(options),
     )
 
 
+def _use_lightweight_stats(options: Mapping[str, Any]) -> bool:
+    """Lightweight stats, unless tracked clients need the client list."""
+    if not options.get(CONF_LIGHTWEIGHT_STATS, DEFAULT_LIGHTWEIGHT_STATS):
+        return False
+    tracked = options.get(CONF_TRACKED_CLIENTS, DEFAULT_TRACKED_CLIENTS)
+    return not str(tracked or "").strip()
+
+
 def _get_scan_interval(entry: ConfigEntry) -> timedelta:
     minutes = entry.options.get(
         CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL_MINUTES
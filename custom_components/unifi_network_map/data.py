@@ -8,6 +8,7 @@ if TYPE_CHECKING:
     from unifi_topology import VpnTunnel, WanInfo
 
     from .coordinator import UniFiNetworkMapCoordinator
+    from .topology_index import TopologyIndex
 
 type UniFiNetworkMapConfigEntry = ConfigEntry[UniFiNetworkMapCoordinator]
 
@@ -18,3 +19,8 @@ class UniFiNetworkMapData:
     payload: dict[str, Any]
     wan_info: WanInfo | None = field(default=None)
     vpn_tunnels: list[VpnTunnel] | None = field(default=None)
+    # Optional sources still loading when the map was published; a
+    # follow-up update fills them in.
+    pending: tuple[str, ...] = field(default=())
+    # Adjacency index of ``payload["edges"]``, built with the payload.
+    topology: TopologyIndex | None = field(default=None)
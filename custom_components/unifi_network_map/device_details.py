@@ -0,0 +1,145 @@
+"""Reuse of detailed device records between refreshes.
+
+The detailed device list (``stat/device``) carries port tables and radio
+stats and is the bulk of a refresh's bytes. With the
+``device_detail_max_age`` option set, each refresh first fetches the
+basic list (``stat/device-basic``), which is a few fields per device,
+and compares a per-device signature (state, config and firmware
+version, uplink and, when reported, the port table) with the previous
+poll. The detailed list is fetched again only when a signature changed,
+a device appeared or left, or the cached records are older than the
+maximum age, so live counters are never older than that.
+
+unifi-topology can only fetch the detailed list for the whole site, so
+any change refetches every device.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
+
+from .const import LOGGER
+from .utils import monotonic_seconds
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+# Basic-list fields that change when a device's detailed record does
+# more than tick its counters.
+_SIGNATURE_FIELDS = (
+    "state",
+    "adopted",
+    "disabled",
+    "cfgversion",
+    "version",
+    "name",
+    "type",
+    "model",
+    "in_gateway_mode",
+)
+_UPLINK_FIELDS = ("uplink_mac", "uplink_remote_port", "type", "up")
+_PORT_FIELDS = ("port_idx", "up", "speed", "full_duplex", "is_uplink")
+
+
+class DeviceDetailCache:
+    """Detailed device records, reused while the basic list is unchanged."""
+
+    def __init__(self, max_age_seconds: float) -> None:
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self._records: list[object] | None = None
+        self._signatures: dict[str, str] | None = None
+        self._fetched_at: float | None = None
+        self._lock = threading.Lock()
+
+    def load(
+        self,
+        fetch_basic: Callable[[], list[object]],
+        fetch_detailed: Callable[[], list[object]],
+    ) -> list[object]:
+        """Return detailed records, fetching them only when needed."""
+        with self._lock:
+            signatures = device_signatures(fetch_basic())
+            reason = self._stale_reason(signatures)
+            if reason is None and self._records is not None:
+                self.hits += 1
+                LOGGER.debug(
+                    "device_details reused devices=%d", len(signatures)
+                )
+                return self._records
+            records = fetch_detailed()
+            self._records = records
+            self._signatures = signatures
+            self._fetched_at = monotonic_seconds()
+            self.misses += 1
+            LOGGER.debug(
+                "device_details fetched devices=%d reason=%s",
+                len(records),
+                reason,
+            )
+            return records
+
+    def invalidate(self) -> None:
+        """Drop the cached records so the next load fetches details."""
+        with self._lock:
+            self._records = None
+            self._signatures = None
+            self._fetched_at = None
+
+    def stats(self) -> dict[str, Any]:
+        fetched_at = self._fetched_at
+        return {
+            "max_age_seconds": self.max_age_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "devices": len(self._signatures or {}),
+            "age_seconds": (
+                None
+                if fetched_at is None
+                else round(monotonic_seconds() - fetched_at, 1)
+            ),
+        }
+
+    def _stale_reason(self, signatures: dict[str, str]) -> str | None:
+        if self._records is None or self._fetched_at is None:
+            return "empty"
+        if monotonic_seconds() - self._fetched_at >= self.max_age_seconds:
+            return "expired"
+        if signatures != self._signatures:
+            return "changed"
+        return None
+
+
+def device_signatures(records: list[object]) -> dict[str, str]:
+    """Map each device MAC to a digest of its change-relevant fields."""
+    signatures: dict[str, str] = {}
+    for record in records:
+        if not isinstance(record, Mapping):
+            continue
+        device: Mapping[str, Any] = record
+        mac = device.get("mac")
+        if not isinstance(mac, str) or not mac.strip():
+            continue
+        signatures[mac.strip().lower()] = _signature(device)
+    return signatures
+
+
+def _signature(device: Mapping[str, Any]) -> str:
+    parts = [repr(device.get(key)) for key in _SIGNATURE_FIELDS]
+    uplink = device.get("uplink")
+    if isinstance(uplink, Mapping):
+        parts.extend(repr(uplink.get(key)) for key in _UPLINK_FIELDS)
+    ports = device.get("port_table")
+    if isinstance(ports, list):
+        parts.extend(
+            repr(tuple(port.get(key) for key in _PORT_FIELDS))
+            for port in ports
+            if isinstance(port, Mapping)
+        )
+    digest = hashlib.blake2b(digest_size=8)
+    digest.update("|".join(parts).encode("utf-8"))
+    return digest.hexdigest()
@@ -0,0 +1,77 @@
+"""Per-render device index shared by every renderer stage.
+
+The renderer used to regroup devices by type, rebuild the MAC-to-name
+index, and re-normalize every device MAC once per payload section. The
+index below is built once per render from the normalized device list and
+passed through the whole pipeline instead.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from unifi_topology import build_device_index, group_devices_by_type
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from unifi_topology import Device
+    from unifi_topology.model.topology import PortInfo
+
+
+@dataclass(frozen=True, slots=True)
+class DeviceIndex:
+    """Read-only device lookups for a single render.
+
+    ``by_mac`` and ``port_tables`` are keyed by the canonical payload MAC
+    (stripped, lowercase); ``names`` and ``groups`` use the
+    ``unifi_topology`` normalization expected by its builders.
+    """
+
+    devices: tuple[Device, ...]
+    by_mac: Mapping[str, Device]
+    names: dict[str, str]
+    groups: Mapping[str, tuple[str, ...]]
+    port_tables: Mapping[str, tuple[PortInfo, ...]]
+    gateway: Device | None
+
+    @property
+    def gateway_macs(self) -> list[str]:
+        return list(self.groups.get("gateway", ()))
+
+
+def build_render_device_index(devices: Iterable[Device]) -> DeviceIndex:
+    """Index normalized devices once for the whole render pipeline."""
+    device_list = tuple(devices)
+    by_mac: dict[str, Device] = {}
+    port_tables: dict[str, tuple[PortInfo, ...]] = {}
+    for device in device_list:
+        mac = canonical_mac(device.mac)
+        if not mac:
+            continue
+        by_mac[mac] = device
+        if device.port_table:
+            port_tables[mac] = tuple(device.port_table)
+    addressed = [device for device in device_list if device.mac]
+    groups = {
+        group: tuple(macs)
+        for group, macs in group_devices_by_type(addressed).items()
+    }
+    gateway_macs = groups.get("gateway", ())
+    gateway = by_mac.get(gateway_macs[0]) if gateway_macs else None
+    return DeviceIndex(
+        devices=device_list,
+        by_mac=by_mac,
+        names=build_device_index(addressed),
+        groups=groups,
+        port_tables=port_tables,
+        gateway=gateway,
+    )
+
+
+def canonical_mac(value: str | None) -> str | None:
+    """Return the payload form of a MAC (stripped, lowercase) or None."""
+    if not value:
+        return None
+    return value.strip().lower() or None
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Any
 from homeassistant.components.diagnostics import async_redact_data
 from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
 
+from .cache_budget import cache_budget_stats
 from .const import CONF_API_KEY, CONF_TRACKED_CLIENTS
 from .enrichment import (
     get_state_entity_macs,
@@ -14,6 +15,9 @@ from .enrichment import (
     get_unifi_entity_macs,
     normalize_mac_value,
 )
+from .job_executor import job_executor_stats
+from .profiler import get_last_profile
+from .stage_timings import get_stage_timings
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
@@ -51,11 +55,36 @@ async def async_get_config_entry_diagnostics(
             "data_age_seconds": _calculate_data_age(
                 getattr(coordinator, "last_update_success_time", None)
             ),
+            "last_refresh_time": _format_timestamp(
+                getattr(coordinator, "last_refresh_time", None)
+            ),
+            "last_change_time": _format_timestamp(
+                getattr(coordinator, "last_change_time", None)
+            ),
+            "superseded_refreshes": getattr(
+                coordinator, "superseded_refreshes", None
+            ),
         },
         "map_summary": _summarize_map_data(hass, data),
+        "stage_timings": get_stage_timings(hass, entry.entry_id).summary(),
+        "last_profile": get_last_profile(hass, entry.entry_id),
+        "render_worker": _render_worker_stats(coordinator),
+        "device_details": _device_detail_stats(coordinator),
+        "job_executor": job_executor_stats(hass),
+        "cache_memory": cache_budget_stats(hass, entry.entry_id),
     }
 
 
+def _render_worker_stats(coordinator: object) -> dict[str, Any] | None:
+    worker = getattr(coordinator, "render_worker", None)
+    return worker.stats() if worker is not None else None
+
+
+def _device_detail_stats(coordinator: object) -> dict[str, Any] | None:
+    details = getattr(coordinator, "device_details", None)
+    return details.stats() if details is not None else None
+
+
 def _format_timestamp(dt: datetime | None) -> str | None:
     """Format a datetime as ISO 8601 string."""
     if dt is None:
@@ -101,6 +130,7 @@ def _summarize_map_data(
     return {
         "svg_length": len(data.svg),
         "payload_schema_version": payload.get("schema_version"),
+        "pending_sources": list(data.pending),
         "node_count": len(node_types),
         "edge_count": len(edges),
         "client_count": client_count,
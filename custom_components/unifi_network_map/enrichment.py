@@ -9,34 +9,155 @@ status, and related entity details.
 from __future__ import annotations
 
 import re
-from copy import deepcopy
 from typing import TYPE_CHECKING
 
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import entity_registry as er
 
-from .const import LOGGER
+from .const import (
+    COMPACT_PAYLOAD_SCHEMA_VERSION,
+    CONF_RELATED_ENTITIES_EAGER_MAX_NODES,
+    DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES,
+    LOGGER,
+)
 from .entity_cache import get_entity_cache
 from .payload_cache import compute_payload_hash, get_payload_cache
+from .payload_encoding import encode_payload
+from .payload_schema import encode_compact_payload, project_payload
+from .stage_timings import get_stage_timings
+from .utils import monotonic_seconds
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
 
+    from .payload_cache import CachedPayload
+
 _MAC_ATTRIBUTE_KEYS = ("mac_address", "mac")
 
+# Heavy per-node payload sections that can be fetched one node at a time.
+NODE_SECTIONS = frozenset({"related_entities", "device_ports"})
+
 
 def get_or_build_enriched_payload(
     hass: HomeAssistant, entry_id: str, source_payload: dict[str, object]
 ) -> dict[str, object]:
     """Get cached enriched payload or build and cache a new one."""
+    return _get_or_build_cached_payload(hass, entry_id, source_payload).payload
+
+
+def get_or_build_payload_for_schema(
+    hass: HomeAssistant,
+    entry_id: str,
+    source_payload: dict[str, object],
+    schema_version: str,
+    fields: tuple[str, ...] | None = None,
+) -> dict[str, object]:
+    """Get the enriched payload encoded for a negotiated schema version.
+
+    The compact encoding and field projections are cached alongside the
+    enriched payload, so each is built once per data change rather than
+    once per request.
+    """
+    cached = _get_or_build_cached_payload(hass, entry_id, source_payload)
+    return _payload_variant(cached, schema_version, fields)
+
+
+def get_or_build_encoded_payload(
+    hass: HomeAssistant,
+    entry_id: str,
+    source_payload: dict[str, object],
+    schema_version: str,
+    encoding: str,
+    fields: tuple[str, ...] | None = None,
+) -> bytes:
+    """Get the serialized payload for a schema version and wire encoding.
+
+    Encoded bytes are cached per data generation, so concurrent clients
+    of the same shape share one serialization.
+    """
+    cached = _get_or_build_cached_payload(hass, entry_id, source_payload)
+    timings = get_stage_timings(hass, entry_id)
+
+    def _encode() -> bytes:
+        with timings.measure("encode_payload"):
+            return encode_payload(
+                _payload_variant(cached, schema_version, fields), encoding
+            )
+
+    return cached.variant(
+        f"{_variant_key(schema_version, fields)}/{encoding}", _encode
+    )
+
+
+def get_node_section(
+    hass: HomeAssistant,
+    entry_id: str,
+    source_payload: dict[str, object],
+    section: str,
+    mac: str,
+) -> list[object]:
+    """Return one node's entries from a per-node payload section.
+
+    Related entities are resolved on demand from the cached MAC index, so
+    they are current even when the payload was built without them.
+    """
+    if section == "related_entities":
+        return list(resolve_related_entities(hass, {mac}).get(mac, []))
+    payload = get_or_build_enriched_payload(hass, entry_id, source_payload)
+    entries = payload.get(section)
+    if not isinstance(entries, dict):
+        return []
+    value = entries.get(mac)
+    return value if isinstance(value, list) else []
+
+
+def _payload_variant(
+    cached: CachedPayload,
+    schema_version: str,
+    fields: tuple[str, ...] | None,
+) -> dict[str, object]:
+    payload = _payload_for_schema(cached, schema_version)
+    if fields is None:
+        return payload
+    return cached.variant(
+        _variant_key(schema_version, fields),
+        lambda: project_payload(payload, fields),
+    )
+
+
+def _payload_for_schema(
+    cached: CachedPayload, schema_version: str
+) -> dict[str, object]:
+    if schema_version != COMPACT_PAYLOAD_SCHEMA_VERSION:
+        return cached.payload
+    return cached.variant(
+        schema_version, lambda: encode_compact_payload(cached.payload)
+    )
+
+
+def _variant_key(schema_version: str, fields: tuple[str, ...] | None) -> str:
+    if fields is None:
+        return schema_version
+    return f"{schema_version}?fields={','.join(fields)}"
+
+
+def _get_or_build_cached_payload(
+    hass: HomeAssistant, entry_id: str, source_payload: dict[str, object]
+) -> CachedPayload:
     cache = get_payload_cache(hass)
     source_hash = compute_payload_hash(source_payload)
-    cached = cache.get(entry_id, source_hash)
+    cached = cache.get_entry(entry_id, source_hash)
     if cached is not None:
         return cached
-    payload = build_enriched_payload(hass, deepcopy(source_payload))
-    cache.set(entry_id, payload, source_hash)
-    return payload
+    # Enrichment only adds top-level sections, so the cached payload
+    # shares the source's sections instead of holding a second copy.
+    with get_stage_timings(hass, entry_id).measure("enrich_payload"):
+        payload = build_enriched_payload(
+            hass,
+            dict(source_payload),
+            related_entities_eager_max_nodes(hass, entry_id),
+        )
+    return cache.set(entry_id, payload, source_hash, source_payload)
 
 
 def _resolve_entity_map_by_mac(
@@ -74,10 +195,33 @@ def resolve_node_status_map(
     return status_map
 
 
+def related_entities_eager_max_nodes(
+    hass: HomeAssistant, entry_id: str
+) -> int:
+    """Return the entry's node count cutoff for eager related entities."""
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None:
+        return DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES
+    return int(
+        entry.options.get(
+            CONF_RELATED_ENTITIES_EAGER_MAX_NODES,
+            DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES,
+        )
+    )
+
+
 def build_enriched_payload(
-    hass: HomeAssistant, payload: dict[str, object]
+    hass: HomeAssistant,
+    payload: dict[str, object],
+    eager_max_nodes: int = DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES,
 ) -> dict[str, object]:
-    """Add entity, status, and related entity data to a map payload."""
+    """Add entity, status, and related entity data to a map payload.
+
+    Related entities are resolved for every node only when the map has at
+    most ``eager_max_nodes`` nodes. Otherwise the payload is flagged
+    ``related_entities_lazy`` and clients resolve the nodes they show via
+    the per-node endpoint or ``unifi_network_map/related_entities``.
+    """
     node_types = payload.get("node_types", {})
     if not isinstance(node_types, dict):
         return payload
@@ -93,8 +237,11 @@ def build_enriched_payload(
     _store_payload_field(payload, "node_entities", node_entities)
     node_status = resolve_node_status_map(hass, node_entities)
     _store_payload_field(payload, "node_status", node_status)
-    related_entities = resolve_related_entities(hass, all_macs)
-    _store_payload_field(payload, "related_entities", related_entities)
+    if len(all_macs) <= eager_max_nodes:
+        related_entities = resolve_related_entities(hass, all_macs)
+        _store_payload_field(payload, "related_entities", related_entities)
+    else:
+        payload["related_entities_lazy"] = True
     return payload
 
 
@@ -187,6 +334,7 @@ def _build_mac_to_all_entities_index(
         )
         return cached
 
+    started = monotonic_seconds()
     entity_registry = er.async_get(hass)
     device_registry = dr.async_get(hass)
     mac_to_entities: dict[str, list[str]] = {}
@@ -226,6 +374,7 @@ def _build_mac_to_all_entities_index(
     _add_entities_from_states(hass, mac_to_entities)
 
     cache.mac_to_all_entities = mac_to_entities
+    cache.record_rebuild(monotonic_seconds() - started)
 
     # Log summary of entities per MAC
     total_entities = sum(len(v) for v in mac_to_entities.values())
@@ -441,6 +590,7 @@ def _build_mac_entity_index(hass: HomeAssistant) -> dict[str, str]:
         )
         return cached
 
+    started = monotonic_seconds()
     entity_registry = er.async_get(hass)
     device_registry = dr.async_get(hass)
     mac_to_entity: dict[str, str] = {}
@@ -448,6 +598,7 @@ def _build_mac_entity_index(hass: HomeAssistant) -> dict[str, str]:
     _add_state_macs(hass, mac_to_entity)
 
     cache.mac_to_entity = mac_to_entity
+    cache.record_rebuild(monotonic_seconds() - started)
     LOGGER.debug(
         "http mac_index built type=primary count=%d", len(mac_to_entity)
     )
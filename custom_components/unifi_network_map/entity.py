@@ -0,0 +1,52 @@
+"""Shared base for the integration's coordinator entities.
+
+Every poll notifies every entity, but most entities (presence sensors in
+particular) report the same state and attributes as last time. Writing
+them anyway costs a state-machine event and a recorder row each. The base
+class below compares the payload records an entity is derived from
+against those of its last write and skips unchanged entities.
+"""
+
+from __future__ import annotations
+
+# pyright: reportUntypedBaseClass=false
+from typing import Any
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .data import UniFiNetworkMapData
+
+
+class UniFiNetworkMapEntity(  # type: ignore[reportUntypedBaseClass]
+    CoordinatorEntity[UniFiNetworkMapData]
+):
+    """Coordinator entity that only writes state when it changed."""
+
+    _last_state_fingerprint: tuple[Any, ...] | None = None
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        # The platform writes the initial state right after this hook.
+        self._last_state_fingerprint = self._state_fingerprint()
+
+    @callback  # type: ignore[reportUntypedFunctionDecorator]
+    def _handle_coordinator_update(self) -> None:
+        fingerprint = self._state_fingerprint()
+        if fingerprint == self._last_state_fingerprint:
+            return
+        self._last_state_fingerprint = fingerprint
+        self.async_write_ha_state()
+
+    def _state_fingerprint(self) -> tuple[Any, ...]:
+        """Return a comparable snapshot of everything written to HA."""
+        return (self.available, *self._state_sources())
+
+    def _state_sources(self) -> tuple[Any, ...]:
+        """Return the payload records the state and attributes derive from.
+
+        Compared by value (dict equality ignores key order), so checking
+        an update costs a few lookups instead of rebuilding the state
+        attributes.
+        """
+        raise NotImplementedError
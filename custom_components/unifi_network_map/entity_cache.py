@@ -31,6 +31,8 @@ class EntityRegistryCache:
     )
     _unsub_entity: Callable[[], None] | None = field(default=None, repr=False)
     _unsub_device: Callable[[], None] | None = field(default=None, repr=False)
+    rebuilds: int = 0
+    rebuild_seconds: float = 0.0
 
     @property
     def mac_to_entity(self) -> dict[str, str] | None:
@@ -50,6 +52,11 @@ class EntityRegistryCache:
     def mac_to_all_entities(self, value: dict[str, list[str]]) -> None:
         self._mac_to_all_entities = value
 
+    def record_rebuild(self, seconds: float) -> None:
+        """Count one index rebuild and how long it took."""
+        self.rebuilds += 1
+        self.rebuild_seconds += seconds
+
     def invalidate(self) -> None:
         """Clear cached indices."""
         self._mac_to_entity = None
@@ -45,3 +45,15 @@ class InvalidCredentialCombination(UniFiNetworkMapError):
 
 class InvalidPort(UniFiNetworkMapError):
     """Raised when the URL contains an invalid port number."""
+
+
+class RenderTimeout(UniFiNetworkMapError):
+    """Raised when a refresh or the render worker exceeds its time budget."""
+
+
+class RenderSuperseded(UniFiNetworkMapError):
+    """Raised when a newer refresh started while this one was running."""
+
+
+class RenderWorkerFailed(UniFiNetworkMapError):
+    """Raised when the render worker cannot start or dies mid-render."""
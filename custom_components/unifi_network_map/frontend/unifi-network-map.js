@@ -3651,6 +3651,131 @@ function showToast(message, variant) {
   setTimeout(() => feedback.remove(), 2e3);
 }
 
+// src/card/data/compact-payload.ts
+var COMPACT_SCHEMA_VERSION = "3.0";
+var NODE_COLUMNS = /* @__PURE__ */ new Set(["node_types", "node_names"]);
+var EDGE_NODE_FIELDS = /* @__PURE__ */ new Set(["left", "right"]);
+var MAC_RECORD_FIELDS = /* @__PURE__ */ new Set(["mac", "uplink_device", "connected_to_mac"]);
+function withCompactSchema(url) {
+  if (!url.startsWith(`/api/${DOMAIN}/`) || /[?&]schema_version=/.test(url)) {
+    return url;
+  }
+  const separator = url.includes("?") ? "&" : "?";
+  return `${url}${separator}schema_version=3`;
+}
+var MAP_FIELDS = [
+  "edges",
+  "node_types",
+  "node_names",
+  "gateways",
+  "client_entities",
+  "device_entities",
+  "node_entities",
+  "node_status",
+  "client_ips",
+  "device_ips",
+  "related_entities",
+  "related_entities_lazy",
+  "node_vlans",
+  "vlan_info",
+  "ap_client_counts",
+  "device_details",
+  "vpn_tunnels"
+];
+function withMapFields(url) {
+  if (!url.startsWith(`/api/${DOMAIN}/`) || /[?&]fields=/.test(url)) {
+    return url;
+  }
+  const separator = url.includes("?") ? "&" : "?";
+  return `${url}${separator}fields=${MAP_FIELDS.join(",")}`;
+}
+function expandPayload(raw) {
+  if (!isCompactPayload(raw)) {
+    return raw;
+  }
+  const nodes = raw.nodes;
+  const mac = (value) => typeof value === "number" && value >= 0 && value < nodes.length ? nodes[value] : value;
+  const expanded = {};
+  for (const [key, value] of Object.entries(raw)) {
+    if (key === "nodes") {
+      continue;
+    }
+    expanded[key] = expandSection(key, value, nodes, mac);
+  }
+  return expanded;
+}
+function isCompactPayload(raw) {
+  if (!raw || typeof raw !== "object") {
+    return false;
+  }
+  const payload = raw;
+  return payload.schema_version === COMPACT_SCHEMA_VERSION && Array.isArray(payload.nodes);
+}
+function expandSection(key, value, nodes, mac) {
+  if (NODE_COLUMNS.has(key) && Array.isArray(value)) {
+    return expandNodeColumn(value, nodes);
+  }
+  if (key === "gateways" && Array.isArray(value)) {
+    return value.map(mac);
+  }
+  if (!isTable(value)) {
+    return value;
+  }
+  if (key === "edges") {
+    return expandRows(value, (field, item) => EDGE_NODE_FIELDS.has(field) ? mac(item) : item);
+  }
+  if (!Array.isArray(value.node)) {
+    return value;
+  }
+  return expandNodeTable(value, nodes, mac);
+}
+function expandNodeColumn(column, nodes) {
+  const result = {};
+  column.forEach((item, index) => {
+    if (item !== null && item !== void 0) {
+      result[nodes[index]] = item;
+    }
+  });
+  return result;
+}
+function expandNodeTable(table, nodes, mac) {
+  const result = {};
+  const rows = table.node;
+  if ("value" in table) {
+    rows.forEach((node, index) => {
+      result[nodes[node]] = table.value[index];
+    });
+    return result;
+  }
+  const records = expandRows(
+    table,
+    (field, item) => MAC_RECORD_FIELDS.has(field) ? mac(item) : item
+  );
+  rows.forEach((node, index) => {
+    result[nodes[node]] = records[index];
+  });
+  return result;
+}
+function expandRows(table, decode) {
+  const fields = Object.keys(table).filter((field) => field !== "node");
+  const count = Math.max(0, ...fields.map((field) => table[field].length));
+  const rows = [];
+  for (let index = 0; index < count; index += 1) {
+    const row = {};
+    for (const field of fields) {
+      row[field] = decode(field, table[field][index]);
+    }
+    rows.push(row);
+  }
+  return rows;
+}
+function isTable(value) {
+  if (!value || typeof value !== "object" || Array.isArray(value)) {
+    return false;
+  }
+  return Object.values(value).every((column) => Array.isArray(column));
+}
+
 // src/card/data/data.ts
 async function loadSvg(fetchWithAuth2, url, signal) {
   return fetchWithAuth2(url, signal, async (response) => {
@@ -3659,8 +3784,19 @@ async function loadSvg(fetchWithAuth2, url, signal) {
     return { svg: svg3, background };
   });
 }
-async function loadPayload(fetchWithAuth2, url, signal) {
-  return fetchWithAuth2(url, signal, (response) => response.json());
+async function loadMapPayload(fetchWithAuth2, url, signal) {
+  return fetchWithAuth2(
+    withMapFields(withCompactSchema(url)),
+    signal,
+    async (response) => expandPayload(await response.json())
+  );
+}
+async function loadNodeSection(fetchWithAuth2, entryId, nodeId, section, signal) {
+  const url = `/api/${DOMAIN}/${entryId}/nodes/${encodeURIComponent(nodeId)}/${section}`;
+  return fetchWithAuth2(url, signal, async (response) => {
+    const body = await response.json();
+    return body[section];
+  });
 }
 
 // src/card/data/websocket.ts
@@ -3670,8 +3806,13 @@ async function subscribeMapUpdates(hass, entryId, onUpdate) {
   }
   try {
     const unsubscribe = await hass.connection.subscribeMessage(
-      (msg) => onUpdate(msg.payload),
-      { type: "unifi_network_map/subscribe", entry_id: entryId },
+      (msg) => onUpdate(expandPayload(msg.payload)),
+      {
+        type: "unifi_network_map/subscribe",
+        entry_id: entryId,
+        schema_version: COMPACT_SCHEMA_VERSION,
+        fields: MAP_FIELDS
+      },
       { resubscribe: true }
     );
     return { subscribed: true, unsubscribe };
@@ -3680,6 +3821,21 @@ async function subscribeMapUpdates(hass, entryId, onUpdate) {
     return { subscribed: false, reason };
   }
 }
+async function fetchRelatedEntities(hass, entryId, macs) {
+  if (!hass.callWS || macs.length === 0) {
+    return null;
+  }
+  try {
+    const result = await hass.callWS({
+      type: "unifi_network_map/related_entities",
+      entry_id: entryId,
+      macs
+    });
+    return result.related_entities;
+  } catch {
+    return null;
+  }
+}
 
 // src/card/core/state.ts
 function normalizeConfig(config) {
@@ -6671,6 +6827,8 @@ var UnifiNetworkMapCard = class extends HTMLElement {
     this._entityModal = createEntityModalController();
     this._contextMenu = createContextMenuController();
     this._portModal = createPortModalController();
+    this._relatedEntitiesPending = /* @__PURE__ */ new Map();
+    this._devicePortsPending = /* @__PURE__ */ new Map();
     this._filterState = createFilterState();
     this._wsSubscribed = false;
     this._wsSubscriptionVersion = 0;
@@ -6907,7 +7065,7 @@ var UnifiNetworkMapCard = class extends HTMLElement {
       return;
     }
     this._preparePayloadLoadingOverlay(request.isRefresh);
-    const result = await loadPayload(
+    const result = await loadMapPayload(
       this._fetchWithAuth.bind(this),
       request.url,
       request.controller.signal
@@ -7030,10 +7188,11 @@ var UnifiNetworkMapCard = class extends HTMLElement {
     const svg3 = this.querySelector(".unifi-network-map__viewport svg");
     if (this._error || !this._svgContent || !svg3) {
       this._render();
-      return;
+    } else {
+      this._wireInteractions();
+      this._updateSelectionOnly();
     }
-    this._wireInteractions();
-    this._updateSelectionOnly();
+    void this._ensureRelatedEntities(this._selection.selectedNode);
   }
   _renderPreview() {
     return `
@@ -7178,6 +7337,44 @@ var UnifiNetworkMapCard = class extends HTMLElement {
       this._panelHelpers()
     );
   }
+  _ensureRelatedEntities(nodeId) {
+    const payload = this._payload;
+    const entryId = this._config?.entry_id;
+    const hass = this._hass;
+    if (!nodeId || !entryId || !hass || !payload?.related_entities_lazy) {
+      return null;
+    }
+    if (payload.related_entities?.[nodeId]) {
+      return null;
+    }
+    const pending = this._relatedEntitiesPending.get(nodeId);
+    if (pending) {
+      return pending;
+    }
+    const request = this._loadRelatedEntities(hass, entryId, payload, nodeId).finally(() => {
+      this._relatedEntitiesPending.delete(nodeId);
+    });
+    this._relatedEntitiesPending.set(nodeId, request);
+    return request;
+  }
+  async _loadRelatedEntities(hass, entryId, payload, nodeId) {
+    const related = await fetchRelatedEntities(hass, entryId, [nodeId]);
+    if (!related || this._payload !== payload) {
+      return;
+    }
+    payload.related_entities = { ...payload.related_entities, [nodeId]: related[nodeId] ?? [] };
+    if (this._selection.selectedNode === nodeId) {
+      this._updateSelectionOnly();
+    }
+  }
+  _withRelatedEntities(nodeId, action) {
+    const loading = this._ensureRelatedEntities(nodeId);
+    if (loading) {
+      void loading.then(action);
+    } else {
+      action();
+    }
+  }
   _panelHelpers() {
     const theme = this._config?.theme ?? "dark";
     return {
@@ -7508,6 +7705,9 @@ var UnifiNetworkMapCard = class extends HTMLElement {
     return true;
   }
   _showEntityModal(nodeId) {
+    this._withRelatedEntities(nodeId, () => this._openEntityModal(nodeId));
+  }
+  _openEntityModal(nodeId) {
     openEntityModal({
       controller: this._entityModal,
       nodeId,
@@ -7590,6 +7790,43 @@ var UnifiNetworkMapCard = class extends HTMLElement {
     }
   }
   _showPortModal(nodeId) {
+    const loading = this._ensureDevicePorts(nodeId);
+    if (loading) {
+      void loading.then(() => this._openPortModal(nodeId));
+    } else {
+      this._openPortModal(nodeId);
+    }
+  }
+  _ensureDevicePorts(nodeId) {
+    const payload = this._payload;
+    const entryId = this._config?.entry_id;
+    if (!entryId || !payload || payload.device_ports?.[nodeId]) {
+      return null;
+    }
+    const pending = this._devicePortsPending.get(nodeId);
+    if (pending) {
+      return pending;
+    }
+    const request = this._loadDevicePorts(entryId, payload, nodeId).finally(() => {
+      this._devicePortsPending.delete(nodeId);
+    });
+    this._devicePortsPending.set(nodeId, request);
+    return request;
+  }
+  async _loadDevicePorts(entryId, payload, nodeId) {
+    const result = await loadNodeSection(
+      this._fetchWithAuth.bind(this),
+      entryId,
+      nodeId,
+      "device_ports",
+      new AbortController().signal
+    );
+    if (!("data" in result) || !Array.isArray(result.data) || this._payload !== payload) {
+      return;
+    }
+    payload.device_ports = { ...payload.device_ports, [nodeId]: result.data };
+  }
+  _openPortModal(nodeId) {
     openPortModal({
       controller: this._portModal,
       nodeId,
@@ -7616,6 +7853,7 @@ var UnifiNetworkMapCard = class extends HTMLElement {
     }
     selectNode(this._selection, deviceName);
     this._render();
+    void this._ensureRelatedEntities(deviceName);
   }
   _removePortModal() {
     closePortModal(this._portModal);
@@ -7624,6 +7862,9 @@ var UnifiNetworkMapCard = class extends HTMLElement {
     showToast(message, "success");
   }
   _handleRestartDevice(nodeId) {
+    this._withRelatedEntities(nodeId, () => this._pressRestartButton(nodeId));
+  }
+  _pressRestartButton(nodeId) {
     const restartEntityId = this._findRestartButtonEntity(nodeId);
     if (!restartEntityId) {
       this._showActionError(this._localize("toast.no_entity"));
@@ -7697,6 +7938,7 @@ var UnifiNetworkMapCard = class extends HTMLElement {
       onNodeSelected: (nodeId) => {
         selectNode(this._selection, nodeId);
         this._updateSelectionOnly();
+        void this._ensureRelatedEntities(nodeId);
       },
       onHoverEdge: (edge) => {
         setHoveredEdge(this._selection, edge);
@@ -7706,8 +7948,13 @@ var UnifiNetworkMapCard = class extends HTMLElement {
       },
       onOpenContextMenu: (x, y, nodeId) => {
         this._removeContextMenu();
-        this._contextMenu.menu = { nodeId, x, y };
-        this._showContextMenu();
+        const menu = { nodeId, x, y };
+        this._contextMenu.menu = menu;
+        this._withRelatedEntities(nodeId, () => {
+          if (this._contextMenu.menu === menu && !this._contextMenu.element) {
+            this._showContextMenu();
+          }
+        });
       },
       onUpdateTransform: (transform) => {
         this._viewportState.viewTransform = transform;
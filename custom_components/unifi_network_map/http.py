@@ -8,8 +8,19 @@ from aiohttp import web
 from homeassistant.components.http import HomeAssistantView
 
 from .const import DOMAIN
-from .enrichment import get_or_build_enriched_payload
+from .device_index import canonical_mac
+from .enrichment import (
+    NODE_SECTIONS,
+    get_node_section,
+    get_or_build_encoded_payload,
+)
+from .job_executor import async_run_job
+from .metrics import METRICS_CONTENT_TYPE, render_metrics
+from .payload_encoding import content_type_for, negotiate_encoding
+from .payload_schema import negotiate_schema_version, parse_payload_fields
 from .renderer import render_themed_svg
+from .stage_timings import get_stage_timings
+from .svg_cache import get_themed_svg_cache
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
@@ -26,6 +37,8 @@ def register_unifi_http_views(hass: HomeAssistant) -> None:
         return
     hass.http.register_view(UniFiNetworkMapSvgView)
     hass.http.register_view(UniFiNetworkMapPayloadView)
+    hass.http.register_view(UniFiNetworkMapNodeSectionView)
+    hass.http.register_view(UniFiNetworkMapMetricsView)
     data[_VIEWS_REGISTERED] = True
 
 
@@ -54,23 +67,43 @@ class UniFiNetworkMapSvgView(HomeAssistantView):  # type: ignore[reportUntypedBa
         hass = request.app["hass"]
         coordinator = _get_coordinator(hass, entry_id)
         data = _get_data(coordinator)
-        if data is None:
+        if coordinator is None or data is None:
             raise web.HTTPNotFound()
-        svg_theme = request.query.get("svg_theme")
-        icon_set = request.query.get("icon_set")
-        if (svg_theme or icon_set) and coordinator is not None:
-            themed_svg, background = await hass.async_add_executor_job(
+        with get_stage_timings(hass, entry_id).measure("http_svg"):
+            return await _svg_response(
+                hass, request, entry_id, coordinator, data
+            )
+
+
+async def _svg_response(
+    hass: HomeAssistant,
+    request: web.Request,
+    entry_id: str,
+    coordinator: UniFiNetworkMapCoordinator,
+    data: UniFiNetworkMapData,
+) -> web.Response:
+    svg_theme = request.query.get("svg_theme")
+    icon_set = request.query.get("icon_set")
+    if svg_theme or icon_set:
+        cache = get_themed_svg_cache(hass)
+        themed = cache.get(entry_id, data, svg_theme, icon_set)
+        if themed is None:
+            themed = await async_run_job(
+                hass,
+                "theme",
                 render_themed_svg,
                 data,
                 coordinator.settings,
                 svg_theme,
                 icon_set,
             )
-            headers = {"X-Theme-Background": background}
-            return web.Response(
-                text=themed_svg, content_type="image/svg+xml", headers=headers
-            )
-        return web.Response(text=data.svg, content_type="image/svg+xml")
+            cache.set(entry_id, data, svg_theme, icon_set, themed)
+        themed_svg, background = themed
+        headers = {"X-Theme-Background": background}
+        return web.Response(
+            text=themed_svg, content_type="image/svg+xml", headers=headers
+        )
+    return web.Response(text=data.svg, content_type="image/svg+xml")
 
 
 class UniFiNetworkMapPayloadView(HomeAssistantView):  # type: ignore[reportUntypedBaseClass]
@@ -82,5 +115,62 @@ class UniFiNetworkMapPayloadView(HomeAssistantView):  # type: ignore[reportUntyp
         data = _get_data(_get_coordinator(hass, entry_id))
         if data is None:
             raise web.HTTPNotFound()
-        payload = get_or_build_enriched_payload(hass, entry_id, data.payload)
-        return web.json_response(payload)
+        with get_stage_timings(hass, entry_id).measure("http_payload"):
+            schema_version = negotiate_schema_version(
+                request.query.get("schema_version")
+            )
+            encoding = negotiate_encoding(request.headers.get("Accept"))
+            try:
+                fields = parse_payload_fields(request.query.get("fields"))
+            except ValueError as err:
+                raise web.HTTPBadRequest(text=str(err)) from err
+            body = get_or_build_encoded_payload(
+                hass, entry_id, data.payload, schema_version, encoding, fields
+            )
+        return web.Response(
+            body=body,
+            content_type=content_type_for(encoding),
+            headers={"Vary": "Accept"},
+        )
+
+
+class UniFiNetworkMapNodeSectionView(HomeAssistantView):  # type: ignore[reportUntypedBaseClass]
+    """One node's slice of a heavy payload section.
+
+    Lets the card fetch related entities or the port table for the node
+    whose panel or port modal is open instead of the whole site's.
+    """
+
+    url = "/api/unifi_network_map/{entry_id}/nodes/{mac}/{section}"
+    name = "api:unifi_network_map:node_section"
+
+    async def get(
+        self, request: web.Request, entry_id: str, mac: str, section: str
+    ) -> web.Response:
+        hass = request.app["hass"]
+        data = _get_data(_get_coordinator(hass, entry_id))
+        node_mac = canonical_mac(mac)
+        if data is None or node_mac is None or section not in NODE_SECTIONS:
+            raise web.HTTPNotFound()
+        # Only nodes drawn on this entry's map, like the WebSocket command.
+        if node_mac not in (data.payload.get("node_types") or {}):
+            raise web.HTTPNotFound()
+        with get_stage_timings(hass, entry_id).measure("http_node_section"):
+            value = get_node_section(
+                hass, entry_id, data.payload, section, node_mac
+            )
+        return web.json_response({"mac": node_mac, section: value})
+
+
+class UniFiNetworkMapMetricsView(HomeAssistantView):  # type: ignore[reportUntypedBaseClass]
+    """Runtime metrics of every loaded entry for Prometheus scrapers."""
+
+    url = "/api/unifi_network_map/metrics"
+    name = "api:unifi_network_map:metrics"
+
+    async def get(self, request: web.Request) -> web.Response:
+        hass = request.app["hass"]
+        return web.Response(
+            body=render_metrics(hass).encode("utf-8"),
+            headers={"Content-Type": METRICS_CONTENT_TYPE},
+        )
@@ -0,0 +1,289 @@
+"""Bounded, prioritized thread pool for the integration's blocking work.
+
+Coordinator refreshes and themed SVG renders used to go through
+``hass.async_add_executor_job`` and so shared Home Assistant's global
+executor: a burst of dashboards asking for themes while refreshes ran
+could hold many of its threads and starve unrelated integrations. They
+now run on a pool owned by the integration, shared by all entries and
+sized by the ``executor_workers`` option (the last entry to load or
+change its options wins, like the payload cache TTL).
+
+Queued jobs run in priority order, first in first out within a
+priority:
+
+1. ``refresh``: coordinator fetch and render.
+2. ``prerender``: background renders nobody is waiting on yet.
+3. ``theme``: on-demand theme and icon-set re-renders for a card.
+
+Threads are started as jobs arrive, up to the pool size, and exit after
+``_IDLE_SECONDS`` without work. Queue depth per priority and the time
+each job waited for a thread are exposed in diagnostics and on the
+metrics endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Literal
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+
+from .const import DEFAULT_EXECUTOR_WORKERS, DOMAIN, LOGGER
+from .stage_timings import StageHistogram, StageTimings
+from .utils import monotonic_seconds
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from homeassistant.core import Event, HomeAssistant
+
+type JobPriority = Literal["refresh", "prerender", "theme"]
+
+JOB_PRIORITIES: tuple[JobPriority, ...] = ("refresh", "prerender", "theme")
+
+_EXECUTOR_KEY = "job_executor"
+_WORKERS_KEY = "job_executor_workers"
+# Idle threads are cheap but not free; a quiet pool shrinks to nothing.
+_IDLE_SECONDS = 60.0
+_JOIN_TIMEOUT_SECONDS = 5.0
+
+
+@dataclass(order=True, slots=True)
+class _Job:
+    rank: int
+    sequence: int
+    priority: JobPriority = field(compare=False)
+    func: Callable[..., Any] | None = field(compare=False)
+    args: tuple[Any, ...] = field(compare=False)
+    future: Future[Any] | None = field(compare=False)
+    queued_at: float = field(compare=False)
+
+
+class JobExecutor:
+    """A fixed-size pool that runs the highest-priority queued job first."""
+
+    def __init__(self, max_workers: int = DEFAULT_EXECUTOR_WORKERS) -> None:
+        self.max_workers = max_workers
+        self.completed: Counter[str] = Counter()
+        # Wait times are kept per priority like pipeline stages.
+        self.wait_timings = StageTimings()
+        self._queue: queue.PriorityQueue[_Job] = queue.PriorityQueue()
+        self._depth: Counter[str] = Counter()
+        self._sequence = itertools.count()
+        self._thread_ids = itertools.count(1)
+        self._threads: set[threading.Thread] = set()
+        self._idle = 0
+        self._shutdown = False
+        self._lock = threading.Lock()
+
+    def submit[T](
+        self, priority: JobPriority, func: Callable[..., T], *args: Any
+    ) -> Future[T]:
+        """Queue ``func(*args)``; the future resolves when it has run."""
+        future: Future[T] = Future()
+        job = _Job(
+            JOB_PRIORITIES.index(priority),
+            next(self._sequence),
+            priority,
+            func,
+            args,
+            future,
+            monotonic_seconds(),
+        )
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("Job executor is shut down")
+            self._depth[priority] += 1
+            self._queue.put(job)
+            if (
+                self._queue.qsize() > self._idle
+                and len(self._threads) < self.max_workers
+            ):
+                self._start_thread_locked()
+        return future
+
+    def resize(self, max_workers: int) -> None:
+        """Apply a new pool size; extra threads exit after their job."""
+        with self._lock:
+            self.max_workers = max_workers
+            while (
+                self._queue.qsize() > self._idle
+                and len(self._threads) < self.max_workers
+            ):
+                self._start_thread_locked()
+
+    def shutdown(self) -> None:
+        """Cancel queued jobs and stop the threads (blocking)."""
+        with self._lock:
+            self._shutdown = True
+            threads = list(self._threads)
+            cancelled = self._drain_locked()
+            for _ in threads:
+                self._queue.put(self._stop_job())
+        for thread in threads:
+            thread.join(_JOIN_TIMEOUT_SECONDS)
+        LOGGER.debug(
+            "job_executor shutdown threads=%d cancelled=%d",
+            len(threads),
+            cancelled,
+        )
+
+    def queue_depth(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                priority: self._depth[priority] for priority in JOB_PRIORITIES
+            }
+
+    def wait_histograms(self) -> dict[str, StageHistogram]:
+        return self.wait_timings.histograms()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            threads, idle = len(self._threads), self._idle
+        return {
+            "max_workers": self.max_workers,
+            "threads": threads,
+            "idle_threads": idle,
+            "queue_depth": self.queue_depth(),
+            "completed": {
+                priority: self.completed[priority]
+                for priority in JOB_PRIORITIES
+            },
+            "wait": self.wait_timings.summary(),
+        }
+
+    def _start_thread_locked(self) -> None:
+        thread = threading.Thread(
+            target=self._work,
+            name=f"{DOMAIN}_executor_{next(self._thread_ids)}",
+            daemon=True,
+        )
+        self._threads.add(thread)
+        thread.start()
+
+    def _work(self) -> None:
+        current = threading.current_thread()
+        while True:
+            job = self._next_job(current)
+            if job is None or job.future is None or job.func is None:
+                return
+            waited = monotonic_seconds() - job.queued_at
+            self.wait_timings.record(job.priority, waited)
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    result = job.func(*job.args)
+                except BaseException as err:  # noqa: BLE001 - handed to the caller
+                    job.future.set_exception(err)
+                else:
+                    job.future.set_result(result)
+            with self._lock:
+                self.completed[job.priority] += 1
+                if len(self._threads) > self.max_workers:
+                    self._threads.discard(current)
+                    return
+
+    def _next_job(self, current: threading.Thread) -> _Job | None:
+        while True:
+            with self._lock:
+                self._idle += 1
+            try:
+                job = self._queue.get(timeout=_IDLE_SECONDS)
+            except queue.Empty:
+                job = None
+            with self._lock:
+                self._idle -= 1
+                if job is None and not self._queue.empty():
+                    # A job was queued for this thread as it timed out.
+                    continue
+                if job is None or job.future is None:
+                    self._threads.discard(current)
+                    return None
+                self._depth[job.priority] -= 1
+                return job
+
+    def _drain_locked(self) -> int:
+        cancelled = 0
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return cancelled
+            if job.future is not None:
+                self._depth[job.priority] -= 1
+                job.future.cancel()
+                cancelled += 1
+
+    def _stop_job(self) -> _Job:
+        # Ranks after every real job, so queued work is never skipped.
+        return _Job(
+            len(JOB_PRIORITIES),
+            next(self._sequence),
+            JOB_PRIORITIES[-1],
+            None,
+            (),
+            None,
+            monotonic_seconds(),
+        )
+
+
+def get_job_executor(hass: HomeAssistant) -> JobExecutor:
+    """Get or create the integration's executor for this hass instance."""
+    data = hass.data.setdefault(DOMAIN, {})
+    executor = data.get(_EXECUTOR_KEY)
+    if executor is None:
+        executor = JobExecutor(
+            data.get(_WORKERS_KEY, DEFAULT_EXECUTOR_WORKERS)
+        )
+        data[_EXECUTOR_KEY] = executor
+
+        async def _async_on_stop(_event: Event) -> None:
+            await async_shutdown_job_executor(hass)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_on_stop)
+    return executor
+
+
+def set_job_executor_workers(hass: HomeAssistant, max_workers: int) -> None:
+    """Set the pool size, applied to the running executor if any."""
+    data = hass.data.setdefault(DOMAIN, {})
+    data[_WORKERS_KEY] = max_workers
+    executor = data.get(_EXECUTOR_KEY)
+    if executor is not None:
+        executor.resize(max_workers)
+
+
+def find_job_executor(hass: HomeAssistant) -> JobExecutor | None:
+    """Return the running executor without creating one."""
+    return hass.data.get(DOMAIN, {}).get(_EXECUTOR_KEY)
+
+
+def job_executor_stats(hass: HomeAssistant) -> dict[str, Any] | None:
+    executor = find_job_executor(hass)
+    return executor.stats() if executor is not None else None
+
+
+async def async_run_job[T](
+    hass: HomeAssistant,
+    priority: JobPriority,
+    func: Callable[..., T],
+    *args: Any,
+) -> T:
+    """Run ``func(*args)`` on the integration's executor and await it.
+
+    Cancelling the awaiting task cancels the job if it has not started.
+    """
+    future = get_job_executor(hass).submit(priority, func, *args)
+    return await asyncio.wrap_future(future)
+
+
+async def async_shutdown_job_executor(hass: HomeAssistant) -> None:
+    """Stop the executor (last entry unloaded or Home Assistant stopping)."""
+    executor = hass.data.get(DOMAIN, {}).pop(_EXECUTOR_KEY, None)
+    if executor is not None:
+        await hass.async_add_executor_job(executor.shutdown)
@@ -0,0 +1,294 @@
+"""Prometheus text exposition of the integration's runtime metrics.
+
+Served by ``/api/unifi_network_map/metrics`` (authenticated like every
+other Home Assistant API view; scrape with a long-lived access token).
+Everything here is read from state the integration already keeps:
+
+- Stage latency histograms from each entry's ``StageTimings``.
+- Controller errors, superseded refreshes and auth backoff activations
+  from the coordinator.
+- Payload and themed-SVG cache hits, misses and estimated bytes held.
+- Entity index rebuild count and total duration (shared by all entries).
+- Job executor queue depth and queue wait histograms per priority
+  (shared by all entries).
+- Current payload (pre-enrichment JSON) and SVG sizes, and WebSocket
+  subscriber counts.
+
+Counters are cumulative since the entry (or Home Assistant) started, so
+hit ratios and rates are left to PromQL.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .cache_budget import get_cache_budget
+from .const import DOMAIN, STAGE_HISTOGRAM_BUCKETS
+from .entity_cache import get_entity_cache
+from .job_executor import find_job_executor
+from .payload_cache import get_payload_cache
+from .stage_timings import get_stage_timings
+from .svg_cache import get_themed_svg_cache
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import UniFiNetworkMapCoordinator
+    from .stage_timings import StageHistogram
+
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+_PREFIX = "unifi_network_map"
+_STAGE_HELP = "Duration of fetch, render and serve pipeline stages."
+
+
+class _Exposition:
+    """Collects samples grouped by metric family.
+
+    The text format requires each family's samples to be contiguous, but
+    samples arrive entry by entry, so lines are emitted at the end.
+    """
+
+    def __init__(self) -> None:
+        self._families: dict[str, list[str]] = {}
+
+    def sample(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        value: float,
+        labels: dict[str, str] | None = None,
+        suffix: str = "",
+    ) -> None:
+        family = f"{_PREFIX}_{name}"
+        lines = self._families.get(family)
+        if lines is None:
+            lines = [f"# HELP {family} {help_text}", f"# TYPE {family} {kind}"]
+            self._families[family] = lines
+        lines.append(
+            f"{family}{suffix}{_format_labels(labels)} {_format_value(value)}"
+        )
+
+    def text(self) -> str:
+        return "".join(
+            f"{line}\n" for lines in self._families.values() for line in lines
+        )
+
+
+def render_metrics(hass: HomeAssistant) -> str:
+    """Render all loaded entries' metrics in text exposition format."""
+    out = _Exposition()
+    loaded = False
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        coordinator: UniFiNetworkMapCoordinator | None = getattr(
+            entry, "runtime_data", None
+        )
+        if coordinator is None:
+            continue
+        loaded = True
+        _add_entry_metrics(hass, out, entry.entry_id, coordinator)
+    if loaded:
+        # The shared entity index only exists while an entry is loaded.
+        _add_entity_index_metrics(hass, out)
+        _add_job_executor_metrics(hass, out)
+    return out.text()
+
+
+def _add_entry_metrics(
+    hass: HomeAssistant,
+    out: _Exposition,
+    entry_id: str,
+    coordinator: UniFiNetworkMapCoordinator,
+) -> None:
+    labels = {"entry_id": entry_id}
+    _add_stage_histograms(hass, out, entry_id)
+    for error, count in sorted(coordinator.fetch_errors.items()):
+        out.sample(
+            "fetch_errors_total",
+            "counter",
+            "Failed controller fetches by error type.",
+            count,
+            {**labels, "error": error},
+        )
+    out.sample(
+        "auth_backoff_activations_total",
+        "counter",
+        "Times the auth/rate-limit backoff was activated.",
+        coordinator.backoff_activations,
+        labels,
+    )
+    out.sample(
+        "refreshes_superseded_total",
+        "counter",
+        "Refreshes stopped early because a newer one was requested.",
+        coordinator.superseded_refreshes,
+        labels,
+    )
+    out.sample(
+        "auth_backoff_active",
+        "gauge",
+        "1 while refreshes are skipped by the backoff.",
+        int(coordinator.auth_backoff_until is not None),
+        labels,
+    )
+    _add_cache_metrics(hass, out, entry_id)
+    _add_size_metrics(out, entry_id, coordinator)
+    out.sample(
+        "websocket_subscribers",
+        "gauge",
+        "Active unifi_network_map/subscribe subscriptions.",
+        coordinator.websocket_subscribers,
+        labels,
+    )
+
+
+def _add_stage_histograms(
+    hass: HomeAssistant, out: _Exposition, entry_id: str
+) -> None:
+    histograms = get_stage_timings(hass, entry_id).histograms()
+    for stage, histogram in histograms.items():
+        _add_histogram(
+            out,
+            "stage_duration_seconds",
+            _STAGE_HELP,
+            histogram,
+            {"entry_id": entry_id, "stage": stage},
+        )
+
+
+def _add_histogram(
+    out: _Exposition,
+    name: str,
+    help_text: str,
+    histogram: StageHistogram,
+    labels: dict[str, str],
+) -> None:
+    bounds = [*map(_format_value, STAGE_HISTOGRAM_BUCKETS), "+Inf"]
+    cumulative = 0
+    for bound, count in zip(bounds, histogram.bucket_counts, strict=True):
+        cumulative += count
+        out.sample(
+            name,
+            "histogram",
+            help_text,
+            cumulative,
+            {**labels, "le": bound},
+            "_bucket",
+        )
+    out.sample(
+        name, "histogram", help_text, histogram.total_seconds, labels, "_sum"
+    )
+    out.sample(name, "histogram", help_text, histogram.count, labels, "_count")
+
+
+def _add_cache_metrics(
+    hass: HomeAssistant, out: _Exposition, entry_id: str
+) -> None:
+    budget = get_cache_budget(hass)
+    for cache_name, cache in (
+        ("payload", get_payload_cache(hass)),
+        ("themed_svg", get_themed_svg_cache(hass)),
+    ):
+        labels = {"entry_id": entry_id, "cache": cache_name}
+        out.sample(
+            "cache_hits_total",
+            "counter",
+            "Cache lookups served from the cache.",
+            cache.hits[entry_id],
+            labels,
+        )
+        out.sample(
+            "cache_misses_total",
+            "counter",
+            "Cache lookups that had to build the value.",
+            cache.misses[entry_id],
+            labels,
+        )
+        out.sample(
+            "cache_bytes",
+            "gauge",
+            "Estimated memory held by the entry's cached artifacts.",
+            budget.entry_bytes(cache_name, entry_id),
+            labels,
+        )
+
+
+def _add_size_metrics(
+    out: _Exposition, entry_id: str, coordinator: UniFiNetworkMapCoordinator
+) -> None:
+    # Measured once per data generation, with the change digest.
+    digest = coordinator.data_digest
+    if digest is None:
+        return
+    labels = {"entry_id": entry_id}
+    out.sample(
+        "payload_bytes",
+        "gauge",
+        "Size of the map payload as JSON, before enrichment.",
+        digest.payload_bytes,
+        labels,
+    )
+    out.sample(
+        "svg_bytes",
+        "gauge",
+        "Size of the rendered SVG.",
+        digest.svg_bytes,
+        labels,
+    )
+
+
+def _add_entity_index_metrics(hass: HomeAssistant, out: _Exposition) -> None:
+    cache = get_entity_cache(hass)
+    out.sample(
+        "entity_index_rebuilds_total",
+        "counter",
+        "MAC-to-entity index rebuilds after registry changes.",
+        cache.rebuilds,
+    )
+    out.sample(
+        "entity_index_rebuild_seconds_total",
+        "counter",
+        "Total time spent rebuilding the MAC-to-entity indexes.",
+        cache.rebuild_seconds,
+    )
+
+
+def _add_job_executor_metrics(hass: HomeAssistant, out: _Exposition) -> None:
+    executor = find_job_executor(hass)
+    if executor is None:
+        return
+    for priority, depth in executor.queue_depth().items():
+        out.sample(
+            "executor_queue_depth",
+            "gauge",
+            "Jobs waiting for an executor thread, by priority.",
+            depth,
+            {"priority": priority},
+        )
+    for priority, histogram in executor.wait_histograms().items():
+        _add_histogram(
+            out,
+            "executor_wait_seconds",
+            "Time jobs waited for an executor thread, by priority.",
+            histogram,
+            {"priority": priority},
+        )
+
+
+def _format_labels(labels: dict[str, str] | None) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape_label(value)}"' for name, value in labels.items()
+    )
+    return f"{{{pairs}}}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
@@ -2,31 +2,71 @@
 
 Caches enriched payloads to avoid re-enrichment on every HTTP request.
 The cache is automatically invalidated when the underlying data changes.
+Each payload and derived variant is accounted in the shared cache budget
+(see ``cache_budget``), which evicts the least recently used ones.
 """
 
 from __future__ import annotations
 
 import hashlib
 import json
+from collections import Counter
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
+from .cache_budget import estimate_size, get_cache_budget
 from .const import DOMAIN, LOGGER
 from .utils import monotonic_seconds
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from homeassistant.core import HomeAssistant
 
+    from .cache_budget import ArtifactKey, CacheBudget
+
 _CACHE_KEY = "payload_cache"
+# Name of this cache, and of an entry's enriched payload, in the budget.
+_BUDGET_CACHE = "payload"
+_ENRICHED = "enriched"
+
+_T = TypeVar("_T")
 
 
 @dataclass
 class CachedPayload:
-    """A cached enriched payload with timestamp."""
+    """A cached enriched payload with timestamp.
+
+    ``variants`` holds artifacts derived from ``payload`` (alternate
+    schema encodings), so they share its hash and TTL lifetime.
+    """
 
     payload: dict[str, Any]
     cached_at: float
     source_hash: str
+    variants: dict[str, Any] = field(default_factory=dict, repr=False)
+    entry_id: str = ""
+    budget: CacheBudget | None = field(default=None, repr=False)
+
+    def variant(self, key: str, build: Callable[[], _T]) -> _T:
+        """Return the derived artifact for ``key``, building it once."""
+        if key in self.variants:
+            if self.budget is not None:
+                self.budget.touch(self._budget_key(_ENRICHED))
+                self.budget.touch(self._budget_key(key))
+            return self.variants[key]
+        value = self.variants[key] = build()
+        LOGGER.debug("payload_cache variant_built key=%s", key)
+        if self.budget is not None:
+            self.budget.track(
+                self._budget_key(key),
+                estimate_size(value),
+                keep=(self._budget_key(_ENRICHED),),
+            )
+        return value
+
+    def _budget_key(self, artifact: str) -> ArtifactKey:
+        return (_BUDGET_CACHE, self.entry_id, artifact)
 
 
 @dataclass
@@ -35,6 +75,13 @@ class PayloadCache:
 
     _entries: dict[str, CachedPayload] = field(default_factory=dict)
     _ttl_seconds: float = 30.0
+    hits: Counter[str] = field(default_factory=Counter)
+    misses: Counter[str] = field(default_factory=Counter)
+    budget: CacheBudget | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.budget is not None:
+            self.budget.register(_BUDGET_CACHE, self._evict)
 
     @property
     def ttl_seconds(self) -> float:
@@ -54,13 +101,22 @@ class PayloadCache:
         - The cached entry has expired (TTL exceeded)
         - The source data has changed (hash mismatch)
         """
+        cached = self.get_entry(entry_id, source_hash)
+        return cached.payload if cached is not None else None
+
+    def get_entry(
+        self, entry_id: str, source_hash: str
+    ) -> CachedPayload | None:
+        """Get the valid cache entry itself, including derived variants."""
         cached = self._entries.get(entry_id)
         if cached is None:
+            self.misses[entry_id] += 1
             return None
         if cached.source_hash != source_hash:
             LOGGER.debug(
                 "payload_cache miss entry_id=%s reason=hash_changed", entry_id
             )
+            self.misses[entry_id] += 1
             return None
         age = monotonic_seconds() - cached.cached_at
         if age > self._ttl_seconds:
@@ -72,41 +128,86 @@ class PayloadCache:
                 age,
                 self._ttl_seconds,
             )
+            self.misses[entry_id] += 1
             return None
         LOGGER.debug("payload_cache hit entry_id=%s age=%.1fs", entry_id, age)
-        return cached.payload
+        self.hits[entry_id] += 1
+        if self.budget is not None:
+            self.budget.touch((_BUDGET_CACHE, entry_id, _ENRICHED))
+        return cached
 
     def set(
-        self, entry_id: str, payload: dict[str, Any], source_hash: str
-    ) -> None:
-        """Store an enriched payload in the cache."""
-        self._entries[entry_id] = CachedPayload(
+        self,
+        entry_id: str,
+        payload: dict[str, Any],
+        source_hash: str,
+        source: dict[str, Any] | None = None,
+    ) -> CachedPayload:
+        """Store an enriched payload in the cache.
+
+        Sections ``payload`` shares with ``source`` are held by the map
+        data anyway, so they are not counted against the budget.
+        """
+        cached = CachedPayload(
             payload=payload,
             cached_at=monotonic_seconds(),
             source_hash=source_hash,
+            entry_id=entry_id,
+            budget=self.budget,
         )
+        self._entries[entry_id] = cached
+        if self.budget is not None:
+            self.budget.discard_entry(_BUDGET_CACHE, entry_id)
+            own = {
+                key: value
+                for key, value in payload.items()
+                if source is None or source.get(key) is not value
+            }
+            self.budget.track(
+                (_BUDGET_CACHE, entry_id, _ENRICHED), estimate_size(own)
+            )
         LOGGER.debug("payload_cache stored entry_id=%s", entry_id)
+        return cached
 
     def invalidate(self, entry_id: str) -> None:
         """Invalidate the cache for a specific entry."""
         if entry_id in self._entries:
             del self._entries[entry_id]
+            self._discard(entry_id)
             LOGGER.debug("payload_cache invalidated entry_id=%s", entry_id)
 
     def invalidate_all(self) -> None:
         """Invalidate all cached payloads."""
         if self._entries:
             count = len(self._entries)
+            for entry_id in self._entries:
+                self._discard(entry_id)
             self._entries.clear()
             LOGGER.debug("payload_cache invalidated_all count=%d", count)
 
+    def _discard(self, entry_id: str) -> None:
+        if self.budget is not None:
+            self.budget.discard_entry(_BUDGET_CACHE, entry_id)
+
+    def _evict(self, entry_id: str, artifact: str) -> None:
+        """Drop an artifact the budget evicted."""
+        cached = self._entries.get(entry_id)
+        if cached is None:
+            return
+        if artifact == _ENRICHED:
+            # The variants derive from the payload and go with it.
+            del self._entries[entry_id]
+            self._discard(entry_id)
+        else:
+            cached.variants.pop(artifact, None)
+
 
 def get_payload_cache(hass: HomeAssistant) -> PayloadCache:
     """Get or create the payload cache for this hass instance."""
     data = hass.data.setdefault(DOMAIN, {})
     cache = data.get(_CACHE_KEY)
     if cache is None:
-        cache = PayloadCache()
+        cache = PayloadCache(budget=get_cache_budget(hass))
         data[_CACHE_KEY] = cache
         LOGGER.debug("payload_cache created")
     return cache
@@ -0,0 +1,86 @@
+"""Wire encodings for the payload view.
+
+JSON stays the default. Clients that send ``Accept: application/msgpack``
+to the payload view get the same payload as MessagePack, which is
+smaller and skips JSON text parsing. The subscribe command stays JSON:
+Home Assistant's WebSocket transport only carries JSON text, and
+MessagePack wrapped in base64 would give back most of the size it saves.
+Integer map keys (``vlan_info`` is keyed by VLAN ID) become strings in
+both encodings, so a client decodes the same payload either way.
+"""
+
+from __future__ import annotations
+
+from typing import Any, cast
+
+import msgpack
+from homeassistant.helpers.json import json_bytes
+
+PAYLOAD_ENCODING_JSON = "json"
+PAYLOAD_ENCODING_MSGPACK = "msgpack"
+SUPPORTED_PAYLOAD_ENCODINGS = (PAYLOAD_ENCODING_JSON, PAYLOAD_ENCODING_MSGPACK)
+
+_CONTENT_TYPES = {
+    PAYLOAD_ENCODING_JSON: "application/json",
+    PAYLOAD_ENCODING_MSGPACK: "application/msgpack",
+}
+_MEDIA_TYPES = {
+    "application/json": PAYLOAD_ENCODING_JSON,
+    "application/msgpack": PAYLOAD_ENCODING_MSGPACK,
+    "application/x-msgpack": PAYLOAD_ENCODING_MSGPACK,
+    "application/vnd.msgpack": PAYLOAD_ENCODING_MSGPACK,
+}
+
+
+def negotiate_encoding(accept: str | None) -> str:
+    """Pick the payload encoding for an HTTP ``Accept`` header.
+
+    The highest-quality supported media type wins; ties keep header
+    order. Wildcards, unknown types and a missing header mean JSON.
+    """
+    best = PAYLOAD_ENCODING_JSON
+    best_quality = 0.0
+    for media_range in (accept or "").split(","):
+        media_type, _, params = media_range.partition(";")
+        encoding = _MEDIA_TYPES.get(media_type.strip().lower())
+        if encoding is None:
+            continue
+        quality = _quality(params)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def content_type_for(encoding: str) -> str:
+    return _CONTENT_TYPES[encoding]
+
+
+def encode_payload(payload: dict[str, Any], encoding: str) -> bytes:
+    """Serialize a payload for the wire."""
+    if encoding == PAYLOAD_ENCODING_MSGPACK:
+        packed = msgpack.packb(_str_keys(payload), use_bin_type=True)
+        return cast("bytes", packed)
+    return json_bytes(payload)
+
+
+def _str_keys(value: Any) -> Any:
+    # JSON writes every map key as a string; MessagePack would keep ints.
+    if isinstance(value, dict):
+        return {
+            key if isinstance(key, str) else str(key): _str_keys(item)
+            for key, item in cast("dict[Any, Any]", value).items()
+        }
+    if isinstance(value, list):
+        return [_str_keys(item) for item in cast("list[Any]", value)]
+    return value
+
+
+def _quality(params: str) -> float:
+    for param in params.split(";"):
+        name, _, value = param.partition("=")
+        if name.strip().lower() == "q":
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+    return 1.0
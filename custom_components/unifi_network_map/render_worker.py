@@ -0,0 +1,244 @@
+"""Out-of-process rendering for CPU-heavy maps (``render_in_worker`` option).
+
+The topology build, SVG render and payload build are pure Python; an
+isometric map with routing and lighting on a few hundred nodes holds the
+GIL for seconds, which stalls the event loop and every other integration
+even though the render runs in Home Assistant's executor. With the option
+on, the controller fetches and device normalization still run in the
+executor, and the normalized ``RenderInputs`` go to a long-lived worker
+process that sends back the SVG and payload.
+
+The worker is started on first use and replaced after a render that:
+
+- exceeds the time budget (the process is killed and the refresh fails,
+  so the coordinator keeps the previous map), or
+- leaves its peak resident memory above the limit.
+
+If the worker dies mid-render the refresh fails the same way, and the
+next refresh starts a new one. Inputs that cannot be pickled are
+rendered in-process.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import pickle
+import resource
+import sys
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .const import LOGGER
+from .errors import RenderTimeout, RenderWorkerFailed, UniFiNetworkMapError
+from .renderer import render_from_inputs
+from .stage_timings import StageTimings
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from multiprocessing.process import BaseProcess
+
+    from .data import UniFiNetworkMapData
+    from .renderer import RenderInputs, RenderJob, RenderSettings
+
+# Forking a process that runs threads (Home Assistant does) can deadlock
+# the child; spawn starts it from a clean interpreter.
+_CONTEXT = multiprocessing.get_context("spawn")
+# A fresh interpreter imports Home Assistant before it can render.
+_STARTUP_TIMEOUT_SECONDS = 60.0
+_JOIN_TIMEOUT_SECONDS = 5.0
+_READY = "ready"
+
+
+@dataclass(frozen=True, slots=True)
+class _Reply:
+    data: UniFiNetworkMapData | None
+    error: str | None
+    samples: list[tuple[str, float]]
+    peak_rss_mib: float
+
+
+class _RecordingTimings(StageTimings):
+    """Stage timings that keep every sample for the parent process."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.samples: list[tuple[str, float]] = []
+
+    def record(self, stage: str, seconds: float) -> None:
+        self.samples.append((stage, seconds))
+
+
+class RenderWorker:
+    """A long-lived render process shared by one entry's refreshes.
+
+    ``render`` blocks until the worker answers, so it is called from the
+    executor like the in-process render.
+    """
+
+    def __init__(self, timeout_seconds: float, memory_limit_mib: int) -> None:
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mib = memory_limit_mib
+        self.renders = 0
+        self.restarts = 0
+        self.timeouts = 0
+        self.peak_rss_mib: float | None = None
+        self._starts = 0
+        self._process: BaseProcess | None = None
+        self._connection: Connection | None = None
+        self._lock = threading.Lock()
+
+    def render(
+        self,
+        inputs: RenderInputs,
+        settings: RenderSettings,
+        timings: StageTimings,
+        job: RenderJob | None = None,
+    ) -> UniFiNetworkMapData:
+        """Render in the worker within the time budget.
+
+        The budget is the worker's own limit or what is left of the
+        refresh's deadline, whichever is shorter.
+        """
+        try:
+            request = pickle.dumps((inputs, settings))
+        except (pickle.PicklingError, TypeError, AttributeError) as err:
+            LOGGER.debug(
+                "render_worker inputs_not_picklable error=%s",
+                type(err).__name__,
+            )
+            return render_from_inputs(inputs, settings, timings, job)
+        with self._lock, timings.measure("render_worker"):
+            if job is not None:
+                job.check("render_worker")
+            reply = self._round_trip(request, _budget(self, job))
+        for stage, seconds in reply.samples:
+            timings.record(stage, seconds)
+        if reply.error is not None or reply.data is None:
+            raise UniFiNetworkMapError(
+                f"Failed to render UniFi network map: {reply.error}"
+            )
+        return reply.data
+
+    def configure(self, timeout_seconds: float, memory_limit_mib: int) -> None:
+        """Apply new limits; they take effect from the next render."""
+        self.timeout_seconds = timeout_seconds
+        self.memory_limit_mib = memory_limit_mib
+
+    def stop(self) -> None:
+        """Stop the worker process (blocking; call from the executor)."""
+        with self._lock:
+            self._stop_locked("stopped")
+
+    def stats(self) -> dict[str, Any]:
+        process = self._process
+        return {
+            "running": process is not None and process.is_alive(),
+            "pid": process.pid if process is not None else None,
+            "renders": self.renders,
+            "restarts": self.restarts,
+            "timeouts": self.timeouts,
+            "peak_rss_mib": self.peak_rss_mib,
+            "timeout_seconds": self.timeout_seconds,
+            "memory_limit_mib": self.memory_limit_mib,
+        }
+
+    def _round_trip(self, request: bytes, budget: float) -> _Reply:
+        connection = self._connection or self._start_locked()
+        try:
+            connection.send_bytes(request)
+            ready = connection.poll(budget)
+        except OSError as err:
+            self._stop_locked("send_failed")
+            raise RenderWorkerFailed(
+                "Render worker is not responding"
+            ) from err
+        if not ready:
+            self.timeouts += 1
+            self._stop_locked("timeout")
+            raise RenderTimeout(f"Render exceeded its {budget:g}s time budget")
+        try:
+            reply: _Reply = connection.recv()
+        except (EOFError, OSError) as err:
+            self._stop_locked("exited")
+            raise RenderWorkerFailed(
+                "Render worker exited during a render"
+            ) from err
+        self.renders += 1
+        self.peak_rss_mib = reply.peak_rss_mib
+        if reply.peak_rss_mib > self.memory_limit_mib:
+            self._stop_locked("memory")
+        return reply
+
+    def _start_locked(self) -> Connection:
+        parent, child = _CONTEXT.Pipe()
+        process = _CONTEXT.Process(
+            target=_worker_main,
+            args=(child,),
+            name="unifi_network_map_render",
+            daemon=True,
+        )
+        process.start()
+        child.close()
+        self._process, self._connection = process, parent
+        if self._starts:
+            self.restarts += 1
+        self._starts += 1
+        try:
+            started = parent.poll(_STARTUP_TIMEOUT_SECONDS)
+            if not started or parent.recv() != _READY:
+                raise EOFError
+        except (EOFError, OSError) as err:
+            self._stop_locked("start_failed")
+            raise RenderWorkerFailed("Render worker failed to start") from err
+        LOGGER.debug("render_worker started pid=%s", process.pid)
+        return parent
+
+    def _stop_locked(self, reason: str) -> None:
+        process, connection = self._process, self._connection
+        self._process = self._connection = None
+        if connection is not None:
+            connection.close()
+        if process is None:
+            return
+        # The worker holds no state worth a graceful shutdown.
+        process.kill()
+        process.join(_JOIN_TIMEOUT_SECONDS)
+        LOGGER.debug(
+            "render_worker stopped pid=%s reason=%s peak_rss_mib=%s",
+            process.pid,
+            reason,
+            self.peak_rss_mib,
+        )
+
+
+def _budget(worker: RenderWorker, job: RenderJob | None) -> float:
+    remaining = job.remaining() if job is not None else None
+    if remaining is None:
+        return worker.timeout_seconds
+    return min(worker.timeout_seconds, remaining)
+
+
+def _worker_main(connection: Connection) -> None:
+    """Render requests from the parent until the pipe closes."""
+    connection.send(_READY)
+    while True:
+        try:
+            inputs, settings = pickle.loads(connection.recv_bytes())
+        except (EOFError, OSError):
+            return
+        timings = _RecordingTimings()
+        data: UniFiNetworkMapData | None = None
+        error: str | None = None
+        try:
+            data = render_from_inputs(inputs, settings, timings)
+        except Exception as err:  # noqa: BLE001 - reported to the parent
+            error = f"{type(err).__name__}: {err}"
+        connection.send(_Reply(data, error, timings.samples, _peak_rss_mib()))
+
+
+def _peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
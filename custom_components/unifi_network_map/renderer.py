@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import Generator, Mapping, Sequence
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Protocol, cast
+from typing import TYPE_CHECKING, Any, Protocol, cast
 
 from unifi_topology import (
     Config,
@@ -14,7 +15,6 @@ from unifi_topology import (
     VpnTunnel,
     WanInfo,
     build_client_edges,
-    build_device_index,
     build_node_names,
     build_node_type_map,
     build_topology,
@@ -23,7 +23,6 @@ from unifi_topology import (
     fetch_clients,
     fetch_devices,
     fetch_networks,
-    group_devices_by_type,
     lookup_model_name,
     normalize_devices,
     render_svg,
@@ -32,7 +31,20 @@ from unifi_topology import (
 
 from .const import LOGGER, PAYLOAD_SCHEMA_VERSION, UNIFI_MODEL_NAMES
 from .data import UniFiNetworkMapData
-from .errors import UniFiNetworkMapError
+from .device_index import (
+    DeviceIndex,
+    build_render_device_index,
+    canonical_mac,
+)
+from .errors import RenderSuperseded, RenderTimeout, UniFiNetworkMapError
+from .payload_intern import SharedStrings
+from .stage_timings import StageTimings
+from .topology_index import build_topology_index
+from .utils import monotonic_seconds
+
+if TYPE_CHECKING:
+    from .device_details import DeviceDetailCache
+    from .topology_index import PortAttachment
 
 
 @dataclass(frozen=True)
@@ -57,6 +69,10 @@ class RenderSettings:
     iso_lighting: bool = False
     iso_route_around_nodes: bool = False
     iso_show_grid: bool = True
+    # Take per-AP and per-VLAN client counts from the station counts the
+    # devices report instead of fetching the client list. The coordinator
+    # only sets it when no client is shown or tracked.
+    lightweight_stats: bool = False
 
 
 class ClientLike(Protocol):
@@ -68,27 +84,229 @@ class ClientLike(Protocol):
 
 ClientData = ClientLike | Mapping[str, Any]
 
+# Client record fields read by this module and by unifi-topology's client
+# edges, node types and names. A controller reports dozens more per
+# client (traffic and radio counters, timestamps, fingerprints) that
+# nothing here uses.
+CLIENT_FIELDS = frozenset(
+    {
+        "ap_mac",
+        "ap_port",
+        "channel",
+        "computed_model",
+        "essid",
+        "hostname",
+        "ip",
+        "is_managed",
+        "is_uap",
+        "is_ubnt",
+        "is_unifi",
+        "is_unifi_device",
+        "is_wired",
+        "last_uplink",
+        "last_uplink_mac",
+        "mac",
+        "manufacturer",
+        "manufacturer_name",
+        "name",
+        "network",
+        "network_id",
+        "network_name",
+        "noise",
+        "oui",
+        "port_idx",
+        "product_line",
+        "product_model",
+        "product_shortname",
+        "radio_channel",
+        "rx_rate",
+        "satisfaction",
+        "signal",
+        "sw_mac",
+        "sw_port",
+        "tx_rate",
+        "unifi_device_info_from_ucore",
+        "uplink",
+        "uplink_device_mac",
+        "uplink_mac",
+        "uplink_remote_port",
+        "vendor",
+        "vendor_name",
+        "vlan",
+        "vlan_id",
+        "vlanid",
+        "wifi_channel",
+    }
+)
+
+
+@dataclass(frozen=True)
+class ControllerRecords:
+    """Raw controller responses a map is rendered from.
+
+    Passed to the renderer instead of fetching when replaying a recorded
+    bundle.
+    """
+
+    devices: list[object]
+    clients: list[ClientData]
+    networks: list[Mapping[str, Any]]
+
+
+@dataclass(frozen=True)
+class RenderInputs:
+    """Normalized devices plus the clients and networks of one render.
+
+    Everything the topology build, SVG render and payload build need,
+    with the controller fetches done; picklable, so the render worker
+    process can take it. ``networks`` is ``None`` while the networks
+    fetch is still running; the map is then rendered without them and
+    completed by ``with_networks``.
+    """
+
+    devices: list[Device]
+    clients: list[ClientData]
+    networks: list[Mapping[str, Any]] | None
+    # Wireless stations per AP MAC as reported by the devices; set (and
+    # ``clients`` left empty) in lightweight stats mode.
+    station_counts: dict[str, int] | None = None
+
+
+class RenderJob:
+    """Generation and deadline of one refresh, checked between stages.
+
+    The coordinator starts a job per refresh and supersedes the previous
+    one, so a refresh that is overtaken by a forced refresh or an options
+    change stops at its next stage boundary instead of rendering a map
+    that would be thrown away. A job past its deadline stops the same
+    way. A stage already running (a controller request, the SVG render)
+    is not interrupted.
+    """
+
+    def __init__(
+        self, generation: int, timeout_seconds: float | None = None
+    ) -> None:
+        self.generation = generation
+        self.timeout_seconds = timeout_seconds
+        self.deadline = (
+            None
+            if timeout_seconds is None
+            else monotonic_seconds() + timeout_seconds
+        )
+        self.superseded = False
+
+    def supersede(self) -> None:
+        self.superseded = True
+
+    def remaining(self) -> float | None:
+        """Seconds left before the deadline (``None`` without one)."""
+        if self.deadline is None:
+            return None
+        return max(self.deadline - monotonic_seconds(), 0.0)
+
+    def check(self, stage: str) -> None:
+        """Raise if the job should not go on to ``stage``."""
+        if self.superseded:
+            raise RenderSuperseded(
+                f"Refresh {self.generation} was superseded before {stage}"
+            )
+        if self.deadline is not None and monotonic_seconds() >= self.deadline:
+            raise RenderTimeout(
+                f"Refresh exceeded its {self.timeout_seconds:g}s time budget"
+                f" before {stage}"
+            )
+
 
 class UniFiNetworkMapRenderer:
     def render(
-        self, config: Config, settings: RenderSettings
+        self,
+        config: Config,
+        settings: RenderSettings,
+        timings: StageTimings | None = None,
+        records: ControllerRecords | None = None,
+        job: RenderJob | None = None,
+        device_details: DeviceDetailCache | None = None,
     ) -> UniFiNetworkMapData:
-        try:
-            return _render_map(config, settings)
-        except (KeyError, TypeError, ValueError) as err:
-            LOGGER.debug(
-                "renderer failed site=%s error=%s message=%s",
-                config.site,
-                type(err).__name__,
-                str(err),
+        with _render_errors(config):
+            return _render_map(
+                config,
+                settings,
+                timings or StageTimings(),
+                records,
+                job,
+                device_details,
             )
-            raise UniFiNetworkMapError(
-                f"Failed to render UniFi network map: {err}"
-            ) from err
 
+    def load_inputs(
+        self,
+        config: Config,
+        settings: RenderSettings,
+        timings: StageTimings | None = None,
+        job: RenderJob | None = None,
+        *,
+        include_networks: bool = True,
+        device_details: DeviceDetailCache | None = None,
+    ) -> RenderInputs:
+        """Fetch and normalize what ``render_from_inputs`` needs."""
+        with _render_errors(config):
+            return load_render_inputs(
+                config,
+                settings,
+                timings or StageTimings(),
+                job=job,
+                include_networks=include_networks,
+                device_details=device_details,
+            )
 
-def _render_map(
+    def render_inputs(
+        self,
+        config: Config,
+        inputs: RenderInputs,
+        settings: RenderSettings,
+        timings: StageTimings | None = None,
+        job: RenderJob | None = None,
+    ) -> UniFiNetworkMapData:
+        """Render already loaded inputs in this process."""
+        with _render_errors(config):
+            return render_from_inputs(
+                inputs, settings, timings or StageTimings(), job
+            )
+
+
+@contextmanager
+def _render_errors(config: Config) -> Generator[None]:
+    try:
+        yield
+    except (KeyError, TypeError, ValueError) as err:
+        LOGGER.debug(
+            "renderer failed site=%s error=%s message=%s",
+            config.site,
+            type(err).__name__,
+            str(err),
+        )
+        raise UniFiNetworkMapError(
+            f"Failed to render UniFi network map: {err}"
+        ) from err
+
+
+def fetch_controller_records(
     config: Config, settings: RenderSettings
+) -> ControllerRecords:
+    """Fetch the raw responses ``render`` would use, without rendering."""
+    return ControllerRecords(
+        devices=_fetch_raw_devices(config, settings),
+        clients=_load_all_clients(config, settings, compact=False),
+        networks=load_networks(config, settings),
+    )
+
+
+def _render_map(
+    config: Config,
+    settings: RenderSettings,
+    timings: StageTimings,
+    records: ControllerRecords | None = None,
+    job: RenderJob | None = None,
+    device_details: DeviceDetailCache | None = None,
 ) -> UniFiNetworkMapData:
     LOGGER.debug(
         "renderer started site=%s include_clients=%s client_scope=%s",
@@ -96,15 +314,89 @@ def _render_map(
         settings.include_clients,
         settings.client_scope,
     )
-    devices = _load_devices(config, settings)
+    inputs = load_render_inputs(
+        config,
+        settings,
+        timings,
+        records,
+        job,
+        device_details=device_details,
+    )
+    return render_from_inputs(inputs, settings, timings, job)
+
+
+def load_render_inputs(
+    config: Config,
+    settings: RenderSettings,
+    timings: StageTimings,
+    records: ControllerRecords | None = None,
+    job: RenderJob | None = None,
+    *,
+    include_networks: bool = True,
+    device_details: DeviceDetailCache | None = None,
+) -> RenderInputs:
+    """Fetch (or take from ``records``) and normalize a render's inputs.
+
+    With ``include_networks`` off the networks are left to the caller, which
+    fetches them alongside (see ``UniFiNetworkMapClient.fetch_map``).
+    """
+    _check(job, "fetch_devices")
+    raw_devices, devices = _load_devices(
+        config, settings, timings, records, device_details
+    )
     LOGGER.debug("renderer devices_loaded count=%d", len(devices))
-    topology, gateways = _build_topology(devices, settings)
-    # One controller fetch, shared by the client edges and the stats.
-    all_clients = _load_all_clients(config, settings)
+    clients: list[ClientData] = []
+    station_counts = None
+    if _uses_device_stats(settings):
+        # The largest transfer of a poll on busy sites, skipped when
+        # only the counts are needed.
+        station_counts = _device_station_counts(raw_devices)
+    else:
+        _check(job, "fetch_clients")
+        # One controller fetch, shared by the client edges and the stats.
+        with timings.measure("fetch_clients"):
+            clients = (
+                records.clients
+                if records is not None
+                else _load_all_clients(config, settings)
+            )
+    if records is not None:
+        networks = records.networks
+    elif include_networks:
+        _check(job, "fetch_networks")
+        with timings.measure("fetch_networks"):
+            networks = load_networks(config, settings)
+    else:
+        networks = None
+    return RenderInputs(
+        devices=devices,
+        clients=clients,
+        networks=networks,
+        station_counts=station_counts,
+    )
+
+
+def render_from_inputs(
+    inputs: RenderInputs,
+    settings: RenderSettings,
+    timings: StageTimings,
+    job: RenderJob | None = None,
+) -> UniFiNetworkMapData:
+    """Build the topology, SVG and payload; pure CPU, no controller calls."""
+    devices = inputs.devices
+    all_clients = inputs.clients
+    _check(job, "build_topology")
+    with timings.measure("build_topology"):
+        index = build_render_device_index(devices)
+        topology = _build_topology(index, settings)
+    gateways = index.gateway_macs
     clients = all_clients if settings.include_clients and all_clients else None
+    strings = SharedStrings(index.by_mac)
     edges = _select_edges(topology)
     if clients:
-        edges = edges + _build_client_edges(devices, clients, settings)
+        _check(job, "client_edges")
+        with timings.measure("client_edges"):
+            edges = edges + _build_client_edges(index, clients, settings)
     client_count = len(clients) if clients else 0
     LOGGER.debug(
         "renderer topology_built edges=%d clients=%d gateways=%d",
@@ -112,78 +404,202 @@ def _render_map(
         client_count,
         len(gateways),
     )
-    node_types = build_node_type_map(
-        devices,
-        clients,
-        client_mode=settings.client_scope,
-        only_unifi=settings.only_unifi,
-    )
-    node_names = build_node_names(
-        devices,
-        clients,
-        client_mode=settings.client_scope,
-        only_unifi=settings.only_unifi,
-    )
-    wan_info = _extract_wan_info(devices, settings)
-    vpn_tunnels = _extract_vpn_info(devices, settings)
-    svg = _render_svg(
-        edges, node_types, settings, wan_info, vpn_tunnels, node_names
-    )
-    networks = _load_networks(config, settings)
-    payload = _build_payload(
-        edges,
-        node_types,
-        node_names,
-        gateways,
-        clients,
-        devices,
-        all_clients,
-        networks,
-        vpn_tunnels,
-    )
+    _check(job, "node_maps")
+    with timings.measure("node_maps"):
+        node_types = build_node_type_map(
+            devices,
+            clients,
+            client_mode=settings.client_scope,
+            only_unifi=settings.only_unifi,
+        )
+        node_names = build_node_names(
+            devices,
+            clients,
+            client_mode=settings.client_scope,
+            only_unifi=settings.only_unifi,
+        )
+    _check(job, "wan_vpn")
+    with timings.measure("wan_vpn"):
+        wan_info = _extract_wan_info(index, settings)
+        vpn_tunnels = _extract_vpn_info(index, settings)
+    _check(job, "render_svg")
+    with timings.measure("render_svg"):
+        svg = _render_svg(
+            edges, node_types, settings, wan_info, vpn_tunnels, node_names
+        )
+    _check(job, "build_payload")
+    with timings.measure("build_payload"):
+        payload = _build_payload(
+            edges,
+            node_types,
+            node_names,
+            gateways,
+            clients,
+            index,
+            all_clients,
+            inputs.networks or [],
+            vpn_tunnels,
+            inputs.station_counts,
+            strings,
+        )
+    _check(job, "topology_index")
+    with timings.measure("topology_index"):
+        topology = build_topology_index(
+            payload["edges"],
+            payload["node_types"],
+            payload["gateways"],
+            _port_attachments(index, clients, strings),
+        )
     LOGGER.debug(
         "renderer completed nodes=%d svg_bytes=%d", len(node_types), len(svg)
     )
     return UniFiNetworkMapData(
-        svg=svg, payload=payload, wan_info=wan_info, vpn_tunnels=vpn_tunnels
+        svg=svg,
+        payload=payload,
+        wan_info=wan_info,
+        vpn_tunnels=vpn_tunnels,
+        pending=("networks",) if inputs.networks is None else (),
+        topology=topology,
+    )
+
+
+def with_networks(
+    data: UniFiNetworkMapData,
+    clients: list[ClientData],
+    networks: list[Mapping[str, Any]],
+    settings: RenderSettings,
+) -> UniFiNetworkMapData:
+    """Complete a map rendered before its networks arrived.
+
+    Networks only feed the payload's VLAN sections, so the SVG and the
+    rest of the payload are reused.
+    """
+    strings = SharedStrings(data.payload.get("node_types", {}))
+    if _uses_device_stats(settings):
+        vlan_info = {
+            vlan_id: dict(info)
+            for vlan_id, info in data.payload.get("vlan_info", {}).items()
+        }
+        _merge_device_vlan_info(vlan_info, networks)
+        sections: dict[str, Any] = {"vlan_info": vlan_info}
+    else:
+        shown = clients if settings.include_clients and clients else None
+        sections = {
+            "node_vlans": _build_node_vlan_index(shown, networks, strings),
+            "vlan_info": _build_vlan_info(shown, networks),
+        }
+    payload = {**data.payload, **sections}
+    return UniFiNetworkMapData(
+        svg=data.svg,
+        payload=payload,
+        wan_info=data.wan_info,
+        vpn_tunnels=data.vpn_tunnels,
+        pending=tuple(name for name in data.pending if name != "networks"),
+        topology=data.topology,
     )
 
 
-def _load_devices(config: Config, settings: RenderSettings) -> list[Device]:
-    raw_devices = list(
+def _check(job: RenderJob | None, stage: str) -> None:
+    if job is not None:
+        job.check(stage)
+
+
+def _load_devices(
+    config: Config,
+    settings: RenderSettings,
+    timings: StageTimings,
+    records: ControllerRecords | None = None,
+    device_details: DeviceDetailCache | None = None,
+) -> tuple[list[object], list[Device]]:
+    """Return the raw device records and the normalized devices."""
+    with timings.measure("fetch_devices"):
+        if records is not None:
+            raw_devices = records.devices
+        elif device_details is not None:
+            raw_devices = device_details.load(
+                lambda: _fetch_raw_devices(config, settings, detailed=False),
+                lambda: _fetch_raw_devices(config, settings),
+            )
+        else:
+            raw_devices = _fetch_raw_devices(config, settings)
+    with timings.measure("normalize_devices"):
+        return raw_devices, normalize_devices(raw_devices)
+
+
+def _uses_device_stats(settings: RenderSettings) -> bool:
+    return settings.lightweight_stats and not settings.include_clients
+
+
+def _device_station_counts(raw_devices: list[object]) -> dict[str, int]:
+    """Wireless stations per access point, as the devices report them."""
+    counts: dict[str, int] = {}
+    for device in raw_devices:
+        if not isinstance(device, Mapping):
+            continue
+        record = cast("Mapping[str, Any]", device)
+        mac = record.get("mac")
+        stations = _wireless_stations(record)
+        if isinstance(mac, str) and stations:
+            counts[mac.strip().lower()] = stations
+    return counts
+
+
+def _wireless_stations(device: Mapping[str, Any]) -> int | None:
+    # Gateways and switches with a built-in radio report their wireless
+    # stations separately; plain APs may only report ``num_sta``.
+    wireless = [
+        value
+        for value in (
+            device.get("user-wlan-num_sta"),
+            device.get("guest-wlan-num_sta"),
+        )
+        if isinstance(value, int)
+    ]
+    if wireless:
+        return sum(wireless)
+    stations = device.get("num_sta")
+    if device.get("type") == "uap" and isinstance(stations, int):
+        return stations
+    return None
+
+
+def _fetch_raw_devices(
+    config: Config, settings: RenderSettings, *, detailed: bool = True
+) -> list[object]:
+    return _as_list(
         fetch_devices(
             config,
             site=config.site,
-            detailed=True,
+            detailed=detailed,
             use_cache=settings.use_cache,
         )
     )
-    return normalize_devices(raw_devices)
+
+
+def _as_list(records: Sequence[object]) -> list[object]:
+    # The adapters already return lists; copying one doubles its peak.
+    return records if isinstance(records, list) else list(records)
 
 
 def _build_topology(
-    devices: list[Device], settings: RenderSettings
-) -> tuple[TopologyResult, list[str]]:
-    groups = group_devices_by_type(devices)
-    gateways = groups.get("gateway", [])
-    topology = build_topology(
-        devices,
+    index: DeviceIndex, settings: RenderSettings
+) -> TopologyResult:
+    return build_topology(
+        index.devices,
         include_ports=settings.include_ports,
         only_unifi=settings.only_unifi,
-        gateways=gateways,
+        gateways=index.gateway_macs,
     )
-    return topology, gateways
 
 
 def _build_client_edges(
-    devices: list[Device],
+    index: DeviceIndex,
     clients: list[ClientData],
     settings: RenderSettings,
 ) -> list[Edge]:
-    device_index = build_device_index(devices)
     return build_client_edges(
         clients,
-        device_index,
+        index.names,
         include_ports=settings.include_ports,
         client_mode=settings.client_scope,
         only_unifi=settings.only_unifi,
@@ -195,17 +611,29 @@ def _select_edges(topology: TopologyResult) -> list[Edge]:
 
 
 def _load_all_clients(
-    config: Config, settings: RenderSettings
+    config: Config, settings: RenderSettings, *, compact: bool = True
 ) -> list[ClientData]:
-    """Load all clients (stats always need them, client edges may too)."""
-    return cast(
-        "list[ClientData]",
-        list(
-            fetch_clients(
-                config, site=config.site, use_cache=settings.use_cache
-            )
-        ),
+    """Load all clients (stats always need them, client edges may too).
+
+    Records are cut down to ``CLIENT_FIELDS`` as they are taken from the
+    response, so the full records can be freed before the render; pass
+    ``compact=False`` to keep them whole (recorded bundles).
+    """
+    records = fetch_clients(
+        config, site=config.site, use_cache=settings.use_cache
     )
+    if not compact:
+        return cast("list[ClientData]", _as_list(records))
+    return [compact_client(cast("ClientData", record)) for record in records]
+
+
+def compact_client(client: ClientData) -> ClientData:
+    """Keep only the fields of a client record the render reads."""
+    if not isinstance(client, Mapping):
+        return client
+    return {
+        key: value for key, value in client.items() if key in CLIENT_FIELDS
+    }
 
 
 def _fetch_networks_filtered(
@@ -216,7 +644,7 @@ def _fetch_networks_filtered(
     return [network for network in networks if isinstance(network, Mapping)]
 
 
-def _load_networks(
+def load_networks(
     config: Config, settings: RenderSettings
 ) -> list[Mapping[str, Any]]:
     """Load UniFi network configurations to include VLANs with zero clients."""
@@ -390,12 +818,12 @@ def _load_builtin_svg_theme(theme_name: str | None):
 
 
 def _extract_wan_info(
-    devices: list[Device], settings: RenderSettings
+    index: DeviceIndex, settings: RenderSettings
 ) -> WanInfo | None:
     """Extract WAN info from the gateway device if show_wan is enabled."""
     if not settings.show_wan:
         return None
-    gateway = _find_gateway_device(devices)
+    gateway = index.gateway
     if gateway is None:
         LOGGER.debug("renderer wan_info_skipped reason=no_gateway_found")
         return None
@@ -436,27 +864,14 @@ def _query_wan_info(
     return None
 
 
-def _find_gateway_device(devices: list[Device]) -> Device | None:
-    """Find the first gateway device by type grouping."""
-    groups = group_devices_by_type(devices)
-    gateway_macs = groups.get("gateway", [])
-    if not gateway_macs:
-        return None
-    gateway_mac = gateway_macs[0]
-    for device in devices:
-        if device.mac and device.mac.strip().lower() == gateway_mac:
-            return device
-    return None
-
-
 def _extract_vpn_info(
-    devices: list[Device], settings: RenderSettings
+    index: DeviceIndex, settings: RenderSettings
 ) -> list[VpnTunnel] | None:
     """Extract VPN tunnel information from gateway devices."""
     if not settings.show_vpn:
         return None
     tunnels: list[VpnTunnel] = []
-    for device in devices:
+    for device in index.devices:
         tunnels.extend(extract_vpn_tunnels(device))
     if not tunnels:
         return None
@@ -489,33 +904,52 @@ def _build_payload(
     node_names: dict[str, str],
     gateways: list[str],
     clients: list[ClientData] | None,
-    devices: list[Device],
+    index: DeviceIndex,
     all_clients: list[ClientData],
     networks: list[Mapping[str, Any]],
     vpn_tunnels: list[VpnTunnel] | None = None,
+    station_counts: dict[str, int] | None = None,
+    strings: SharedStrings | None = None,
 ) -> dict[str, Any]:
-    return {
+    if strings is None:
+        strings = SharedStrings(index.by_mac)
+    if station_counts is not None:
+        vlan_info = _build_vlan_info_from_devices(index, networks)
+        ap_client_counts = {
+            mac: count
+            for mac, count in station_counts.items()
+            if mac in index.by_mac
+        }
+    else:
+        vlan_info = _build_vlan_info(clients, networks)
+        ap_client_counts = _build_ap_client_counts(all_clients, index, strings)
+    payload: dict[str, Any] = {
         "schema_version": PAYLOAD_SCHEMA_VERSION,
-        "edges": [_edge_to_dict(edge) for edge in edges],
-        "node_types": node_types,
-        "node_names": node_names,
+        "edges": [_edge_to_dict(edge, strings) for edge in edges],
+        "node_types": strings.keys(node_types),
+        "node_names": strings.keys(node_names),
         "gateways": gateways,
-        "client_ips": _build_client_ip_index(clients),
-        "device_ips": _build_device_ip_index(devices),
-        "node_vlans": _build_node_vlan_index(clients, networks),
-        "vlan_info": _build_vlan_info(clients, networks),
-        "ap_client_counts": _build_ap_client_counts(all_clients, devices),
-        "device_details": _build_device_details(devices),
-        "client_details": _build_client_details(all_clients),
-        "device_ports": _build_device_ports(devices),
+        "client_ips": _build_client_ip_index(clients, strings),
+        "device_ips": _build_device_ip_index(index),
+        "node_vlans": _build_node_vlan_index(clients, networks, strings),
+        "vlan_info": vlan_info,
+        "ap_client_counts": ap_client_counts,
+        "device_details": _build_device_details(index),
+        "client_details": _build_client_details(all_clients, strings),
+        "device_ports": _build_device_ports(index),
         "vpn_tunnels": _build_vpn_tunnel_list(vpn_tunnels),
     }
+    return payload
 
 
-def _edge_to_dict(edge: Edge) -> dict[str, Any]:
+def _edge_to_dict(
+    edge: Edge, strings: SharedStrings | None = None
+) -> dict[str, Any]:
+    if strings is None:
+        strings = SharedStrings()
     return {
-        "left": edge.left,
-        "right": edge.right,
+        "left": strings.text(edge.left),
+        "right": strings.text(edge.right),
         "label": edge.label,
         "poe": edge.poe,
         "wireless": edge.wireless,
@@ -524,25 +958,56 @@ def _edge_to_dict(edge: Edge) -> dict[str, Any]:
     }
 
 
-def _build_client_ip_index(clients: list[ClientData] | None) -> dict[str, str]:
+def _port_attachments(
+    index: DeviceIndex,
+    clients: list[ClientData] | None,
+    strings: SharedStrings | None = None,
+) -> list[PortAttachment]:
+    """Devices on their uplink's port, wired clients on their switch port."""
+    if strings is None:
+        strings = SharedStrings(index.by_mac)
+    attachments: list[PortAttachment] = []
+    for mac, device in index.by_mac.items():
+        uplink = device.uplink
+        upstream = strings.mac(uplink.mac) if uplink else None
+        if uplink and upstream and uplink.port is not None:
+            attachments.append((upstream, uplink.port, mac))
+    for client in clients or ():
+        if _client_field(client, "is_wired") is False:
+            continue
+        switch = _client_field(client, "sw_mac")
+        port = _client_field(client, "sw_port")
+        mac = strings.mac(_client_mac(client))
+        if isinstance(switch, str) and isinstance(port, int) and mac:
+            upstream = strings.mac(switch)
+            if upstream:
+                attachments.append((upstream, port, mac))
+    return attachments
+
+
+def _build_client_ip_index(
+    clients: list[ClientData] | None, strings: SharedStrings | None = None
+) -> dict[str, str]:
     if not clients:
         return {}
+    if strings is None:
+        strings = SharedStrings()
     client_ips: dict[str, str] = {}
     for client in clients:
-        mac = _client_mac(client)
+        mac = strings.mac(_client_mac(client))
         ip = _client_ip(client)
         if not mac or not ip:
             continue
-        client_ips[mac.strip().lower()] = ip.strip()
+        client_ips[mac] = ip.strip()
     return client_ips
 
 
-def _build_device_ip_index(devices: list[Device]) -> dict[str, str]:
-    device_ips: dict[str, str] = {}
-    for device in devices:
-        if device.mac and device.ip:
-            device_ips[device.mac.strip().lower()] = device.ip.strip()
-    return device_ips
+def _build_device_ip_index(index: DeviceIndex) -> dict[str, str]:
+    return {
+        mac: device.ip.strip()
+        for mac, device in index.by_mac.items()
+        if device.ip
+    }
 
 
 def _client_display_name(client: ClientData) -> str | None:
@@ -601,21 +1066,25 @@ def _client_network_name(client: ClientData) -> str | None:
 
 
 def _build_node_vlan_index(
-    clients: list[ClientData] | None, networks: list[Mapping[str, Any]]
+    clients: list[ClientData] | None,
+    networks: list[Mapping[str, Any]],
+    strings: SharedStrings | None = None,
 ) -> dict[str, int | None]:
     """Map node MACs to their VLAN IDs."""
     if not clients:
         return {}
+    if strings is None:
+        strings = SharedStrings()
     network_name_map = _build_network_name_map(networks)
     node_vlans: dict[str, int | None] = {}
     for client in clients:
-        mac = _client_mac(client)
+        mac = strings.mac(_client_mac(client))
         if not mac:
             continue
         vlan = _client_vlan(client)
         if vlan is None:
             vlan = _client_vlan_from_network_name(client, network_name_map)
-        node_vlans[mac.strip().lower()] = vlan
+        node_vlans[mac] = vlan
     return node_vlans
 
 
@@ -635,6 +1104,44 @@ def _build_vlan_info(
     return vlan_info
 
 
+def _build_vlan_info_from_devices(
+    index: DeviceIndex, networks: list[Mapping[str, Any]]
+) -> dict[int, dict[str, Any]]:
+    """Build VLAN metadata from the station counts gateways report.
+
+    Used in lightweight stats mode: counts come from the gateway's
+    ``network_table`` and the client name lists stay empty.
+    """
+    vlan_info: dict[int, dict[str, Any]] = {}
+    for device in index.devices:
+        for entry in device.network_table:
+            vlan_id = _network_vlan_id(entry)
+            stations = entry.get("num_sta")
+            if vlan_id is None or not isinstance(stations, int):
+                continue
+            info = vlan_info.setdefault(
+                vlan_id,
+                {
+                    "id": vlan_id,
+                    "name": _network_name(entry, vlan_id),
+                    "client_count": 0,
+                    "clients": [],
+                },
+            )
+            info["client_count"] += stations
+    _merge_device_vlan_info(vlan_info, networks)
+    return vlan_info
+
+
+def _merge_device_vlan_info(
+    vlan_info: dict[int, dict[str, Any]], networks: list[Mapping[str, Any]]
+) -> None:
+    _merge_vlan_info_from_networks(vlan_info, networks)
+    for info in vlan_info.values():
+        info.setdefault("client_count", 0)
+        info.setdefault("clients", [])
+
+
 def _build_vlan_info_from_clients(
     clients: list[ClientData] | None,
     network_name_map: dict[str, int],
@@ -737,25 +1244,22 @@ def _client_vlan_from_network_name(
 
 
 def _build_ap_client_counts(
-    clients: list[ClientData], devices: list[Device]
+    clients: list[ClientData],
+    index: DeviceIndex,
+    strings: SharedStrings | None = None,
 ) -> dict[str, int]:
     """Build wireless client counts per access point.
 
     Returns a dict mapping AP MAC to the number of
     wireless clients connected to it.
     """
-    known_device_macs: set[str] = set()
-    for device in devices:
-        if device.mac:
-            known_device_macs.add(device.mac.strip().lower())
-
+    if strings is None:
+        strings = SharedStrings(index.by_mac)
+    known_device_macs = index.by_mac
     ap_counts: dict[str, int] = {}
     for client in clients:
-        ap_mac = _client_field(client, "ap_mac")
-        if not ap_mac or not isinstance(ap_mac, str):
-            continue
-        ap_mac_normalized = ap_mac.strip().lower()
-        if ap_mac_normalized in known_device_macs:
+        ap_mac_normalized = strings.mac(_client_field(client, "ap_mac"))
+        if ap_mac_normalized and ap_mac_normalized in known_device_macs:
             ap_counts[ap_mac_normalized] = (
                 ap_counts.get(ap_mac_normalized, 0) + 1
             )
@@ -788,21 +1292,16 @@ def _resolve_model_name(
     return model_code
 
 
-def _build_device_details(devices: list[Device]) -> dict[str, dict[str, Any]]:
+def _build_device_details(index: DeviceIndex) -> dict[str, dict[str, Any]]:
     """Build detailed device info for entity attributes.
 
     Returns a dict mapping device MAC to details
     including mac, ip, model, and uplink.
     """
     details: dict[str, dict[str, Any]] = {}
-    for device in devices:
-        if not device.mac:
-            continue
-        mac = device.mac.strip().lower()
+    for mac, device in index.by_mac.items():
         uplink_mac = (
-            device.uplink.mac.strip().lower()
-            if device.uplink and device.uplink.mac
-            else None
+            canonical_mac(device.uplink.mac) if device.uplink else None
         )
         details[mac] = {
             "mac": mac,
@@ -815,7 +1314,7 @@ def _build_device_details(devices: list[Device]) -> dict[str, dict[str, Any]]:
 
 
 def _build_device_ports(
-    devices: list[Device],
+    index: DeviceIndex,
 ) -> dict[str, list[dict[str, Any]]]:
     """Build port information for each device.
 
@@ -823,11 +1322,9 @@ def _build_device_ports(
     port number, name, speed, PoE status, and power consumption.
     """
     result: dict[str, list[dict[str, Any]]] = {}
-    for device in devices:
-        if not device.mac or not device.port_table:
-            continue
+    for mac, port_table in index.port_tables.items():
         ports: list[dict[str, Any]] = []
-        for port in device.port_table:
+        for port in port_table:
             if port.port_idx is None:
                 continue
             poe_active = port.poe_enable and port.poe_good
@@ -844,38 +1341,36 @@ def _build_device_ports(
         if ports:
             # Sort by port number
             ports.sort(key=lambda p: p["port"])
-            result[device.mac.strip().lower()] = ports
+            result[mac] = ports
     return result
 
 
 def _build_client_details(
-    clients: list[ClientData],
+    clients: list[ClientData], strings: SharedStrings | None = None
 ) -> dict[str, dict[str, Any]]:
     """Build detailed client info indexed by MAC address.
 
     Returns a dict mapping client MAC to details
     for presence sensor attributes.
     """
+    if strings is None:
+        strings = SharedStrings()
     details: dict[str, dict[str, Any]] = {}
     for client in clients:
-        mac = _client_mac(client)
+        mac = strings.mac(_client_mac(client))
         if not mac:
             continue
-        mac_normalized = mac.strip().lower()
         is_wired = _client_field(client, "is_wired")
         connected_to_mac = _client_field(client, "ap_mac") or _client_field(
             client, "sw_mac"
         )
-        connected_to_mac_str: str | None = None
-        if isinstance(connected_to_mac, str) and connected_to_mac.strip():
-            connected_to_mac_str = connected_to_mac.strip().lower()
-        details[mac_normalized] = {
+        details[mac] = {
             "name": _client_display_name(client),
-            "mac": mac_normalized,
+            "mac": mac,
             "ip": _client_ip(client),
             "vlan": _client_vlan(client),
-            "network": _client_network_name(client),
+            "network": strings.text(_client_network_name(client)),
             "is_wired": bool(is_wired) if is_wired is not None else None,
-            "connected_to_mac": connected_to_mac_str,
+            "connected_to_mac": strings.mac(connected_to_mac),
         }
     return details
@@ -7,10 +7,9 @@ from homeassistant.components.sensor import SensorEntity, SensorStateClass
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.entity import EntityCategory
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, PAYLOAD_SCHEMA_VERSION
-from .data import UniFiNetworkMapData
+from .entity import UniFiNetworkMapEntity
 
 PARALLEL_UPDATES = 1
 
@@ -39,16 +38,24 @@ async def async_setup_entry(
     added_vlans: set[str] = set()
 
     def _add_new_vlan_sensors() -> None:
-        """Add any new VLAN sensors based on current coordinator data."""
+        """Add sensors for VLANs not seen before.
+
+        VLAN keys are diffed first so updates without new VLANs construct
+        no entities.
+        """
         if not coordinator.data or not coordinator.data.payload:
             return
 
         new_entities: list[UniFiVlanClientsSensor] = []
-
-        for entity in _create_vlan_sensors(coordinator, entry):
-            if entity.unique_id and entity.unique_id not in added_vlans:
-                added_vlans.add(entity.unique_id)
-                new_entities.append(entity)
+        vlan_info = coordinator.data.payload.get("vlan_info") or {}
+        for vlan_id, info in vlan_info.items():
+            unique_id = _vlan_unique_id(entry.entry_id, int(vlan_id))
+            if unique_id in added_vlans:
+                continue
+            added_vlans.add(unique_id)
+            new_entities.append(
+                _create_vlan_sensor(coordinator, entry, vlan_id, info)
+            )
 
         if new_entities:
             async_add_entities(new_entities)
@@ -68,39 +75,34 @@ async def async_setup_entry(
         )
 
 
-def _create_vlan_sensors(
+def _create_vlan_sensor(
     coordinator: UniFiNetworkMapCoordinator,
     entry: ConfigEntry,
-) -> list[UniFiVlanClientsSensor]:
-    """Create VLAN client count sensors."""
-    if not coordinator.data or not coordinator.data.payload:
-        return []
-
-    vlan_info = coordinator.data.payload.get("vlan_info", {})
-    if not vlan_info:
-        return []
-
-    entities: list[UniFiVlanClientsSensor] = []
-    for vlan_id, info in vlan_info.items():
-        entities.append(
-            UniFiVlanClientsSensor(
-                coordinator=coordinator,
-                entry=entry,
-                vlan_id=int(vlan_id),
-                vlan_name=str(info.get("name", f"VLAN {vlan_id}")),
-            )
-        )
-    return entities
+    vlan_id: int | str,
+    info: dict[str, Any],
+) -> UniFiVlanClientsSensor:
+    """Create the client count sensor for one VLAN."""
+    return UniFiVlanClientsSensor(
+        coordinator=coordinator,
+        entry=entry,
+        vlan_id=int(vlan_id),
+        vlan_name=str(info.get("name", f"VLAN {vlan_id}")),
+    )
+
+
+def _vlan_unique_id(entry_id: str, vlan_id: int) -> str:
+    return f"{entry_id}_vlan_{vlan_id}_clients"
 
 
 class UniFiNetworkMapSensor(  # type: ignore[reportUntypedBaseClass]
-    CoordinatorEntity[UniFiNetworkMapData], SensorEntity
+    UniFiNetworkMapEntity, SensorEntity
 ):
     """Status sensor for the UniFi Network Map integration."""
 
     _attr_has_entity_name = True
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_translation_key = "status"
+    _unrecorded_attributes = frozenset({"stage_timings"})
 
     def __init__(
         self, coordinator: UniFiNetworkMapCoordinator, entry: ConfigEntry
@@ -122,7 +124,7 @@ class UniFiNetworkMapSensor(  # type: ignore[reportUntypedBaseClass]
         return _derive_state(self.coordinator)
 
     @property
-    def extra_state_attributes(self) -> dict[str, str]:
+    def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional state attributes."""
         error = _format_error(self.coordinator)
         entry_id = self._entry.entry_id
@@ -132,8 +134,14 @@ class UniFiNetworkMapSensor(  # type: ignore[reportUntypedBaseClass]
             "payload_url": f"/api/unifi_network_map/{entry_id}/payload",
             "payload_schema_version": PAYLOAD_SCHEMA_VERSION,
             "last_error": error or "",
+            "stage_timings": self.coordinator.timings.summary(),
         }
 
+    def _state_sources(self) -> tuple[Any, ...]:
+        # Timings change on every refresh, so they are left out: they are
+        # refreshed whenever the state or the error changes.
+        return (self.native_value, _format_error(self.coordinator))
+
 
 def _derive_state(coordinator: UniFiNetworkMapCoordinator) -> str:
     """Derive sensor state from coordinator."""
@@ -153,7 +161,7 @@ def _format_error(coordinator: UniFiNetworkMapCoordinator) -> str | None:
 
 
 class UniFiVlanClientsSensor(  # type: ignore[reportUntypedBaseClass]
-    CoordinatorEntity[UniFiNetworkMapData], SensorEntity
+    UniFiNetworkMapEntity, SensorEntity
 ):
     """Sensor showing client count per VLAN."""
 
@@ -161,6 +169,10 @@ class UniFiVlanClientsSensor(  # type: ignore[reportUntypedBaseClass]
     _attr_entity_category = EntityCategory.DIAGNOSTIC
     _attr_state_class = SensorStateClass.MEASUREMENT
     _attr_translation_key = "vlan_clients"
+    # The client name list churns with every join/leave and would store a
+    # new attribute set per poll; the full list is served on demand by the
+    # unifi_network_map/vlan_clients WebSocket command.
+    _unrecorded_attributes = frozenset({"clients"})
 
     def __init__(
         self,
@@ -175,7 +187,7 @@ class UniFiVlanClientsSensor(  # type: ignore[reportUntypedBaseClass]
         self._vlan_id = vlan_id
         self._vlan_name = vlan_name
 
-        self._attr_unique_id = f"{entry.entry_id}_vlan_{vlan_id}_clients"
+        self._attr_unique_id = _vlan_unique_id(entry.entry_id, vlan_id)
         self._attr_translation_placeholders = {
             "vlan_name": vlan_name,
         }
@@ -203,6 +215,9 @@ class UniFiVlanClientsSensor(  # type: ignore[reportUntypedBaseClass]
             "clients": clients,
         }
 
+    def _state_sources(self) -> tuple[Any, ...]:
+        return (self._get_vlan_info(),)
+
     def _get_vlan_info(self) -> dict[str, Any] | None:
         """Get VLAN info from current coordinator data."""
         if not self.coordinator.data or not self.coordinator.data.payload:
@@ -0,0 +1,148 @@
+"""Rolling per-stage timings for the fetch, render and serve pipeline.
+
+Each config entry keeps the last ``STAGE_TIMING_WINDOW`` durations of
+every stage (controller fetches, topology build, SVG render, payload
+build, enrichment, HTTP views) measured with the monotonic clock. The
+summary (count, last, p50, p95, max in milliseconds) is shown in
+diagnostics and on the status sensor, so a slow refresh can be pinned to
+a stage without turning on debug logging. Every sample also lands in a
+cumulative histogram for the metrics endpoint.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .const import DOMAIN, STAGE_HISTOGRAM_BUCKETS, STAGE_TIMING_WINDOW
+from .utils import monotonic_seconds
+
+if TYPE_CHECKING:
+    from collections.abc import Generator
+
+    from homeassistant.core import HomeAssistant
+
+_TIMINGS_KEY = "stage_timings"
+
+
+@dataclass(slots=True)
+class StageHistogram:
+    """Cumulative latency histogram of one stage since the entry loaded.
+
+    ``bucket_counts[i]`` counts samples that fell in bucket ``i`` only;
+    the last slot is the ``+Inf`` overflow bucket.
+    """
+
+    bucket_counts: list[int] = field(
+        default_factory=lambda: [0] * (len(STAGE_HISTOGRAM_BUCKETS) + 1)
+    )
+    count: int = 0
+    total_seconds: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.bucket_counts[bisect_left(STAGE_HISTOGRAM_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total_seconds += seconds
+
+
+class StageTimings:
+    """Rolling window of durations per named stage.
+
+    Stages are recorded from executor threads (render) and the event loop
+    (enrichment, views), so updates take a lock.
+    """
+
+    def __init__(self, window: int = STAGE_TIMING_WINDOW) -> None:
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+        self._histograms: dict[str, StageHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                samples = deque(maxlen=self._window)
+                self._samples[stage] = samples
+                self._histograms[stage] = StageHistogram()
+            samples.append(seconds)
+            self._histograms[stage].observe(seconds)
+
+    @contextmanager
+    def measure(self, stage: str) -> Generator[None]:
+        """Record how long the ``with`` block takes, even if it raises."""
+        start = monotonic_seconds()
+        try:
+            yield
+        finally:
+            self.record(stage, monotonic_seconds() - start)
+
+    def summary(self) -> dict[str, dict[str, float | int]]:
+        """Return count, last, p50, p95 and max (ms) per stage."""
+        with self._lock:
+            snapshot = {
+                stage: list(samples)
+                for stage, samples in self._samples.items()
+            }
+        return {
+            stage: _summarize(samples)
+            for stage, samples in sorted(snapshot.items())
+        }
+
+    def histograms(self) -> dict[str, StageHistogram]:
+        """Return a copy of the cumulative histogram per stage."""
+        with self._lock:
+            return {
+                stage: StageHistogram(
+                    list(histogram.bucket_counts),
+                    histogram.count,
+                    histogram.total_seconds,
+                )
+                for stage, histogram in sorted(self._histograms.items())
+            }
+
+
+def _summarize(samples: list[float]) -> dict[str, float | int]:
+    ordered = sorted(samples)
+    return {
+        "count": len(samples),
+        "last_ms": _ms(samples[-1]),
+        "p50_ms": _ms(_percentile(ordered, 0.50)),
+        "p95_ms": _ms(_percentile(ordered, 0.95)),
+        "max_ms": _ms(ordered[-1]),
+    }
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
+
+
+def get_stage_timings(hass: HomeAssistant, entry_id: str) -> StageTimings:
+    """Get or create the stage timings for a config entry."""
+    data = hass.data.setdefault(DOMAIN, {})
+    timings_by_entry: dict[str, StageTimings] = data.setdefault(
+        _TIMINGS_KEY, {}
+    )
+    timings = timings_by_entry.get(entry_id)
+    if timings is None:
+        timings = StageTimings()
+        timings_by_entry[entry_id] = timings
+    return timings
+
+
+def discard_stage_timings(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop a config entry's timings when it unloads."""
+    timings_by_entry = hass.data.get(DOMAIN, {}).get(_TIMINGS_KEY)
+    if timings_by_entry is not None:
+        timings_by_entry.pop(entry_id, None)
@@ -0,0 +1,136 @@
+"""Cache of per-card theme and icon-set re-renders of the map SVG.
+
+Cards can ask the SVG view for a different theme or icon set than the
+configured one. Each such request used to re-render the whole SVG in the
+executor; the result is now kept until the coordinator publishes a new
+data object (unchanged refreshes keep the old one) or the entry's options
+change, or until the shared cache budget (see ``cache_budget``) evicts it.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from .cache_budget import estimate_size, get_cache_budget
+from .const import DOMAIN, LOGGER
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .cache_budget import ArtifactKey, CacheBudget
+    from .data import UniFiNetworkMapData
+
+_CACHE_KEY = "themed_svg_cache"
+_BUDGET_CACHE = "themed_svg"
+
+type ThemedSvg = tuple[str, str]
+"""A themed SVG document and its theme background colour."""
+
+
+@dataclass
+class _EntrySvgs:
+    data: UniFiNetworkMapData
+    svgs: dict[tuple[str | None, str | None], ThemedSvg] = field(
+        default_factory=dict
+    )
+
+
+@dataclass
+class ThemedSvgCache:
+    """Themed SVG renders per config entry, tied to one data object."""
+
+    _entries: dict[str, _EntrySvgs] = field(default_factory=dict)
+    hits: Counter[str] = field(default_factory=Counter)
+    misses: Counter[str] = field(default_factory=Counter)
+    budget: CacheBudget | None = field(default=None, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.budget is not None:
+            self.budget.register(_BUDGET_CACHE, self._evict)
+
+    def get(
+        self,
+        entry_id: str,
+        data: UniFiNetworkMapData,
+        svg_theme: str | None,
+        icon_set: str | None,
+    ) -> ThemedSvg | None:
+        cached = self._entries.get(entry_id)
+        result = None
+        if cached is not None and cached.data is data:
+            result = cached.svgs.get((svg_theme, icon_set))
+        if result is None:
+            self.misses[entry_id] += 1
+        else:
+            self.hits[entry_id] += 1
+            if self.budget is not None:
+                self.budget.touch(_budget_key(entry_id, svg_theme, icon_set))
+        return result
+
+    def set(
+        self,
+        entry_id: str,
+        data: UniFiNetworkMapData,
+        svg_theme: str | None,
+        icon_set: str | None,
+        result: ThemedSvg,
+    ) -> None:
+        cached = self._entries.get(entry_id)
+        if cached is None or cached.data is not data:
+            cached = _EntrySvgs(data)
+            self._entries[entry_id] = cached
+            self._discard(entry_id)
+        cached.svgs[(svg_theme, icon_set)] = result
+        if self.budget is not None:
+            self.budget.track(
+                _budget_key(entry_id, svg_theme, icon_set),
+                estimate_size(result),
+            )
+        LOGGER.debug(
+            "svg_cache stored entry_id=%s theme=%s icon_set=%s",
+            entry_id,
+            svg_theme,
+            icon_set,
+        )
+
+    def invalidate(self, entry_id: str) -> None:
+        self._entries.pop(entry_id, None)
+        self._discard(entry_id)
+
+    def _discard(self, entry_id: str) -> None:
+        if self.budget is not None:
+            self.budget.discard_entry(_BUDGET_CACHE, entry_id)
+
+    def _evict(self, entry_id: str, artifact: str) -> None:
+        """Drop a themed render the budget evicted."""
+        cached = self._entries.get(entry_id)
+        if cached is None:
+            return
+        for svg_theme, icon_set in list(cached.svgs):
+            if _budget_key(entry_id, svg_theme, icon_set)[2] == artifact:
+                del cached.svgs[(svg_theme, icon_set)]
+
+
+def _budget_key(
+    entry_id: str, svg_theme: str | None, icon_set: str | None
+) -> ArtifactKey:
+    return (_BUDGET_CACHE, entry_id, f"{svg_theme or ''}/{icon_set or ''}")
+
+
+def get_themed_svg_cache(hass: HomeAssistant) -> ThemedSvgCache:
+    """Get or create the themed SVG cache for this hass instance."""
+    data = hass.data.setdefault(DOMAIN, {})
+    cache = data.get(_CACHE_KEY)
+    if cache is None:
+        cache = ThemedSvgCache(budget=get_cache_budget(hass))
+        data[_CACHE_KEY] = cache
+    return cache
+
+
+def invalidate_themed_svg_cache(hass: HomeAssistant, entry_id: str) -> None:
+    """Drop an entry's themed renders (options changed or unloaded)."""
+    cache = hass.data.get(DOMAIN, {}).get(_CACHE_KEY)
+    if cache is not None:
+        cache.invalidate(entry_id)
@@ -0,0 +1,145 @@
+"""Adjacency index of one map generation.
+
+The payload describes the topology as a flat ``edges`` list, so every
+question about it (what is upstream of a node, what hangs off a switch
+port) used to be a scan of that list. The renderer now builds this index
+once per render, next to the payload, and the
+``unifi_network_map/path`` and ``unifi_network_map/neighbors`` WebSocket
+commands answer from it: a node's uplink path costs one dictionary
+lookup per hop.
+
+Edges are oriented away from the gateways by a breadth-first walk, so a
+node's parent is the neighbor one hop closer to a gateway even when the
+controller reported the link the other way around. Port attachments come
+from the devices' uplink ports and the wired clients' switch ports.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+type PortAttachment = tuple[str, int, str]
+"""Device MAC, port number on that device and the attached node's MAC."""
+
+
+@dataclass(frozen=True, slots=True)
+class TopologyIndex:
+    """Parents, children and port attachments keyed by payload MAC."""
+
+    nodes: frozenset[str]
+    gateways: tuple[str, ...]
+    parents: Mapping[str, str]
+    children: Mapping[str, tuple[str, ...]]
+    ports: Mapping[str, Mapping[int, tuple[str, ...]]]
+    uplink_ports: Mapping[str, int]
+
+    def path_to_gateway(self, mac: str) -> list[str] | None:
+        """Return ``mac`` and its upstream nodes up to the gateway.
+
+        None when the node is not on the map.
+        """
+        if mac not in self.nodes:
+            return None
+        path = [mac]
+        while (parent := self.parents.get(path[-1])) is not None:
+            path.append(parent)
+        return path
+
+    def neighbors(self, mac: str) -> dict[str, Any] | None:
+        """Return a node's parent, children and per-port attachments."""
+        if mac not in self.nodes:
+            return None
+        ports = self.ports.get(mac, {})
+        return {
+            "parent": self.parents.get(mac),
+            "uplink_port": self.uplink_ports.get(mac),
+            "children": list(self.children.get(mac, ())),
+            "ports": [
+                {"port": port, "macs": list(ports[port])}
+                for port in sorted(ports)
+            ],
+        }
+
+
+def build_topology_index(
+    edges: Iterable[Mapping[str, Any]],
+    nodes: Iterable[str],
+    gateways: Iterable[str],
+    attachments: Iterable[PortAttachment] = (),
+) -> TopologyIndex:
+    """Index payload edges (``left``/``right`` MACs) and port attachments."""
+    node_set = frozenset(nodes)
+    adjacency: dict[str, list[str]] = {}
+    pairs: list[tuple[str, str]] = []
+    for edge in edges:
+        left, right = edge.get("left"), edge.get("right")
+        if not isinstance(left, str) or not isinstance(right, str):
+            continue
+        adjacency.setdefault(left, []).append(right)
+        adjacency.setdefault(right, []).append(left)
+        pairs.append((left, right))
+    roots = tuple(mac for mac in gateways if mac in node_set)
+    parents = _orient(adjacency, roots)
+    # Links not reachable from a gateway keep the reported direction.
+    for left, right in pairs:
+        if (
+            right not in parents
+            and right not in roots
+            and not _is_upstream(parents, right, left)
+        ):
+            parents[right] = left
+    children: dict[str, list[str]] = {}
+    for child, parent in parents.items():
+        children.setdefault(parent, []).append(child)
+    ports: dict[str, dict[int, list[str]]] = {}
+    uplink_ports: dict[str, int] = {}
+    for device, port, node in attachments:
+        if device not in node_set or node not in node_set:
+            continue
+        attached = ports.setdefault(device, {}).setdefault(port, [])
+        if node not in attached:
+            attached.append(node)
+        if parents.get(node) == device:
+            uplink_ports[node] = port
+    return TopologyIndex(
+        nodes=node_set.union(adjacency),
+        gateways=roots,
+        parents=parents,
+        children={mac: tuple(macs) for mac, macs in children.items()},
+        ports={
+            device: {port: tuple(macs) for port, macs in by_port.items()}
+            for device, by_port in ports.items()
+        },
+        uplink_ports=uplink_ports,
+    )
+
+
+def _is_upstream(parents: Mapping[str, str], mac: str, of: str) -> bool:
+    """Whether ``mac`` is ``of`` or one of its ancestors."""
+    current: str | None = of
+    while current is not None:
+        if current == mac:
+            return True
+        current = parents.get(current)
+    return False
+
+
+def _orient(
+    adjacency: Mapping[str, list[str]], roots: tuple[str, ...]
+) -> dict[str, str]:
+    parents: dict[str, str] = {}
+    seen = set(roots)
+    queue = deque(roots)
+    while queue:
+        mac = queue.popleft()
+        for neighbor in adjacency.get(mac, ()):
+            if neighbor not in seen:
+                seen.add(neighbor)
+                parents[neighbor] = mac
+                queue.append(neighbor)
+    return parents
@@ -2,15 +2,36 @@
 
 from __future__ import annotations
 
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 from homeassistant.components import websocket_api
 from homeassistant.core import HomeAssistant, callback
 
-from .const import DOMAIN
+from .const import DOMAIN, PAYLOAD_SCHEMA_VERSION
 from .coordinator import UniFiNetworkMapCoordinator
-from .enrichment import get_or_build_enriched_payload
+from .device_index import canonical_mac
+from .enrichment import (
+    get_or_build_payload_for_schema,
+    resolve_related_entities,
+)
+from .payload_schema import (
+    PAYLOAD_SECTIONS,
+    negotiate_schema_version,
+    parse_payload_fields,
+)
+
+if TYPE_CHECKING:
+    from homeassistant.components.websocket_api.connection import (
+        ActiveConnection,
+    )
+
+    from .data import UniFiNetworkMapData
+    from .topology_index import TopologyIndex
+
+# Upper bound on nodes per related_entities request; clients ask for the
+# handful of nodes on screen, not the whole site.
+MAX_RELATED_ENTITY_MACS = 50
 
 
 def async_register_websocket_api(hass: HomeAssistant) -> None:
@@ -19,6 +40,10 @@ def async_register_websocket_api(hass: HomeAssistant) -> None:
     if data.get("websocket_registered"):
         return
     websocket_api.async_register_command(hass, websocket_subscribe_map)
+    websocket_api.async_register_command(hass, websocket_related_entities)
+    websocket_api.async_register_command(hass, websocket_vlan_clients)
+    websocket_api.async_register_command(hass, websocket_node_path)
+    websocket_api.async_register_command(hass, websocket_node_neighbors)
     data["websocket_registered"] = True
 
 
@@ -26,16 +51,20 @@ def async_register_websocket_api(hass: HomeAssistant) -> None:
     {
         vol.Required("type"): "unifi_network_map/subscribe",
         vol.Required("entry_id"): str,
+        vol.Optional("schema_version"): vol.Any(str, int, float),
+        vol.Optional("fields"): [vol.In(PAYLOAD_SECTIONS)],
     }
 )
 @websocket_api.async_response  # type: ignore[reportUntypedFunctionDecorator]
 async def websocket_subscribe_map(
     hass: HomeAssistant,
-    connection: websocket_api.ActiveConnection,
+    connection: ActiveConnection,
     msg: dict[str, Any],
 ) -> None:
     """Subscribe to network map updates."""
     entry_id = msg["entry_id"]
+    schema_version = negotiate_schema_version(msg.get("schema_version"))
+    fields = parse_payload_fields(msg.get("fields"))
     coordinator = _get_coordinator(hass, entry_id)
 
     if coordinator is None:
@@ -54,7 +83,9 @@ async def websocket_subscribe_map(
     # events alone never settle it.
     connection.send_result(msg["id"])
 
-    payload = _build_payload(hass, coordinator, entry_id)
+    payload = _build_payload(
+        hass, coordinator, entry_id, schema_version, fields
+    )
     connection.send_message(
         websocket_api.event_message(msg["id"], {"payload": payload})
     )
@@ -64,15 +95,211 @@ async def websocket_subscribe_map(
         """Handle coordinator update."""
         if coordinator.data is None:
             return
-        updated_payload = _build_payload(hass, coordinator, entry_id)
+        updated_payload = _build_payload(
+            hass, coordinator, entry_id, schema_version, fields
+        )
         connection.send_message(
             websocket_api.event_message(
                 msg["id"], {"payload": updated_payload}
             )
         )
 
-    unsubscribe = coordinator.async_add_listener(_on_update)
-    connection.subscriptions[msg["id"]] = unsubscribe
+    remove_listener = coordinator.async_add_listener(_on_update)
+    coordinator.websocket_subscribers += 1
+
+    @callback  # type: ignore[reportUntypedFunctionDecorator]
+    def _unsubscribe() -> None:
+        remove_listener()
+        coordinator.websocket_subscribers -= 1
+
+    connection.subscriptions[msg["id"]] = _unsubscribe
+
+
+@websocket_api.websocket_command(  # type: ignore[reportUntypedFunctionDecorator]
+    {
+        vol.Required("type"): "unifi_network_map/related_entities",
+        vol.Required("entry_id"): str,
+        vol.Required("macs"): vol.All(
+            [str], vol.Length(min=1, max=MAX_RELATED_ENTITY_MACS)
+        ),
+    }
+)
+@callback  # type: ignore[reportUntypedFunctionDecorator]
+def websocket_related_entities(
+    hass: HomeAssistant,
+    connection: ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Resolve related entities for the nodes a client is showing.
+
+    Only nodes on this entry's map are resolved; other MACs are left out
+    of the result.
+    """
+    entry_id = msg["entry_id"]
+    coordinator = _get_coordinator(hass, entry_id)
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], "not_found", f"Entry {entry_id} not found"
+        )
+        return
+    data = _get_data(coordinator)
+    if data is None:
+        connection.send_error(
+            msg["id"], "no_data", "Coordinator has no data yet"
+        )
+        return
+    node_types = data.payload.get("node_types") or {}
+    macs = {
+        mac
+        for raw in msg["macs"]
+        if (mac := canonical_mac(raw)) and mac in node_types
+    }
+    resolved = resolve_related_entities(hass, macs)
+    connection.send_result(
+        msg["id"],
+        {"related_entities": {mac: resolved.get(mac, []) for mac in macs}},
+    )
+
+
+@websocket_api.websocket_command(  # type: ignore[reportUntypedFunctionDecorator]
+    {
+        vol.Required("type"): "unifi_network_map/vlan_clients",
+        vol.Required("entry_id"): str,
+        vol.Required("vlan_id"): vol.Coerce(int),
+    }
+)
+@callback  # type: ignore[reportUntypedFunctionDecorator]
+def websocket_vlan_clients(
+    hass: HomeAssistant,
+    connection: ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return every client on a VLAN.
+
+    The VLAN sensor's ``clients`` attribute is capped and kept out of the
+    recorder; this is the uncapped list, built from the current payload.
+    """
+    entry_id = msg["entry_id"]
+    coordinator = _get_coordinator(hass, entry_id)
+    data = _get_data(coordinator) if coordinator else None
+    if data is None:
+        connection.send_error(
+            msg["id"], "not_found", f"Entry {entry_id} not found"
+        )
+        return
+    vlan_id = msg["vlan_id"]
+    connection.send_result(
+        msg["id"],
+        {
+            "vlan_id": vlan_id,
+            "clients": _vlan_clients(data.payload, vlan_id),
+        },
+    )
+
+
+def _vlan_clients(
+    payload: dict[str, Any], vlan_id: int
+) -> list[dict[str, str]]:
+    node_vlans = payload.get("node_vlans") or {}
+    client_details = payload.get("client_details") or {}
+    node_names = payload.get("node_names") or {}
+    clients: list[dict[str, str]] = []
+    for mac, vlan in node_vlans.items():
+        if vlan != vlan_id:
+            continue
+        details = client_details.get(mac) or {}
+        name = details.get("name") or node_names.get(mac) or mac
+        clients.append({"mac": mac, "name": str(name)})
+    return sorted(clients, key=lambda client: client["name"].lower())
+
+
+@websocket_api.websocket_command(  # type: ignore[reportUntypedFunctionDecorator]
+    {
+        vol.Required("type"): "unifi_network_map/path",
+        vol.Required("entry_id"): str,
+        vol.Required("mac"): str,
+    }
+)
+@callback  # type: ignore[reportUntypedFunctionDecorator]
+def websocket_node_path(
+    hass: HomeAssistant,
+    connection: ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return a node's uplink path, from the node up to its gateway."""
+    found = _topology_node(hass, connection, msg)
+    if found is None:
+        return
+    coordinator, topology, mac = found
+    payload = coordinator.data.payload if coordinator.data else {}
+    node_names = payload.get("node_names") or {}
+    node_types = payload.get("node_types") or {}
+    connection.send_result(
+        msg["id"],
+        {
+            "mac": mac,
+            "path": [
+                {
+                    "mac": hop,
+                    "name": node_names.get(hop),
+                    "type": node_types.get(hop),
+                    "uplink_port": topology.uplink_ports.get(hop),
+                }
+                for hop in topology.path_to_gateway(mac) or []
+            ],
+        },
+    )
+
+
+@websocket_api.websocket_command(  # type: ignore[reportUntypedFunctionDecorator]
+    {
+        vol.Required("type"): "unifi_network_map/neighbors",
+        vol.Required("entry_id"): str,
+        vol.Required("mac"): str,
+    }
+)
+@callback  # type: ignore[reportUntypedFunctionDecorator]
+def websocket_node_neighbors(
+    hass: HomeAssistant,
+    connection: ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return a node's parent, children and what is on each of its ports."""
+    found = _topology_node(hass, connection, msg)
+    if found is None:
+        return
+    _coordinator, topology, mac = found
+    connection.send_result(
+        msg["id"], {"mac": mac, **(topology.neighbors(mac) or {})}
+    )
+
+
+def _topology_node(
+    hass: HomeAssistant,
+    connection: ActiveConnection,
+    msg: dict[str, Any],
+) -> tuple[UniFiNetworkMapCoordinator, TopologyIndex, str] | None:
+    """Resolve a topology command's entry and node, or send the error."""
+    entry_id = msg["entry_id"]
+    coordinator = _get_coordinator(hass, entry_id)
+    if coordinator is None:
+        connection.send_error(
+            msg["id"], "not_found", f"Entry {entry_id} not found"
+        )
+        return None
+    topology = coordinator.data.topology if coordinator.data else None
+    if topology is None:
+        connection.send_error(
+            msg["id"], "no_data", "Coordinator has no data yet"
+        )
+        return None
+    mac = canonical_mac(msg["mac"])
+    if mac is None or mac not in topology.nodes:
+        connection.send_error(
+            msg["id"], "not_found", f"Node {msg['mac']} is not on the map"
+        )
+        return None
+    return coordinator, topology, mac
 
 
 def _get_coordinator(
@@ -88,17 +315,29 @@ def _get_coordinator(
     return None
 
 
+def _get_data(
+    coordinator: UniFiNetworkMapCoordinator,
+) -> UniFiNetworkMapData | None:
+    # None until the coordinator's first successful refresh.
+    return coordinator.data
+
+
 def _build_payload(
     hass: HomeAssistant,
     coordinator: UniFiNetworkMapCoordinator,
     entry_id: str,
+    schema_version: str = PAYLOAD_SCHEMA_VERSION,
+    fields: tuple[str, ...] | None = None,
 ) -> dict[str, Any]:
     """Build the enriched payload via the shared hash+TTL cache.
 
     Sharing the HTTP view's cache means N subscribers cost one
-    enrichment per coordinator update instead of one each.
+    enrichment (and one compact encoding) per coordinator update
+    instead of one each.
     """
     data = coordinator.data
     if data is None:
         return {}
-    return get_or_build_enriched_payload(hass, entry_id, data.payload)
+    return get_or_build_payload_for_schema(
+        hass, entry_id, data.payload, schema_version, fields
+    )
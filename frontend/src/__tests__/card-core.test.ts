@@ -1,3 +1,4 @@
+import { MAP_FIELDS } from "../card/data/compact-payload";
 import type { ConfigurableCard } from "./test-helpers";
 import { flushPromises, makeSvg, resetTestDom, samplePayload } from "./test-helpers";
 
@@ -247,12 +248,22 @@ describe("unifi-network-map card core", () => {
 
     expect(subscribeMessage).toHaveBeenCalledWith(
       expect.any(Function),
-      { type: "unifi_network_map/subscribe", entry_id: "entry-1" },
+      {
+        type: "unifi_network_map/subscribe",
+        entry_id: "entry-1",
+        schema_version: "3.0",
+        fields: MAP_FIELDS,
+      },
       { resubscribe: true },
     );
     expect(subscribeMessage).toHaveBeenCalledWith(
       expect.any(Function),
-      { type: "unifi_network_map/subscribe", entry_id: "entry-2" },
+      {
+        type: "unifi_network_map/subscribe",
+        entry_id: "entry-2",
+        schema_version: "3.0",
+        fields: MAP_FIELDS,
+      },
       { resubscribe: true },
     );
     expect(unsubscribeFirst).toHaveBeenCalledTimes(1);
@@ -25,7 +25,7 @@ import {
   ZOOM_INCREMENT,
 } from "../card/shared/constants";
 import type { ConfigurableCard } from "./test-helpers";
-import { makeSvg, resetTestDom } from "./test-helpers";
+import { flushPromises, makeSvg, resetTestDom } from "./test-helpers";
 
 const viewportOptions = () => ({
   minPanMovementThreshold: MIN_PAN_MOVEMENT_THRESHOLD,
@@ -120,6 +120,147 @@ describe("unifi-network-map card interaction", () => {
     expect(events).toHaveLength(0);
   });
 
+  describe("with a lazy payload", () => {
+    const mac = "aa:bb:cc:dd:ee:ff";
+    type LazyCard = {
+      _payload?: unknown;
+      _config?: unknown;
+      _hass?: unknown;
+      _handleRestartDevice: (nodeId: string) => void;
+      _showEntityModal: (nodeId: string) => void;
+      _renderPanelContent: () => string;
+      _viewportCallbacks: () => ViewportCallbacks;
+    };
+
+    const lazyCard = () => {
+      const element = document.createElement("unifi-network-map") as ConfigurableCard;
+      const card = element as unknown as LazyCard;
+      const callWS = jest.fn().mockResolvedValue({
+        related_entities: {
+          [mac]: [
+            {
+              entity_id: "device_tracker.office_ap",
+              domain: "device_tracker",
+              state: "home",
+              ip: "192.168.1.20",
+            },
+            { entity_id: "button.office_ap_restart", domain: "button", state: null },
+          ],
+        },
+      });
+      card._payload = {
+        edges: [],
+        node_types: { [mac]: "ap" },
+        node_entities: { [mac]: "device_tracker.office_ap" },
+        related_entities_lazy: true,
+      };
+      card._config = { entry_id: "entry-1" };
+      card._hass = { callWS };
+      return { element, card, callWS };
+    };
+
+    it("restart resolves the node's related entities first", async () => {
+      const { element, card, callWS } = lazyCard();
+      const events: CustomEvent[] = [];
+      element.addEventListener("hass-action", (event) => events.push(event as CustomEvent));
+
+      card._handleRestartDevice(mac);
+      expect(events).toHaveLength(0);
+      await flushPromises();
+
+      expect(callWS).toHaveBeenCalledWith({
+        type: "unifi_network_map/related_entities",
+        entry_id: "entry-1",
+        macs: [mac],
+      });
+      expect(events).toHaveLength(1);
+      const detail = events[0].detail as { target: { entity_id: string } };
+      expect(detail.target.entity_id).toBe("button.office_ap_restart");
+    });
+
+    it("entity modal opens with the fetched related entities", async () => {
+      const { card, callWS } = lazyCard();
+
+      card._showEntityModal(mac);
+      card._showEntityModal(mac);
+      await flushPromises();
+
+      expect(callWS).toHaveBeenCalledTimes(1);
+      expect(document.querySelectorAll(".entity-modal-overlay")).toHaveLength(1);
+      expect(
+        document.querySelector('[data-modal-entity-id="button.office_ap_restart"]'),
+      ).not.toBeNull();
+    });
+
+    it("selecting a node fetches its related entities, rendering does not", async () => {
+      const { card, callWS } = lazyCard();
+
+      card._renderPanelContent();
+      await flushPromises();
+      expect(callWS).not.toHaveBeenCalled();
+
+      card._viewportCallbacks().onNodeSelected(mac);
+      await flushPromises();
+      expect(callWS).toHaveBeenCalledTimes(1);
+      expect(callWS).toHaveBeenCalledWith({
+        type: "unifi_network_map/related_entities",
+        entry_id: "entry-1",
+        macs: [mac],
+      });
+    });
+
+    it("context menu falls back to the related entities' IP", async () => {
+      const { card } = lazyCard();
+
+      card._viewportCallbacks().onOpenContextMenu(10, 10, mac);
+      expect(document.querySelector(".context-menu")).toBeNull();
+      await flushPromises();
+
+      const copyIp = document.querySelector('[data-context-action="copy-ip"]');
+      expect(copyIp?.getAttribute("data-ip")).toBe("192.168.1.20");
+    });
+  });
+
+  it("port modal fetches the device's ports once it opens", async () => {
+    const mac = "aa:bb:cc:dd:ee:01";
+    const port = {
+      port: 7,
+      name: "Port 7",
+      speed: 1000,
+      poe_enabled: false,
+      poe_active: false,
+      poe_power: null,
+    };
+    const fetchMock = jest.fn().mockResolvedValue({
+      ok: true,
+      status: 200,
+      json: () => Promise.resolve({ mac, device_ports: [port] }),
+    });
+    (globalThis as { fetch?: typeof fetch }).fetch = fetchMock;
+    const element = document.createElement("unifi-network-map") as ConfigurableCard;
+    const card = element as unknown as {
+      _payload?: { device_ports?: unknown };
+      _config?: unknown;
+      _hass?: unknown;
+      _showPortModal: (nodeId: string) => void;
+    };
+    card._payload = { edges: [], node_types: { [mac]: "switch" } };
+    card._config = { entry_id: "entry-1" };
+    card._hass = { auth: { data: { access_token: "token" } } };
+
+    card._showPortModal(mac);
+    expect(document.querySelector(".port-modal")).toBeNull();
+    await flushPromises();
+
+    expect(fetchMock).toHaveBeenCalledTimes(1);
+    expect(fetchMock).toHaveBeenCalledWith(
+      "/api/unifi_network_map/entry-1/nodes/aa%3Abb%3Acc%3Add%3Aee%3A01/device_ports",
+      expect.anything(),
+    );
+    expect(card._payload.device_ports).toEqual({ [mac]: [port] });
+    expect(document.querySelector(".port-modal")).not.toBeNull();
+  });
+
   it("resolves node name from text element in event path", () => {
     const text = document.createElement("text");
     text.textContent = "Path Text";
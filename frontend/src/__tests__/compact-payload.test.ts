@@ -0,0 +1,99 @@
+import {
+  expandPayload,
+  MAP_FIELDS,
+  withCompactSchema,
+  withMapFields,
+} from "../card/data/compact-payload";
+
+describe("compact-payload", () => {
+  describe("withCompactSchema", () => {
+    it("requests schema 3 from the integration payload view", () => {
+      expect(withCompactSchema("/api/unifi_network_map/entry-1/payload")).toBe(
+        "/api/unifi_network_map/entry-1/payload?schema_version=3",
+      );
+    });
+
+    it("appends to an existing query string", () => {
+      expect(withCompactSchema("/api/unifi_network_map/entry-1/payload?a=1")).toBe(
+        "/api/unifi_network_map/entry-1/payload?a=1&schema_version=3",
+      );
+    });
+
+    it("leaves custom and already negotiated URLs alone", () => {
+      expect(withCompactSchema("/map.json")).toBe("/map.json");
+      expect(withCompactSchema("/api/unifi_network_map/e/payload?schema_version=2")).toBe(
+        "/api/unifi_network_map/e/payload?schema_version=2",
+      );
+    });
+  });
+
+  describe("withMapFields", () => {
+    it("asks the integration for the sections the card renders", () => {
+      const url = withMapFields("/api/unifi_network_map/entry-1/payload?schema_version=3");
+      expect(url).toBe(
+        `/api/unifi_network_map/entry-1/payload?schema_version=3&fields=${MAP_FIELDS.join(",")}`,
+      );
+      expect(MAP_FIELDS).not.toContain("device_ports");
+      expect(MAP_FIELDS).not.toContain("client_details");
+    });
+
+    it("leaves custom and already projected URLs alone", () => {
+      expect(withMapFields("/map.json")).toBe("/map.json");
+      expect(withMapFields("/api/unifi_network_map/e/payload?fields=edges")).toBe(
+        "/api/unifi_network_map/e/payload?fields=edges",
+      );
+    });
+  });
+
+  describe("expandPayload", () => {
+    it("returns schema 2 payloads unchanged", () => {
+      const payload = { schema_version: "2.0", edges: [], node_types: { a: "switch" } };
+      expect(expandPayload(payload)).toBe(payload);
+    });
+
+    it("expands every compact section back to MAC-keyed maps", () => {
+      const expanded = expandPayload({
+        schema_version: "3.0",
+        nodes: ["gw", "sw", "cl", "up"],
+        node_types: ["gateway", "switch", "client", null],
+        node_names: ["Gateway", null, "Laptop", null],
+        gateways: [0],
+        edges: { left: [0, 1], right: [1, 2], poe: [false, true] },
+        client_ips: { node: [2], value: ["10.0.0.5"] },
+        device_ports: { node: [1], value: [[{ port: 1 }]] },
+        device_details: { node: [1], mac: [1], model: ["USW"], uplink_device: [3] },
+        client_details: { node: [2], connected_to_mac: [null] },
+        vlan_info: { 1: { id: 1, name: "LAN" } },
+        vpn_tunnels: [],
+      });
+
+      expect(expanded).toEqual({
+        schema_version: "3.0",
+        node_types: { gw: "gateway", sw: "switch", cl: "client" },
+        node_names: { gw: "Gateway", cl: "Laptop" },
+        gateways: ["gw"],
+        edges: [
+          { left: "gw", right: "sw", poe: false },
+          { left: "sw", right: "cl", poe: true },
+        ],
+        client_ips: { cl: "10.0.0.5" },
+        device_ports: { sw: [{ port: 1 }] },
+        device_details: { sw: { mac: "sw", model: "USW", uplink_device: "up" } },
+        client_details: { cl: { connected_to_mac: null } },
+        vlan_info: { 1: { id: 1, name: "LAN" } },
+        vpn_tunnels: [],
+      });
+    });
+
+    it("expands empty edge tables to an empty list", () => {
+      const expanded = expandPayload({
+        schema_version: "3.0",
+        nodes: [],
+        node_types: [],
+        edges: { left: [], right: [] },
+      });
+      expect(expanded.edges).toEqual([]);
+      expect(expanded.node_types).toEqual({});
+    });
+  });
+});
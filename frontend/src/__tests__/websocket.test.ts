@@ -1,4 +1,5 @@
-import { subscribeMapUpdates } from "../card/data/websocket";
+import { MAP_FIELDS } from "../card/data/compact-payload";
+import { fetchRelatedEntities, subscribeMapUpdates } from "../card/data/websocket";
 import type { Hass, MapPayload } from "../card/core/types";
 
 describe("websocket", () => {
@@ -43,7 +44,12 @@ describe("websocket", () => {
       }
       expect(mockSubscribeMessage).toHaveBeenCalledWith(
         expect.any(Function),
-        { type: "unifi_network_map/subscribe", entry_id: "entry123" },
+        {
+          type: "unifi_network_map/subscribe",
+          entry_id: "entry123",
+          schema_version: "3.0",
+          fields: MAP_FIELDS,
+        },
         { resubscribe: true },
       );
     });
@@ -67,6 +73,35 @@ describe("websocket", () => {
       expect(onUpdate).toHaveBeenCalledWith(testPayload);
     });
 
+    it("expands compact payloads before calling onUpdate", async () => {
+      let messageCallback: ((msg: { payload: unknown }) => void) | undefined;
+      const mockSubscribeMessage = jest.fn().mockImplementation((callback) => {
+        messageCallback = callback;
+        return Promise.resolve(jest.fn());
+      });
+      const hass = {
+        connection: { subscribeMessage: mockSubscribeMessage },
+      } as unknown as Hass;
+      const onUpdate = jest.fn();
+
+      await subscribeMapUpdates(hass, "entry123", onUpdate);
+
+      messageCallback?.({
+        payload: {
+          schema_version: "3.0",
+          nodes: ["aa", "bb"],
+          node_types: ["switch", "ap"],
+          edges: { left: [0], right: [1] },
+        },
+      });
+
+      expect(onUpdate).toHaveBeenCalledWith({
+        schema_version: "3.0",
+        node_types: { aa: "switch", bb: "ap" },
+        edges: [{ left: "aa", right: "bb" }],
+      });
+    });
+
     it("returns error reason when subscription fails with Error", async () => {
       const mockSubscribeMessage = jest.fn().mockRejectedValue(new Error("Connection lost"));
       const hass = {
@@ -97,4 +132,28 @@ describe("websocket", () => {
       }
     });
   });
+
+  describe("fetchRelatedEntities", () => {
+    it("requests the given nodes and returns their entities", async () => {
+      const related = { "aa:bb": [{ entity_id: "sensor.a", domain: "sensor", state: "1" }] };
+      const callWS = jest.fn().mockResolvedValue({ related_entities: related });
+      const hass = { callWS } as unknown as Hass;
+
+      const result = await fetchRelatedEntities(hass, "entry123", ["aa:bb"]);
+
+      expect(result).toEqual(related);
+      expect(callWS).toHaveBeenCalledWith({
+        type: "unifi_network_map/related_entities",
+        entry_id: "entry123",
+        macs: ["aa:bb"],
+      });
+    });
+
+    it("returns null without callWS or when the call fails", async () => {
+      const failing = { callWS: jest.fn().mockRejectedValue(new Error("nope")) };
+
+      expect(await fetchRelatedEntities({} as Hass, "entry123", ["aa:bb"])).toBeNull();
+      expect(await fetchRelatedEntities(failing as unknown as Hass, "entry123", ["aa:bb"])).toBeNull();
+    });
+  });
 });
@@ -184,6 +184,7 @@ export type MapPayload = {
   client_ips?: Record<string, string>;
   device_ips?: Record<string, string>;
   related_entities?: Record<string, RelatedEntity[]>;
+  related_entities_lazy?: boolean;
   node_vlans?: Record<string, number | null>;
   vlan_info?: Record<number, VlanInfo>;
   ap_client_counts?: Record<string, number>;
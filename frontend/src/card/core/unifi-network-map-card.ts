@@ -21,8 +21,8 @@ import { renderContextMenu } from "../ui/context-menu";
 import { MISSING_AUTH_ERROR, fetchWithAuth } from "../data/auth";
 import type { AuthFetchResult } from "../data/auth";
 import { showToast } from "../shared/feedback";
-import { loadPayload, loadSvg, type SvgLoadResult } from "../data/data";
-import { subscribeMapUpdates } from "../data/websocket";
+import { loadMapPayload, loadNodeSection, loadSvg, type SvgLoadResult } from "../data/data";
+import { fetchRelatedEntities, subscribeMapUpdates } from "../data/websocket";
 import { normalizeConfig, startPolling, stopPolling } from "./state";
 import { createLocalize } from "../shared/localize";
 import {
@@ -56,6 +56,7 @@ import { CARD_STYLES, GLOBAL_STYLES } from "../ui/styles";
 import { assignVlanColors, generateVlanStyles } from "../ui/vlan-colors";
 import type {
   CardConfig,
+  DevicePort,
   DeviceType,
   DeviceTypeFilters,
   Edge,
@@ -246,6 +247,8 @@ export class UnifiNetworkMapCard extends HTMLElement {
   private _entityModal = createEntityModalController();
   private _contextMenu = createContextMenuController();
   private _portModal = createPortModalController();
+  private _relatedEntitiesPending = new Map<string, Promise<void>>();
+  private _devicePortsPending = new Map<string, Promise<void>>();
   private _filterState: DeviceTypeFilters = createFilterState();
   private _wsUnsubscribe?: UnsubscribeFunc;
   private _wsSubscribed = false;
@@ -397,7 +400,7 @@ export class UnifiNetworkMapCard extends HTMLElement {
       return;
     }
     this._preparePayloadLoadingOverlay(request.isRefresh);
-    const result = await loadPayload<MapPayload>(
+    const result = await loadMapPayload(
       this._fetchWithAuth.bind(this),
       request.url,
       request.controller.signal,
@@ -551,10 +554,12 @@ export class UnifiNetworkMapCard extends HTMLElement {
     const svg = this.querySelector(".unifi-network-map__viewport svg") as SVGElement | null;
     if (this._error || !this._svgContent || !svg) {
       this._render();
-      return;
+    } else {
+      this._wireInteractions();
+      this._updateSelectionOnly();
     }
-    this._wireInteractions();
-    this._updateSelectionOnly();
+    // A new payload drops related entities loaded for the open panel.
+    void this._ensureRelatedEntities(this._selection.selectedNode);
   }
 
   private _renderPreview(): string {
@@ -717,6 +722,56 @@ export class UnifiNetworkMapCard extends HTMLElement {
     );
   }
 
+  private _ensureRelatedEntities(nodeId: string | null | undefined): Promise<void> | null {
+    // Large sites ship the payload without related entities; resolve a
+    // node's on demand. Returns null when there is nothing to load.
+    const payload = this._payload;
+    const entryId = this._config?.entry_id;
+    const hass = this._hass;
+    if (!nodeId || !entryId || !hass || !payload?.related_entities_lazy) {
+      return null;
+    }
+    if (payload.related_entities?.[nodeId]) {
+      return null;
+    }
+    const pending = this._relatedEntitiesPending.get(nodeId);
+    if (pending) {
+      return pending;
+    }
+    const request = this._loadRelatedEntities(hass, entryId, payload, nodeId).finally(() => {
+      this._relatedEntitiesPending.delete(nodeId);
+    });
+    this._relatedEntitiesPending.set(nodeId, request);
+    return request;
+  }
+
+  private async _loadRelatedEntities(
+    hass: Hass,
+    entryId: string,
+    payload: MapPayload,
+    nodeId: string,
+  ): Promise<void> {
+    const related = await fetchRelatedEntities(hass, entryId, [nodeId]);
+    if (!related || this._payload !== payload) {
+      return;
+    }
+    payload.related_entities = { ...payload.related_entities, [nodeId]: related[nodeId] ?? [] };
+    if (this._selection.selectedNode === nodeId) {
+      this._updateSelectionOnly();
+    }
+  }
+
+  private _withRelatedEntities(nodeId: string, action: () => void): void {
+    // Runs at once unless the node's related entities are still to be
+    // loaded; then once they are in (or failed to load).
+    const loading = this._ensureRelatedEntities(nodeId);
+    if (loading) {
+      void loading.then(action);
+    } else {
+      action();
+    }
+  }
+
   private _panelHelpers() {
     const theme = this._config?.theme ?? "dark";
     return {
@@ -1108,6 +1163,10 @@ export class UnifiNetworkMapCard extends HTMLElement {
   }
 
   private _showEntityModal(nodeId: string): void {
+    this._withRelatedEntities(nodeId, () => this._openEntityModal(nodeId));
+  }
+
+  private _openEntityModal(nodeId: string): void {
     openEntityModal({
       controller: this._entityModal,
       nodeId,
@@ -1206,6 +1265,53 @@ export class UnifiNetworkMapCard extends HTMLElement {
   }
 
   private _showPortModal(nodeId: string): void {
+    const loading = this._ensureDevicePorts(nodeId);
+    if (loading) {
+      void loading.then(() => this._openPortModal(nodeId));
+    } else {
+      this._openPortModal(nodeId);
+    }
+  }
+
+  private _ensureDevicePorts(nodeId: string): Promise<void> | null {
+    // The map payload leaves device_ports out; fetch a device's port table
+    // when its port modal opens. Returns null when there is nothing to load.
+    const payload = this._payload;
+    const entryId = this._config?.entry_id;
+    if (!entryId || !payload || payload.device_ports?.[nodeId]) {
+      return null;
+    }
+    const pending = this._devicePortsPending.get(nodeId);
+    if (pending) {
+      return pending;
+    }
+    const request = this._loadDevicePorts(entryId, payload, nodeId).finally(() => {
+      this._devicePortsPending.delete(nodeId);
+    });
+    this._devicePortsPending.set(nodeId, request);
+    return request;
+  }
+
+  private async _loadDevicePorts(
+    entryId: string,
+    payload: MapPayload,
+    nodeId: string,
+  ): Promise<void> {
+    const result = await loadNodeSection<DevicePort[]>(
+      this._fetchWithAuth.bind(this),
+      entryId,
+      nodeId,
+      "device_ports",
+      new AbortController().signal,
+    );
+    // On failure the modal falls back to the ports seen on the map's edges.
+    if (!("data" in result) || !Array.isArray(result.data) || this._payload !== payload) {
+      return;
+    }
+    payload.device_ports = { ...payload.device_ports, [nodeId]: result.data };
+  }
+
+  private _openPortModal(nodeId: string): void {
     openPortModal({
       controller: this._portModal,
       nodeId,
@@ -1233,6 +1339,7 @@ export class UnifiNetworkMapCard extends HTMLElement {
     }
     selectNode(this._selection, deviceName);
     this._render();
+    void this._ensureRelatedEntities(deviceName);
   }
 
   private _removePortModal(): void {
@@ -1244,6 +1351,10 @@ export class UnifiNetworkMapCard extends HTMLElement {
   }
 
   private _handleRestartDevice(nodeId: string): void {
+    this._withRelatedEntities(nodeId, () => this._pressRestartButton(nodeId));
+  }
+
+  private _pressRestartButton(nodeId: string): void {
     const restartEntityId = this._findRestartButtonEntity(nodeId);
 
     if (!restartEntityId) {
@@ -1327,6 +1438,7 @@ export class UnifiNetworkMapCard extends HTMLElement {
       onNodeSelected: (nodeId: string) => {
         selectNode(this._selection, nodeId);
         this._updateSelectionOnly();
+        void this._ensureRelatedEntities(nodeId);
       },
       onHoverEdge: (edge: Edge | null) => {
         setHoveredEdge(this._selection, edge);
@@ -1336,8 +1448,14 @@ export class UnifiNetworkMapCard extends HTMLElement {
       },
       onOpenContextMenu: (x: number, y: number, nodeId: string) => {
         this._removeContextMenu();
-        this._contextMenu.menu = { nodeId, x, y };
-        this._showContextMenu();
+        const menu = { nodeId, x, y };
+        this._contextMenu.menu = menu;
+        // The menu's IP may come from the node's related entities.
+        this._withRelatedEntities(nodeId, () => {
+          if (this._contextMenu.menu === menu && !this._contextMenu.element) {
+            this._showContextMenu();
+          }
+        });
       },
       onUpdateTransform: (transform: { x: number; y: number; scale: number }) => {
         this._viewportState.viewTransform = transform;
@@ -0,0 +1,156 @@
+import { DOMAIN } from "../shared/constants";
+import type { MapPayload } from "../core/types";
+
+export const COMPACT_SCHEMA_VERSION = "3.0";
+
+type Column = unknown[];
+type Table = Record<string, Column>;
+type CompactPayload = Record<string, unknown> & { nodes: string[] };
+
+const NODE_COLUMNS = new Set(["node_types", "node_names"]);
+const EDGE_NODE_FIELDS = new Set(["left", "right"]);
+const MAC_RECORD_FIELDS = new Set(["mac", "uplink_device", "connected_to_mac"]);
+
+export function withCompactSchema(url: string): string {
+  // Only the integration's own payload view understands schema negotiation.
+  if (!url.startsWith(`/api/${DOMAIN}/`) || /[?&]schema_version=/.test(url)) {
+    return url;
+  }
+  const separator = url.includes("?") ? "&" : "?";
+  return `${url}${separator}schema_version=3`;
+}
+
+// Sections the card renders from. The port table is fetched per device when
+// its port modal opens, and client_details is not shown by the card.
+export const MAP_FIELDS = [
+  "edges",
+  "node_types",
+  "node_names",
+  "gateways",
+  "client_entities",
+  "device_entities",
+  "node_entities",
+  "node_status",
+  "client_ips",
+  "device_ips",
+  "related_entities",
+  "related_entities_lazy",
+  "node_vlans",
+  "vlan_info",
+  "ap_client_counts",
+  "device_details",
+  "vpn_tunnels",
+];
+
+export function withMapFields(url: string): string {
+  if (!url.startsWith(`/api/${DOMAIN}/`) || /[?&]fields=/.test(url)) {
+    return url;
+  }
+  const separator = url.includes("?") ? "&" : "?";
+  return `${url}${separator}fields=${MAP_FIELDS.join(",")}`;
+}
+
+export function expandPayload(raw: unknown): MapPayload {
+  if (!isCompactPayload(raw)) {
+    return raw as MapPayload;
+  }
+  const nodes = raw.nodes;
+  const mac = (value: unknown): unknown =>
+    typeof value === "number" && value >= 0 && value < nodes.length ? nodes[value] : value;
+  const expanded: Record<string, unknown> = {};
+  for (const [key, value] of Object.entries(raw)) {
+    if (key === "nodes") {
+      continue;
+    }
+    expanded[key] = expandSection(key, value, nodes, mac);
+  }
+  return expanded as MapPayload;
+}
+
+function isCompactPayload(raw: unknown): raw is CompactPayload {
+  if (!raw || typeof raw !== "object") {
+    return false;
+  }
+  const payload = raw as Record<string, unknown>;
+  return payload.schema_version === COMPACT_SCHEMA_VERSION && Array.isArray(payload.nodes);
+}
+
+function expandSection(
+  key: string,
+  value: unknown,
+  nodes: string[],
+  mac: (value: unknown) => unknown,
+): unknown {
+  if (NODE_COLUMNS.has(key) && Array.isArray(value)) {
+    return expandNodeColumn(value, nodes);
+  }
+  if (key === "gateways" && Array.isArray(value)) {
+    return value.map(mac);
+  }
+  if (!isTable(value)) {
+    return value;
+  }
+  if (key === "edges") {
+    return expandRows(value, (field, item) => (EDGE_NODE_FIELDS.has(field) ? mac(item) : item));
+  }
+  if (!Array.isArray(value.node)) {
+    return value;
+  }
+  return expandNodeTable(value, nodes, mac);
+}
+
+function expandNodeColumn(column: Column, nodes: string[]): Record<string, unknown> {
+  const result: Record<string, unknown> = {};
+  column.forEach((item, index) => {
+    if (item !== null && item !== undefined) {
+      result[nodes[index]] = item;
+    }
+  });
+  return result;
+}
+
+function expandNodeTable(
+  table: Table,
+  nodes: string[],
+  mac: (value: unknown) => unknown,
+): Record<string, unknown> {
+  const result: Record<string, unknown> = {};
+  const rows = table.node;
+  if ("value" in table) {
+    rows.forEach((node, index) => {
+      result[nodes[node as number]] = table.value[index];
+    });
+    return result;
+  }
+  const records = expandRows(table, (field, item) =>
+    MAC_RECORD_FIELDS.has(field) ? mac(item) : item,
+  );
+  rows.forEach((node, index) => {
+    result[nodes[node as number]] = records[index];
+  });
+  return result;
+}
+
+function expandRows(
+  table: Table,
+  decode: (field: string, item: unknown) => unknown,
+): Record<string, unknown>[] {
+  const fields = Object.keys(table).filter((field) => field !== "node");
+  const count = Math.max(0, ...fields.map((field) => table[field].length));
+  const rows: Record<string, unknown>[] = [];
+  for (let index = 0; index < count; index += 1) {
+    const row: Record<string, unknown> = {};
+    for (const field of fields) {
+      row[field] = decode(field, table[field][index]);
+    }
+    rows.push(row);
+  }
+  return rows;
+}
+
+function isTable(value: unknown): value is Table {
+  if (!value || typeof value !== "object" || Array.isArray(value)) {
+    return false;
+  }
+  return Object.values(value).every((column) => Array.isArray(column));
+}
@@ -1,4 +1,7 @@
+import type { MapPayload } from "../core/types";
+import { DOMAIN } from "../shared/constants";
 import type { AuthFetchResult } from "./auth";
+import { expandPayload, withCompactSchema, withMapFields } from "./compact-payload";
 
 export type FetchWithAuth = <T>(
   url: string,
@@ -30,3 +33,27 @@ export async function loadPayload<T>(
 ): Promise<AuthFetchResult<T>> {
   return fetchWithAuth(url, signal, (response) => response.json());
 }
+
+export async function loadMapPayload(
+  fetchWithAuth: FetchWithAuth,
+  url: string,
+  signal: AbortSignal,
+): Promise<AuthFetchResult<MapPayload>> {
+  return fetchWithAuth(withMapFields(withCompactSchema(url)), signal, async (response) =>
+    expandPayload(await response.json()),
+  );
+}
+
+export async function loadNodeSection<T>(
+  fetchWithAuth: FetchWithAuth,
+  entryId: string,
+  nodeId: string,
+  section: "device_ports" | "related_entities",
+  signal: AbortSignal,
+): Promise<AuthFetchResult<T>> {
+  const url = `/api/${DOMAIN}/${entryId}/nodes/${encodeURIComponent(nodeId)}/${section}`;
+  return fetchWithAuth(url, signal, async (response) => {
+    const body = (await response.json()) as Record<string, unknown>;
+    return body[section] as T;
+  });
+}
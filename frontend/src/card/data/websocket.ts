@@ -1,10 +1,11 @@
-import type { Hass, MapPayload, UnsubscribeFunc } from "../core/types";
+import type { Hass, MapPayload, RelatedEntity, UnsubscribeFunc } from "../core/types";
+import { COMPACT_SCHEMA_VERSION, MAP_FIELDS, expandPayload } from "./compact-payload";
 
 export type SubscribeResult =
   { subscribed: true; unsubscribe: UnsubscribeFunc } | { subscribed: false; reason: string };
 
 type MapUpdateMessage = {
-  payload: MapPayload;
+  payload: unknown;
 };
 
 export async function subscribeMapUpdates(
@@ -18,8 +19,13 @@ export async function subscribeMapUpdates(
 
   try {
     const unsubscribe = await hass.connection.subscribeMessage<MapUpdateMessage>(
-      (msg) => onUpdate(msg.payload),
-      { type: "unifi_network_map/subscribe", entry_id: entryId },
+      (msg) => onUpdate(expandPayload(msg.payload)),
+      {
+        type: "unifi_network_map/subscribe",
+        entry_id: entryId,
+        schema_version: COMPACT_SCHEMA_VERSION,
+        fields: MAP_FIELDS,
+      },
       { resubscribe: true },
     );
 
@@ -29,3 +35,27 @@ export async function subscribeMapUpdates(
     return { subscribed: false, reason };
   }
 }
+
+type RelatedEntitiesResult = {
+  related_entities: Record<string, RelatedEntity[]>;
+};
+
+export async function fetchRelatedEntities(
+  hass: Hass,
+  entryId: string,
+  macs: string[],
+): Promise<Record<string, RelatedEntity[]> | null> {
+  if (!hass.callWS || macs.length === 0) {
+    return null;
+  }
+  try {
+    const result = await hass.callWS<RelatedEntitiesResult>({
+      type: "unifi_network_map/related_entities",
+      entry_id: entryId,
+      macs,
+    });
+    return result.related_entities;
+  } catch {
+    return null;
+  }
+}
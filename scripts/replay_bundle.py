@@ -0,0 +1,114 @@
+"""Replay a recorded controller bundle and report per-stage timings.
+
+Runs the bundle's devices, clients and networks through the renderer,
+the payload hash, the compact schema and the JSON/MessagePack encoders,
+without Home Assistant or a controller:
+
+    python scripts/replay_bundle.py bundle-<entry>-<ts>.json.gz --repeat 5
+
+Enrichment needs Home Assistant's registries; run the bundle through the
+benchmark suite for that (``BENCHMARK_BUNDLE=<path> make benchmark``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from custom_components.unifi_network_map.bundle import (  # noqa: E402
+    load_bundle,
+)
+from custom_components.unifi_network_map.payload_cache import (  # noqa: E402
+    compute_payload_hash,
+)
+from custom_components.unifi_network_map.payload_encoding import (  # noqa: E402
+    PAYLOAD_ENCODING_JSON,
+    PAYLOAD_ENCODING_MSGPACK,
+    encode_payload,
+)
+from custom_components.unifi_network_map.payload_schema import (  # noqa: E402
+    encode_compact_payload,
+)
+from custom_components.unifi_network_map.renderer import (  # noqa: E402
+    UniFiNetworkMapRenderer,
+    render_themed_svg,
+)
+from custom_components.unifi_network_map.stage_timings import (  # noqa: E402
+    StageTimings,
+)
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("bundle", type=Path)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--theme", help="also time a themed re-render with this theme"
+    )
+    parser.add_argument(
+        "--isometric", action="store_true", help="render isometric SVGs"
+    )
+    return parser.parse_args(argv)
+
+
+def replay(
+    bundle_path: Path,
+    repeat: int,
+    theme: str | None = None,
+    isometric: bool = False,
+) -> StageTimings:
+    """Replay ``bundle_path`` ``repeat`` times and return the timings."""
+    bundle = load_bundle(bundle_path)
+    settings = bundle.settings()
+    if isometric:
+        settings = replace(settings, svg_isometric=True)
+    config = bundle.config()
+    timings = StageTimings(window=max(repeat, 1))
+    renderer = UniFiNetworkMapRenderer()
+    for _ in range(max(repeat, 1)):
+        with timings.measure("render"):
+            data = renderer.render(config, settings, timings, bundle.records)
+        with timings.measure("compute_payload_hash"):
+            compute_payload_hash(data.payload)
+        with timings.measure("compact_payload"):
+            encode_compact_payload(data.payload)
+        for encoding in (PAYLOAD_ENCODING_JSON, PAYLOAD_ENCODING_MSGPACK):
+            with timings.measure(f"encode_{encoding}"):
+                encode_payload(data.payload, encoding)
+        if theme:
+            with timings.measure("themed_svg"):
+                render_themed_svg(data, settings, theme, None)
+    return timings
+
+
+def main() -> int:
+    args = _parse_args(sys.argv[1:])
+    if not args.bundle.is_file():
+        print(f"Bundle not found: {args.bundle}", file=sys.stderr)
+        return 1
+    started = time.perf_counter()
+    try:
+        timings = replay(args.bundle, args.repeat, args.theme, args.isometric)
+    except ValueError as err:
+        print(f"Cannot replay {args.bundle}: {err}", file=sys.stderr)
+        return 1
+    summary = timings.summary()
+    print(f"{'stage':<24} {'runs':>5} {'p50 ms':>10} {'max ms':>10}")
+    for stage, values in summary.items():
+        print(
+            f"{stage:<24} {values['count']:>5}"
+            f" {values['p50_ms']:>10.1f} {values['max_ms']:>10.1f}"
+        )
+    print(f"total {time.perf_counter() - started:.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
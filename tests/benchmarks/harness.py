@@ -0,0 +1,207 @@
+"""Measurement, baseline and reporting helpers for the benchmarks.
+
+Every metric is a ``Measurement``: the fastest wall time over a few
+untraced runs, plus the peak traced memory of one extra run under
+tracemalloc (tracing slows code down, so the two are kept apart).
+
+Results are compared against ``baseline.json`` next to this module.
+Wall times vary between machines, so the baseline should be refreshed
+on the machine that runs the comparison (``BENCHMARK_UPDATE_BASELINE=1``).
+"""
+
+from __future__ import annotations
+
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+from custom_components.unifi_network_map import renderer
+from custom_components.unifi_network_map.stage_timings import StageTimings
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+
+BENCHMARK_DIR = Path(__file__).parent
+BASELINE_PATH = BENCHMARK_DIR / "baseline.json"
+RESULTS_PATH = BENCHMARK_DIR / "results" / "latest.json"
+
+
+@dataclass(frozen=True)
+class Measurement:
+    wall_ms: float
+    peak_kib: float
+
+
+class MemoryStageTimings(StageTimings):
+    """Stage timings that also record each stage's peak traced memory.
+
+    Only meaningful while tracemalloc is tracing, and only for stages that
+    do not nest (true for the renderer's stages).
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.peak_kib: dict[str, float] = {}
+
+    @contextmanager
+    def measure(self, stage: str) -> Iterator[None]:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        with super().measure(stage):
+            yield
+        _, peak = tracemalloc.get_traced_memory()
+        self.peak_kib[stage] = round(max(peak - start, 0) / 1024, 1)
+
+
+@contextmanager
+def controller_records(
+    devices: Sequence[object],
+    clients: Sequence[object],
+    networks: Sequence[object],
+) -> Iterator[None]:
+    """Serve fixed controller records to the renderer's fetch calls."""
+    with (
+        patch.object(renderer, "fetch_devices", lambda *_a, **_k: devices),
+        patch.object(renderer, "fetch_clients", lambda *_a, **_k: clients),
+        patch.object(renderer, "fetch_networks", lambda *_a, **_k: networks),
+    ):
+        yield
+
+
+def measure(func: Callable[[], object], repeat: int = 3) -> Measurement:
+    """Time ``func`` (fastest of ``repeat`` runs) and trace its peak memory."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return Measurement(wall_ms=round(best * 1000, 2), peak_kib=_peak_kib(func))
+
+
+def measure_render_stages(
+    render: Callable[[StageTimings], object], repeat: int = 3
+) -> dict[str, Measurement]:
+    """Measure ``render`` as a whole and per stage.
+
+    Stage wall times come from the fastest untraced run; stage peaks come
+    from a traced run.
+    """
+    best = float("inf")
+    best_timings = StageTimings()
+    for _ in range(repeat):
+        timings = StageTimings()
+        started = time.perf_counter()
+        render(timings)
+        elapsed = time.perf_counter() - started
+        if elapsed < best:
+            best, best_timings = elapsed, timings
+    # Stage tracing resets the peak, so the total is traced separately.
+    total_peak = _peak_kib(lambda: render(StageTimings()))
+    traced = MemoryStageTimings()
+    _peak_kib(lambda: render(traced))
+    results = {"render_map": Measurement(round(best * 1000, 2), total_peak)}
+    for stage, summary in best_timings.summary().items():
+        results[f"render_map.{stage}"] = Measurement(
+            summary["last_ms"], traced.peak_kib.get(stage, 0.0)
+        )
+    return results
+
+
+def _peak_kib(func: Callable[[], object]) -> float:
+    started_tracing = not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+    return round(max(peak - start, 0) / 1024, 1)
+
+
+def load_json(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def store_results(
+    path: Path, scale: str, results: dict[str, Measurement]
+) -> None:
+    """Merge one scale's results into the JSON file at ``path``."""
+    stored = load_json(path)
+    stored[scale] = {
+        metric: asdict(value) for metric, value in sorted(results.items())
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+
+
+def find_regressions(
+    results: dict[str, Measurement],
+    baseline: dict[str, dict[str, float]],
+    *,
+    wall_tolerance: float,
+    memory_tolerance: float,
+    min_wall_ms: float = 5.0,
+) -> list[str]:
+    """List metrics that got slower or bigger than the baseline allows.
+
+    Tolerances are fractions (0.5 allows 50% growth). Wall times under
+    ``min_wall_ms`` in the baseline are too noisy to compare.
+    """
+    regressions = []
+    for metric, current in sorted(results.items()):
+        previous = baseline.get(metric)
+        if previous is None:
+            continue
+        wall_limit = previous["wall_ms"] * (1 + wall_tolerance)
+        if previous["wall_ms"] >= min_wall_ms and current.wall_ms > wall_limit:
+            regressions.append(
+                f"{metric}: wall {current.wall_ms:.1f} ms"
+                f" > {previous['wall_ms']:.1f} ms baseline"
+            )
+        memory_limit = previous["peak_kib"] * (1 + memory_tolerance)
+        if previous["peak_kib"] >= 64 and current.peak_kib > memory_limit:
+            regressions.append(
+                f"{metric}: peak {current.peak_kib:.0f} KiB"
+                f" > {previous['peak_kib']:.0f} KiB baseline"
+            )
+    return regressions
+
+
+def format_report(
+    scale: str,
+    results: dict[str, Measurement],
+    baseline: dict[str, dict[str, float]],
+) -> str:
+    lines = [
+        f"benchmark scale={scale}",
+        (
+            f"{'metric':<36} {'wall ms':>10} {'base':>10}"
+            f" {'peak KiB':>11} {'base':>11}"
+        ),
+    ]
+    for metric, current in sorted(results.items()):
+        previous = baseline.get(metric, {})
+        lines.append(
+            f"{metric:<36} {current.wall_ms:>10.2f}"
+            f" {_cell(previous.get('wall_ms'), '.2f'):>10}"
+            f" {current.peak_kib:>11.1f}"
+            f" {_cell(previous.get('peak_kib'), '.1f'):>11}"
+        )
+    return "\n".join(lines)
+
+
+def _cell(value: float | None, spec: str) -> str:
+    return "-" if value is None else format(value, spec)
@@ -0,0 +1,152 @@
+"""Latency, throughput and event-loop lag helpers for the load benchmark.
+
+The load benchmark runs the HTTP views, the WebSocket API and the
+simulated clients on one event loop, as Home Assistant runs the views
+and its frontend connections. Event-loop blocking is therefore measured
+by a probe task that asks to wake every ``LoopLagProbe.interval``
+seconds and records how late it actually woke.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import time
+from contextlib import suppress
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from tests.benchmarks.harness import load_json
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+# Lags under this are scheduling noise rather than blocking work.
+BLOCKING_THRESHOLD_MS = 10.0
+
+
+@dataclass
+class LatencySamples:
+    """Latencies (seconds) and failures of one kind of client request."""
+
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    def record(self, seconds: float) -> None:
+        self.latencies.append(seconds)
+
+    def summary(self, elapsed: float) -> dict[str, float | int]:
+        ordered = sorted(self.latencies)
+        return {
+            "requests": len(ordered),
+            "errors": self.errors,
+            "per_second": round(len(ordered) / elapsed, 1) if elapsed else 0,
+            "p50_ms": _ms(_percentile(ordered, 0.50)),
+            "p95_ms": _ms(_percentile(ordered, 0.95)),
+            "p99_ms": _ms(_percentile(ordered, 0.99)),
+            "max_ms": _ms(ordered[-1] if ordered else 0.0),
+        }
+
+
+class LoopLagProbe:
+    """Measures how long the event loop was unable to run a ready task."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.lags: list[float] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def summary(self) -> dict[str, float]:
+        ordered = sorted(self.lags)
+        blocked = [
+            lag for lag in ordered if lag * 1000 >= BLOCKING_THRESHOLD_MS
+        ]
+        return {
+            "lag_p99_ms": _ms(_percentile(ordered, 0.99)),
+            "lag_max_ms": _ms(ordered[-1] if ordered else 0.0),
+            "blocked_ms": _ms(sum(blocked)),
+            "blocked_count": len(blocked),
+        }
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            late = time.perf_counter() - started - self.interval
+            self.lags.append(max(late, 0.0))
+
+
+@dataclass(frozen=True)
+class LoadResult:
+    """Outcome of one concurrency level."""
+
+    clients: int
+    elapsed_s: float
+    kinds: dict[str, dict[str, float | int]]
+    loop: dict[str, float]
+
+    @property
+    def total_per_second(self) -> float:
+        requests = sum(int(kind["requests"]) for kind in self.kinds.values())
+        return round(requests / self.elapsed_s, 1) if self.elapsed_s else 0.0
+
+
+def store_load_results(path: Path, scale: str, result: LoadResult) -> None:
+    """Merge one concurrency level's result into the JSON file at ``path``."""
+    stored: dict[str, Any] = load_json(path)
+    stored.setdefault(scale, {})[str(result.clients)] = asdict(result)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        json.dumps(stored, indent=2, sort_keys=True) + "\n", encoding="utf-8"
+    )
+
+
+def format_load_report(scale: str, results: list[LoadResult]) -> str:
+    lines = [
+        f"load benchmark scale={scale}",
+        (
+            f"{'clients':>7} {'kind':<10} {'req':>6} {'req/s':>8}"
+            f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+        ),
+    ]
+    for result in results:
+        for kind, summary in sorted(result.kinds.items()):
+            lines.append(
+                f"{result.clients:>7} {kind:<10} {summary['requests']:>6}"
+                f" {summary['per_second']:>8.1f} {summary['p50_ms']:>8.1f}"
+                f" {summary['p95_ms']:>8.1f} {summary['p99_ms']:>8.1f}"
+                f" {summary['max_ms']:>8.1f}"
+            )
+        loop = result.loop
+        lines.append(
+            f"{result.clients:>7} {'loop':<10} total {result.total_per_second}"
+            f" req/s, lag p99 {loop['lag_p99_ms']:.1f} ms,"
+            f" max {loop['lag_max_ms']:.1f} ms,"
+            f" blocked {loop['blocked_ms']:.1f} ms"
+            f" in {loop['blocked_count']} stalls"
+        )
+    return "\n".join(lines)
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0 when empty)."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 1)
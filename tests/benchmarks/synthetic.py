@@ -0,0 +1,312 @@
+"""Synthetic controller-shaped sites for benchmarks.
+
+Generates the raw ``stat/device``, ``stat/sta`` and ``rest/networkconf``
+records the renderer would fetch from a controller, at any scale and
+deterministically for a given seed:
+
+- One gateway, a core switch, then layers of 48-port switches until
+  every switch and AP has a free port. APs hang off the lowest layer.
+- Devices are linked with LLDP entries and ``uplink`` records in both
+  directions, as real controllers report them.
+- About 40% of clients are wired (``sw_mac``/``sw_port``), the rest are
+  wireless (``ap_mac``), spread over a handful of VLAN networks.
+"""
+
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from typing import Any
+
+SWITCH_PORTS = 48
+# The top ports of every switch are reserved for wired clients.
+CLIENT_PORTS = 8
+_SWITCH_SHARE = 0.35
+_WIRED_SHARE = 0.4
+_VLANS = (1, 10, 20, 30, 40, 100)
+
+
+@dataclass(frozen=True)
+class SiteScale:
+    """Size of a synthetic site."""
+
+    name: str
+    devices: int
+    clients: int
+
+
+SCALES: dict[str, SiteScale] = {
+    scale.name: scale
+    for scale in (
+        SiteScale("small", devices=10, clients=100),
+        SiteScale("medium", devices=100, clients=2_000),
+        SiteScale("large", devices=1_000, clients=20_000),
+    )
+}
+
+
+@dataclass
+class SyntheticSite:
+    """Raw controller records for one site."""
+
+    devices: list[dict[str, Any]] = field(default_factory=list)
+    clients: list[dict[str, Any]] = field(default_factory=list)
+    networks: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def device_macs(self) -> list[str]:
+        return [device["mac"] for device in self.devices]
+
+    @property
+    def client_macs(self) -> list[str]:
+        return [client["mac"] for client in self.clients]
+
+
+@dataclass
+class _Builder:
+    rng: random.Random
+    site: SyntheticSite = field(default_factory=SyntheticSite)
+    next_port: dict[str, int] = field(default_factory=dict)
+    mac_counter: int = 0
+
+    def mac(self, prefix: int) -> str:
+        self.mac_counter += 1
+        value = (prefix << 40) | self.mac_counter
+        return ":".join(
+            f"{(value >> shift) & 0xFF:02x}" for shift in range(40, -8, -8)
+        )
+
+    def ip(self, index: int, subnet: int = 0) -> str:
+        return f"10.{subnet}.{index // 250}.{index % 250 + 2}"
+
+    def device(self, name: str, dev_type: str, model: str) -> dict[str, Any]:
+        index = len(self.site.devices)
+        device: dict[str, Any] = {
+            "_id": f"dev{index:06d}",
+            "name": name,
+            "mac": self.mac(0x02),
+            "ip": self.ip(index),
+            "type": dev_type,
+            "model": model,
+            "version": "7.1.26",
+            "state": 1,
+            "adopted": True,
+            "uptime": 86_400 + index,
+            "num_sta": 0,
+            "port_table": [],
+            "lldp_table": [],
+        }
+        self.site.devices.append(device)
+        return device
+
+    def free_port(self, switch: dict[str, Any]) -> int | None:
+        port = self.next_port.get(switch["mac"], 1)
+        if port > SWITCH_PORTS - CLIENT_PORTS:
+            return None
+        self.next_port[switch["mac"]] = port + 1
+        return port
+
+    def link(
+        self,
+        parent: dict[str, Any],
+        child: dict[str, Any],
+        parent_port: int,
+        *,
+        poe: bool,
+    ) -> None:
+        parent["port_table"].append(
+            _port(parent_port, up=True, poe=poe, rng=self.rng)
+        )
+        child["port_table"].append(
+            _port(1, up=True, poe=False, rng=self.rng, uplink=True)
+        )
+        child["uplink"] = {
+            "uplink_mac": parent["mac"],
+            "uplink_device_name": parent["name"],
+            "uplink_remote_port": parent_port,
+            "port_idx": 1,
+            "type": "wire",
+            "speed": 1000,
+        }
+        parent["lldp_table"].append(_lldp(child, parent_port, 1))
+        child["lldp_table"].append(_lldp(parent, 1, parent_port))
+
+
+def generate_site(
+    device_count: int, client_count: int, *, seed: int = 0
+) -> SyntheticSite:
+    """Build a site with the given device and client counts."""
+    builder = _Builder(rng=random.Random(seed))
+    builder.site.networks = _networks()
+    switches, aps = _build_devices(builder, max(device_count, 2))
+    _build_clients(builder, switches, aps, client_count)
+    return builder.site
+
+
+def _build_devices(
+    builder: _Builder, device_count: int
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    gateway = builder.device("Gateway", "udm", "UDMPRO")
+    gateway["port_table"].append(_wan_port())
+    switch_count = max(1, round((device_count - 1) * _SWITCH_SHARE))
+    ap_count = max(0, device_count - 1 - switch_count)
+    core = builder.device("Core Switch", "usw", "US48PRO")
+    builder.link(gateway, core, 2, poe=False)
+    switches = [core]
+    parents = [core]
+    while len(switches) < switch_count:
+        layer: list[dict[str, Any]] = []
+        for parent in parents:
+            # Keep half of each switch's device ports for APs.
+            for _ in range(SWITCH_PORTS // 2):
+                if len(switches) >= switch_count:
+                    break
+                switch = builder.device(
+                    f"Switch {len(switches):04d}", "usw", "USL24P"
+                )
+                builder.link(
+                    parent, switch, builder.free_port(parent) or 1, poe=False
+                )
+                switches.append(switch)
+                layer.append(switch)
+        parents = layer
+    for switch in switches:
+        switch["port_table"].extend(
+            _port(port_idx, up=True, poe=False, rng=builder.rng)
+            for port_idx in range(
+                SWITCH_PORTS - CLIENT_PORTS + 1, SWITCH_PORTS + 1
+            )
+        )
+    aps = []
+    for index in range(ap_count):
+        parent = _with_free_port(builder, switches, index)
+        ap = builder.device(f"AP {index:04d}", "uap", "U6LR")
+        builder.link(parent, ap, builder.free_port(parent) or 1, poe=True)
+        aps.append(ap)
+    return switches, aps
+
+
+def _with_free_port(
+    builder: _Builder, switches: list[dict[str, Any]], index: int
+) -> dict[str, Any]:
+    for offset in range(len(switches)):
+        switch = switches[-1 - (index + offset) % len(switches)]
+        if (
+            builder.next_port.get(switch["mac"], 1)
+            <= SWITCH_PORTS - CLIENT_PORTS
+        ):
+            return switch
+    return switches[-1]
+
+
+def _build_clients(
+    builder: _Builder,
+    switches: list[dict[str, Any]],
+    aps: list[dict[str, Any]],
+    client_count: int,
+) -> None:
+    wired_count = (
+        client_count if not aps else round(client_count * _WIRED_SHARE)
+    )
+    for index in range(client_count):
+        vlan = _VLANS[index % len(_VLANS)]
+        client: dict[str, Any] = {
+            "_id": f"sta{index:06d}",
+            "mac": builder.mac(0x0A),
+            "ip": builder.ip(index, subnet=vlan),
+            "hostname": f"host-{index:05d}",
+            "vlan": vlan,
+            "network": _network_name(vlan),
+            "uptime": 3_600 + index,
+            "last_seen": 1_700_000_000 + index,
+            "oui": "Synthetic",
+        }
+        if index % 3 == 0:
+            client["name"] = f"Client {index:05d}"
+        if index < wired_count:
+            switch = switches[index % len(switches)]
+            client.update(
+                is_wired=True,
+                sw_mac=switch["mac"],
+                sw_port=SWITCH_PORTS - index % CLIENT_PORTS,
+            )
+        else:
+            ap = aps[index % len(aps)]
+            ap["num_sta"] += 1
+            client.update(
+                is_wired=False,
+                ap_mac=ap["mac"],
+                essid=_network_name(vlan),
+                channel=(1, 6, 11, 36, 44, 149)[index % 6],
+                signal=builder.rng.randint(-80, -40),
+                tx_rate=builder.rng.choice((144_000, 433_000, 866_000)),
+                rx_rate=builder.rng.choice((144_000, 433_000, 866_000)),
+            )
+        builder.site.clients.append(client)
+
+
+def _networks() -> list[dict[str, Any]]:
+    networks: list[dict[str, Any]] = []
+    for vlan in _VLANS:
+        network: dict[str, Any] = {
+            "_id": f"net{vlan:04d}",
+            "name": _network_name(vlan),
+            "purpose": "corporate",
+            "ip_subnet": f"10.{vlan}.0.1/16",
+        }
+        if vlan != 1:
+            network.update(vlan=vlan, vlan_enabled=True)
+        networks.append(network)
+    return networks
+
+
+def _network_name(vlan: int) -> str:
+    return "Default" if vlan == 1 else f"VLAN {vlan}"
+
+
+def _port(
+    port_idx: int,
+    *,
+    up: bool,
+    poe: bool,
+    rng: random.Random,
+    uplink: bool = False,
+) -> dict[str, Any]:
+    port: dict[str, Any] = {
+        "port_idx": port_idx,
+        "name": f"Port {port_idx}",
+        "up": up,
+        "speed": 1000,
+        "is_uplink": uplink,
+        "native_networkconf_id": "net0001",
+        "poe_enable": poe,
+        "port_poe": poe,
+        "poe_good": poe,
+        "poe_power": f"{rng.uniform(2.0, 12.0):.2f}" if poe else "0.00",
+        "rx_bytes": rng.randint(0, 10**12),
+        "tx_bytes": rng.randint(0, 10**12),
+    }
+    return port
+
+
+def _wan_port() -> dict[str, Any]:
+    return {
+        "port_idx": 1,
+        "name": "WAN",
+        "up": True,
+        "speed": 1000,
+        "is_uplink": True,
+        "network_name": "wan",
+    }
+
+
+def _lldp(
+    remote: dict[str, Any], local_port: int, remote_port: int
+) -> dict[str, Any]:
+    return {
+        "chassis_id": remote["mac"],
+        "port_id": f"Port {remote_port}",
+        "port_desc": remote["name"],
+        "local_port_idx": local_port,
+        "local_port_name": f"Port {local_port}",
+    }
@@ -0,0 +1,194 @@
+"""Render, payload and enrichment benchmarks on synthetic sites.
+
+Not part of the default test run; use ``make benchmark`` or
+``pytest tests/benchmarks -s``. Environment variables:
+
+- ``BENCHMARK_SCALES``: comma-separated scale names (default: all).
+- ``BENCHMARK_BUNDLE``: path to a recorded controller bundle, benchmarked
+  as an extra ``bundle`` scale with the recorded render settings.
+- ``BENCHMARK_UPDATE_BASELINE=1``: write the results as the new baseline.
+- ``BENCHMARK_WALL_TOLERANCE`` / ``BENCHMARK_MEMORY_TOLERANCE``: allowed
+  growth over the baseline as a fraction (defaults 0.5 and 0.2).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from copy import deepcopy
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, cast
+
+import pytest
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from unifi_topology import Config
+
+from custom_components.unifi_network_map.bundle import load_bundle
+from custom_components.unifi_network_map.enrichment import (
+    build_enriched_payload,
+)
+from custom_components.unifi_network_map.entity_cache import (
+    invalidate_entity_cache,
+)
+from custom_components.unifi_network_map.payload_cache import (
+    compute_payload_hash,
+)
+from custom_components.unifi_network_map.renderer import (
+    _render_map,
+    render_themed_svg,
+)
+from custom_components.unifi_network_map.stage_timings import StageTimings
+from tests.benchmarks.harness import (
+    BASELINE_PATH,
+    RESULTS_PATH,
+    controller_records,
+    find_regressions,
+    format_report,
+    load_json,
+    measure,
+    measure_render_stages,
+    store_results,
+)
+from tests.benchmarks.synthetic import SCALES, SyntheticSite, generate_site
+from tests.helpers import build_settings
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.unifi_network_map.renderer import RenderSettings
+
+_BUNDLE_SCALE = "bundle"
+_CONFIG = Config(
+    url="https://controller.invalid", site="default", api_key="benchmark"
+)
+
+
+def _selected_scales() -> list[str]:
+    names = os.environ.get("BENCHMARK_SCALES")
+    if not names:
+        selected = list(SCALES)
+    else:
+        selected = [name.strip() for name in names.split(",") if name.strip()]
+    if os.environ.get("BENCHMARK_BUNDLE"):
+        selected.append(_BUNDLE_SCALE)
+    return selected
+
+
+def _load_site(scale_name: str) -> tuple[SyntheticSite, RenderSettings]:
+    if scale_name == _BUNDLE_SCALE:
+        bundle = load_bundle(Path(os.environ["BENCHMARK_BUNDLE"]))
+        site = SyntheticSite(
+            devices=cast("list[dict[str, Any]]", bundle.records.devices),
+            clients=cast("list[dict[str, Any]]", bundle.records.clients),
+            networks=cast("list[dict[str, Any]]", bundle.records.networks),
+        )
+        return site, bundle.settings()
+    scale = SCALES[scale_name]
+    settings = build_settings(
+        include_ports=True, include_clients=True, client_scope="all"
+    )
+    return generate_site(scale.devices, scale.clients), settings
+
+
+def _populate_registry(hass: HomeAssistant, site: SyntheticSite) -> None:
+    """Mirror what the UniFi integration registers for a site.
+
+    Each device gets a registry device with a tracker and an uptime
+    sensor; each client gets a tracker keyed by its MAC.
+    """
+    unifi_entry = MockConfigEntry(domain="unifi", data={})
+    unifi_entry.add_to_hass(hass)
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    for device in site.devices:
+        mac = device["mac"]
+        registry_device = device_registry.async_get_or_create(
+            config_entry_id=unifi_entry.entry_id,
+            identifiers={("unifi", mac)},
+            connections={(dr.CONNECTION_NETWORK_MAC, mac)},
+            name=device["name"],
+        )
+        for domain, unique_id in (
+            ("device_tracker", mac),
+            ("sensor", f"uptime-{mac}"),
+        ):
+            entity = entity_registry.async_get_or_create(
+                domain,
+                "unifi",
+                unique_id,
+                config_entry=unifi_entry,
+                device_id=registry_device.id,
+            )
+            if domain == "device_tracker":
+                hass.states.async_set(entity.entity_id, "home")
+    for client in site.clients:
+        entity = entity_registry.async_get_or_create(
+            "device_tracker",
+            "unifi",
+            f"default-{client['mac']}",
+            config_entry=unifi_entry,
+        )
+        hass.states.async_set(entity.entity_id, "home")
+
+
+@pytest.mark.parametrize("scale_name", _selected_scales())
+async def test_benchmark_scale(
+    hass: HomeAssistant, caplog: pytest.LogCaptureFixture, scale_name: str
+) -> None:
+    # Registering thousands of entities logs one line each.
+    caplog.set_level(logging.WARNING)
+    site, settings = _load_site(scale_name)
+
+    def _render(timings: StageTimings):
+        with controller_records(site.devices, site.clients, site.networks):
+            return _render_map(_CONFIG, settings, timings)
+
+    results = measure_render_stages(_render)
+    data = _render(StageTimings())
+    payload = data.payload
+    results["compute_payload_hash"] = measure(
+        lambda: compute_payload_hash(payload)
+    )
+    results["themed_svg"] = measure(
+        lambda: render_themed_svg(data, settings, "unifi-dark", None)
+    )
+
+    _populate_registry(hass, site)
+
+    def _enrich_cold() -> None:
+        invalidate_entity_cache(hass)
+        build_enriched_payload(hass, deepcopy(payload))
+
+    results["enrich_payload_cold"] = measure(_enrich_cold)
+    results["enrich_payload_warm"] = measure(
+        lambda: build_enriched_payload(hass, deepcopy(payload))
+    )
+    # Both sides of the related entities cutoff at every scale, to size
+    # its default against the per-node cost of resolving them all.
+    results["enrich_payload_eager"] = measure(
+        lambda: build_enriched_payload(hass, deepcopy(payload), sys.maxsize)
+    )
+    results["enrich_payload_lazy"] = measure(
+        lambda: build_enriched_payload(hass, deepcopy(payload), 0)
+    )
+
+    baseline = load_json(BASELINE_PATH).get(scale_name, {})
+    print(f"\n{format_report(scale_name, results, baseline)}")
+    store_results(RESULTS_PATH, scale_name, results)
+    if os.environ.get("BENCHMARK_UPDATE_BASELINE") == "1":
+        store_results(BASELINE_PATH, scale_name, results)
+        return
+    regressions = find_regressions(
+        results,
+        baseline,
+        wall_tolerance=float(
+            os.environ.get("BENCHMARK_WALL_TOLERANCE", "0.5")
+        ),
+        memory_tolerance=float(
+            os.environ.get("BENCHMARK_MEMORY_TOLERANCE", "0.2")
+        ),
+    )
+    assert not regressions, "\n".join(regressions)
@@ -0,0 +1,357 @@
+"""Concurrent-load benchmark for the HTTP views and the subscribe command.
+
+Serves a synthetic site through the real SVG and payload views and the
+``unifi_network_map/subscribe`` WebSocket command on an in-process
+aiohttp server, then drives a mix of simulated dashboards at it while the
+coordinator publishes new snapshots:
+
+- 40% request the SVG with a rotating theme (what themed cards do),
+- 40% poll the payload, alternating JSON and MessagePack,
+- 20% hold a WebSocket subscription and time each update's delivery
+  from the start of the coordinator refresh that published it.
+
+Each simulated client has its own connection. Throughput and latency
+percentiles are reported per kind, plus how long the event loop was
+blocked. Not part of the default test run; use ``make benchmark`` or
+``pytest tests/benchmarks/test_load.py -s``. Environment variables:
+
+- ``BENCHMARK_LOAD_SCALE``: synthetic site scale (default ``medium``).
+- ``BENCHMARK_LOAD_CLIENTS``: comma-separated concurrency levels
+  (default ``10,50,200``).
+- ``BENCHMARK_LOAD_UPDATES``: coordinator updates per level (default 3).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from functools import cache
+from itertools import cycle
+from typing import TYPE_CHECKING
+
+import aiohttp
+import pytest
+from homeassistant.setup import async_setup_component
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from unifi_topology import Config
+
+from custom_components.unifi_network_map.const import DOMAIN, SVG_THEMES
+from custom_components.unifi_network_map.coordinator import (
+    UniFiNetworkMapCoordinator,
+)
+from custom_components.unifi_network_map.http import (
+    register_unifi_http_views,
+)
+from custom_components.unifi_network_map.renderer import _render_map
+from custom_components.unifi_network_map.stage_timings import StageTimings
+from custom_components.unifi_network_map.websocket import (
+    async_register_websocket_api,
+)
+from tests.benchmarks.harness import RESULTS_PATH, controller_records
+from tests.benchmarks.load import (
+    LatencySamples,
+    LoadResult,
+    LoopLagProbe,
+    format_load_report,
+    store_load_results,
+)
+from tests.benchmarks.synthetic import SCALES, generate_site
+from tests.helpers import build_settings
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from pytest_homeassistant_custom_component.typing import (
+        ClientSessionGenerator,
+    )
+    from yarl import URL
+
+    from custom_components.unifi_network_map.data import UniFiNetworkMapData
+    from custom_components.unifi_network_map.renderer import RenderSettings
+
+LOAD_RESULTS_PATH = RESULTS_PATH.with_name("load.json")
+_CONFIG = Config(
+    url="https://controller.invalid", site="default", api_key="benchmark"
+)
+_SETTINGS = build_settings(
+    include_ports=True, include_clients=True, client_scope="all"
+)
+# Seconds between published snapshots; long enough for every request
+# kind to run against each snapshot's cold and warm caches.
+_UPDATE_INTERVAL = 1.0
+
+
+def _load_scale() -> str:
+    return os.environ.get("BENCHMARK_LOAD_SCALE", "medium")
+
+
+def _client_counts() -> list[int]:
+    counts = os.environ.get("BENCHMARK_LOAD_CLIENTS", "10,50,200")
+    return [int(count) for count in counts.split(",") if count.strip()]
+
+
+@cache
+def _snapshots(scale_name: str, count: int) -> tuple[UniFiNetworkMapData, ...]:
+    """Render ``count`` distinct snapshots of one site (port counters vary)."""
+    scale = SCALES[scale_name]
+    snapshots = []
+    for seed in range(count):
+        site = generate_site(scale.devices, scale.clients, seed=seed)
+        with controller_records(site.devices, site.clients, site.networks):
+            snapshots.append(_render_map(_CONFIG, _SETTINGS, StageTimings()))
+    return tuple(snapshots)
+
+
+class _ReplayClient:
+    """Hands the coordinator the next pre-rendered snapshot per refresh."""
+
+    def __init__(
+        self,
+        settings: RenderSettings,
+        snapshots: tuple[UniFiNetworkMapData, ...],
+    ) -> None:
+        self.settings = settings
+        self._snapshots = iter(snapshots)
+
+    def fetch_map(
+        self, _job: object = None, _networks: object = None
+    ) -> UniFiNetworkMapData:
+        return next(self._snapshots)
+
+    def fetch_networks(self) -> list[dict[str, object]]:
+        return []
+
+    def complete_networks(
+        self, data: UniFiNetworkMapData, _networks: object
+    ) -> UniFiNetworkMapData:
+        return data
+
+    def invalidate_cache(self) -> None:
+        return None
+
+
+async def _poll(
+    session: aiohttp.ClientSession,
+    url: URL,
+    samples: LatencySamples,
+    stop: asyncio.Event,
+    headers: cycle[dict[str, str]],
+) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        async with session.get(url, headers=next(headers)) as response:
+            await response.read()
+        if response.status == 200:
+            samples.record(time.perf_counter() - started)
+        else:
+            samples.errors += 1
+
+
+async def _poll_svg(
+    session: aiohttp.ClientSession,
+    url: URL,
+    samples: LatencySamples,
+    stop: asyncio.Event,
+    offset: int,
+) -> None:
+    themes = cycle(SVG_THEMES[offset % len(SVG_THEMES) :] + SVG_THEMES)
+    while not stop.is_set():
+        started = time.perf_counter()
+        themed = url.with_query(svg_theme=next(themes))
+        async with session.get(themed) as response:
+            await response.read()
+        if response.status == 200:
+            samples.record(time.perf_counter() - started)
+        else:
+            samples.errors += 1
+
+
+async def _subscribe(
+    session: aiohttp.ClientSession,
+    url: URL,
+    access_token: str,
+    entry_id: str,
+    published: list[float],
+    samples: LatencySamples,
+    ready: asyncio.Event,
+) -> int:
+    """Hold a subscription until every update arrived; return the count."""
+    received = 0
+    async with session.ws_connect(url, max_msg_size=0) as websocket:
+        await websocket.receive_json()
+        await websocket.send_json(
+            {"type": "auth", "access_token": access_token}
+        )
+        await websocket.receive_json()
+        await websocket.send_json(
+            {"id": 1, "type": f"{DOMAIN}/subscribe", "entry_id": entry_id}
+        )
+        result = await websocket.receive_json()
+        if not result.get("success"):
+            samples.errors += 1
+            ready.set()
+            return received
+        # The first event is the current snapshot, sent on subscribe.
+        await websocket.receive_json()
+        ready.set()
+        while received < len(published):
+            message = await websocket.receive_json()
+            if message.get("type") != "event":
+                samples.errors += 1
+                continue
+            samples.record(time.perf_counter() - published[received])
+            received += 1
+    return received
+
+
+async def _run_level(
+    hass: HomeAssistant,
+    coordinator: UniFiNetworkMapCoordinator,
+    base_url: URL,
+    access_token: str,
+    entry_id: str,
+    clients: int,
+    updates: int,
+) -> LoadResult:
+    subscriber_count = max(1, clients // 5)
+    svg_count = (clients - subscriber_count) // 2
+    payload_count = clients - subscriber_count - svg_count
+    samples = {
+        "svg": LatencySamples(),
+        "payload": LatencySamples(),
+        "websocket": LatencySamples(),
+    }
+    published = [0.0] * updates
+    stop = asyncio.Event()
+    auth = {"Authorization": f"Bearer {access_token}"}
+    sessions = [aiohttp.ClientSession(headers=auth) for _ in range(clients)]
+    svg_url = base_url.with_path(f"/api/{DOMAIN}/{entry_id}/svg")
+    payload_url = base_url.with_path(f"/api/{DOMAIN}/{entry_id}/payload")
+    encodings = [
+        {"Accept": "application/json"},
+        {"Accept": "application/msgpack"},
+    ]
+    probe = LoopLagProbe()
+    try:
+        ready = [asyncio.Event() for _ in range(subscriber_count)]
+        subscribers = [
+            asyncio.create_task(
+                _subscribe(
+                    sessions[index],
+                    base_url.with_path("/api/websocket"),
+                    access_token,
+                    entry_id,
+                    published,
+                    samples["websocket"],
+                    ready[index],
+                )
+            )
+            for index in range(subscriber_count)
+        ]
+        await asyncio.gather(*(event.wait() for event in ready))
+        probe.start()
+        started = time.perf_counter()
+        pollers = [
+            asyncio.create_task(
+                _poll_svg(
+                    sessions[subscriber_count + index],
+                    svg_url,
+                    samples["svg"],
+                    stop,
+                    index,
+                )
+            )
+            for index in range(svg_count)
+        ] + [
+            asyncio.create_task(
+                _poll(
+                    sessions[subscriber_count + svg_count + index],
+                    payload_url,
+                    samples["payload"],
+                    stop,
+                    cycle(encodings[index % 2 :] + encodings),
+                )
+            )
+            for index in range(payload_count)
+        ]
+        for update in range(updates):
+            await asyncio.sleep(_UPDATE_INTERVAL)
+            # Delivery latency includes the refresh and event encoding.
+            published[update] = time.perf_counter()
+            await coordinator.async_refresh()
+        await asyncio.sleep(_UPDATE_INTERVAL)
+        stop.set()
+        await asyncio.gather(*pollers)
+        delivered = await asyncio.wait_for(asyncio.gather(*subscribers), 60)
+        elapsed = time.perf_counter() - started
+    finally:
+        stop.set()
+        await probe.stop()
+        for session in sessions:
+            await session.close()
+    missing = sum(updates - count for count in delivered)
+    samples["websocket"].errors += missing
+    return LoadResult(
+        clients=clients,
+        elapsed_s=round(elapsed, 2),
+        kinds={
+            kind: value.summary(elapsed) for kind, value in samples.items()
+        },
+        loop=probe.summary(),
+    )
+
+
+@pytest.mark.parametrize("clients", _client_counts())
+async def test_load(
+    hass: HomeAssistant,
+    hass_client: ClientSessionGenerator,
+    hass_access_token: str,
+    caplog: pytest.LogCaptureFixture,
+    clients: int,
+) -> None:
+    caplog.set_level(logging.WARNING)
+    scale_name = _load_scale()
+    updates = int(os.environ.get("BENCHMARK_LOAD_UPDATES", "3"))
+    snapshots = _snapshots(scale_name, updates + 1)
+    assert await async_setup_component(hass, "http", {})
+    assert await async_setup_component(hass, "websocket_api", {})
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        data={
+            "url": "https://controller.invalid",
+            "api_key": "benchmark",
+            "site": "default",
+        },
+    )
+    entry.add_to_hass(hass)
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, entry, client=_ReplayClient(_SETTINGS, snapshots)
+    )
+    await coordinator.async_refresh()
+    entry.runtime_data = coordinator
+    register_unifi_http_views(hass)
+    async_register_websocket_api(hass)
+    server = await hass_client()
+
+    try:
+        result = await _run_level(
+            hass,
+            coordinator,
+            server.make_url("/"),
+            hass_access_token,
+            entry.entry_id,
+            clients,
+            updates,
+        )
+    finally:
+        await coordinator.async_shutdown()
+
+    print(f"\n{format_load_report(scale_name, [result])}")
+    store_load_results(LOAD_RESULTS_PATH, scale_name, result)
+    errors = {
+        kind: summary["errors"]
+        for kind, summary in result.kinds.items()
+        if summary["errors"]
+    }
+    assert not errors, f"failed requests or missed updates: {errors}"
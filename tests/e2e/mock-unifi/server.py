@@ -1,7 +1,14 @@
-"""Mock UniFi controller server for E2E testing."""
+"""Mock UniFi controller server for E2E testing.
+
+Serves ``fixtures/topology.json`` by default. Set ``UNIFI_BUNDLE`` to the
+path of a bundle recorded with the ``unifi_network_map.record_bundle``
+service (mounted into the container) to serve its devices, clients and
+networks instead.
+"""
 
 from __future__ import annotations
 
+import gzip
 import json
 import os
 import secrets
@@ -17,6 +24,7 @@ FIXTURES_DIR = Path(__file__).parent / "fixtures"
 USERNAME = os.environ.get("UNIFI_USERNAME", "admin")
 PASSWORD = os.environ.get("UNIFI_PASSWORD", "test123")
 SITE = os.environ.get("UNIFI_SITE", "default")
+BUNDLE_PATH = os.environ.get("UNIFI_BUNDLE")
 
 sessions: dict[str, bool] = {}
 
@@ -29,6 +37,21 @@ def load_fixture(name: str) -> dict[str, Any]:
     return {}
 
 
+def load_bundle(path: str) -> dict[str, Any]:
+    """Load a recorded bundle (gzipped or plain JSON)."""
+    raw = Path(path).read_bytes()
+    if raw[:2] == b"\x1f\x8b":
+        raw = gzip.decompress(raw)
+    return json.loads(raw)
+
+
+def load_topology() -> dict[str, Any]:
+    """Return the served devices, clients and networks."""
+    if BUNDLE_PATH:
+        return load_bundle(BUNDLE_PATH)
+    return load_fixture("topology")
+
+
 async def health_check(_request: Request) -> Response:
     """Health check endpoint."""
     return web.json_response({"status": "ok"})
@@ -105,7 +128,7 @@ async def get_devices(request: Request) -> Response:
             {"meta": {"rc": "error", "msg": "Unauthorized"}}, status=401
         )
 
-    topology = load_fixture("topology")
+    topology = load_topology()
     devices = topology.get("devices", [])
     return web.json_response({"meta": {"rc": "ok"}, "data": devices})
 
@@ -117,7 +140,7 @@ async def get_devices_basic(request: Request) -> Response:
             {"meta": {"rc": "error", "msg": "Unauthorized"}}, status=401
         )
 
-    topology = load_fixture("topology")
+    topology = load_topology()
     devices = topology.get("devices", [])
     # Return simplified device info for basic endpoint
     basic_devices = [
@@ -143,7 +166,7 @@ async def get_clients(request: Request) -> Response:
             {"meta": {"rc": "error", "msg": "Unauthorized"}}, status=401
         )
 
-    topology = load_fixture("topology")
+    topology = load_topology()
     clients = topology.get("clients", [])
     return web.json_response({"meta": {"rc": "ok"}, "data": clients})
 
@@ -172,7 +195,8 @@ async def get_networkconf(request: Request) -> Response:
             {"meta": {"rc": "error", "msg": "Unauthorized"}}, status=401
         )
 
-    return web.json_response({"meta": {"rc": "ok"}, "data": []})
+    networks = load_topology().get("networks", [])
+    return web.json_response({"meta": {"rc": "ok"}, "data": networks})
 
 
 async def get_sysinfo(request: Request) -> Response:
@@ -443,3 +443,37 @@ async def test_client_sensor_is_off_when_no_data(
     assert attrs == {"mac": "aa:bb:cc:dd:ee:ff"}
 
     await coordinator.async_shutdown()
+
+
+async def test_updates_only_construct_entities_for_new_devices(
+    hass: HomeAssistant, monkeypatch: Any
+) -> None:
+    entry = build_mock_entry()
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    payload = _build_payload_with_devices()
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload=payload)
+    coordinator.last_exception = None
+    constructed: list[str] = []
+    original = binary_sensor._create_device_presence_entity
+
+    def _counting(*args: Any) -> UniFiDevicePresenceSensor:
+        entity = original(*args)
+        constructed.append(entity.unique_id)
+        return entity
+
+    monkeypatch.setattr(
+        binary_sensor, "_create_device_presence_entity", _counting
+    )
+    added = await _setup_binary_sensor(hass, entry, coordinator)
+    assert len(constructed) == 3
+
+    coordinator.async_update_listeners()
+    assert len(constructed) == 3
+
+    payload["node_types"]["Garage AP"] = "ap"
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload=payload)
+    coordinator.async_update_listeners()
+
+    assert len(constructed) == 4
+    assert len(added) == 4
+    assert added[-1].name == "Garage AP"
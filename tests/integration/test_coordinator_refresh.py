@@ -0,0 +1,384 @@
+"""Tests for skipping listener notification on unchanged refreshes."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import replace
+from typing import TYPE_CHECKING, Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.unifi_network_map import (
+    coordinator as coordinator_module,
+)
+from custom_components.unifi_network_map.coordinator import (
+    UniFiNetworkMapCoordinator,
+    compute_data_digest,
+)
+from custom_components.unifi_network_map.data import UniFiNetworkMapData
+from custom_components.unifi_network_map.renderer import (
+    RenderJob,
+    RenderSettings,
+)
+from tests.integration.conftest import build_mock_entry
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class _StubClient:
+    def __init__(self) -> None:
+        self.settings = RenderSettings(
+            include_ports=False,
+            include_clients=False,
+            client_scope="wired",
+            only_unifi=False,
+            svg_isometric=False,
+            svg_width=None,
+            svg_height=None,
+            use_cache=False,
+        )
+        self.payload: dict[str, Any] = {"node_types": {"GW": "gateway"}}
+
+    def fetch_map(
+        self, _job: object = None, _networks: object = None
+    ) -> UniFiNetworkMapData:
+        # A fresh object each time, like an uncached render.
+        return UniFiNetworkMapData(svg="<svg />", payload=_copy(self.payload))
+
+    def fetch_networks(self) -> list[dict[str, object]]:
+        return []
+
+    def complete_networks(
+        self, data: UniFiNetworkMapData, _networks: object
+    ) -> UniFiNetworkMapData:
+        return data
+
+    def invalidate_cache(self) -> None:
+        return None
+
+
+def _copy(payload: dict[str, Any]) -> dict[str, Any]:
+    return {key: dict(value) for key, value in payload.items()}
+
+
+async def _coordinator(
+    hass: HomeAssistant,
+) -> tuple[UniFiNetworkMapCoordinator, _StubClient, list[int]]:
+    client = _StubClient()
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, build_mock_entry(), client=client
+    )
+    notified: list[int] = []
+    coordinator.async_add_listener(lambda: notified.append(1))
+    await coordinator.async_refresh()
+    notified.clear()
+    return coordinator, client, notified
+
+
+async def test_unchanged_refresh_keeps_data_and_skips_listeners(
+    hass: HomeAssistant,
+) -> None:
+    coordinator, _client, notified = await _coordinator(hass)
+    first = coordinator.data
+    changed_at = coordinator.last_change_time
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data is first
+    assert notified == []
+    assert coordinator.last_change_time == changed_at
+    assert coordinator.last_refresh_time is not None
+    await coordinator.async_shutdown()
+
+
+async def test_changed_refresh_notifies_listeners(
+    hass: HomeAssistant,
+) -> None:
+    coordinator, client, notified = await _coordinator(hass)
+    first = coordinator.data
+
+    client.payload["node_types"]["AP"] = "ap"
+    await coordinator.async_refresh()
+
+    assert coordinator.data is not first
+    assert coordinator.data.payload["node_types"]["AP"] == "ap"
+    assert notified == [1]
+    await coordinator.async_shutdown()
+
+
+def test_digest_covers_svg_and_payload() -> None:
+    base = UniFiNetworkMapData(svg="<svg />", payload={"a": 1})
+
+    assert compute_data_digest(base) == compute_data_digest(
+        UniFiNetworkMapData(svg="<svg />", payload={"a": 1})
+    )
+    assert compute_data_digest(base) != compute_data_digest(
+        UniFiNetworkMapData(svg="<svg></svg>", payload={"a": 1})
+    )
+    assert compute_data_digest(base) != compute_data_digest(
+        UniFiNetworkMapData(svg="<svg />", payload={"a": 2})
+    )
+
+
+async def test_data_digest_is_measured_once_per_generation(
+    hass: HomeAssistant,
+) -> None:
+    coordinator, client, _notified = await _coordinator(hass)
+    digest = coordinator.data_digest
+
+    assert digest is not None
+    assert digest.svg_bytes == len("<svg />")
+    assert digest.payload_bytes == len('{"node_types":{"GW":"gateway"}}')
+    assert coordinator.data_digest is digest
+
+    await coordinator.async_refresh()
+    assert coordinator.data_digest is digest
+
+    client.payload["node_types"]["AP"] = "ap"
+    await coordinator.async_refresh()
+    assert coordinator.data_digest is not digest
+    await coordinator.async_shutdown()
+
+
+class _BlockingClient(_StubClient):
+    """Holds the first fetch until released; later fetches return at once."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.fetching = threading.Event()
+        self.release = threading.Event()
+        self.calls = 0
+
+    def fetch_map(
+        self, job: RenderJob | None = None, _networks: object = None
+    ) -> UniFiNetworkMapData:
+        self.calls += 1
+        if self.calls == 1:
+            self.fetching.set()
+            self.release.wait(5)
+        return UniFiNetworkMapData(
+            svg=f"<svg>{self.calls}</svg>", payload=_copy(self.payload)
+        )
+
+
+async def test_superseded_refresh_does_not_publish(
+    hass: HomeAssistant,
+) -> None:
+    client = _BlockingClient()
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, build_mock_entry(), client=client
+    )
+    coordinator.data = UniFiNetworkMapData(svg="<svg>old</svg>", payload={})
+    slow = hass.async_create_task(coordinator.async_refresh())
+    await hass.async_add_executor_job(client.fetching.wait, 5)
+
+    # The forced refresh is queued behind the running one and supersedes it.
+    await coordinator.async_force_refresh()
+    client.release.set()
+    await slow
+
+    assert coordinator.data.svg == "<svg>old</svg>"
+    assert coordinator.superseded_refreshes == 1
+    assert coordinator.last_update_success
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data.svg == "<svg>2</svg>"
+    await coordinator.async_shutdown()
+
+
+async def test_refresh_past_its_deadline_keeps_previous_data(
+    hass: HomeAssistant,
+) -> None:
+    client = _StubClient()
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, build_mock_entry({"render_timeout_seconds": 0}), client=client
+    )
+    previous = UniFiNetworkMapData(svg="<svg />", payload={})
+    coordinator.data = previous
+
+    def _fetch_map(
+        job: RenderJob | None = None, _networks: object = None
+    ) -> UniFiNetworkMapData:
+        assert job is not None
+        job.check("build_topology")
+        raise AssertionError("rendered past the deadline")
+
+    client.fetch_map = _fetch_map  # type: ignore[method-assign]
+    await coordinator.async_refresh()
+
+    assert coordinator.data is previous
+    assert not coordinator.last_update_success
+    assert coordinator.fetch_errors == {"RenderTimeout": 1}
+    await coordinator.async_shutdown()
+
+
+class _LateNetworksClient(_StubClient):
+    """Renders before its networks arrive, like a slow networks endpoint.
+
+    As the real client does, a late render uses the networks of the last
+    completed map.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+        self.networks: list[dict[str, object]] = [{"vlan": 10, "name": "IoT"}]
+        self.known: list[dict[str, object]] | None = None
+
+    def fetch_map(
+        self,
+        _job: object = None,
+        start_networks: Callable[[], object] | None = None,
+    ) -> UniFiNetworkMapData:
+        assert start_networks is not None
+        start_networks()
+        payload = _copy(self.payload)
+        if self.known is not None:
+            payload["vlan_info"] = _vlan_info(self.known)
+        return UniFiNetworkMapData(
+            svg="<svg />", payload=payload, pending=("networks",)
+        )
+
+    def fetch_networks(self) -> list[dict[str, object]]:
+        self.release.wait(5)
+        return self.networks
+
+    def complete_networks(
+        self, data: UniFiNetworkMapData, networks: list[dict[str, object]]
+    ) -> UniFiNetworkMapData:
+        self.known = networks
+        return replace(
+            data,
+            payload={**data.payload, "vlan_info": _vlan_info(networks)},
+            pending=(),
+        )
+
+
+def _vlan_info(networks: list[dict[str, object]]) -> dict[object, object]:
+    return {network["vlan"]: dict(network) for network in networks}
+
+
+async def test_late_networks_are_published_in_a_follow_up_update(
+    hass: HomeAssistant,
+) -> None:
+    client = _LateNetworksClient()
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, build_mock_entry(), client=client
+    )
+    notified: list[int] = []
+    coordinator.async_add_listener(lambda: notified.append(1))
+
+    await coordinator.async_refresh()
+
+    assert coordinator.data.pending == ("networks",)
+    assert "vlan_info" not in coordinator.data.payload
+    assert notified == [1]
+
+    client.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.data.pending == ()
+    assert coordinator.data.payload["vlan_info"] == {
+        10: {"vlan": 10, "name": "IoT"}
+    }
+    assert notified == [1, 1]
+    await coordinator.async_shutdown()
+
+
+async def test_late_networks_wait_expires_and_keeps_the_partial_map(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        coordinator_module, "LATE_NETWORKS_TIMEOUT_SECONDS", 0.01
+    )
+    client = _LateNetworksClient()
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, build_mock_entry(), client=client
+    )
+    notified: list[int] = []
+    coordinator.async_add_listener(lambda: notified.append(1))
+
+    await coordinator.async_refresh()
+    partial = coordinator.data
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    # The wait gave up while the networks fetch was still blocked.
+    assert not client.release.is_set()
+    assert coordinator.data is partial
+    assert coordinator.data.pending == ("networks",)
+
+    client.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.data is partial
+    assert notified == [1]
+    await coordinator.async_shutdown()
+
+
+async def test_late_render_with_known_networks_does_not_regress_data(
+    hass: HomeAssistant,
+) -> None:
+    client = _LateNetworksClient()
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, build_mock_entry(), client=client
+    )
+    client.release.set()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+    completed = coordinator.data
+    assert completed.pending == ()
+    notified: list[int] = []
+    coordinator.async_add_listener(lambda: notified.append(1))
+
+    client.release.clear()
+    client.networks = [{"vlan": 10, "name": "Cameras"}]
+    await coordinator.async_refresh()
+
+    # The late render kept the VLAN sections, so nothing changed yet.
+    assert coordinator.data is completed
+    assert notified == []
+
+    client.release.set()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.data.payload["vlan_info"][10]["name"] == "Cameras"
+    assert notified == [1]
+    await coordinator.async_shutdown()
+
+
+class _CachedClient(_StubClient):
+    """Answers from its render cache, which needs no networks."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.cached = UniFiNetworkMapData(svg="<svg />", payload={})
+        self.networks_fetched = 0
+
+    def fetch_map(
+        self, _job: object = None, _start_networks: object = None
+    ) -> UniFiNetworkMapData:
+        return self.cached
+
+    def fetch_networks(self) -> list[dict[str, object]]:
+        self.networks_fetched += 1
+        return []
+
+
+async def test_cached_map_does_not_fetch_networks(
+    hass: HomeAssistant,
+) -> None:
+    client = _CachedClient()
+    coordinator = UniFiNetworkMapCoordinator(
+        hass, build_mock_entry(), client=client
+    )
+
+    await coordinator.async_refresh()
+    await coordinator.async_refresh()
+    await hass.async_block_till_done(wait_background_tasks=True)
+
+    assert coordinator.data is client.cached
+    assert client.networks_fetched == 0
+    await coordinator.async_shutdown()
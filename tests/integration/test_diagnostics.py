@@ -40,6 +40,9 @@ async def test_diagnostics_without_coordinator() -> None:
     assert result["entry"]["entry_id"] == entry.entry_id
     assert result["coordinator"]["last_update_success"] is None
     assert result["map_summary"] is None
+    assert result["stage_timings"] == {}
+    assert result["cache_memory"]["used_bytes"] == 0
+    assert result["cache_memory"]["limit_bytes"] == 128 * 1024 * 1024
 
 
 async def test_diagnostics_redacts_api_key() -> None:
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import json
 from typing import TYPE_CHECKING
 
+import msgpack
 from homeassistant.helpers import (
     device_registry as dr,
 )
@@ -18,7 +20,10 @@ from custom_components.unifi_network_map.enrichment import (
     _build_mac_entity_index,
     _build_mac_to_all_entities_index,
     _iter_unifi_entity_entries,
+    get_node_section,
+    get_or_build_encoded_payload,
     get_or_build_enriched_payload,
+    get_or_build_payload_for_schema,
     resolve_related_entities,
 )
 from custom_components.unifi_network_map.entity_cache import (
@@ -266,6 +271,153 @@ async def testget_or_build_enriched_payload(
     assert second is first
 
 
+async def test_enriched_payload_shares_the_source_sections(
+    hass: HomeAssistant,
+) -> None:
+    """The cached payload adds sections without copying the source's."""
+    invalidate_entity_cache(hass)
+    source: dict[str, object] = {
+        "edges": [{"left": MAC_SWITCH, "right": MAC_AP}],
+        "node_types": {MAC_SWITCH: "switch", MAC_AP: "ap"},
+    }
+
+    enriched = get_or_build_enriched_payload(hass, "entry1", source)
+
+    assert enriched is not source
+    assert enriched["edges"] is source["edges"]
+    assert enriched["node_types"] is source["node_types"]
+    assert "related_entities_lazy" not in source
+
+
+async def test_enriched_payload_honors_the_eager_cutoff_option(
+    hass: HomeAssistant,
+) -> None:
+    """The entry's cutoff option decides whether related entities are lazy."""
+    invalidate_entity_cache(hass)
+    entry = MockConfigEntry(
+        domain="unifi_network_map",
+        data={},
+        options={"related_entities_eager_max_nodes": 1},
+    )
+    entry.add_to_hass(hass)
+    source: dict[str, object] = {
+        "node_types": {MAC_SWITCH: "switch", MAC_AP: "ap"},
+    }
+
+    enriched = get_or_build_enriched_payload(hass, entry.entry_id, source)
+
+    assert enriched["related_entities_lazy"] is True
+    assert "related_entities" not in enriched
+
+
+async def test_get_or_build_payload_for_schema_caches_compact(
+    hass: HomeAssistant,
+) -> None:
+    """The compact encoding is built once and shares the payload cache."""
+    invalidate_entity_cache(hass)
+    source: dict[str, object] = {
+        "edges": [{"left": MAC_SWITCH, "right": MAC_AP}],
+        "node_types": {MAC_SWITCH: "switch", MAC_AP: "ap"},
+    }
+
+    legacy = get_or_build_payload_for_schema(hass, "entry1", source, "2.0")
+    first = get_or_build_payload_for_schema(hass, "entry1", source, "3.0")
+    second = get_or_build_payload_for_schema(hass, "entry1", source, "3.0")
+
+    assert legacy is get_or_build_enriched_payload(hass, "entry1", source)
+    assert first is second
+    assert first["schema_version"] == "3.0"
+    assert first["nodes"] == [MAC_SWITCH, MAC_AP]
+    assert first["edges"] == {"left": [0], "right": [1]}
+
+
+async def test_get_or_build_encoded_payload_caches_bytes(
+    hass: HomeAssistant,
+) -> None:
+    """Encoded bytes are cached per data generation and encoding."""
+    invalidate_entity_cache(hass)
+    source: dict[str, object] = {"node_types": {MAC_SWITCH: "switch"}}
+
+    first = get_or_build_encoded_payload(hass, "entry1", source, "2.0", "json")
+    again = get_or_build_encoded_payload(hass, "entry1", source, "2.0", "json")
+    packed = get_or_build_encoded_payload(
+        hass, "entry1", source, "3.0", "msgpack"
+    )
+    changed = get_or_build_encoded_payload(
+        hass, "entry1", {"node_types": {MAC_AP: "ap"}}, "2.0", "json"
+    )
+
+    assert first is again
+    assert json.loads(first)["node_types"] == {MAC_SWITCH: "switch"}
+    unpacked = msgpack.unpackb(packed)
+    assert unpacked["schema_version"] == "3.0"
+    assert unpacked["nodes"] == [MAC_SWITCH]
+    assert json.loads(changed)["node_types"] == {MAC_AP: "ap"}
+
+
+async def test_projected_payloads_are_cached_per_field_set(
+    hass: HomeAssistant,
+) -> None:
+    invalidate_entity_cache(hass)
+    source: dict[str, object] = {
+        "edges": [],
+        "node_types": {MAC_SWITCH: "switch"},
+        "device_ports": {MAC_SWITCH: [{"port": 1}]},
+    }
+
+    first = get_or_build_payload_for_schema(
+        hass, "entry1", source, "2.0", ("node_types",)
+    )
+    second = get_or_build_payload_for_schema(
+        hass, "entry1", source, "2.0", ("node_types",)
+    )
+    compact = get_or_build_payload_for_schema(
+        hass, "entry1", source, "3.0", ("edges",)
+    )
+
+    assert first is second
+    assert set(first) == {"node_types"}
+    assert set(compact) == {"schema_version", "nodes", "edges"}
+
+
+async def test_get_node_section_returns_one_node(hass: HomeAssistant) -> None:
+    invalidate_entity_cache(hass)
+    source: dict[str, object] = {
+        "node_types": {MAC_SWITCH: "switch"},
+        "device_ports": {MAC_SWITCH: [{"port": 1}]},
+    }
+
+    ports = get_node_section(
+        hass, "entry1", source, "device_ports", MAC_SWITCH
+    )
+    missing = get_node_section(hass, "entry1", source, "device_ports", MAC_AP)
+    related = get_node_section(
+        hass, "entry1", source, "related_entities", MAC_AP
+    )
+
+    assert ports == [{"port": 1}]
+    assert missing == []
+    assert related == []
+
+
+async def test_get_node_section_resolves_related_entities_on_demand(
+    hass: HomeAssistant,
+) -> None:
+    invalidate_entity_cache(hass)
+    hass.states.async_set(
+        "sensor.switch_temp", "40", {"mac": MAC_SWITCH, "friendly_name": "T"}
+    )
+    source: dict[str, object] = {"node_types": {MAC_SWITCH: "switch"}}
+
+    related = get_node_section(
+        hass, "entry1", source, "related_entities", MAC_SWITCH
+    )
+
+    assert [entity["entity_id"] for entity in related] == [
+        "sensor.switch_temp"
+    ]
+
+
 # ------------------------------------------------------------------
 # Test 7: resolve_related_entities returns empty for unknown MAC
 # ------------------------------------------------------------------
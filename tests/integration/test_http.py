@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 from types import SimpleNamespace
 from typing import TYPE_CHECKING, cast
 
@@ -9,6 +10,7 @@ from aiohttp import web
 from custom_components.unifi_network_map import http as http_module
 from custom_components.unifi_network_map import renderer as renderer_module
 from custom_components.unifi_network_map.data import UniFiNetworkMapData
+from custom_components.unifi_network_map.stage_timings import get_stage_timings
 from tests.helpers import (
     FakeCoordinator,
     FakeHassWithHttp,
@@ -30,7 +32,7 @@ def test_register_unifi_http_views_registers_once() -> None:
 
     data = cast("dict[str, object]", hass.data["unifi_network_map"])
     assert data["views_registered"] is True
-    assert len(hass.http.views) == 2
+    assert len(hass.http.views) == 4
 
 
 async def test_svg_view_returns_404_when_missing_data() -> None:
@@ -57,29 +59,50 @@ async def test_svg_view_renders_theme_when_requested(
     hass = FakeHassWithHttp({})
     hass.config_entries.entries_by_id["entry-1"] = fake_entry
 
+    renders: list[str | None] = []
+
     def _render_themed_svg(
         _data: object,
         _settings: object,
-        _svg_theme: str | None,
+        svg_theme: str | None,
         _icon_set: str | None,
     ) -> tuple[str, str]:
+        renders.append(svg_theme)
         return ("themed", "#1c1e21")
 
     monkeypatch.setattr(http_module, "render_themed_svg", _render_themed_svg)
+    priorities: list[str] = []
+
+    async def _run_job(
+        _hass: object, priority: str, func: Callable[..., object], *args
+    ) -> object:
+        priorities.append(priority)
+        return func(*args)
+
+    monkeypatch.setattr(http_module, "async_run_job", _run_job)
 
     def _response(**kwargs: object) -> SimpleNamespace:
         return SimpleNamespace(**kwargs)
 
-    http_module.web.Response = _response
+    monkeypatch.setattr(http_module.web, "Response", _response)
     request = SimpleNamespace(
         app={"hass": hass}, query={"svg_theme": "unifi-dark"}
     )
 
     view = http_module.UniFiNetworkMapSvgView()
     response = await view.get(request, "entry-1")
+    await view.get(request, "entry-1")
 
     assert response.text == "themed"
     assert response.headers == {"X-Theme-Background": "#1c1e21"}
+    # The second request for the same theme is served from the cache.
+    assert renders == ["unifi-dark"]
+    assert priorities == ["theme"]
+
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload={})
+    await view.get(request, "entry-1")
+
+    assert renders == ["unifi-dark", "unifi-dark"]
 
 
 async def test_payload_view_returns_mapped_entities(
@@ -100,27 +123,158 @@ async def test_payload_view_returns_mapped_entities(
     hass = FakeHassWithHttp({})
     hass.config_entries.entries_by_id["entry-1"] = fake_entry
 
-    def _json_response(payload: object) -> SimpleNamespace:
-        return SimpleNamespace(status=200, body=bytes(str(payload), "utf-8"))
-
     enriched = {
         "node_entities": {"One": "a"},
         "node_status": {"One": {"state": "online"}},
     }
 
-    http_module.web.json_response = _json_response
     monkeypatch.setattr(
         http_module,
-        "get_or_build_enriched_payload",
-        lambda _hass, _eid, _payload: enriched,
+        "get_or_build_encoded_payload",
+        lambda _hass, _eid, _payload, _schema, _encoding, _fields: bytes(
+            str(enriched), "utf-8"
+        ),
     )
-    request = SimpleNamespace(app={"hass": hass})
+    request = SimpleNamespace(app={"hass": hass}, query={}, headers={})
 
     view = http_module.UniFiNetworkMapPayloadView()
     response = await view.get(request, "entry-1")
 
     assert response.status == 200
     assert response.body
+    assert response.content_type == "application/json"
+
+
+async def test_payload_view_negotiates_schema_and_encoding(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    coordinator = FakeCoordinator(settings=build_settings())
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload={})
+    hass = FakeHassWithHttp({})
+    hass.config_entries.entries_by_id["entry-1"] = SimpleNamespace(
+        runtime_data=coordinator
+    )
+    requested: list[tuple[str, str, tuple[str, ...] | None]] = []
+
+    def _build(
+        _hass: object,
+        _eid: str,
+        _payload: object,
+        schema: str,
+        encoding: str,
+        fields: tuple[str, ...] | None,
+    ) -> bytes:
+        requested.append((schema, encoding, fields))
+        return b"{}"
+
+    monkeypatch.setattr(http_module, "get_or_build_encoded_payload", _build)
+    view = http_module.UniFiNetworkMapPayloadView()
+
+    cases = [
+        ({}, {}),
+        ({"schema_version": "3"}, {"Accept": "application/msgpack"}),
+        ({"schema_version": "7"}, {"Accept": "text/html, */*"}),
+        ({"fields": "node_types,edges"}, {}),
+    ]
+    content_types = []
+    for query, headers in cases:
+        request = SimpleNamespace(
+            app={"hass": hass}, query=query, headers=headers
+        )
+        response = await view.get(request, "entry-1")
+        content_types.append(response.content_type)
+
+    assert requested == [
+        ("2.0", "json", None),
+        ("3.0", "msgpack", None),
+        ("2.0", "json", None),
+        ("2.0", "json", ("edges", "node_types")),
+    ]
+    assert content_types == [
+        "application/json",
+        "application/msgpack",
+        "application/json",
+        "application/json",
+    ]
+    assert response.headers["Vary"] == "Accept"
+    timings = get_stage_timings(hass, "entry-1").summary()  # type: ignore[arg-type]
+    assert timings["http_payload"]["count"] == len(cases)
+
+
+async def test_payload_view_rejects_unknown_fields() -> None:
+    coordinator = FakeCoordinator(settings=build_settings())
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload={})
+    hass = FakeHassWithHttp({})
+    hass.config_entries.entries_by_id["entry-1"] = SimpleNamespace(
+        runtime_data=coordinator
+    )
+    request = SimpleNamespace(
+        app={"hass": hass}, query={"fields": "edges,bogus"}, headers={}
+    )
+    view = http_module.UniFiNetworkMapPayloadView()
+
+    with pytest.raises(web.HTTPBadRequest):
+        await view.get(request, "entry-1")
+
+
+async def test_node_section_view_returns_one_node(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    coordinator = FakeCoordinator(settings=build_settings())
+    coordinator.data = UniFiNetworkMapData(
+        svg="<svg />", payload={"node_types": {"aa:bb:cc:dd:ee:01": "switch"}}
+    )
+    hass = FakeHassWithHttp({})
+    hass.config_entries.entries_by_id["entry-1"] = SimpleNamespace(
+        runtime_data=coordinator
+    )
+    lookups: list[tuple[str, str]] = []
+
+    def _section(
+        _hass: object, _eid: str, _payload: object, section: str, mac: str
+    ) -> list[object]:
+        lookups.append((section, mac))
+        return [{"port": 1}]
+
+    monkeypatch.setattr(http_module, "get_node_section", _section)
+    view = http_module.UniFiNetworkMapNodeSectionView()
+    request = SimpleNamespace(app={"hass": hass}, query={}, headers={})
+
+    response = await view.get(
+        request, "entry-1", "AA:BB:CC:DD:EE:01", "device_ports"
+    )
+
+    assert lookups == [("device_ports", "aa:bb:cc:dd:ee:01")]
+    assert json.loads(response.body) == {
+        "mac": "aa:bb:cc:dd:ee:01",
+        "device_ports": [{"port": 1}],
+    }
+
+
+@pytest.mark.parametrize(
+    ("entry_id", "mac", "section"),
+    [
+        ("entry-1", "aa:bb:cc:dd:ee:01", "client_details"),
+        ("missing", "aa:bb:cc:dd:ee:01", "device_ports"),
+        ("entry-1", "aa:bb:cc:dd:ee:02", "device_ports"),
+    ],
+)
+async def test_node_section_view_rejects_unknown_requests(
+    entry_id: str, mac: str, section: str
+) -> None:
+    coordinator = FakeCoordinator(settings=build_settings())
+    coordinator.data = UniFiNetworkMapData(
+        svg="<svg />", payload={"node_types": {"aa:bb:cc:dd:ee:01": "switch"}}
+    )
+    hass = FakeHassWithHttp({})
+    hass.config_entries.entries_by_id["entry-1"] = SimpleNamespace(
+        runtime_data=coordinator
+    )
+    view = http_module.UniFiNetworkMapNodeSectionView()
+    request = SimpleNamespace(app={"hass": hass}, query={}, headers={})
+
+    with pytest.raises(web.HTTPNotFound):
+        await view.get(request, entry_id, mac, section)
 
 
 def test_edge_payload_validation_and_defaults() -> None:
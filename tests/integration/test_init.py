@@ -39,7 +39,12 @@ class FakeServices:
         self.registered = []
 
     def async_register(
-        self, domain: str, service: str, handler, schema=None
+        self,
+        domain: str,
+        service: str,
+        handler,
+        schema=None,
+        supports_response=None,
     ) -> None:
         self.registered.append((domain, service, handler, schema))
 
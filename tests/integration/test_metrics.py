@@ -0,0 +1,129 @@
+"""Tests for the Prometheus metrics exposition."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.unifi_network_map.coordinator import (
+    UniFiNetworkMapCoordinator,
+)
+from custom_components.unifi_network_map.data import UniFiNetworkMapData
+from custom_components.unifi_network_map.errors import InvalidAuth
+from custom_components.unifi_network_map.job_executor import async_run_job
+from custom_components.unifi_network_map.metrics import render_metrics
+from custom_components.unifi_network_map.payload_cache import (
+    get_payload_cache,
+)
+from tests.integration.conftest import build_mock_entry
+
+
+def _load_entry(
+    hass: HomeAssistant,
+) -> tuple[str, UniFiNetworkMapCoordinator]:
+    entry = build_mock_entry()
+    entry.add_to_hass(hass)
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    coordinator.data = UniFiNetworkMapData(
+        svg="<svg />", payload={"node_types": {"GW": "gateway"}}
+    )
+    entry.runtime_data = coordinator
+    return entry.entry_id, coordinator
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples: dict[str, float] = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+async def test_metrics_empty_without_loaded_entries(
+    hass: HomeAssistant,
+) -> None:
+    assert render_metrics(hass) == ""
+
+
+async def test_metrics_cover_entry_counters_and_sizes(
+    hass: HomeAssistant,
+) -> None:
+    entry_id, coordinator = _load_entry(hass)
+    coordinator.timings.record("render_svg", 0.03)
+    coordinator.timings.record("render_svg", 2.0)
+    coordinator.fetch_errors[InvalidAuth.__name__] += 2
+    coordinator.backoff_activations = 1
+    coordinator.superseded_refreshes = 2
+    coordinator.websocket_subscribers = 3
+    get_payload_cache(hass).misses[entry_id] += 1
+    get_payload_cache(hass).set(entry_id, {"node_status": {}}, "hash")
+    label = f'entry_id="{entry_id}"'
+
+    samples = _samples(render_metrics(hass))
+
+    stage = f'{label},stage="render_svg"'
+    prefix = "unifi_network_map_stage_duration_seconds"
+    assert samples[f'{prefix}_bucket{{{stage},le="0.05"}}'] == 1
+    assert samples[f'{prefix}_bucket{{{stage},le="+Inf"}}'] == 2
+    assert samples[f"{prefix}_count{{{stage}}}"] == 2
+    assert samples[f"{prefix}_sum{{{stage}}}"] == 2.03
+    assert (
+        samples[
+            f'unifi_network_map_fetch_errors_total{{{label},error="InvalidAuth"}}'
+        ]
+        == 2
+    )
+    assert (
+        samples[f"unifi_network_map_auth_backoff_activations_total{{{label}}}"]
+        == 1
+    )
+    assert (
+        samples[f"unifi_network_map_refreshes_superseded_total{{{label}}}"]
+        == 2
+    )
+    assert samples[f"unifi_network_map_websocket_subscribers{{{label}}}"] == 3
+    assert (
+        samples[
+            f'unifi_network_map_cache_misses_total{{{label},cache="payload"}}'
+        ]
+        == 1
+    )
+    assert samples[f'unifi_network_map_cache_bytes{{{label},cache="payload"}}']
+    assert (
+        samples[f'unifi_network_map_cache_bytes{{{label},cache="themed_svg"}}']
+        == 0
+    )
+    assert samples[f"unifi_network_map_svg_bytes{{{label}}}"] == len("<svg />")
+    assert samples[f"unifi_network_map_payload_bytes{{{label}}}"] > 0
+    assert "unifi_network_map_entity_index_rebuilds_total" in samples
+
+
+async def test_metric_families_are_contiguous_across_entries(
+    hass: HomeAssistant,
+) -> None:
+    for _ in range(2):
+        _load_entry(hass)[1].timings.record("fetch_map", 0.1)
+
+    family = ""
+    seen: list[str] = []
+    for line in render_metrics(hass).splitlines():
+        if line.startswith("# TYPE"):
+            family = line.split(" ")[2]
+            assert family not in seen
+            seen.append(family)
+        elif not line.startswith("#"):
+            assert line.startswith(family)
+
+
+async def test_metrics_cover_job_executor_queue(hass: HomeAssistant) -> None:
+    _load_entry(hass)
+    assert "executor_queue_depth" not in render_metrics(hass)
+
+    await async_run_job(hass, "theme", lambda: None)
+    samples = _samples(render_metrics(hass))
+
+    prefix = "unifi_network_map_executor"
+    assert samples[f'{prefix}_queue_depth{{priority="refresh"}}'] == 0
+    assert samples[f'{prefix}_queue_depth{{priority="theme"}}'] == 0
+    assert samples[f'{prefix}_wait_seconds_count{{priority="theme"}}'] == 1
+    assert f'{prefix}_wait_seconds_count{{priority="refresh"}}' not in samples
@@ -0,0 +1,151 @@
+"""Tests for the profile_refresh service."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.unifi_network_map import (
+    _register_profile_service,
+)
+from custom_components.unifi_network_map import profiler as profiler_module
+from custom_components.unifi_network_map.const import (
+    DOMAIN,
+    SERVICE_PROFILE_REFRESH,
+)
+from custom_components.unifi_network_map.coordinator import (
+    UniFiNetworkMapCoordinator,
+)
+from custom_components.unifi_network_map.data import UniFiNetworkMapData
+from custom_components.unifi_network_map.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from custom_components.unifi_network_map.profiler import (
+    async_profile_refresh,
+    get_last_profile,
+)
+from tests.integration.conftest import build_mock_entry
+
+if TYPE_CHECKING:
+    from custom_components.unifi_network_map.stage_timings import (
+        StageTimings,
+    )
+
+
+class _StubClient:
+    def __init__(self, timings: StageTimings) -> None:
+        self.timings = timings
+
+    def fetch_map(self, _job: object = None) -> UniFiNetworkMapData:
+        self.thread = threading.current_thread().name
+        with self.timings.measure("fetch_map"):
+            return UniFiNetworkMapData(
+                svg="<svg />",
+                payload={"node_types": {"GW": "gateway", "AP": "ap"}},
+            )
+
+
+def _load_entry(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> tuple[str, UniFiNetworkMapCoordinator]:
+    entry = build_mock_entry()
+    entry.add_to_hass(hass)
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    live = UniFiNetworkMapData(svg="<svg>live</svg>", payload={})
+    coordinator.data = live
+    monkeypatch.setattr(coordinator, "build_uncached_client", _StubClient)
+    entry.runtime_data = coordinator
+    return entry.entry_id, coordinator
+
+
+async def test_profile_refresh_writes_files_and_keeps_summary(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entry_id, coordinator = _load_entry(hass, monkeypatch)
+    live = coordinator.data
+    _register_profile_service(hass)
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_PROFILE_REFRESH,
+        {"entry_id": entry_id, "top": 5},
+        blocking=True,
+        return_response=True,
+    )
+
+    summary = response["profiles"][entry_id]
+    assert summary["node_count"] == 2
+    assert set(summary["stages"]) == {"fetch_map", "enrich_payload"}
+    assert 0 < len(summary["top_functions"]) <= 5
+    assert len(summary["memory"]["top_allocations"]) <= 5
+    assert summary["memory"]["peak_kib"] >= 0
+    assert Path(summary["stats_path"]).is_file()
+    text = Path(summary["summary_path"]).read_text(encoding="utf-8")
+    assert f"refresh profile for {entry_id}" in text
+    assert Path(summary["stats_path"]).parent == Path(hass.config.path(DOMAIN))
+    assert coordinator.data is live
+    assert get_last_profile(hass, entry_id) is summary
+
+    diagnostics = await async_get_config_entry_diagnostics(
+        hass, hass.config_entries.async_get_entry(entry_id)
+    )
+    assert diagnostics["last_profile"]["entry_id"] == entry_id
+
+
+async def test_profile_refresh_runs_on_the_job_executor(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entry_id, coordinator = _load_entry(hass, monkeypatch)
+    clients: list[_StubClient] = []
+    enrich_threads: list[str] = []
+
+    def _client(timings: StageTimings) -> _StubClient:
+        clients.append(_StubClient(timings))
+        return clients[-1]
+
+    def _enrich(
+        _hass: HomeAssistant, payload: dict[str, object], eager_max_nodes: int
+    ) -> None:
+        enrich_threads.append(threading.current_thread().name)
+
+    monkeypatch.setattr(coordinator, "build_uncached_client", _client)
+    monkeypatch.setattr(profiler_module, "build_enriched_payload", _enrich)
+
+    await async_profile_refresh(hass, entry_id, coordinator, 5)
+
+    assert clients[0].thread.startswith(f"{DOMAIN}_executor_")
+    assert enrich_threads == [clients[0].thread]
+
+
+async def test_profile_refresh_rejects_concurrent_runs(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entry_id, coordinator = _load_entry(hass, monkeypatch)
+    lock = asyncio.Lock()
+    hass.data.setdefault(DOMAIN, {})["profile_lock"] = lock
+    await lock.acquire()
+
+    with pytest.raises(HomeAssistantError):
+        await async_profile_refresh(hass, entry_id, coordinator, 5)
+    assert get_last_profile(hass, entry_id) is None
+
+
+async def test_profile_service_requires_matching_entry(
+    hass: HomeAssistant,
+) -> None:
+    _register_profile_service(hass)
+
+    with pytest.raises(HomeAssistantError):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_PROFILE_REFRESH,
+            {"entry_id": "missing"},
+            blocking=True,
+            return_response=True,
+        )
@@ -0,0 +1,95 @@
+"""Tests for the record_bundle service."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.unifi_network_map import (
+    _register_record_bundle_service,
+)
+from custom_components.unifi_network_map.bundle import load_bundle
+from custom_components.unifi_network_map.const import (
+    DOMAIN,
+    SERVICE_RECORD_BUNDLE,
+)
+from custom_components.unifi_network_map.coordinator import (
+    UniFiNetworkMapCoordinator,
+)
+from custom_components.unifi_network_map.errors import CannotConnect
+from custom_components.unifi_network_map.renderer import ControllerRecords
+from tests.integration.conftest import build_mock_entry
+
+
+class _StubClient:
+    def __init__(self, error: Exception | None = None) -> None:
+        self.error = error
+
+    def fetch_records(self) -> ControllerRecords:
+        if self.error:
+            raise self.error
+        return ControllerRecords(
+            devices=[{"name": "Home Gateway", "mac": "aa:bb:cc:00:00:01"}],
+            clients=[{"mac": "aa:bb:cc:00:00:02", "hostname": "laptop"}],
+            networks=[],
+        )
+
+
+def _load_entry(
+    hass: HomeAssistant,
+    monkeypatch: pytest.MonkeyPatch,
+    client: _StubClient,
+) -> str:
+    entry = build_mock_entry({"include_clients": True})
+    entry.add_to_hass(hass)
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    monkeypatch.setattr(
+        coordinator, "build_uncached_client", lambda _timings: client
+    )
+    entry.runtime_data = coordinator
+    _register_record_bundle_service(hass)
+    return entry.entry_id
+
+
+async def test_record_bundle_writes_redacted_bundle(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entry_id = _load_entry(hass, monkeypatch, _StubClient())
+
+    response = await hass.services.async_call(
+        DOMAIN,
+        SERVICE_RECORD_BUNDLE,
+        {"entry_id": entry_id},
+        blocking=True,
+        return_response=True,
+    )
+
+    result = response["bundles"][entry_id]
+    assert result["devices"] == 1
+    assert result["clients"] == 1
+    path = Path(result["path"])
+    assert path.parent == Path(hass.config.path(DOMAIN))
+    bundle = load_bundle(path)
+    assert bundle.settings().include_clients is True
+    assert "Home Gateway" not in str(bundle.records)
+    assert "aa:bb:cc" not in str(bundle.records)
+
+
+async def test_record_bundle_reports_fetch_failures(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entry_id = _load_entry(
+        hass, monkeypatch, _StubClient(CannotConnect("Unable to connect"))
+    )
+
+    with pytest.raises(HomeAssistantError, match="Unable to connect"):
+        await hass.services.async_call(
+            DOMAIN,
+            SERVICE_RECORD_BUNDLE,
+            {"entry_id": entry_id},
+            blocking=True,
+            return_response=True,
+        )
@@ -0,0 +1,86 @@
+"""Tests for wiring the render worker option into the coordinator."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from custom_components.unifi_network_map.const import (
+    CONF_RENDER_IN_WORKER,
+    CONF_RENDER_TIMEOUT_SECONDS,
+    CONF_RENDER_WORKER_MEMORY_MIB,
+)
+from custom_components.unifi_network_map.coordinator import (
+    UniFiNetworkMapCoordinator,
+)
+from custom_components.unifi_network_map.diagnostics import (
+    async_get_config_entry_diagnostics,
+)
+from tests.integration.conftest import build_mock_entry
+
+if TYPE_CHECKING:
+    import pytest
+    from homeassistant.core import HomeAssistant
+
+    from custom_components.unifi_network_map.render_worker import (
+        RenderWorker,
+    )
+
+
+async def test_render_worker_follows_entry_options(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entry = build_mock_entry()
+    entry.add_to_hass(hass)
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    assert coordinator.render_worker is None
+
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            CONF_RENDER_IN_WORKER: True,
+            CONF_RENDER_TIMEOUT_SECONDS: 30,
+            CONF_RENDER_WORKER_MEMORY_MIB: 512,
+        },
+    )
+    coordinator.update_settings()
+    worker = coordinator.render_worker
+    assert worker is not None
+    assert worker.timeout_seconds == 30
+    assert worker.memory_limit_mib == 512
+    assert coordinator._client.render_worker is worker
+    entry.runtime_data = coordinator
+    diagnostics = await async_get_config_entry_diagnostics(hass, entry)
+    assert diagnostics["render_worker"]["running"] is False
+
+    hass.config_entries.async_update_entry(
+        entry,
+        options={CONF_RENDER_IN_WORKER: True, CONF_RENDER_TIMEOUT_SECONDS: 60},
+    )
+    coordinator.update_settings()
+    assert coordinator.render_worker is worker
+    assert worker.timeout_seconds == 60
+
+    stopped: list[RenderWorker] = []
+    monkeypatch.setattr(worker, "stop", lambda: stopped.append(worker))
+    hass.config_entries.async_update_entry(entry, options={})
+    coordinator.update_settings()
+    await hass.async_block_till_done()
+    assert coordinator.render_worker is None
+    assert coordinator._client.render_worker is None
+    assert stopped == [worker]
+
+
+async def test_shutdown_stops_render_worker(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    entry = build_mock_entry({CONF_RENDER_IN_WORKER: True})
+    entry.add_to_hass(hass)
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    worker = coordinator.render_worker
+    assert worker is not None
+    stopped: list[bool] = []
+    monkeypatch.setattr(worker, "stop", lambda: stopped.append(True))
+
+    await coordinator.async_shutdown()
+
+    assert stopped == [True]
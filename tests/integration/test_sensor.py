@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import Any
+from unittest.mock import MagicMock
 
 from homeassistant.core import HomeAssistant
 from pytest_homeassistant_custom_component.common import MockConfigEntry
@@ -48,6 +49,27 @@ async def test_sensor_state_and_attributes(
     assert attrs["entry_id"] == entry.entry_id
     assert attrs["svg_url"].endswith(f"/{entry.entry_id}/svg")
     assert attrs["payload_url"].endswith(f"/{entry.entry_id}/payload")
+    assert attrs["stage_timings"] == coordinator.timings.summary()
+    assert "stage_timings" in entity._unrecorded_attributes
+
+
+async def test_sensor_skips_write_when_only_timings_change(
+    hass: HomeAssistant,
+) -> None:
+    entry = build_mock_entry()
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload={})
+    coordinator.last_exception = None
+    entity = (await _setup_sensor(hass, entry, coordinator))[0]
+    entity.async_write_ha_state = MagicMock()
+
+    entity._handle_coordinator_update()
+    coordinator.timings.record("render", 0.25)
+    entity._handle_coordinator_update()
+    coordinator.last_exception = RuntimeError("boom")
+    entity._handle_coordinator_update()
+
+    assert entity.async_write_ha_state.call_count == 2
 
 
 async def test_sensor_error_state(hass: HomeAssistant) -> None:
@@ -148,6 +170,8 @@ async def test_vlan_sensor_attributes(
         "Hue Bridge",
         "Smart TV",
     ]
+    assert "clients" in iot_sensor._unrecorded_attributes
+    assert "vlan_name" not in iot_sensor._unrecorded_attributes
 
 
 async def test_vlan_sensor_unique_id_format(
@@ -237,3 +261,33 @@ async def test_vlan_sensor_returns_zero_when_data_cleared(
         assert vlan_sensor._get_vlan_info() is None
 
     await coordinator.async_shutdown()
+
+
+async def test_updates_only_construct_sensors_for_new_vlans(
+    hass: HomeAssistant, monkeypatch: Any
+) -> None:
+    entry = build_mock_entry()
+    coordinator = UniFiNetworkMapCoordinator(hass, entry)
+    payload = _build_payload_with_vlans()
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload=payload)
+    coordinator.last_exception = None
+    constructed: list[int] = []
+    original = sensor._create_vlan_sensor
+
+    def _counting(*args: Any) -> UniFiVlanClientsSensor:
+        entity = original(*args)
+        constructed.append(entity._vlan_id)
+        return entity
+
+    monkeypatch.setattr(sensor, "_create_vlan_sensor", _counting)
+    await _setup_sensor(hass, entry, coordinator)
+    assert constructed == [10, 20]
+
+    coordinator.async_update_listeners()
+    assert constructed == [10, 20]
+
+    payload["vlan_info"]["30"] = {"id": 30, "name": "Cameras"}
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload=payload)
+    coordinator.async_update_listeners()
+
+    assert constructed == [10, 20, 30]
@@ -26,6 +26,9 @@ from tests.helpers import build_settings
 if TYPE_CHECKING:
     from collections.abc import Callable
 
+    from custom_components.unifi_network_map.render_worker import (
+        RenderWorker,
+    )
     from custom_components.unifi_network_map.renderer import RenderSettings
 
 
@@ -171,6 +174,69 @@ def test_render_map_payload_maps_request_errors(
         )
 
 
+def test_fetch_records_maps_request_errors_and_bypasses_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    seen: list[bool] = []
+
+    def _fetch(_config: object, settings: RenderSettings) -> object:
+        seen.append(settings.use_cache)
+        raise RequestException("timeout")
+
+    monkeypatch.setattr(api_module, "fetch_controller_records", _fetch)
+    client = api_module.UniFiNetworkMapClient(
+        base_url="https://controller.local",
+        username="user",
+        password="pass",
+        site="default",
+        verify_ssl=True,
+        settings=_build_settings(),
+    )
+
+    with pytest.raises(CannotConnect):
+        client.fetch_records()
+    assert seen == [False]
+    assert client.timings.summary()["fetch_records"]["count"] == 1
+
+
+def test_fetch_map_hands_inputs_to_render_worker(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    data = UniFiNetworkMapData(svg="<svg />", payload={})
+    rendered: list[tuple[object, object]] = []
+
+    class _Worker:
+        def render(
+            self,
+            inputs: object,
+            settings: object,
+            _timings: object,
+            _job: object = None,
+        ) -> UniFiNetworkMapData:
+            rendered.append((inputs, settings))
+            return data
+
+    def _load_inputs(*_args: object, **_kwargs: object) -> str:
+        return "inputs"
+
+    monkeypatch.setattr(
+        api_module.UniFiNetworkMapRenderer, "load_inputs", _load_inputs
+    )
+    settings = _build_settings()
+    client = api_module.UniFiNetworkMapClient(
+        base_url="https://controller.local",
+        username="user",
+        password="pass",
+        site="default",
+        verify_ssl=True,
+        settings=settings,
+        render_worker=cast("RenderWorker", _Worker()),
+    )
+
+    assert client.fetch_map() is data
+    assert rendered == [("inputs", settings)]
+
+
 def test_assert_unifi_connectivity_maps_request_rejected_on_401(
     monkeypatch: pytest.MonkeyPatch,
 ) -> None:
@@ -514,7 +580,7 @@ def test_client_forwards_api_key_to_config(
     captured: dict[str, object] = {}
 
     def _render_payload(
-        config: api_module.Config, _settings: object
+        config: api_module.Config, *_args: object
     ) -> UniFiNetworkMapData:
         captured["config"] = config
         return UniFiNetworkMapData(svg="<svg />", payload={})
@@ -588,3 +654,66 @@ def test_invalidate_cache_forces_refetch(
     client.fetch_map()
 
     assert counter["value"] == 2
+
+
+def test_fetch_map_publishes_before_late_networks(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from concurrent.futures import Future
+
+    from custom_components.unifi_network_map import renderer
+
+    monkeypatch.setattr(renderer, "fetch_devices", lambda *a, **k: [])
+    monkeypatch.setattr(
+        renderer,
+        "fetch_clients",
+        lambda *a, **k: [{"name": "Cam", "vlan": 20, "is_wired": True}],
+    )
+    client = api_module.UniFiNetworkMapClient(
+        base_url="https://controller",
+        username=None,
+        password=None,
+        site="default",
+        verify_ssl=True,
+        settings=build_settings(
+            include_clients=True, client_scope="all", use_cache=True
+        ),
+        api_key="topsecret",
+    )
+    networks: Future[list[dict[str, object]]] = Future()
+    started: list[int] = []
+
+    def _start_networks() -> Future[list[dict[str, object]]]:
+        started.append(1)
+        return networks
+
+    partial = client.fetch_map(start_networks=_start_networks)
+
+    assert started == [1]
+    assert partial.pending == ("networks",)
+    assert partial.payload["vlan_info"][20]["name"] == "VLAN 20"
+
+    completed = client.complete_networks(
+        partial, [{"name": "Cameras", "vlan": 20}]
+    )
+
+    assert completed.pending == ()
+    assert completed.payload["vlan_info"][20]["name"] == "Cameras"
+    assert completed.svg == partial.svg
+    # The cache serves the completed map without starting a networks
+    # fetch; completing twice is a no-op.
+    assert client.fetch_map(start_networks=_start_networks) is completed
+    assert started == [1]
+    assert client.complete_networks(partial, []) is partial
+
+    # Later late renders keep the last completed map's networks.
+    client.invalidate_cache()
+    late = client.fetch_map(start_networks=_start_networks)
+    assert late.pending == ("networks",)
+    assert late.payload["vlan_info"][20]["name"] == "Cameras"
+
+    networks.set_result([])
+    client.invalidate_cache()
+    on_time = client.fetch_map(start_networks=_start_networks)
+    assert on_time.pending == ()
+    assert on_time.payload["vlan_info"][20]["name"] == "VLAN 20"
@@ -39,12 +39,22 @@ class FakeClient:
             use_cache=False,
         )
 
-    def fetch_map(self) -> UniFiNetworkMapData:
+    def fetch_map(
+        self, _job: object = None, _networks: object = None
+    ) -> UniFiNetworkMapData:
         response = self._responses.pop(0)
         if isinstance(response, Exception):
             raise response
         return response
 
+    def fetch_networks(self) -> list[dict[str, object]]:
+        return []
+
+    def complete_networks(
+        self, data: UniFiNetworkMapData, _networks: object
+    ) -> UniFiNetworkMapData:
+        return data
+
 
 def _build_entry() -> MockConfigEntry:
     return MockConfigEntry(
@@ -84,6 +94,8 @@ async def test_auth_backoff_blocks_immediate_retry(
         100.0 + AUTH_BACKOFF_BASE_SECONDS
     )
     assert coordinator.auth_backoff_seconds == AUTH_BACKOFF_BASE_SECONDS * 2
+    assert coordinator.backoff_activations == 1
+    assert coordinator.fetch_errors == {"InvalidAuth": 1}
 
     with pytest.raises(UpdateFailed) as exc:
         await coordinator._async_update_data()
@@ -0,0 +1,118 @@
+"""Unit tests for the benchmark generator, regression check and load stats."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import TYPE_CHECKING
+
+from custom_components.unifi_network_map.renderer import _render_map
+from custom_components.unifi_network_map.stage_timings import StageTimings
+from tests.benchmarks.harness import (
+    Measurement,
+    controller_records,
+    find_regressions,
+)
+from tests.benchmarks.load import (
+    LatencySamples,
+    LoadResult,
+    LoopLagProbe,
+    store_load_results,
+)
+from tests.benchmarks.synthetic import generate_site
+from tests.helpers import build_settings
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_generated_site_renders_as_one_tree() -> None:
+    site = generate_site(40, 300)
+    settings = build_settings(
+        include_ports=True, include_clients=True, client_scope="all"
+    )
+    config = type("Config", (), {"site": "default"})()
+
+    with controller_records(site.devices, site.clients, site.networks):
+        data = _render_map(config, settings, StageTimings())
+
+    node_count = len(site.devices) + len(site.clients)
+    assert len(data.payload["node_types"]) == node_count
+    assert len(data.payload["edges"]) == node_count - 1
+    assert data.payload["gateways"] == [site.devices[0]["mac"]]
+
+
+def test_generated_site_is_deterministic() -> None:
+    assert generate_site(10, 50, seed=3) == generate_site(10, 50, seed=3)
+    assert generate_site(10, 50, seed=3) != generate_site(10, 50, seed=4)
+
+
+def test_find_regressions_applies_tolerances_and_noise_floor() -> None:
+    baseline = {
+        "slow": {"wall_ms": 100.0, "peak_kib": 1000.0},
+        "tiny": {"wall_ms": 1.0, "peak_kib": 10.0},
+    }
+    results = {
+        "slow": Measurement(wall_ms=160.0, peak_kib=1300.0),
+        "tiny": Measurement(wall_ms=9.0, peak_kib=90.0),
+        "new": Measurement(wall_ms=1.0, peak_kib=1.0),
+    }
+
+    regressions = find_regressions(
+        results, baseline, wall_tolerance=0.5, memory_tolerance=0.2
+    )
+
+    assert regressions == [
+        "slow: wall 160.0 ms > 100.0 ms baseline",
+        "slow: peak 1300 KiB > 1000 KiB baseline",
+    ]
+
+
+def test_latency_samples_summarize_percentiles_and_throughput() -> None:
+    samples = LatencySamples()
+    for millis in range(1, 101):
+        samples.record(millis / 1000)
+    samples.errors = 2
+
+    summary = samples.summary(elapsed=4.0)
+
+    assert summary == {
+        "requests": 100,
+        "errors": 2,
+        "per_second": 25.0,
+        "p50_ms": 50.0,
+        "p95_ms": 95.0,
+        "p99_ms": 99.0,
+        "max_ms": 100.0,
+    }
+    assert LatencySamples().summary(elapsed=1.0)["max_ms"] == 0.0
+
+
+async def test_loop_lag_probe_reports_blocking() -> None:
+    probe = LoopLagProbe(interval=0.001)
+    probe.start()
+    await asyncio.sleep(0.01)
+    # Block the loop the way synchronous work in a view would.
+    started = asyncio.get_running_loop().time()
+    while asyncio.get_running_loop().time() - started < 0.05:
+        pass
+    await asyncio.sleep(0.01)
+    await probe.stop()
+
+    summary = probe.summary()
+    assert summary["blocked_count"] >= 1
+    assert summary["lag_max_ms"] >= 40
+
+
+def test_store_load_results_merges_levels(tmp_path: Path) -> None:
+    path = tmp_path / "load.json"
+
+    for clients in (10, 50):
+        store_load_results(
+            path,
+            "small",
+            LoadResult(clients=clients, elapsed_s=1.0, kinds={}, loop={}),
+        )
+
+    stored = json.loads(path.read_text(encoding="utf-8"))
+    assert sorted(stored["small"]) == ["10", "50"]
@@ -658,3 +658,11 @@ async def test_client_presence_unique_id_format(hass: HomeAssistant) -> None:
     )
 
     assert sensor.unique_id == f"{entry.entry_id}_client_aabbccddeeff"
+
+
+def test_device_presence_keeps_bulky_attributes_out_of_recorder() -> None:
+    unrecorded = UniFiDevicePresenceSensor._unrecorded_attributes
+
+    assert {"uplink_device", "model", "clients_connected"} <= unrecorded
+    assert "ip" not in unrecorded
+    assert "device_type" not in unrecorded
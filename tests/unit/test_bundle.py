@@ -0,0 +1,159 @@
+"""Unit tests for controller bundle redaction, storage and replay."""
+
+from __future__ import annotations
+
+import gzip
+import ipaddress
+import json
+from dataclasses import asdict
+from typing import TYPE_CHECKING
+
+import pytest
+
+from custom_components.unifi_network_map.bundle import (
+    BUNDLE_FORMAT,
+    load_bundle,
+    redact_records,
+    write_bundle,
+)
+from custom_components.unifi_network_map.renderer import (
+    ControllerRecords,
+    UniFiNetworkMapRenderer,
+)
+from scripts.replay_bundle import replay
+from tests.benchmarks.synthetic import generate_site
+from tests.helpers import build_settings
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+GATEWAY_MAC = "AA:BB:CC:00:00:01"
+SWITCH_MAC = "aa:bb:cc:00:00:02"
+CLIENT_MAC = "aa-bb-cc-00-00-03"
+
+
+def _records() -> ControllerRecords:
+    return ControllerRecords(
+        devices=[
+            {
+                "name": "Smith Gateway",
+                "mac": GATEWAY_MAC,
+                "ip": "192.168.1.1",
+                "connect_request_ip": "81.2.69.142",
+                "serial": "AABBCC000001",
+                "geo_info": {"city": "Springfield"},
+                "x_ssh_password": "secret",
+                "wan1": {"dns": ["1.1.1.1", "192.168.1.1"]},
+            },
+            {
+                "name": "Office Switch",
+                "mac": SWITCH_MAC,
+                "uplink": {
+                    "uplink_mac": GATEWAY_MAC.lower(),
+                    "uplink_device_name": "Smith Gateway",
+                },
+                "lldp_table": [
+                    {"chassis_id": GATEWAY_MAC, "port_desc": "Smith Gateway"}
+                ],
+            },
+        ],
+        clients=[
+            {
+                "mac": CLIENT_MAC,
+                "hostname": "bobs-laptop",
+                "sw_mac": SWITCH_MAC,
+                "network": "Smith IoT",
+                "ip": "10.20.0.5",
+                "oui": "Apple",
+            }
+        ],
+        networks=[{"name": "Smith IoT", "ip_subnet": "10.20.0.1/24"}],
+    )
+
+
+def test_redaction_keeps_links_consistent() -> None:
+    redacted = redact_records(_records())
+    gateway, switch = redacted.devices
+    client = redacted.clients[0]
+
+    assert gateway["mac"] == switch["uplink"]["uplink_mac"]
+    assert gateway["mac"] == switch["lldp_table"][0]["chassis_id"]
+    assert gateway["name"] == switch["uplink"]["uplink_device_name"]
+    assert gateway["name"] == switch["lldp_table"][0]["port_desc"]
+    assert switch["mac"] == client["sw_mac"]
+    assert client["network"] == redacted.networks[0]["name"]
+    assert gateway["ip"] == gateway["wan1"]["dns"][1]
+    assert client["oui"] == "Apple"
+
+
+def test_redaction_removes_identifying_values() -> None:
+    text = json.dumps(asdict(redact_records(_records())))
+
+    for secret in (
+        "Smith",
+        "bobs-laptop",
+        "AABBCC000001",
+        "Springfield",
+        "secret",
+        "192.168.1.1",
+        "81.2.69.142",
+        "aa:bb:cc",
+        "AA:BB:CC",
+    ):
+        assert secret not in text
+
+
+def test_redaction_keeps_address_scope_and_prefix() -> None:
+    redacted = redact_records(_records())
+    gateway = redacted.devices[0]
+
+    assert ipaddress.ip_address(gateway["connect_request_ip"]).is_global
+    assert ipaddress.ip_address(gateway["ip"]).is_private
+    assert redacted.networks[0]["ip_subnet"].endswith("/24")
+
+
+def test_bundle_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / "bundle.json.gz"
+    settings = build_settings(include_clients=True, svg_isometric=True)
+    records = redact_records(_records())
+
+    write_bundle(path, records, {"settings": asdict(settings)})
+    bundle = load_bundle(path)
+
+    assert bundle.records == records
+    assert bundle.metadata["format"] == BUNDLE_FORMAT
+    assert bundle.settings() == settings
+    assert bundle.config().site == "default"
+
+
+def test_load_bundle_rejects_unknown_format(tmp_path: Path) -> None:
+    path = tmp_path / "bundle.json.gz"
+    path.write_bytes(gzip.compress(b'{"format": 99}'))
+
+    with pytest.raises(ValueError, match="format"):
+        load_bundle(path)
+
+
+def test_redacted_site_renders_the_same_topology(tmp_path: Path) -> None:
+    site = generate_site(20, 120)
+    records = ControllerRecords(site.devices, site.clients, site.networks)
+    settings = build_settings(include_clients=True, client_scope="all")
+    path = tmp_path / "bundle.json.gz"
+    write_bundle(path, redact_records(records), {"settings": asdict(settings)})
+    bundle = load_bundle(path)
+    renderer = UniFiNetworkMapRenderer()
+
+    original = renderer.render(bundle.config(), settings, records=records)
+    replayed = renderer.render(
+        bundle.config(), bundle.settings(), records=bundle.records
+    )
+
+    assert len(replayed.payload["edges"]) == len(original.payload["edges"])
+    assert sorted(replayed.payload["node_types"].values()) == sorted(
+        original.payload["node_types"].values()
+    )
+
+    timings = replay(path, repeat=2, theme="unifi-dark")
+    summary = timings.summary()
+    assert summary["render"]["count"] == 2
+    assert {"render_svg", "encode_msgpack", "themed_svg"} <= set(summary)
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from typing import Any
+
+from custom_components.unifi_network_map.cache_budget import (
+    CacheBudget,
+    estimate_size,
+    get_cache_budget,
+    set_cache_memory_limit,
+)
+from custom_components.unifi_network_map.payload_cache import (
+    PayloadCache,
+    get_payload_cache,
+)
+from custom_components.unifi_network_map.svg_cache import (
+    ThemedSvgCache,
+    get_themed_svg_cache,
+)
+
+
+class FakeHass:
+    def __init__(self) -> None:
+        self.data: dict[str, Any] = {}
+
+
+def _body(size: int) -> bytes:
+    return b"x" * (size - estimate_size(b""))
+
+
+def test_least_recently_used_artifacts_are_evicted() -> None:
+    budget = CacheBudget(limit_bytes=3000)
+    evicted: list[tuple[str, str]] = []
+    budget.register(
+        "test", lambda entry_id, key: evicted.append((entry_id, key))
+    )
+
+    budget.track(("test", "a", "1"), 1000)
+    budget.track(("test", "b", "1"), 1000)
+    budget.track(("test", "a", "2"), 1000)
+    budget.touch(("test", "a", "1"))
+    budget.track(("test", "c", "1"), 1000)
+
+    assert evicted == [("b", "1")]
+    assert budget.used_bytes == 3000
+    stats = budget.stats("a")
+    assert stats["entry_bytes"] == 2000
+    assert stats["evictions"] == {"test": 1}
+    assert stats["artifacts"] == 3
+
+
+def test_the_artifact_just_stored_is_kept_when_over_budget() -> None:
+    budget = CacheBudget(limit_bytes=100)
+
+    budget.track(("test", "a", "1"), 500, keep=(("test", "a", "0"),))
+
+    assert budget.used_bytes == 500
+    budget.resize(50)
+    assert budget.used_bytes == 0
+
+
+def test_estimate_counts_shared_objects_once() -> None:
+    name = "aa:bb:cc:dd:ee:ff" * 10
+    shared = estimate_size([name, name, name])
+    distinct = estimate_size([name, name + "1", name + "2"])
+
+    assert estimate_size(b"x" * 1000) >= 1000
+    assert shared < distinct
+
+
+def test_payload_variants_are_accounted_and_evicted() -> None:
+    budget = CacheBudget(limit_bytes=10_000)
+    cache = PayloadCache(budget=budget)
+    source = {"edges": [{"left": "a", "right": "b"}] * 50}
+    first = cache.set("entry1", {**source, "node_status": {}}, "h1", source)
+    assert budget.entry_bytes("payload", "entry1") < estimate_size(source)
+
+    first.variant("2.0/json", lambda: _body(4000))
+    second = cache.set("entry2", dict(source), "h2", source)
+    second.variant("2.0/json", lambda: _body(4000))
+    first.variant("2.0/json", lambda: _body(4000))
+    second.variant("3.0/json", lambda: _body(4000))
+
+    # entry2's older body went first; entry1's was used more recently.
+    assert "2.0/json" not in second.variants
+    assert "2.0/json" in first.variants
+    assert budget.used_bytes <= budget.limit_bytes
+
+    cache.invalidate("entry1")
+    assert budget.entry_bytes("payload", "entry1") == 0
+
+
+def test_evicting_a_payload_drops_its_entry() -> None:
+    budget = CacheBudget(limit_bytes=10_000)
+    cache = PayloadCache(budget=budget)
+    cache.set("entry1", {"body": _body(6000)}, "h1")
+
+    cache.set("entry2", {"body": _body(6000)}, "h2")
+
+    assert cache.get_entry("entry1", "h1") is None
+    assert cache.get_entry("entry2", "h2") is not None
+
+
+def test_themed_svgs_share_the_budget_with_payloads() -> None:
+    hass = FakeHass()
+    set_cache_memory_limit(hass, 1)  # type: ignore[arg-type]
+    svgs = get_themed_svg_cache(hass)  # type: ignore[arg-type]
+    payloads = get_payload_cache(hass)  # type: ignore[arg-type]
+    data = object()
+    svg = "<svg>" + "x" * 400_000 + "</svg>"
+
+    svgs.set("entry1", data, "dark", None, (svg, "#000"))  # type: ignore[arg-type]
+    cached = payloads.set("entry1", {}, "h1")
+    cached.variant("2.0/json", lambda: _body(500_000))
+    svgs.set("entry1", data, "light", None, (svg, "#fff"))  # type: ignore[arg-type]
+
+    budget = get_cache_budget(hass)  # type: ignore[arg-type]
+    assert svgs.get("entry1", data, "dark", None) is None  # type: ignore[arg-type]
+    assert svgs.get("entry1", data, "light", None) is not None  # type: ignore[arg-type]
+    assert budget.stats()["evictions"] == {"themed_svg": 1}
+    assert budget.used_bytes <= budget.limit_bytes
+
+
+def test_caches_without_a_budget_do_not_account() -> None:
+    cache = ThemedSvgCache()
+    cache.set("entry1", object(), "dark", None, ("<svg/>", "#000"))  # type: ignore[arg-type]
+
+    assert cache.get("entry1", object(), "dark", None) is None  # type: ignore[arg-type]
@@ -29,10 +29,30 @@ def test_should_not_backoff_on_plain_cannot_connect() -> None:
 
 def test_build_client_sets_cache_ttl_from_scan_interval() -> None:
     from custom_components.unifi_network_map.coordinator import _build_client
+    from custom_components.unifi_network_map.stage_timings import StageTimings
     from tests.helpers import build_entry
 
     entry = build_entry(options={"scan_interval": 1})
 
-    client = _build_client(MagicMock(), entry)  # type: ignore[arg-type]
+    client = _build_client(MagicMock(), entry, StageTimings())  # type: ignore[arg-type]
 
     assert client.cache_ttl_seconds == 60.0
+
+
+def test_lightweight_stats_yields_to_tracked_clients() -> None:
+    from custom_components.unifi_network_map.coordinator import (
+        _build_settings,
+    )
+    from tests.helpers import build_entry
+
+    lightweight = build_entry(options={"lightweight_stats": True})
+    tracked = build_entry(
+        options={
+            "lightweight_stats": True,
+            "tracked_clients": "aa:bb:cc:dd:ee:ff",
+        }
+    )
+
+    assert _build_settings(lightweight).lightweight_stats is True
+    assert _build_settings(tracked).lightweight_stats is False
+    assert _build_settings(build_entry()).lightweight_stats is False
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from typing import Any
+
+import pytest
+
+from custom_components.unifi_network_map import device_details
+from custom_components.unifi_network_map.device_details import (
+    DeviceDetailCache,
+    device_signatures,
+)
+
+
+class _Controller:
+    """Serves a basic and a detailed device list and counts the fetches."""
+
+    def __init__(self) -> None:
+        self.basic: list[dict[str, Any]] = [
+            {"mac": "AA:00", "state": 1, "cfgversion": "a", "type": "usw"},
+            {"mac": "aa:01", "state": 1, "cfgversion": "b", "type": "uap"},
+        ]
+        self.detailed_fetches = 0
+
+    def fetch_basic(self) -> list[object]:
+        return [dict(device) for device in self.basic]
+
+    def fetch_detailed(self) -> list[object]:
+        self.detailed_fetches += 1
+        return [
+            {**device, "port_table": [], "fetch": self.detailed_fetches}
+            for device in self.basic
+        ]
+
+
+def _load(cache: DeviceDetailCache, controller: _Controller) -> list[Any]:
+    return cache.load(controller.fetch_basic, controller.fetch_detailed)
+
+
+def test_details_are_reused_while_the_basic_list_is_unchanged() -> None:
+    cache = DeviceDetailCache(max_age_seconds=600)
+    controller = _Controller()
+
+    first = _load(cache, controller)
+    second = _load(cache, controller)
+
+    assert second is first
+    assert controller.detailed_fetches == 1
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["devices"] == 2
+
+
+@pytest.mark.parametrize(
+    ("field", "value"),
+    [
+        ("state", 0),
+        ("cfgversion", "c"),
+        ("uplink", {"uplink_mac": "aa:02"}),
+        ("port_table", [{"port_idx": 1, "up": False}]),
+    ],
+)
+def test_a_changed_device_refetches_details(field: str, value: Any) -> None:
+    cache = DeviceDetailCache(max_age_seconds=600)
+    controller = _Controller()
+    _load(cache, controller)
+
+    controller.basic[1][field] = value
+    records = _load(cache, controller)
+
+    assert controller.detailed_fetches == 2
+    assert records[1]["fetch"] == 2
+
+
+def test_added_device_and_expiry_refetch_details(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    now = [0.0]
+    monkeypatch.setattr(device_details, "monotonic_seconds", lambda: now[0])
+    cache = DeviceDetailCache(max_age_seconds=300)
+    controller = _Controller()
+    _load(cache, controller)
+
+    controller.basic.append({"mac": "aa:02", "state": 1, "type": "ugw"})
+    _load(cache, controller)
+    now[0] = 299.0
+    _load(cache, controller)
+    now[0] = 301.0
+    _load(cache, controller)
+    cache.invalidate()
+    _load(cache, controller)
+
+    assert controller.detailed_fetches == 4
+
+
+def test_signatures_key_devices_by_lowercase_mac() -> None:
+    signatures = device_signatures(
+        [{"mac": " AA:BB ", "state": 1}, {"state": 1}, "not a device"]
+    )
+
+    assert list(signatures) == ["aa:bb"]
+
+
+def test_renderer_fetches_the_basic_list_through_the_cache(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from custom_components.unifi_network_map import renderer
+    from tests.helpers import build_settings
+
+    calls: list[bool] = []
+
+    def _fetch_devices(*_args: Any, detailed: bool, **_kwargs: Any) -> list:
+        calls.append(detailed)
+        return [{"name": "GW", "mac": "aa:00", "type": "udm", "state": 1}]
+
+    monkeypatch.setattr(renderer, "fetch_devices", _fetch_devices)
+    monkeypatch.setattr(renderer, "fetch_clients", lambda *a, **k: [])
+    monkeypatch.setattr(renderer, "fetch_networks", lambda *a, **k: [])
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    cache = DeviceDetailCache(max_age_seconds=600)
+    map_renderer = renderer.UniFiNetworkMapRenderer()
+
+    for _ in range(2):
+        map_renderer.render(config, build_settings(), device_details=cache)
+
+    assert calls == [False, True, False]
@@ -0,0 +1,102 @@
+"""Unit tests for the per-render device index."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any
+
+import pytest
+
+from custom_components.unifi_network_map import device_index, renderer
+from custom_components.unifi_network_map.device_index import (
+    build_render_device_index,
+    canonical_mac,
+)
+from tests.helpers import build_settings
+
+
+@dataclass
+class _Device:
+    name: str
+    mac: str | None
+    type: str = ""
+    ip: str | None = None
+    port_table: list[Any] = field(default_factory=list)
+
+
+def test_indexes_devices_by_canonical_mac() -> None:
+    switch = _Device(name="Switch", mac=" AA:BB:CC:DD:EE:01 ", type="usw")
+    index = build_render_device_index([switch, _Device(name="X", mac=None)])
+
+    assert dict(index.by_mac) == {"aa:bb:cc:dd:ee:01": switch}
+    assert index.names == {"aa:bb:cc:dd:ee:01": "Switch"}
+    assert len(index.devices) == 2
+
+
+def test_resolves_gateway_from_type_groups() -> None:
+    gateway = _Device(name="Gateway", mac="aa:bb:cc:dd:ee:01", type="udm")
+    switch = _Device(name="Switch", mac="aa:bb:cc:dd:ee:02", type="usw")
+    index = build_render_device_index([switch, gateway])
+
+    assert index.gateway is gateway
+    assert index.gateway_macs == ["aa:bb:cc:dd:ee:01"]
+    assert index.groups["switch"] == ("aa:bb:cc:dd:ee:02",)
+
+
+def test_without_gateway() -> None:
+    index = build_render_device_index(
+        [_Device(name="Switch", mac="aa:bb:cc:dd:ee:02", type="usw")]
+    )
+
+    assert index.gateway is None
+    assert index.gateway_macs == []
+
+
+def test_keeps_only_devices_with_port_tables() -> None:
+    ports = [object()]
+    index = build_render_device_index(
+        [
+            _Device(name="A", mac="aa:bb:cc:dd:ee:01", port_table=ports),
+            _Device(name="B", mac="aa:bb:cc:dd:ee:02"),
+        ]
+    )
+
+    assert dict(index.port_tables) == {"aa:bb:cc:dd:ee:01": tuple(ports)}
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, None), ("", None), ("  ", None), (" AA:BB ", "aa:bb")],
+)
+def test_canonical_mac(value: str | None, expected: str | None) -> None:
+    assert canonical_mac(value) == expected
+
+
+def test_render_map_groups_devices_once(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Topology, WAN lookup and payload share one device grouping."""
+    calls = {"group": 0}
+    original = device_index.group_devices_by_type
+
+    def _group(devices: Any) -> dict[str, list[str]]:
+        calls["group"] += 1
+        return original(devices)
+
+    monkeypatch.setattr(device_index, "group_devices_by_type", _group)
+    monkeypatch.setattr(renderer, "fetch_devices", lambda *a, **k: [])
+    monkeypatch.setattr(renderer, "fetch_networks", lambda *a, **k: [])
+    monkeypatch.setattr(renderer, "fetch_clients", lambda *a, **k: [])
+
+    config = renderer.Config(
+        url="https://c",
+        site="default",
+        user="u",
+        password="p",
+        verify_ssl=True,
+    )
+    renderer._render_map(
+        config, build_settings(include_clients=True), renderer.StageTimings()
+    )
+
+    assert calls["group"] == 1
@@ -5,6 +5,11 @@ from __future__ import annotations
 from datetime import UTC, datetime
 from unittest.mock import MagicMock, patch
 
+import pytest
+
+from custom_components.unifi_network_map.const import (
+    DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES,
+)
 from custom_components.unifi_network_map.enrichment import (
     _add_entities_by_device,
     _append_unique_entity,
@@ -536,6 +541,42 @@ class TestBuildEnrichedPayload:
         result = build_enriched_payload(hass, payload)
         assert result is payload
 
+    @pytest.mark.parametrize(
+        ("node_count", "eager_max_nodes", "expect_eager"),
+        [
+            (2, DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES, True),
+            (
+                DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES + 1,
+                DEFAULT_RELATED_ENTITIES_EAGER_MAX_NODES,
+                False,
+            ),
+            (2, 0, False),
+            (500, 500, True),
+        ],
+    )
+    def test_related_entities_eager_only_for_small_sites(
+        self, node_count: int, eager_max_nodes: int, expect_eager: bool
+    ) -> None:
+        hass = MagicMock()
+        payload: dict[str, object] = {
+            "node_types": {f"mac-{i}": "client" for i in range(node_count)}
+        }
+        with (
+            patch(
+                "custom_components.unifi_network_map.enrichment._resolve_entity_map_by_mac",
+                return_value={},
+            ),
+            patch(
+                "custom_components.unifi_network_map.enrichment.resolve_related_entities",
+                return_value={"mac-0": [{"entity_id": "sensor.a"}]},
+            ) as mock_related,
+        ):
+            result = build_enriched_payload(hass, payload, eager_max_nodes)
+
+        assert mock_related.called is expect_eager
+        assert ("related_entities" in result) is expect_eager
+        assert result.get("related_entities_lazy", False) is not expect_eager
+
 
 class TestFormatMacNonMacString:
     """Additional _format_mac edge cases."""
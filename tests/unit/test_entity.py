@@ -0,0 +1,176 @@
+"""Tests for change-aware state writes in the shared entity base."""
+
+from __future__ import annotations
+
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.unifi_network_map.binary_sensor import (
+    UniFiClientPresenceSensor,
+    UniFiDevicePresenceSensor,
+)
+from custom_components.unifi_network_map.coordinator import (
+    UniFiNetworkMapCoordinator,
+)
+from custom_components.unifi_network_map.data import UniFiNetworkMapData
+from custom_components.unifi_network_map.sensor import UniFiVlanClientsSensor
+from tests.integration.conftest import build_mock_entry
+
+SWITCH = "aa:bb:cc:dd:ee:01"
+CLIENT = "aa:bb:cc:dd:ee:02"
+
+
+def _coordinator(
+    hass: HomeAssistant, payload: dict[str, Any]
+) -> UniFiNetworkMapCoordinator:
+    coordinator = UniFiNetworkMapCoordinator(hass, build_mock_entry())
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload=payload)
+    coordinator.last_exception = None
+    return coordinator
+
+
+def _set_payload(
+    coordinator: UniFiNetworkMapCoordinator, payload: dict[str, Any]
+) -> None:
+    coordinator.data = UniFiNetworkMapData(svg="<svg />", payload=payload)
+
+
+def _vlan_payload(clients: list[str]) -> dict[str, Any]:
+    return {
+        "vlan_info": {
+            10: {"id": 10, "client_count": len(clients), "clients": clients}
+        }
+    }
+
+
+async def test_skips_write_when_nothing_changed(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass, _vlan_payload(["tv"]))
+    sensor = UniFiVlanClientsSensor(
+        coordinator, build_mock_entry(), vlan_id=10, vlan_name="IoT"
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor._handle_coordinator_update()
+    _set_payload(coordinator, _vlan_payload(["tv"]))
+    sensor._handle_coordinator_update()
+
+    sensor.async_write_ha_state.assert_called_once()
+
+
+async def test_writes_when_attributes_change(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass, _vlan_payload(["tv"]))
+    sensor = UniFiVlanClientsSensor(
+        coordinator, build_mock_entry(), vlan_id=10, vlan_name="IoT"
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor._handle_coordinator_update()
+    _set_payload(coordinator, _vlan_payload(["radio"]))
+    sensor._handle_coordinator_update()
+
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+async def test_writes_when_availability_changes(hass: HomeAssistant) -> None:
+    payload = {"node_types": {SWITCH: "switch"}}
+    coordinator = _coordinator(hass, payload)
+    sensor = UniFiDevicePresenceSensor(
+        coordinator=coordinator,
+        entry=build_mock_entry(),
+        device_mac=SWITCH,
+        device_name="Switch",
+        device_type="switch",
+        device_details={},
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor._handle_coordinator_update()
+    coordinator.last_update_success = False
+    sensor._handle_coordinator_update()
+    sensor._handle_coordinator_update()
+
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+async def test_reordered_records_do_not_write(hass: HomeAssistant) -> None:
+    def _payload(details: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "node_types": {SWITCH: "switch"},
+            "device_details": {SWITCH: details},
+        }
+
+    details = {"mac": SWITCH, "ip": "10.0.0.2", "model": "USW"}
+    coordinator = _coordinator(hass, _payload(details))
+    sensor = UniFiDevicePresenceSensor(
+        coordinator=coordinator,
+        entry=build_mock_entry(),
+        device_mac=SWITCH,
+        device_name="Switch",
+        device_type="switch",
+        device_details={},
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor._handle_coordinator_update()
+    _set_payload(coordinator, _payload(dict(reversed(details.items()))))
+    sensor._handle_coordinator_update()
+
+    sensor.async_write_ha_state.assert_called_once()
+
+
+async def test_fingerprint_does_not_build_attributes(
+    hass: HomeAssistant, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    coordinator = _coordinator(hass, _vlan_payload(["tv"]))
+    sensor = UniFiVlanClientsSensor(
+        coordinator, build_mock_entry(), vlan_id=10, vlan_name="IoT"
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    def _attributes(_self: UniFiVlanClientsSensor) -> dict[str, Any]:
+        pytest.fail("extra_state_attributes built for the fingerprint")
+
+    monkeypatch.setattr(
+        UniFiVlanClientsSensor, "extra_state_attributes", property(_attributes)
+    )
+    sensor._handle_coordinator_update()
+    _set_payload(coordinator, _vlan_payload(["tv", "radio"]))
+    sensor._handle_coordinator_update()
+
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+async def test_client_sensor_writes_on_rename(hass: HomeAssistant) -> None:
+    def _payload(name: str) -> dict[str, Any]:
+        return {"client_details": {CLIENT: {"name": name, "mac": CLIENT}}}
+
+    coordinator = _coordinator(hass, _payload("Laptop"))
+    sensor = UniFiClientPresenceSensor(
+        coordinator=coordinator, entry=build_mock_entry(), client_mac=CLIENT
+    )
+    sensor.async_write_ha_state = MagicMock()
+
+    sensor._handle_coordinator_update()
+    _set_payload(coordinator, _payload("Laptop"))
+    sensor._handle_coordinator_update()
+    _set_payload(coordinator, _payload("Work Laptop"))
+    sensor._handle_coordinator_update()
+
+    assert sensor.async_write_ha_state.call_count == 2
+
+
+async def test_initial_write_seeds_fingerprint(hass: HomeAssistant) -> None:
+    coordinator = _coordinator(hass, _vlan_payload(["tv"]))
+    sensor = UniFiVlanClientsSensor(
+        coordinator, build_mock_entry(), vlan_id=10, vlan_name="IoT"
+    )
+    sensor.hass = hass
+    sensor.async_write_ha_state = MagicMock()
+
+    await sensor.async_added_to_hass()
+    sensor._handle_coordinator_update()
+
+    sensor.async_write_ha_state.assert_not_called()
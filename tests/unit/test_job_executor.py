@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import threading
+from concurrent.futures import CancelledError
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.unifi_network_map.job_executor import (
+    JobExecutor,
+    async_run_job,
+    async_shutdown_job_executor,
+    find_job_executor,
+    job_executor_stats,
+    set_job_executor_workers,
+)
+
+
+def _block(executor: JobExecutor) -> threading.Event:
+    """Occupy every thread of a one-thread executor until released."""
+    started, release = threading.Event(), threading.Event()
+
+    def _wait() -> None:
+        started.set()
+        release.wait(5)
+
+    executor.submit("refresh", _wait)
+    assert started.wait(5)
+    return release
+
+
+def test_queued_jobs_run_in_priority_order() -> None:
+    executor = JobExecutor(max_workers=1)
+    release = _block(executor)
+    ran: list[str] = []
+    futures = [
+        executor.submit(priority, ran.append, name)
+        for priority, name in (
+            ("theme", "theme-1"),
+            ("prerender", "prerender"),
+            ("refresh", "refresh"),
+            ("theme", "theme-2"),
+        )
+    ]
+
+    assert executor.queue_depth() == {
+        "refresh": 1,
+        "prerender": 1,
+        "theme": 2,
+    }
+    release.set()
+    for future in futures:
+        future.result(5)
+    executor.shutdown()
+
+    assert ran == ["refresh", "prerender", "theme-1", "theme-2"]
+    stats = executor.stats()
+    assert stats["queue_depth"] == {"refresh": 0, "prerender": 0, "theme": 0}
+    assert stats["completed"] == {"refresh": 2, "prerender": 1, "theme": 2}
+    assert stats["wait"]["theme"]["count"] == 2
+
+
+def test_job_errors_reach_the_caller() -> None:
+    executor = JobExecutor(max_workers=1)
+
+    def _fail() -> None:
+        raise ValueError("boom")
+
+    future = executor.submit("refresh", _fail)
+
+    with pytest.raises(ValueError, match="boom"):
+        future.result(5)
+    # The thread survives a failed job.
+    assert executor.submit("theme", lambda: 42).result(5) == 42
+    executor.shutdown()
+
+
+def test_pool_never_exceeds_its_size() -> None:
+    executor = JobExecutor(max_workers=2)
+    release = threading.Event()
+    futures = [executor.submit("theme", release.wait, 5) for _ in range(5)]
+
+    assert executor.stats()["threads"] == 2
+    executor.resize(3)
+    assert executor.stats()["threads"] == 3
+    release.set()
+    for future in futures:
+        future.result(5)
+    executor.shutdown()
+
+
+def test_shutdown_cancels_queued_jobs() -> None:
+    executor = JobExecutor(max_workers=1)
+    release = _block(executor)
+    queued = executor.submit("theme", lambda: None)
+
+    release.set()
+    executor.shutdown()
+
+    with pytest.raises(CancelledError):
+        queued.result(5)
+    assert executor.stats()["threads"] == 0
+    with pytest.raises(RuntimeError):
+        executor.submit("refresh", lambda: None)
+
+
+async def test_async_run_job_uses_the_configured_executor(
+    hass: HomeAssistant,
+) -> None:
+    set_job_executor_workers(hass, 3)
+
+    thread_name = await async_run_job(
+        hass, "refresh", lambda: threading.current_thread().name
+    )
+
+    assert thread_name.startswith("unifi_network_map_executor_")
+    stats = job_executor_stats(hass)
+    assert stats is not None
+    assert stats["max_workers"] == 3
+    assert stats["wait"]["refresh"]["count"] == 1
+
+    await async_shutdown_job_executor(hass)
+
+    assert find_job_executor(hass) is None
+    assert job_executor_stats(hass) is None
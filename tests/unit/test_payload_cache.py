@@ -77,6 +77,18 @@ def test_payload_cache_get_returns_cached_payload_when_valid() -> None:
     assert result == payload_data
 
 
+def test_payload_cache_counts_hits_and_misses_per_entry() -> None:
+    cache = payload_cache.PayloadCache()
+    cache.get("entry1", "hash123")
+    cache.set("entry1", {"data": "value"}, "hash123")
+    cache.get("entry1", "hash123")
+    cache.get("entry1", "other")
+
+    assert cache.hits["entry1"] == 1
+    assert cache.misses["entry1"] == 2
+    assert cache.misses["entry2"] == 0
+
+
 def test_payload_cache_set_stores_payload() -> None:
     cache = payload_cache.PayloadCache()
     payload_data = {"test": "data"}
@@ -283,3 +295,29 @@ def test_payload_cache_integration_scenario() -> None:
     with patch.object(payload_cache, "monotonic_seconds", return_value=200.0):
         result = cache.get("entry1", source_hash)
         assert result is None
+
+
+def test_cached_payload_variant_builds_once() -> None:
+    cached = payload_cache.CachedPayload(
+        payload={"test": "data"}, cached_at=0.0, source_hash="hash123"
+    )
+    builds: list[str] = []
+
+    def _build() -> str:
+        builds.append("built")
+        return "encoded"
+
+    assert cached.variant("3.0", _build) == "encoded"
+    assert cached.variant("3.0", _build) == "encoded"
+    assert builds == ["built"]
+
+
+def test_payload_cache_variants_reset_on_new_payload() -> None:
+    cache = payload_cache.PayloadCache()
+    first = cache.set("entry1", {"data": 1}, "hash1")
+    first.variant("3.0", lambda: "old")
+
+    second = cache.set("entry1", {"data": 2}, "hash2")
+
+    assert cache.get_entry("entry1", "hash2") is second
+    assert second.variant("3.0", lambda: "new") == "new"
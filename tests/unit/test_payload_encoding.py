@@ -0,0 +1,62 @@
+"""Tests for payload wire encoding negotiation and serialization."""
+
+from __future__ import annotations
+
+import json
+
+import msgpack
+import pytest
+
+from custom_components.unifi_network_map.payload_encoding import (
+    content_type_for,
+    encode_payload,
+    negotiate_encoding,
+)
+
+PAYLOAD = {
+    "edges": [{"left": "aa", "right": "bb", "speed": 1000}],
+    "node_types": {"aa": "gateway", "bb": "switch"},
+    "vlan_info": {10: {"id": 10, "name": "IoT"}},
+}
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, "json"),
+        ("", "json"),
+        ("*/*", "json"),
+        ("application/json", "json"),
+        ("application/msgpack", "msgpack"),
+        ("application/x-msgpack", "msgpack"),
+        ("Application/MsgPack; charset=binary", "msgpack"),
+        ("application/json, application/msgpack", "json"),
+        ("application/json;q=0.5, application/msgpack;q=0.9", "msgpack"),
+        ("application/msgpack;q=0, application/json", "json"),
+        ("application/msgpack;q=bogus", "json"),
+        ("application/cbor", "json"),
+    ],
+)
+def test_negotiate_encoding(accept: str | None, expected: str) -> None:
+    assert negotiate_encoding(accept) == expected
+
+
+def test_content_types() -> None:
+    assert content_type_for("json") == "application/json"
+    assert content_type_for("msgpack") == "application/msgpack"
+
+
+def test_json_encoding_keeps_integer_keys_as_strings() -> None:
+    decoded = json.loads(encode_payload(PAYLOAD, "json"))
+
+    assert decoded["vlan_info"] == {"10": {"id": 10, "name": "IoT"}}
+    assert decoded["edges"] == PAYLOAD["edges"]
+
+
+def test_msgpack_decodes_to_the_json_payload() -> None:
+    packed = encode_payload(PAYLOAD, "msgpack")
+
+    assert msgpack.unpackb(packed) == json.loads(
+        encode_payload(PAYLOAD, "json")
+    )
+    assert len(packed) < len(encode_payload(PAYLOAD, "json"))
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+from enum import StrEnum
+
+from custom_components.unifi_network_map.payload_intern import SharedStrings
+
+
+def _mac(suffix: int) -> str:
+    # Built at runtime so each call returns a distinct string object.
+    return ":".join(["aa"] * 5 + [f"{suffix:02x}"])
+
+
+def test_equal_macs_share_the_seeded_string() -> None:
+    seed = _mac(1)
+    strings = SharedStrings([seed])
+
+    assert strings.mac(f" {_mac(1).upper()} ") is seed
+    assert strings.text(_mac(1)) is seed
+    assert strings.mac(_mac(2)) is strings.mac(_mac(2).upper())
+
+
+def test_node_map_keys_are_shared() -> None:
+    strings = SharedStrings()
+    client = strings.mac(_mac(2))
+
+    nodes = strings.keys({_mac(1): "Gateway", _mac(2): "Laptop"})
+
+    assert nodes == {_mac(1): "Gateway", _mac(2): "Laptop"}
+    assert list(nodes)[1] is client
+
+
+def test_blank_and_non_string_macs_are_none() -> None:
+    strings = SharedStrings()
+
+    assert strings.mac("  ") is None
+    assert strings.mac(None) is None
+    assert strings.mac(42) is None
+
+
+def test_non_string_values_and_str_subclasses_are_kept() -> None:
+    class Kind(StrEnum):
+        AP = "ap"
+
+    strings = SharedStrings(["ap"])
+
+    assert strings.text(Kind.AP) is Kind.AP
+    assert strings.text(None) is None
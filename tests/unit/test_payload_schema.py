@@ -0,0 +1,283 @@
+"""Tests for payload schema negotiation and the compact v3 encoding."""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+import pytest
+
+from custom_components.unifi_network_map.payload_schema import (
+    PAYLOAD_SECTIONS,
+    encode_compact_payload,
+    negotiate_schema_version,
+    parse_payload_fields,
+    project_payload,
+)
+
+GATEWAY = "aa:bb:cc:dd:ee:01"
+SWITCH = "aa:bb:cc:dd:ee:02"
+CLIENT = "aa:bb:cc:dd:ee:03"
+UPSTREAM = "aa:bb:cc:dd:ee:99"
+
+
+def _payload() -> dict[str, Any]:
+    return {
+        "schema_version": "2.0",
+        "edges": [
+            {
+                "left": GATEWAY,
+                "right": SWITCH,
+                "label": "Port 1",
+                "poe": False,
+                "wireless": False,
+                "speed": 1000,
+                "channel": None,
+            },
+            {
+                "left": SWITCH,
+                "right": CLIENT,
+                "label": None,
+                "poe": True,
+                "wireless": False,
+                "speed": 100,
+                "channel": None,
+            },
+        ],
+        "node_types": {GATEWAY: "gateway", SWITCH: "switch", CLIENT: "client"},
+        "node_names": {GATEWAY: "Gateway", SWITCH: "Switch", CLIENT: "Laptop"},
+        "gateways": [GATEWAY],
+        "client_ips": {CLIENT: "192.168.1.50"},
+        "device_ips": {GATEWAY: "192.168.1.1", SWITCH: "192.168.1.2"},
+        "node_vlans": {CLIENT: None},
+        "vlan_info": {1: {"id": 1, "name": "LAN", "client_count": 1}},
+        "ap_client_counts": {},
+        "device_details": {
+            SWITCH: {
+                "mac": SWITCH,
+                "ip": "192.168.1.2",
+                "model": "USW-24",
+                "model_name": "Switch 24",
+                "uplink_device": UPSTREAM,
+            }
+        },
+        "client_details": {
+            CLIENT: {"name": "Laptop", "mac": CLIENT, "connected_to_mac": None}
+        },
+        "device_ports": {SWITCH: [{"port": 1, "speed": 1000}]},
+        "vpn_tunnels": [],
+        "node_status": {
+            CLIENT: {"entity_id": "device_tracker.laptop", "state": "online"}
+        },
+    }
+
+
+def _expand(compact: dict[str, Any]) -> dict[str, Any]:
+    """Reference decoder mirroring the card's expandCompactPayload."""
+    nodes: list[str] = compact["nodes"]
+
+    def mac(value: object) -> object:
+        return nodes[value] if isinstance(value, int) else value
+
+    expanded: dict[str, Any] = {}
+    for key, value in compact.items():
+        if key == "nodes":
+            continue
+        if key in ("node_types", "node_names"):
+            expanded[key] = {
+                nodes[i]: item
+                for i, item in enumerate(value)
+                if item is not None
+            }
+        elif key == "edges":
+            count = len(value["left"])
+            expanded[key] = [
+                {
+                    field: mac(column[i])
+                    if field in ("left", "right")
+                    else column[i]
+                    for field, column in value.items()
+                }
+                for i in range(count)
+            ]
+        elif key == "gateways":
+            expanded[key] = [mac(item) for item in value]
+        elif isinstance(value, dict) and "node" in value:
+            expanded[key] = _expand_table(value, nodes, mac)
+        else:
+            expanded[key] = value
+    return expanded
+
+
+def _expand_table(
+    table: dict[str, list[Any]], nodes: list[str], mac: Any
+) -> dict[str, Any]:
+    rows = table["node"]
+    if "value" in table:
+        return {nodes[n]: table["value"][i] for i, n in enumerate(rows)}
+    fields = [field for field in table if field != "node"]
+    return {
+        nodes[n]: {
+            field: mac(table[field][i])
+            if field in ("mac", "uplink_device", "connected_to_mac")
+            else table[field][i]
+            for field in fields
+        }
+        for i, n in enumerate(rows)
+    }
+
+
+def test_assigns_node_indexes_in_node_types_order() -> None:
+    compact = encode_compact_payload(_payload())
+
+    assert compact["schema_version"] == "3.0"
+    assert compact["nodes"][:3] == [GATEWAY, SWITCH, CLIENT]
+    assert compact["node_types"] == ["gateway", "switch", "client", None]
+    assert compact["gateways"] == [0]
+
+
+def test_edges_are_parallel_arrays_of_node_indexes() -> None:
+    edges = encode_compact_payload(_payload())["edges"]
+
+    assert edges["left"] == [0, 1]
+    assert edges["right"] == [1, 2]
+    assert edges["speed"] == [1000, 100]
+    assert edges["poe"] == [False, True]
+
+
+def test_mac_valued_record_fields_become_indexes() -> None:
+    compact = encode_compact_payload(_payload())
+    details = compact["device_details"]
+
+    assert details["node"] == [1]
+    assert details["mac"] == [1]
+    assert compact["nodes"][details["uplink_device"][0]] == UPSTREAM
+    assert compact["client_details"]["connected_to_mac"] == [None]
+
+
+def test_round_trips_to_schema_two_sections() -> None:
+    original = _payload()
+    expanded = _expand(encode_compact_payload(original))
+
+    for key, value in original.items():
+        if key == "schema_version":
+            continue
+        assert expanded[key] == value, key
+
+
+def test_empty_edges_keep_endpoint_columns() -> None:
+    payload = _payload()
+    payload["edges"] = []
+
+    assert encode_compact_payload(payload)["edges"] == {
+        "left": [],
+        "right": [],
+    }
+
+
+def test_passes_through_non_mac_sections() -> None:
+    compact = encode_compact_payload(_payload())
+
+    assert compact["vlan_info"] == _payload()["vlan_info"]
+    assert compact["vpn_tunnels"] == []
+
+
+def test_does_not_mutate_source_payload() -> None:
+    original = _payload()
+    encode_compact_payload(original)
+
+    assert original == _payload()
+
+
+def test_compact_encoding_is_smaller_on_large_sites() -> None:
+    switches = [f"02:00:00:00:{i // 256:02x}:{i % 256:02x}" for i in range(50)]
+    clients = [
+        f"04:00:00:00:{i // 256:02x}:{i % 256:02x}" for i in range(2000)
+    ]
+    payload = _payload()
+    payload["node_types"] = {
+        **{mac: "switch" for mac in switches},
+        **{mac: "client" for mac in clients},
+    }
+    payload["node_names"] = {mac: f"n{i}" for i, mac in enumerate(clients)}
+    payload["edges"] = [
+        {
+            "left": switches[i % 50],
+            "right": mac,
+            "label": None,
+            "poe": False,
+            "wireless": True,
+            "speed": None,
+            "channel": 36,
+        }
+        for i, mac in enumerate(clients)
+    ]
+    payload["client_ips"] = {mac: "10.0.0.1" for mac in clients}
+
+    full = len(json.dumps(payload))
+    compact = len(json.dumps(encode_compact_payload(payload)))
+
+    assert compact * 2 < full
+
+
+@pytest.mark.parametrize(
+    ("requested", "expected"),
+    [
+        (None, "2.0"),
+        ("2", "2.0"),
+        ("3", "3.0"),
+        ("3.0", "3.0"),
+        (3, "3.0"),
+        ("9.1", "2.0"),
+        ("garbage", "2.0"),
+    ],
+)
+def test_negotiate_schema_version(requested: object, expected: str) -> None:
+    assert negotiate_schema_version(requested) == expected
+
+
+@pytest.mark.parametrize(
+    ("requested", "expected"),
+    [
+        (None, None),
+        ("", None),
+        (" , ", None),
+        ([], None),
+        ("node_types,edges", ("edges", "node_types")),
+        (" edges , edges ", ("edges",)),
+        (["node_status", "edges"], ("edges", "node_status")),
+    ],
+)
+def test_parse_payload_fields(
+    requested: str | list[str] | None, expected: tuple[str, ...] | None
+) -> None:
+    assert parse_payload_fields(requested) == expected
+
+
+@pytest.mark.parametrize(
+    "requested", ["edges,bogus", ["node_types", "../etc"], "EDGES"]
+)
+def test_parse_payload_fields_rejects_unknown_sections(
+    requested: str | list[str],
+) -> None:
+    with pytest.raises(ValueError, match="Unknown payload fields"):
+        parse_payload_fields(requested)
+
+
+def test_payload_sections_cover_the_enriched_payload() -> None:
+    assert set(_payload()) <= PAYLOAD_SECTIONS
+    assert set(encode_compact_payload(_payload())) <= PAYLOAD_SECTIONS
+
+
+def test_project_payload_keeps_requested_sections() -> None:
+    projected = project_payload(_payload(), ("edges", "node_types", "bogus"))
+
+    assert set(projected) == {"schema_version", "edges", "node_types"}
+
+
+def test_project_compact_payload_keeps_node_table() -> None:
+    compact = encode_compact_payload(_payload())
+    projected = project_payload(compact, ("edges",))
+
+    assert set(projected) == {"schema_version", "nodes", "edges"}
+    assert projected["nodes"] is compact["nodes"]
@@ -0,0 +1,113 @@
+"""Tests for the out-of-process render worker."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+
+from custom_components.unifi_network_map.errors import (
+    RenderTimeout,
+    UniFiNetworkMapError,
+)
+from custom_components.unifi_network_map.render_worker import RenderWorker
+from custom_components.unifi_network_map.renderer import (
+    ControllerRecords,
+    RenderInputs,
+    load_render_inputs,
+    render_from_inputs,
+)
+from custom_components.unifi_network_map.stage_timings import StageTimings
+from tests.benchmarks.synthetic import generate_site
+from tests.helpers import build_settings
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+_SETTINGS = build_settings(include_clients=True, client_scope="all")
+
+
+@pytest.fixture
+def worker() -> Iterator[RenderWorker]:
+    worker = RenderWorker(timeout_seconds=60, memory_limit_mib=4096)
+    yield worker
+    worker.stop()
+
+
+def _inputs(devices: int = 12, clients: int = 80) -> RenderInputs:
+    site = generate_site(devices, clients)
+    records = ControllerRecords(site.devices, site.clients, site.networks)
+    config = type("Config", (), {"site": "default"})()
+    return load_render_inputs(config, _SETTINGS, StageTimings(), records)
+
+
+def test_worker_renders_like_the_event_loop_process(
+    worker: RenderWorker,
+) -> None:
+    inputs = _inputs()
+    timings = StageTimings()
+
+    data = worker.render(inputs, _SETTINGS, timings)
+
+    expected = render_from_inputs(inputs, _SETTINGS, StageTimings())
+    assert data.svg == expected.svg
+    assert data.payload == expected.payload
+    assert {"render_worker", "render_svg", "build_payload"} <= set(
+        timings.summary()
+    )
+    stats = worker.stats()
+    assert stats["running"] is True
+    assert stats["renders"] == 1
+    assert stats["peak_rss_mib"] > 0
+
+
+def test_worker_restarts_after_timeout(worker: RenderWorker) -> None:
+    inputs = _inputs(200, 4000)
+    worker.render(_inputs(), _SETTINGS, StageTimings())
+    first_pid = worker.stats()["pid"]
+    worker.configure(timeout_seconds=0.001, memory_limit_mib=4096)
+
+    with pytest.raises(RenderTimeout):
+        worker.render(inputs, _SETTINGS, StageTimings())
+
+    assert worker.stats()["running"] is False
+    worker.configure(timeout_seconds=60, memory_limit_mib=4096)
+    worker.render(_inputs(), _SETTINGS, StageTimings())
+    stats = worker.stats()
+    assert stats["pid"] != first_pid
+    assert stats["timeouts"] == 1
+    assert stats["restarts"] == 1
+
+
+def test_worker_is_replaced_above_memory_limit(worker: RenderWorker) -> None:
+    worker.configure(timeout_seconds=60, memory_limit_mib=1)
+
+    worker.render(_inputs(), _SETTINGS, StageTimings())
+
+    assert worker.stats()["running"] is False
+    worker.render(_inputs(), _SETTINGS, StageTimings())
+    assert worker.stats()["restarts"] == 1
+
+
+def test_worker_reports_render_errors(worker: RenderWorker) -> None:
+    inputs = RenderInputs(devices=[None], clients=[], networks=[])  # type: ignore[list-item]
+
+    with pytest.raises(UniFiNetworkMapError, match="Failed to render"):
+        worker.render(inputs, _SETTINGS, StageTimings())
+
+    assert worker.stats()["running"] is True
+
+
+def test_unpicklable_inputs_render_in_process() -> None:
+    worker = RenderWorker(timeout_seconds=60, memory_limit_mib=4096)
+    inputs = _inputs()
+    unpicklable = RenderInputs(
+        devices=inputs.devices,
+        clients=[*inputs.clients, {"mac": "aa:bb", "handle": lambda: None}],
+        networks=inputs.networks,
+    )
+
+    data = worker.render(unpicklable, _SETTINGS, StageTimings())
+
+    assert data.svg
+    assert worker.stats()["pid"] is None
@@ -9,7 +9,14 @@ from unittest.mock import MagicMock, patch
 import pytest
 from unifi_topology import SvgOptions
 
-from custom_components.unifi_network_map.errors import UniFiNetworkMapError
+from custom_components.unifi_network_map.device_index import (
+    build_render_device_index,
+)
+from custom_components.unifi_network_map.errors import (
+    RenderSuperseded,
+    RenderTimeout,
+    UniFiNetworkMapError,
+)
 from custom_components.unifi_network_map.renderer import (
     RenderSettings,
     UniFiNetworkMapRenderer,
@@ -458,7 +465,7 @@ class TestBuildDeviceIpIndex:
             ),
             MockDevice(name="AP1", mac="AA:BB:CC:DD:EE:02", ip="192.168.1.2"),
         ]
-        result = _build_device_ip_index(devices)
+        result = _build_device_ip_index(build_render_device_index(devices))
         assert result == {
             "aa:bb:cc:dd:ee:01": "192.168.1.1",
             "aa:bb:cc:dd:ee:02": "192.168.1.2",
@@ -533,17 +540,21 @@ class TestBuildApClientCounts:
             {"name": "Client2", "ap_mac": "aa:bb:cc:dd:ee:01"},
             {"name": "Client3", "ap_mac": "aa:bb:cc:dd:ee:02"},  # Unknown AP
         ]
-        result = _build_ap_client_counts(clients, devices)
+        result = _build_ap_client_counts(
+            clients, build_render_device_index(devices)
+        )
         assert result == {"aa:bb:cc:dd:ee:01": 2}
 
     def test_ignores_wired_clients(self) -> None:
         devices = [MockDevice(name="Switch1", mac="aa:bb:cc:dd:ee:01")]
         clients: list[dict[str, Any]] = [{"name": "Client1"}]  # No ap_mac
-        result = _build_ap_client_counts(clients, devices)
+        result = _build_ap_client_counts(
+            clients, build_render_device_index(devices)
+        )
         assert result == {}
 
     def test_handles_empty_lists(self) -> None:
-        assert _build_ap_client_counts([], []) == {}
+        assert _build_ap_client_counts([], build_render_device_index([])) == {}
 
 
 class TestResolveModelName:
@@ -595,7 +606,7 @@ class TestBuildDeviceDetails:
                 uplink=uplink,
             )
         ]
-        result = _build_device_details(devices)
+        result = _build_device_details(build_render_device_index(devices))
         assert result == {
             "aa:bb:cc:dd:ee:01": {
                 "mac": "aa:bb:cc:dd:ee:01",
@@ -610,12 +621,12 @@ class TestBuildDeviceDetails:
         devices = [
             MockDevice(name="Switch1", mac="aa:bb:cc:dd:ee:01", uplink=None)
         ]
-        result = _build_device_details(devices)
+        result = _build_device_details(build_render_device_index(devices))
         assert result["aa:bb:cc:dd:ee:01"]["uplink_device"] is None
 
     def test_skips_devices_without_mac(self) -> None:
         devices = [MockDevice(name="Switch1", mac=None)]
-        assert _build_device_details(devices) == {}
+        assert _build_device_details(build_render_device_index(devices)) == {}
 
 
 class TestBuildDevicePorts:
@@ -644,7 +655,7 @@ class TestBuildDevicePorts:
                 name="Switch1", mac="aa:bb:cc:dd:ee:01", port_table=ports
             )
         ]
-        result = _build_device_ports(devices)
+        result = _build_device_ports(build_render_device_index(devices))
         assert "aa:bb:cc:dd:ee:01" in result
         assert len(result["aa:bb:cc:dd:ee:01"]) == 2
         assert result["aa:bb:cc:dd:ee:01"][0]["port"] == 1
@@ -656,12 +667,12 @@ class TestBuildDevicePorts:
     def test_skips_ports_without_idx(self) -> None:
         ports = [MockPort(port_idx=None, name="Unknown")]
         devices = [MockDevice(name="Switch1", port_table=ports)]
-        result = _build_device_ports(devices)
+        result = _build_device_ports(build_render_device_index(devices))
         assert result == {}
 
     def test_skips_devices_without_ports(self) -> None:
         devices = [MockDevice(name="Switch1", port_table=None)]
-        assert _build_device_ports(devices) == {}
+        assert _build_device_ports(build_render_device_index(devices)) == {}
 
     def test_sorts_by_port_number(self) -> None:
         ports = [
@@ -674,7 +685,7 @@ class TestBuildDevicePorts:
                 name="Switch1", mac="aa:bb:cc:dd:ee:01", port_table=ports
             )
         ]
-        result = _build_device_ports(devices)
+        result = _build_device_ports(build_render_device_index(devices))
         port_nums = [p["port"] for p in result["aa:bb:cc:dd:ee:01"]]
         assert port_nums == [1, 2, 3]
 
@@ -851,7 +862,7 @@ class TestExtractWanInfo:
         )
         with (
             patch(
-                "custom_components.unifi_network_map.renderer.group_devices_by_type",
+                "custom_components.unifi_network_map.device_index.group_devices_by_type",
                 return_value={"gateway": ["aa:bb:cc:dd:ee:01"]},
             ),
             patch(
@@ -859,7 +870,7 @@ class TestExtractWanInfo:
             ) as mock_extract,
         ):
             mock_extract.return_value = None
-            _extract_wan_info(devices, settings)
+            _extract_wan_info(build_render_device_index(devices), settings)
 
             mock_extract.assert_called_once_with(
                 gateway,
@@ -891,7 +902,7 @@ class TestExtractWanInfo:
         )
         with (
             patch(
-                "custom_components.unifi_network_map.renderer.group_devices_by_type",
+                "custom_components.unifi_network_map.device_index.group_devices_by_type",
                 return_value={"gateway": ["aa:bb:cc:dd:ee:01"]},
             ),
             patch(
@@ -899,7 +910,7 @@ class TestExtractWanInfo:
             ) as mock_extract,
         ):
             mock_extract.return_value = None
-            _extract_wan_info(devices, settings)
+            _extract_wan_info(build_render_device_index(devices), settings)
 
             mock_extract.assert_called_once_with(
                 gateway,
@@ -922,7 +933,7 @@ class TestExtractWanInfo:
             use_cache=False,
             show_wan=False,
         )
-        result = _extract_wan_info([], settings)
+        result = _extract_wan_info(build_render_device_index([]), settings)
         assert result is None
 
 
@@ -1029,11 +1040,45 @@ def test_render_map_fetches_clients_once(
         password="p",
         verify_ssl=True,
     )
-    renderer._render_map(config, build_settings(include_clients=True))
+    renderer._render_map(
+        config, build_settings(include_clients=True), renderer.StageTimings()
+    )
 
     assert calls["clients"] == 1
 
 
+def test_render_map_records_stage_timings(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from custom_components.unifi_network_map import renderer
+
+    monkeypatch.setattr(renderer, "fetch_devices", lambda *a, **k: [])
+    monkeypatch.setattr(renderer, "fetch_networks", lambda *a, **k: [])
+    monkeypatch.setattr(renderer, "fetch_clients", lambda *a, **k: [])
+    config = renderer.Config(
+        url="https://c",
+        site="default",
+        user="u",
+        password="p",
+        verify_ssl=True,
+    )
+    timings = renderer.StageTimings()
+
+    renderer.UniFiNetworkMapRenderer().render(
+        config, build_settings(), timings
+    )
+
+    assert set(timings.summary()) >= {
+        "fetch_devices",
+        "normalize_devices",
+        "build_topology",
+        "fetch_clients",
+        "render_svg",
+        "fetch_networks",
+        "build_payload",
+    }
+
+
 class TestValidEdgePayload:
     """Tests for _valid_edge_payload function."""
 
@@ -1124,3 +1169,306 @@ class TestBuildSvgEdges:
         ]
         result = _build_svg_edges(payload)
         assert len(result) == 1
+
+
+def test_render_with_records_skips_controller_fetches(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from custom_components.unifi_network_map import renderer
+
+    def _fail(*_args: Any, **_kwargs: Any) -> list[Any]:
+        raise AssertionError("controller contacted during replay")
+
+    for name in ("fetch_devices", "fetch_clients", "fetch_networks"):
+        monkeypatch.setattr(renderer, name, _fail)
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    records = renderer.ControllerRecords(
+        devices=[
+            {
+                "name": "Gateway",
+                "mac": "aa:bb:cc:00:00:01",
+                "type": "udm",
+                "lldp_table": [],
+            }
+        ],
+        clients=[],
+        networks=[],
+    )
+
+    data = renderer.UniFiNetworkMapRenderer().render(
+        config, build_settings(), renderer.StageTimings(), records
+    )
+
+    assert "aa:bb:cc:00:00:01" in data.payload["device_details"]
+
+
+def test_fetch_controller_records_fetches_without_rendering(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from custom_components.unifi_network_map import renderer
+
+    monkeypatch.setattr(renderer, "fetch_devices", lambda *a, **k: [{"a": 1}])
+    monkeypatch.setattr(renderer, "fetch_clients", lambda *a, **k: [{"b": 2}])
+    monkeypatch.setattr(
+        renderer, "fetch_networks", lambda *a, **k: [{"c": 3}, "bad"]
+    )
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+
+    records = renderer.fetch_controller_records(config, build_settings())
+
+    assert records == renderer.ControllerRecords(
+        devices=[{"a": 1}], clients=[{"b": 2}], networks=[{"c": 3}]
+    )
+
+
+def test_superseded_job_stops_before_the_next_stage(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from custom_components.unifi_network_map import renderer
+
+    job = renderer.RenderJob(generation=1)
+    monkeypatch.setattr(renderer, "fetch_devices", lambda *a, **k: [])
+    monkeypatch.setattr(renderer, "fetch_networks", lambda *a, **k: [])
+
+    def _fetch_clients(*_args: Any, **_kwargs: Any) -> list[Any]:
+        # A forced refresh starts while this one waits on the controller.
+        job.supersede()
+        return []
+
+    monkeypatch.setattr(renderer, "fetch_clients", _fetch_clients)
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    timings = renderer.StageTimings()
+
+    with pytest.raises(RenderSuperseded):
+        renderer.UniFiNetworkMapRenderer().render(
+            config, build_settings(), timings, job=job
+        )
+
+    stages = set(timings.summary())
+    assert "fetch_clients" in stages
+    assert not stages & {"fetch_networks", "build_topology", "render_svg"}
+
+
+def test_job_past_its_deadline_fails_fast() -> None:
+    from custom_components.unifi_network_map import renderer
+
+    job = renderer.RenderJob(generation=3, timeout_seconds=0)
+    inputs = renderer.RenderInputs(devices=[], clients=[], networks=[])
+
+    with pytest.raises(RenderTimeout, match="0s time budget before"):
+        renderer.render_from_inputs(
+            inputs, build_settings(), renderer.StageTimings(), job
+        )
+    assert renderer.RenderJob(generation=4).remaining() is None
+
+
+def test_map_rendered_before_its_networks_is_completed_later() -> None:
+    from dataclasses import replace
+
+    from custom_components.unifi_network_map import renderer
+    from tests.benchmarks.synthetic import generate_site
+
+    site = generate_site(8, 40)
+    networks = [
+        {**network, "name": f"Segment {index}"}
+        for index, network in enumerate(site.networks)
+    ]
+    records = renderer.ControllerRecords(site.devices, site.clients, networks)
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    settings = build_settings(include_clients=True, client_scope="all")
+    inputs = renderer.load_render_inputs(
+        config, settings, renderer.StageTimings(), records
+    )
+    full = renderer.render_from_inputs(
+        inputs, settings, renderer.StageTimings()
+    )
+
+    partial = renderer.render_from_inputs(
+        replace(inputs, networks=None), settings, renderer.StageTimings()
+    )
+    completed = renderer.with_networks(
+        partial, inputs.clients, networks, settings
+    )
+
+    assert full.pending == ()
+    assert partial.pending == ("networks",)
+    assert partial.svg == full.svg
+    assert partial.payload["vlan_info"] != full.payload["vlan_info"]
+    assert completed.pending == ()
+    assert completed.payload == full.payload
+
+
+def test_lightweight_stats_count_from_devices_without_client_list(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    from dataclasses import replace
+
+    from custom_components.unifi_network_map import renderer
+
+    def _fail(*_args: Any, **_kwargs: Any) -> list[Any]:
+        raise AssertionError("client list fetched in lightweight mode")
+
+    gateway = {
+        "name": "Gateway",
+        "mac": "aa:bb:cc:00:00:01",
+        "type": "udm",
+        "lldp_table": [],
+        "network_table": [
+            {"name": "Default", "purpose": "corporate", "num_sta": 5},
+            {"name": "IoT", "vlan": 20, "vlan_enabled": True, "num_sta": 7},
+            {"name": "Office VPN", "purpose": "site-vpn", "num_sta": 1},
+        ],
+    }
+    access_point = {
+        "name": "AP",
+        "mac": "AA:BB:CC:00:00:02",
+        "type": "uap",
+        "num_sta": 9,
+        "lldp_table": [],
+    }
+    monkeypatch.setattr(
+        renderer, "fetch_devices", lambda *a, **k: [gateway, access_point]
+    )
+    monkeypatch.setattr(renderer, "fetch_clients", _fail)
+    monkeypatch.setattr(
+        renderer,
+        "fetch_networks",
+        lambda *a, **k: [{"name": "Cams", "vlan": 30}],
+    )
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    settings = replace(build_settings(), lightweight_stats=True)
+    timings = renderer.StageTimings()
+
+    data = renderer.UniFiNetworkMapRenderer().render(config, settings, timings)
+
+    assert "fetch_clients" not in timings.summary()
+    assert data.payload["ap_client_counts"] == {"aa:bb:cc:00:00:02": 9}
+    vlan_info = data.payload["vlan_info"]
+    assert vlan_info[1] == {
+        "id": 1,
+        "name": "Default",
+        "client_count": 5,
+        "clients": [],
+    }
+    assert vlan_info[20]["client_count"] == 7
+    assert vlan_info[30] == {
+        "id": 30,
+        "name": "Cams",
+        "client_count": 0,
+        "clients": [],
+    }
+    assert data.payload["client_details"] == {}
+
+
+@pytest.mark.parametrize("client_scope", ["wired", "wireless", "all"])
+def test_compact_clients_render_like_full_records(
+    monkeypatch: pytest.MonkeyPatch, client_scope: str
+) -> None:
+    from custom_components.unifi_network_map import renderer
+    from tests.benchmarks.synthetic import generate_site
+
+    site = generate_site(10, 60)
+    full = [
+        {**client, "tx_bytes": 1, "wifi_tx_attempts": 2, "first_seen": 3}
+        for client in site.clients
+    ]
+    monkeypatch.setattr(
+        renderer, "fetch_devices", lambda *a, **k: site.devices
+    )
+    monkeypatch.setattr(renderer, "fetch_clients", lambda *a, **k: full)
+    monkeypatch.setattr(renderer, "fetch_networks", lambda *a, **k: [])
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    settings = build_settings(
+        include_ports=True, include_clients=True, client_scope=client_scope
+    )
+
+    compact = renderer._load_all_clients(config, settings)
+
+    def _render(clients: list[Any]) -> Any:
+        records = renderer.ControllerRecords(
+            site.devices, clients, site.networks
+        )
+        return renderer.UniFiNetworkMapRenderer().render(
+            config, settings, renderer.StageTimings(), records
+        )
+
+    expected = _render(full)
+    actual = _render(compact)
+
+    assert all("tx_bytes" not in client for client in compact)
+    assert all(set(client) <= renderer.CLIENT_FIELDS for client in compact)
+    assert renderer.fetch_controller_records(config, settings).clients is full
+    assert actual.svg == expected.svg
+    assert actual.payload == expected.payload
+
+
+def test_rendered_payload_shares_one_string_per_mac() -> None:
+    from custom_components.unifi_network_map import renderer
+    from tests.benchmarks.synthetic import generate_site
+
+    site = generate_site(4, 12)
+    records = renderer.ControllerRecords(
+        site.devices, site.clients, site.networks
+    )
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    settings = build_settings(include_clients=True, client_scope="all")
+
+    payload = renderer.render_from_inputs(
+        renderer.load_render_inputs(
+            config, settings, renderer.StageTimings(), records
+        ),
+        settings,
+        renderer.StageTimings(),
+    ).payload
+
+    macs = {mac: mac for mac in payload["node_types"]}
+    for edge in payload["edges"]:
+        assert edge["left"] is macs[edge["left"]]
+        assert edge["right"] is macs[edge["right"]]
+    for mac, details in payload["client_details"].items():
+        assert mac is details["mac"] is macs.get(mac, mac)
+        connected = details["connected_to_mac"]
+        assert connected is None or connected is macs[connected]
+    for section in ("client_ips", "node_vlans", "device_details"):
+        for mac in payload[section]:
+            assert mac is macs[mac]
+
+
+def test_render_indexes_the_topology_with_the_payload() -> None:
+    from dataclasses import replace
+
+    from custom_components.unifi_network_map import renderer
+    from tests.benchmarks.synthetic import generate_site
+
+    site = generate_site(6, 30)
+    records = renderer.ControllerRecords(
+        site.devices, site.clients, site.networks
+    )
+    config = renderer.Config(url="https://c", site="default", api_key="k")
+    settings = build_settings(
+        include_ports=True, include_clients=True, client_scope="all"
+    )
+    inputs = renderer.load_render_inputs(
+        config, settings, renderer.StageTimings(), records
+    )
+
+    data = renderer.render_from_inputs(
+        replace(inputs, networks=None), settings, renderer.StageTimings()
+    )
+    topology = data.topology
+
+    assert topology is not None
+    payload = data.payload
+    for mac, details in payload["client_details"].items():
+        path = topology.path_to_gateway(mac)
+        if path is None:
+            continue
+        assert path[-1] in payload["gateways"]
+        if details["is_wired"]:
+            assert path[1] == details["connected_to_mac"]
+            assert topology.uplink_ports.get(mac) is not None
+    for mac, details in payload["device_details"].items():
+        if details["uplink_device"]:
+            assert topology.parents[mac] == details["uplink_device"]
+    completed = renderer.with_networks(data, inputs.clients, [], settings)
+    assert completed.topology is topology
@@ -5,6 +5,9 @@ from __future__ import annotations
 from dataclasses import replace
 from unittest.mock import MagicMock, patch
 
+from custom_components.unifi_network_map.device_index import (
+    build_render_device_index,
+)
 from custom_components.unifi_network_map.renderer import (
     RenderSettings,
     _build_client_ip_index,
@@ -13,8 +16,8 @@ from custom_components.unifi_network_map.renderer import (
     _build_vpn_tunnel_list,
     _extract_vpn_info,
     _load_builtin_svg_theme,
-    _load_networks,
     _resolve_svg_theme,
+    load_networks,
 )
 
 _DEFAULT_SETTINGS = RenderSettings(
@@ -30,11 +33,11 @@ _DEFAULT_SETTINGS = RenderSettings(
 )
 
 
-# -- _load_networks ----------------------------------------------------------
+# -- load_networks ----------------------------------------------------------
 
 
-def test_load_networks_returns_empty_on_error() -> None:
-    """When _fetch_networks_filtered raises, _load_networks returns []."""
+def testload_networks_returns_empty_on_error() -> None:
+    """When _fetch_networks_filtered raises, load_networks returns []."""
     config = MagicMock()
     config.site = "default"
     settings = replace(_DEFAULT_SETTINGS, use_cache=False)
@@ -44,7 +47,7 @@ def test_load_networks_returns_empty_on_error() -> None:
         "._fetch_networks_filtered",
         side_effect=RuntimeError("connection refused"),
     ):
-        result = _load_networks(config, settings)
+        result = load_networks(config, settings)
 
     assert result == []
 
@@ -75,7 +78,7 @@ def test_resolve_svg_theme_overrides_icon_set() -> None:
 def test_extract_vpn_info_returns_none_when_disabled() -> None:
     """With show_vpn=False the function short-circuits to None."""
     settings = replace(_DEFAULT_SETTINGS, show_vpn=False)
-    result = _extract_vpn_info([], settings)
+    result = _extract_vpn_info(build_render_device_index([]), settings)
     assert result is None
 
 
@@ -89,7 +92,9 @@ def test_extract_vpn_info_returns_tunnels_when_found() -> None:
         "custom_components.unifi_network_map.renderer.extract_vpn_tunnels",
         return_value=[tunnel],
     ):
-        result = _extract_vpn_info([MagicMock()], settings)
+        result = _extract_vpn_info(
+            build_render_device_index([MagicMock()]), settings
+        )
 
     assert result is not None
     assert len(result) == 1
@@ -0,0 +1,68 @@
+"""Tests for the rolling per-stage timings."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.unifi_network_map import stage_timings
+from custom_components.unifi_network_map.stage_timings import (
+    StageTimings,
+    discard_stage_timings,
+    get_stage_timings,
+)
+
+
+def test_summary_reports_percentiles_in_milliseconds() -> None:
+    timings = StageTimings(window=100)
+    for ms in range(1, 101):
+        timings.record("render_svg", ms / 1000)
+
+    summary = timings.summary()["render_svg"]
+
+    assert summary == {
+        "count": 100,
+        "last_ms": 100.0,
+        "p50_ms": 50.0,
+        "p95_ms": 95.0,
+        "max_ms": 100.0,
+    }
+
+
+def test_window_keeps_only_recent_samples() -> None:
+    timings = StageTimings(window=3)
+    for seconds in (5.0, 0.001, 0.002, 0.003):
+        timings.record("fetch_map", seconds)
+
+    summary = timings.summary()["fetch_map"]
+
+    assert summary["count"] == 3
+    assert summary["max_ms"] == 3.0
+
+
+def test_measure_records_even_when_block_raises(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    clock = iter([10.0, 10.25])
+    monkeypatch.setattr(
+        stage_timings, "monotonic_seconds", lambda: next(clock)
+    )
+    timings = StageTimings()
+
+    with pytest.raises(RuntimeError), timings.measure("fetch_devices"):
+        raise RuntimeError("boom")
+
+    assert timings.summary()["fetch_devices"]["last_ms"] == 250.0
+
+
+def test_timings_are_per_entry_and_discarded_on_unload() -> None:
+    hass = SimpleNamespace(data={})
+    first = get_stage_timings(hass, "entry-1")  # type: ignore[arg-type]
+
+    assert get_stage_timings(hass, "entry-1") is first  # type: ignore[arg-type]
+    assert get_stage_timings(hass, "entry-2") is not first  # type: ignore[arg-type]
+
+    discard_stage_timings(hass, "entry-1")  # type: ignore[arg-type]
+
+    assert get_stage_timings(hass, "entry-1") is not first  # type: ignore[arg-type]
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from custom_components.unifi_network_map.topology_index import (
+    build_topology_index,
+)
+
+
+def _edge(left: str, right: str) -> dict[str, str]:
+    return {"left": left, "right": right}
+
+
+def test_edges_are_oriented_away_from_the_gateway() -> None:
+    # The switch-to-gateway link is reported upside down.
+    index = build_topology_index(
+        [_edge("sw", "gw"), _edge("sw", "ap"), _edge("ap", "phone")],
+        ["gw", "sw", "ap", "phone"],
+        ["gw"],
+    )
+
+    assert index.path_to_gateway("phone") == ["phone", "ap", "sw", "gw"]
+    assert index.path_to_gateway("gw") == ["gw"]
+    assert index.path_to_gateway("missing") is None
+    assert index.children["sw"] == ("ap",)
+    assert index.neighbors("gw") == {
+        "parent": None,
+        "uplink_port": None,
+        "children": ["sw"],
+        "ports": [],
+    }
+
+
+def test_port_attachments_group_nodes_per_port() -> None:
+    index = build_topology_index(
+        [_edge("gw", "sw"), _edge("sw", "c1"), _edge("sw", "c2")],
+        ["gw", "sw", "c1", "c2"],
+        ["gw"],
+        [
+            ("gw", 4, "sw"),
+            ("sw", 12, "c1"),
+            ("sw", 12, "c2"),
+            ("sw", 12, "c2"),
+            ("sw", 3, "gone"),
+        ],
+    )
+
+    neighbors = index.neighbors("sw")
+
+    assert neighbors is not None
+    assert neighbors["ports"] == [{"port": 12, "macs": ["c1", "c2"]}]
+    assert index.uplink_ports == {"sw": 4, "c1": 12, "c2": 12}
+
+
+def test_links_away_from_any_gateway_keep_their_direction() -> None:
+    index = build_topology_index(
+        [_edge("a", "b"), _edge("b", "c"), _edge("c", "a")],
+        ["a", "b", "c"],
+        [],
+    )
+
+    assert index.path_to_gateway("c") == ["c", "b", "a"]
+    assert index.parents.get("a") is None
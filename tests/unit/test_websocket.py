@@ -12,11 +12,18 @@ from custom_components.unifi_network_map.coordinator import (
     UniFiNetworkMapCoordinator,
 )
 from custom_components.unifi_network_map.data import UniFiNetworkMapData
+from custom_components.unifi_network_map.topology_index import (
+    build_topology_index,
+)
 from custom_components.unifi_network_map.websocket import (
     _build_payload,
     _get_coordinator,
     async_register_websocket_api,
+    websocket_node_neighbors,
+    websocket_node_path,
+    websocket_related_entities,
     websocket_subscribe_map,
+    websocket_vlan_clients,
 )
 
 # The real @async_response decorator wraps the async function
@@ -37,7 +44,14 @@ class TestAsyncRegisterWebsocketApi:
         ) as mock_register:
             async_register_websocket_api(hass)
 
-        mock_register.assert_called_once()
+        registered = [call.args[1] for call in mock_register.call_args_list]
+        assert registered == [
+            websocket_subscribe_map,
+            websocket_related_entities,
+            websocket_vlan_clients,
+            websocket_node_path,
+            websocket_node_neighbors,
+        ]
         assert hass.data[DOMAIN]["websocket_registered"] is True
 
     def test_does_not_register_twice(self) -> None:
@@ -151,6 +165,55 @@ class TestBuildPayload:
         args = mock_enrich.call_args[0]
         assert args[1] is not original_payload
 
+    def test_encodes_compact_schema_when_requested(self) -> None:
+        hass = MagicMock()
+        hass.data = {}
+        coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
+        coordinator.data = UniFiNetworkMapData(
+            svg="<svg></svg>",
+            payload={"edges": [], "node_types": {"a": "switch"}},
+        )
+
+        with patch(
+            "custom_components.unifi_network_map.enrichment.build_enriched_payload"
+        ) as mock_enrich:
+            mock_enrich.return_value = {"node_types": {"a": "switch"}}
+            first = _build_payload(hass, coordinator, "entry-1", "3.0")
+            second = _build_payload(hass, coordinator, "entry-1", "3.0")
+
+        assert first is second
+        assert first["schema_version"] == "3.0"
+        assert first["nodes"] == ["a"]
+        assert first["node_types"] == ["switch"]
+        mock_enrich.assert_called_once()
+
+
+class TestBuildPayloadFields:
+    """Tests for field projection in _build_payload."""
+
+    def test_projects_requested_fields(self) -> None:
+        hass = MagicMock()
+        hass.data = {}
+        coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
+        coordinator.data = UniFiNetworkMapData(
+            svg="<svg></svg>",
+            payload={"edges": [], "node_types": {"a": "switch"}},
+        )
+
+        with patch(
+            "custom_components.unifi_network_map.enrichment.build_enriched_payload"
+        ) as mock_enrich:
+            mock_enrich.return_value = {
+                "edges": [],
+                "node_types": {"a": "switch"},
+                "related_entities": {"a": []},
+            }
+            payload = _build_payload(
+                hass, coordinator, "entry-1", "2.0", ("edges",)
+            )
+
+        assert payload == {"edges": []}
+
 
 class TestWebsocketSubscribeMap:
     """Tests for websocket_subscribe_map function."""
@@ -299,6 +362,36 @@ class TestWebsocketSubscribeMap:
         # Should send update message
         connection.send_message.assert_called_once()
 
+    @pytest.mark.asyncio  # type: ignore[misc]
+    async def test_counts_active_subscribers(self) -> None:
+        coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
+        coordinator.data = UniFiNetworkMapData(
+            svg="<svg></svg>",
+            payload={"edges": [], "node_types": {}},
+        )
+        coordinator.websocket_subscribers = 0
+        remove_listener = MagicMock()
+        coordinator.async_add_listener.return_value = remove_listener
+        entry = MagicMock()
+        entry.runtime_data = coordinator
+        hass = MagicMock()
+        hass.data = {}
+        hass.config_entries.async_get_entry.return_value = entry
+        connection = MagicMock()
+        connection.subscriptions = {}
+        msg: dict[str, Any] = {"id": 1, "entry_id": "entry123"}
+
+        with patch(
+            "custom_components.unifi_network_map.enrichment.build_enriched_payload"
+        ) as mock_enrich:
+            mock_enrich.return_value = {"enriched": True}
+            await _subscribe_map_async(hass, connection, msg)
+
+        assert coordinator.websocket_subscribers == 1
+        connection.subscriptions[1]()
+        assert coordinator.websocket_subscribers == 0
+        remove_listener.assert_called_once()
+
     @pytest.mark.asyncio  # type: ignore[misc]
     async def test_update_callback_skips_if_no_data(self) -> None:
         coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
@@ -341,3 +434,243 @@ class TestWebsocketSubscribeMap:
 
         # Should not send message when data is None
         connection.send_message.assert_not_called()
+
+
+class TestWebsocketRelatedEntities:
+    """Tests for websocket_related_entities function."""
+
+    def _hass(self, data: UniFiNetworkMapData | None) -> MagicMock:
+        coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
+        coordinator.data = data
+        entry = MagicMock()
+        entry.runtime_data = coordinator
+        hass = MagicMock()
+        hass.config_entries.async_get_entry.return_value = entry
+        return hass
+
+    def test_resolves_requested_nodes_on_the_map_only(self) -> None:
+        hass = self._hass(
+            UniFiNetworkMapData(
+                svg="<svg />",
+                payload={
+                    "node_types": {
+                        "aa:bb:cc:dd:ee:01": "switch",
+                        "aa:bb:cc:dd:ee:02": "client",
+                    }
+                },
+            )
+        )
+        connection = MagicMock()
+        msg: dict[str, Any] = {
+            "id": 5,
+            "entry_id": "entry123",
+            "macs": [
+                "AA:BB:CC:DD:EE:01",
+                "aa:bb:cc:dd:ee:02",
+                "aa:bb:cc:dd:ee:99",
+                " ",
+            ],
+        }
+
+        with patch(
+            "custom_components.unifi_network_map.websocket.resolve_related_entities"
+        ) as mock_resolve:
+            mock_resolve.return_value = {
+                "aa:bb:cc:dd:ee:01": [{"entity_id": "sensor.a"}]
+            }
+            websocket_related_entities(hass, connection, msg)
+
+        mock_resolve.assert_called_once_with(
+            hass, {"aa:bb:cc:dd:ee:01", "aa:bb:cc:dd:ee:02"}
+        )
+        connection.send_result.assert_called_once_with(
+            5,
+            {
+                "related_entities": {
+                    "aa:bb:cc:dd:ee:01": [{"entity_id": "sensor.a"}],
+                    "aa:bb:cc:dd:ee:02": [],
+                }
+            },
+        )
+
+    def test_sends_error_without_data(self) -> None:
+        hass = self._hass(None)
+        connection = MagicMock()
+        msg: dict[str, Any] = {"id": 7, "entry_id": "entry123", "macs": ["a"]}
+
+        websocket_related_entities(hass, connection, msg)
+
+        connection.send_error.assert_called_once()
+        assert connection.send_error.call_args[0][1] == "no_data"
+
+    def test_sends_error_if_coordinator_not_found(self) -> None:
+        hass = MagicMock()
+        hass.config_entries.async_get_entry.return_value = None
+        connection = MagicMock()
+        msg: dict[str, Any] = {"id": 6, "entry_id": "missing", "macs": ["a"]}
+
+        websocket_related_entities(hass, connection, msg)
+
+        connection.send_error.assert_called_once()
+        assert connection.send_error.call_args[0][1] == "not_found"
+
+
+class TestWebsocketVlanClients:
+    """Tests for websocket_vlan_clients function."""
+
+    def test_returns_every_client_on_the_vlan(self) -> None:
+        coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
+        coordinator.data = UniFiNetworkMapData(
+            svg="<svg></svg>",
+            payload={
+                "node_vlans": {"c1": 10, "c2": 10, "c3": 20, "c4": None},
+                "client_details": {"c1": {"name": "tv"}},
+                "node_names": {"c2": "Apple TV"},
+            },
+        )
+        entry = MagicMock()
+        entry.runtime_data = coordinator
+        hass = MagicMock()
+        hass.config_entries.async_get_entry.return_value = entry
+        connection = MagicMock()
+
+        websocket_vlan_clients(
+            hass, connection, {"id": 7, "entry_id": "e", "vlan_id": 10}
+        )
+
+        connection.send_result.assert_called_once_with(
+            7,
+            {
+                "vlan_id": 10,
+                "clients": [
+                    {"mac": "c2", "name": "Apple TV"},
+                    {"mac": "c1", "name": "tv"},
+                ],
+            },
+        )
+
+    def test_sends_error_without_data(self) -> None:
+        coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
+        coordinator.data = None
+        entry = MagicMock()
+        entry.runtime_data = coordinator
+        hass = MagicMock()
+        hass.config_entries.async_get_entry.return_value = entry
+        connection = MagicMock()
+
+        websocket_vlan_clients(
+            hass, connection, {"id": 8, "entry_id": "e", "vlan_id": 10}
+        )
+
+        connection.send_error.assert_called_once()
+
+
+def _topology_hass(data: UniFiNetworkMapData | None) -> MagicMock:
+    coordinator = MagicMock(spec=UniFiNetworkMapCoordinator)
+    coordinator.data = data
+    entry = MagicMock()
+    entry.runtime_data = coordinator
+    hass = MagicMock()
+    hass.config_entries.async_get_entry.return_value = entry
+    return hass
+
+
+def _topology_data() -> UniFiNetworkMapData:
+    payload: dict[str, Any] = {
+        "edges": [
+            {"left": "gw", "right": "sw"},
+            {"left": "sw", "right": "c1"},
+        ],
+        "node_types": {"gw": "gateway", "sw": "switch", "c1": "client"},
+        "node_names": {"gw": "Gateway", "sw": "Switch", "c1": "Laptop"},
+        "gateways": ["gw"],
+    }
+    return UniFiNetworkMapData(
+        svg="<svg></svg>",
+        payload=payload,
+        topology=build_topology_index(
+            payload["edges"],
+            payload["node_types"],
+            payload["gateways"],
+            [("gw", 2, "sw"), ("sw", 7, "c1")],
+        ),
+    )
+
+
+class TestWebsocketTopology:
+    """Tests for the path and neighbors commands."""
+
+    def test_path_lists_hops_up_to_the_gateway(self) -> None:
+        hass = _topology_hass(_topology_data())
+        connection = MagicMock()
+
+        websocket_node_path(
+            hass, connection, {"id": 9, "entry_id": "e", "mac": " C1 "}
+        )
+
+        connection.send_result.assert_called_once_with(
+            9,
+            {
+                "mac": "c1",
+                "path": [
+                    {
+                        "mac": "c1",
+                        "name": "Laptop",
+                        "type": "client",
+                        "uplink_port": 7,
+                    },
+                    {
+                        "mac": "sw",
+                        "name": "Switch",
+                        "type": "switch",
+                        "uplink_port": 2,
+                    },
+                    {
+                        "mac": "gw",
+                        "name": "Gateway",
+                        "type": "gateway",
+                        "uplink_port": None,
+                    },
+                ],
+            },
+        )
+
+    def test_neighbors_list_parent_children_and_ports(self) -> None:
+        hass = _topology_hass(_topology_data())
+        connection = MagicMock()
+
+        websocket_node_neighbors(
+            hass, connection, {"id": 10, "entry_id": "e", "mac": "sw"}
+        )
+
+        connection.send_result.assert_called_once_with(
+            10,
+            {
+                "mac": "sw",
+                "parent": "gw",
+                "uplink_port": 2,
+                "children": ["c1"],
+                "ports": [{"port": 7, "macs": ["c1"]}],
+            },
+        )
+
+    @pytest.mark.parametrize(
+        ("data", "mac", "code"),
+        [
+            (None, "sw", "no_data"),
+            (UniFiNetworkMapData(svg="", payload={}), "sw", "no_data"),
+            (_topology_data(), "unknown", "not_found"),
+        ],
+    )
+    def test_errors(
+        self, data: UniFiNetworkMapData | None, mac: str, code: str
+    ) -> None:
+        hass = _topology_hass(data)
+        connection = MagicMock()
+
+        websocket_node_path(
+            hass, connection, {"id": 11, "entry_id": "e", "mac": mac}
+        )
+
+        connection.send_result.assert_not_called()
+        assert connection.send_error.call_args[0][1] == code